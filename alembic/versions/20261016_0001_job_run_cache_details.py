@@ -0,0 +1,42 @@
+"""add job run cache hit flag and stage details
+
+Revision ID: 20261016_0001
+Revises: 20260224_0003
+Create Date: 2026-10-16 10:00:00
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+
+
+revision: str = "20261016_0001"
+down_revision: Union[str, None] = "20260224_0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_column(table_name: str, column_name: str) -> bool:
+    bind = op.get_bind()
+    return column_name in {column["name"] for column in inspect(bind).get_columns(table_name)}
+
+
+def upgrade() -> None:
+    if not _has_column("job_runs", "cache_hit"):
+        op.add_column(
+            "job_runs",
+            sa.Column("cache_hit", sa.Boolean(), nullable=False, server_default=sa.text("false")),
+        )
+    if not _has_column("job_runs", "details_json"):
+        op.add_column("job_runs", sa.Column("details_json", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    if _has_column("job_runs", "details_json"):
+        op.drop_column("job_runs", "details_json")
+    if _has_column("job_runs", "cache_hit"):
+        op.drop_column("job_runs", "cache_hit")
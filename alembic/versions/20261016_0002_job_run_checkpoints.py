@@ -0,0 +1,44 @@
+"""add job run input fingerprints for stage checkpoints
+
+Revision ID: 20261016_0002
+Revises: 20261016_0001
+Create Date: 2026-10-16 11:00:00
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+
+
+revision: str = "20261016_0002"
+down_revision: Union[str, None] = "20261016_0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_column(table_name: str, column_name: str) -> bool:
+    bind = op.get_bind()
+    return column_name in {column["name"] for column in inspect(bind).get_columns(table_name)}
+
+
+def _index_names(table_name: str) -> set[str]:
+    bind = op.get_bind()
+    return {idx["name"] for idx in inspect(bind).get_indexes(table_name)}
+
+
+def upgrade() -> None:
+    if not _has_column("job_runs", "input_fingerprint"):
+        op.add_column("job_runs", sa.Column("input_fingerprint", sa.String(length=64), nullable=True))
+    if "ix_job_runs_post_stage" not in _index_names("job_runs"):
+        op.create_index("ix_job_runs_post_stage", "job_runs", ["post_id", "stage"], unique=False)
+
+
+def downgrade() -> None:
+    if "ix_job_runs_post_stage" in _index_names("job_runs"):
+        op.drop_index("ix_job_runs_post_stage", table_name="job_runs")
+    if _has_column("job_runs", "input_fingerprint"):
+        op.drop_column("job_runs", "input_fingerprint")
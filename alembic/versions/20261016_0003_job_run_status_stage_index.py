@@ -0,0 +1,34 @@
+"""index job runs by status and stage for the Veo operation sweep
+
+Revision ID: 20261016_0003
+Revises: 20261016_0002
+Create Date: 2026-10-16 14:00:00
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy import inspect
+
+
+revision: str = "20261016_0003"
+down_revision: Union[str, None] = "20261016_0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _index_names(table_name: str) -> set[str]:
+    bind = op.get_bind()
+    return {idx["name"] for idx in inspect(bind).get_indexes(table_name)}
+
+
+def upgrade() -> None:
+    if "ix_job_runs_status_stage" not in _index_names("job_runs"):
+        op.create_index("ix_job_runs_status_stage", "job_runs", ["status", "stage"], unique=False)
+
+
+def downgrade() -> None:
+    if "ix_job_runs_status_stage" in _index_names("job_runs"):
+        op.drop_index("ix_job_runs_status_stage", table_name="job_runs")
@@ -0,0 +1,46 @@
+"""add render tier and spec to variants and video jobs for draft/final rendering
+
+Revision ID: 20261016_0004
+Revises: 20261016_0003
+Create Date: 2026-10-16 20:00:00
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+
+
+revision: str = "20261016_0004"
+down_revision: Union[str, None] = "20261016_0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_TABLES = ("post_variants", "video_jobs")
+
+
+def _has_column(table_name: str, column_name: str) -> bool:
+    bind = op.get_bind()
+    return column_name in {column["name"] for column in inspect(bind).get_columns(table_name)}
+
+
+def upgrade() -> None:
+    for table_name in _TABLES:
+        if not _has_column(table_name, "render_tier"):
+            op.add_column(
+                table_name,
+                sa.Column("render_tier", sa.String(length=10), nullable=False, server_default="final"),
+            )
+        if not _has_column(table_name, "render_spec"):
+            op.add_column(table_name, sa.Column("render_spec", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    for table_name in _TABLES:
+        if _has_column(table_name, "render_spec"):
+            op.drop_column(table_name, "render_spec")
+        if _has_column(table_name, "render_tier"):
+            op.drop_column(table_name, "render_tier")
@@ -0,0 +1,58 @@
+"""add media assets registry with upload-time probe metadata
+
+Revision ID: 20261016_0005
+Revises: 20261016_0004
+Create Date: 2026-10-16 21:00:00
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+
+
+revision: str = "20261016_0005"
+down_revision: Union[str, None] = "20261016_0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_table(table_name: str) -> bool:
+    bind = op.get_bind()
+    return table_name in inspect(bind).get_table_names()
+
+
+def _index_names(table_name: str) -> set[str]:
+    bind = op.get_bind()
+    return {idx["name"] for idx in inspect(bind).get_indexes(table_name)}
+
+
+def upgrade() -> None:
+    if not _has_table("media_assets"):
+        op.create_table(
+            "media_assets",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("url", sa.String(length=500), nullable=False),
+            sa.Column("storage_key", sa.String(length=500), nullable=False),
+            sa.Column("content_sha256", sa.String(length=64), nullable=True),
+            sa.Column("byte_size", sa.BigInteger(), nullable=False),
+            sa.Column("mime_type", sa.String(length=100), nullable=False),
+            sa.Column("width", sa.Integer(), nullable=True),
+            sa.Column("height", sa.Integer(), nullable=True),
+            sa.Column("duration_seconds", sa.Float(), nullable=True),
+            sa.Column("codec", sa.String(length=40), nullable=True),
+            sa.Column("bitrate", sa.BigInteger(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("url"),
+        )
+    if "ix_media_assets_content_sha256" not in _index_names("media_assets"):
+        op.create_index("ix_media_assets_content_sha256", "media_assets", ["content_sha256"], unique=False)
+
+
+def downgrade() -> None:
+    if _has_table("media_assets"):
+        op.drop_table("media_assets")
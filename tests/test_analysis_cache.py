@@ -0,0 +1,135 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from vak_bot.api import admin_routes
+from vak_bot.db.base import Base
+from vak_bot.db.models import Brand, JobRun, Post
+from vak_bot.enums import JobStage
+from vak_bot.pipeline import analysis_cache, orchestrator, prompts
+from vak_bot.pipeline.analysis_cache import style_brief_cache_key
+from vak_bot.schemas import StyleBrief
+from vak_bot.services.cache_store import CacheStore
+
+REFERENCE = "https://www.instagram.com/p/ABC/"
+
+
+def test_brands_with_different_guardrails_get_different_keys(monkeypatch) -> None:
+    base = prompts.load_brand_config(None)
+    guardrails = {1: "Never mention discounts.", 2: "Always call the fabric handloom cotton."}
+    monkeypatch.setattr(prompts, "load_brand_config", lambda brand_id=None: {**base, "llm_guardrails": guardrails[brand_id]})
+
+    first = style_brief_cache_key(REFERENCE, b"pixels", "general", brand_id=1)
+    second = style_brief_cache_key(REFERENCE, b"pixels", "general", brand_id=2)
+
+    assert first != second
+    assert first == style_brief_cache_key(REFERENCE, b"pixels", "general", brand_id=1)
+    assert style_brief_cache_key(REFERENCE, b"pixels", "general", brand_id=1, is_video=True) != first
+
+
+@pytest.fixture
+def briefs(monkeypatch, tmp_path) -> CacheStore:
+    store = CacheStore("style-briefs", redis_url="", disk_dir=str(tmp_path))
+    monkeypatch.setattr(analysis_cache, "_store", store)
+    return store
+
+
+def _brief(temperature: str) -> StyleBrief:
+    return StyleBrief.model_validate(
+        {
+            "layout_type": "flat-lay",
+            "color_mood": {"temperature": temperature, "dominant_colors": ["#D4A574"], "palette_name": "earthy"},
+            "vibe_words": ["warm", "artisan"],
+        }
+    )
+
+
+class _UnreachableAnalyzer:
+    brand_id = None
+    settings = SimpleNamespace(dry_run=False)
+
+    async def analyze_reference_async(self, *_args, **_kwargs) -> StyleBrief:
+        raise AssertionError("the analyzer ran despite a cached brief")
+
+
+def test_cache_hit_skips_the_analyzer_and_is_recorded_on_the_analyze_run(briefs, monkeypatch) -> None:
+    async def _reference_bytes(_url: str) -> bytes:
+        return b"pixels"
+
+    monkeypatch.setattr(orchestrator, "_fetch_bytes_async", _reference_bytes)
+    cached = _brief("warm")
+    analysis_cache.store_style_brief(style_brief_cache_key(REFERENCE, b"pixels", "general"), cached)
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine, expire_on_commit=False, class_=Session)() as session:
+        brand = Brand(slug="b", name="B")
+        session.add(brand)
+        session.flush()
+        post = Post(brand_id=brand.id, reference_url=REFERENCE)
+        session.add(post)
+        session.commit()
+
+        async def _analyze() -> StyleBrief:
+            async with orchestrator.stage_run_async(session, post.id, JobStage.ANALYZE, brand.id) as run:
+                style_brief, run.cache_hit = await orchestrator._analyze_reference(
+                    _UnreachableAnalyzer(), REFERENCE, "https://media.example/reference.jpg", None
+                )
+            return style_brief
+
+        assert asyncio.run(_analyze()) == cached
+        run = session.query(JobRun).one()
+        assert run.stage == JobStage.ANALYZE.value
+        assert run.cache_hit is True
+
+
+def test_image_and_video_briefs_of_one_reference_do_not_collide(briefs) -> None:
+    image_key = style_brief_cache_key(REFERENCE, b"pixels", "general")
+    video_key = style_brief_cache_key(REFERENCE, b"pixels", "general", is_video=True)
+    analysis_cache.store_style_brief(image_key, _brief("warm"))
+
+    assert analysis_cache.get_cached_style_brief(video_key) is None
+    analysis_cache.store_style_brief(video_key, _brief("cool"))
+    assert analysis_cache.get_cached_style_brief(image_key) == _brief("warm")
+    assert analysis_cache.get_cached_style_brief(video_key) == _brief("cool")
+
+    assert analysis_cache.purge_style_briefs(REFERENCE) == 2
+    assert analysis_cache.get_cached_style_brief(image_key) is None
+    assert analysis_cache.get_cached_style_brief(video_key) is None
+
+
+def test_briefs_cached_concurrently_for_one_reference_are_all_purged(briefs) -> None:
+    keys = [style_brief_cache_key(REFERENCE, b"pixels", f"category-{index}") for index in range(8)]
+    threads = [threading.Thread(target=analysis_cache.store_style_brief, args=(key, _brief("warm"))) for key in keys]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert analysis_cache.purge_style_briefs(REFERENCE) == len(keys)
+    assert all(analysis_cache.get_cached_style_brief(key) is None for key in keys)
+
+
+def test_admin_purge_clears_every_cached_brief(briefs, monkeypatch) -> None:
+    audit: list[dict] = []
+    monkeypatch.setattr(admin_routes, "_require_user", lambda _request, _db: SimpleNamespace(id=1))
+    monkeypatch.setattr(admin_routes, "_require_csrf", lambda _request, _user: None)
+    monkeypatch.setattr(admin_routes, "_is_super_admin", lambda _db, _user_id: True)
+    monkeypatch.setattr(admin_routes, "write_audit_log", lambda _db, **kwargs: audit.append(kwargs))
+    first = style_brief_cache_key(REFERENCE, b"pixels", "general")
+    second = style_brief_cache_key("https://www.instagram.com/p/XYZ/", b"other", "general")
+    analysis_cache.store_style_brief(first, _brief("warm"))
+    analysis_cache.store_style_brief(second, _brief("cool"))
+
+    response = admin_routes.purge_style_brief_cache(admin_routes.StyleBriefPurgePayload(), request=None, db=None)
+
+    assert response["ok"] is True
+    assert response["removed"] >= 2
+    assert analysis_cache.get_cached_style_brief(first) is None
+    assert analysis_cache.get_cached_style_brief(second) is None
+    assert audit[0]["action"] == "cache.style_briefs.purge"
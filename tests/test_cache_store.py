@@ -0,0 +1,37 @@
+import time
+
+from vak_bot.services.cache_store import CacheStore
+
+
+def test_cache_store_disk_fallback_roundtrip(tmp_path) -> None:
+    store = CacheStore("test", redis_url="", disk_dir=str(tmp_path))
+    assert store.get("missing") is None
+    store.set("key", b"\x00payload", ttl_seconds=60)
+    assert store.get("key") == b"\x00payload"
+    store.delete("key")
+    assert store.get("key") is None
+
+
+def test_cache_store_disk_entries_expire(tmp_path, monkeypatch) -> None:
+    store = CacheStore("test", redis_url="", disk_dir=str(tmp_path))
+    store.set("key", b"value", ttl_seconds=10)
+    monkeypatch.setattr(time, "time", lambda: 10**12)
+    assert store.get("key") is None
+
+
+def test_cache_store_clear_removes_namespace(tmp_path) -> None:
+    store = CacheStore("test", redis_url="", disk_dir=str(tmp_path))
+    other = CacheStore("other", redis_url="", disk_dir=str(tmp_path))
+    store.set("a", b"1")
+    store.set("b", b"2")
+    other.set("a", b"3")
+    assert store.clear() == 2
+    assert store.get("a") is None
+    assert other.get("a") == b"3"
+
+
+def test_cache_store_update_applies_to_the_stored_value(tmp_path) -> None:
+    store = CacheStore("test", redis_url="", disk_dir=str(tmp_path))
+    assert store.update("count", lambda raw: str(int(raw or b"0") + 1).encode()) == b"1"
+    assert store.update("count", lambda raw: str(int(raw or b"0") + 1).encode()) == b"2"
+    assert store.get("count") == b"2"
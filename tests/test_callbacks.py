@@ -16,3 +16,9 @@ def test_parse_extend_callback() -> None:
     parsed = parse_callback(data)
     assert parsed is not None
     assert parsed.action == CallbackAction.EXTEND
+
+
+def test_parse_another_video_callback() -> None:
+    parsed = parse_callback(make_callback(7, 0, CallbackAction.ANOTHER_VIDEO))
+    assert parsed is not None
+    assert parsed.action == CallbackAction.ANOTHER_VIDEO
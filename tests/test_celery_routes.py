@@ -6,3 +6,34 @@ def test_video_tasks_are_routed_to_pipeline_queue() -> None:
     assert routes.get("vak_bot.workers.tasks.process_video_post_task") == {"queue": "pipeline"}
     assert routes.get("vak_bot.workers.tasks.extend_video_task") == {"queue": "pipeline"}
     assert routes.get("vak_bot.workers.tasks.reel_this_task") == {"queue": "pipeline"}
+    assert routes.get("vak_bot.workers.tasks.render_reel_variation_task") == {"queue": "pipeline"}
+
+
+def test_reference_routing_runs_on_pipeline_queue() -> None:
+    routes = celery_app.conf.task_routes or {}
+    assert routes.get("vak_bot.workers.tasks.route_reference_task") == {"queue": "pipeline"}
+    assert routes.get("vak_bot.workers.tasks.prefetch_reference_task") == {"queue": "pipeline"}
+
+
+def test_carousel_slides_render_on_pipeline_queue() -> None:
+    routes = celery_app.conf.task_routes or {}
+    assert routes.get("vak_bot.workers.tasks.render_carousel_slides_task") == {"queue": "pipeline"}
+
+
+def test_final_renders_run_on_pipeline_queue() -> None:
+    routes = celery_app.conf.task_routes or {}
+    assert routes.get("vak_bot.workers.tasks.finalize_render_task") == {"queue": "pipeline"}
+
+
+def test_veo_sweep_runs_on_a_beat_schedule() -> None:
+    routes = celery_app.conf.task_routes or {}
+    assert routes.get("vak_bot.workers.tasks.poll_veo_operations_task") == {"queue": "maintenance"}
+    schedule = celery_app.conf.beat_schedule["poll-veo-operations"]
+    assert schedule["task"] == "vak_bot.workers.tasks.poll_veo_operations_task"
+
+
+def test_storage_orphan_sweep_runs_daily_on_maintenance_queue() -> None:
+    routes = celery_app.conf.task_routes or {}
+    assert routes.get("vak_bot.workers.tasks.sweep_storage_orphans_task") == {"queue": "maintenance"}
+    schedule = celery_app.conf.beat_schedule["sweep-storage-orphans-daily"]
+    assert schedule["task"] == "vak_bot.workers.tasks.sweep_storage_orphans_task"
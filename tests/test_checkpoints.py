@@ -0,0 +1,63 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from vak_bot.db.base import Base
+from vak_bot.db.models import Brand, JobRun, Post
+from vak_bot.enums import JobStage, JobStatus
+from vak_bot.pipeline.checkpoints import IMAGE_STAGES, StageCheckpoints, input_fingerprint
+
+
+@pytest.fixture()
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        brand = Brand(slug="b", name="B")
+        db.add(brand)
+        db.commit()
+        db.add(Post(brand_id=brand.id, reference_url="https://www.instagram.com/p/ABC/", status="draft"))
+        db.commit()
+        yield db
+
+
+def _run(db, stage: JobStage, status: JobStatus, fingerprint: str) -> None:
+    post = db.query(Post).one()
+    db.add(JobRun(brand_id=post.brand_id, post_id=post.id, stage=stage.value, status=status.value, input_fingerprint=fingerprint))
+    db.commit()
+
+
+def _checkpoints(db, from_stage: JobStage | None = None) -> StageCheckpoints:
+    post = db.query(Post).one()
+    return StageCheckpoints(db, post.id, post.brand_id, IMAGE_STAGES, from_stage=from_stage)
+
+
+def test_input_fingerprint_is_order_insensitive_for_dicts() -> None:
+    assert input_fingerprint({"a": 1, "b": 2}, [1]) == input_fingerprint({"b": 2, "a": 1}, [1])
+    assert input_fingerprint({"a": 1}) != input_fingerprint({"a": 2})
+
+
+def test_stage_is_skipped_when_inputs_unchanged(session) -> None:
+    _run(session, JobStage.ANALYZE, JobStatus.SUCCEEDED, "fp")
+    assert _checkpoints(session).try_skip(JobStage.ANALYZE, "fp", ready=True)
+    latest = session.query(JobRun).order_by(JobRun.id.desc()).first()
+    assert latest.status == JobStatus.SKIPPED.value
+    # A reused checkpoint stays reusable.
+    assert _checkpoints(session).try_skip(JobStage.ANALYZE, "fp", ready=True)
+
+
+def test_stage_reruns_on_changed_inputs_failure_or_missing_output(session) -> None:
+    _run(session, JobStage.STYLE, JobStatus.SUCCEEDED, "fp")
+    assert not _checkpoints(session).try_skip(JobStage.STYLE, "other", ready=True)
+    assert not _checkpoints(session).try_skip(JobStage.STYLE, "fp", ready=False)
+    _run(session, JobStage.STYLE, JobStatus.FAILED, "fp")
+    assert not _checkpoints(session).try_skip(JobStage.STYLE, "fp", ready=True)
+
+
+def test_from_stage_forces_that_stage_and_later(session) -> None:
+    for stage in (JobStage.DOWNLOAD, JobStage.STYLE, JobStage.CAPTION):
+        _run(session, stage, JobStatus.SUCCEEDED, "fp")
+    checkpoints = _checkpoints(session, from_stage=JobStage.STYLE)
+    assert checkpoints.try_skip(JobStage.DOWNLOAD, "fp", ready=True)
+    assert not checkpoints.try_skip(JobStage.STYLE, "fp", ready=True)
+    assert not checkpoints.try_skip(JobStage.CAPTION, "fp", ready=True)
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from vak_bot.pipeline.dag import DagError, Node, run_dag
+
+
+@pytest.mark.asyncio
+async def test_dependents_receive_results_from_sync_and_async_nodes() -> None:
+    async def _b(inputs: dict) -> int:
+        await asyncio.sleep(0)
+        return inputs["a"] + 1
+
+    outcome = await run_dag(
+        [
+            Node("a", lambda _inputs: 1),
+            Node("b", _b, deps=("a",)),
+            Node("persist", lambda inputs: inputs["a"] + inputs["b"], deps=("a", "b")),
+        ]
+    )
+
+    assert outcome.results == {"a": 1, "b": 2, "persist": 3}
+    assert {timing.status for timing in outcome.timings.values()} == {"succeeded"}
+
+
+@pytest.mark.asyncio
+async def test_dependent_starts_before_unrelated_slow_node_finishes() -> None:
+    slow_started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def _slow(_inputs: dict) -> str:
+        slow_started.set()
+        await asyncio.wait_for(release.wait(), timeout=5)
+        return "slow"
+
+    async def _dependent(_inputs: dict) -> str:
+        # Runs while the slow sibling is still blocked.
+        await asyncio.wait_for(slow_started.wait(), timeout=5)
+        release.set()
+        return "caption"
+
+    outcome = await run_dag(
+        [
+            Node("slow", _slow),
+            Node("fast", lambda _inputs: "first"),
+            Node("caption", _dependent, deps=("fast",)),
+        ]
+    )
+
+    assert outcome.results["caption"] == "caption"
+    assert outcome.timings["caption"].start_ms <= outcome.timings["slow"].start_ms + outcome.timings["slow"].duration_ms
+
+
+@pytest.mark.asyncio
+async def test_failure_cancels_running_and_unstarted_nodes() -> None:
+    ran: list[str] = []
+
+    async def _boom(_inputs: dict) -> None:
+        await asyncio.sleep(0.01)
+        raise RuntimeError("render failed")
+
+    async def _sibling(_inputs: dict) -> None:
+        await asyncio.sleep(1)
+        ran.append("sibling")
+
+    with pytest.raises(DagError) as excinfo:
+        await run_dag(
+            [
+                Node("render", _boom),
+                Node("sibling", _sibling),
+                Node("validate", lambda _inputs: ran.append("validate"), deps=("render",)),
+            ]
+        )
+
+    assert excinfo.value.node == "render"
+    assert isinstance(excinfo.value.cause, RuntimeError)
+    assert excinfo.value.timings["sibling"].status == "cancelled"
+    assert excinfo.value.timings["validate"].status == "cancelled"
+    assert ran == []
+
+
+@pytest.mark.asyncio
+async def test_cycles_are_rejected() -> None:
+    with pytest.raises(ValueError):
+        await run_dag([Node("a", lambda _inputs: 1, deps=("b",)), Node("b", lambda _inputs: 2, deps=("a",))])
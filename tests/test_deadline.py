@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from vak_bot.db.base import Base
+from vak_bot.db.models import Brand, JobRun, Post
+from vak_bot.enums import JobStage
+from vak_bot.pipeline.deadline import DeadlineBudget, limit_attempts, provider_timeout, within_budget
+from vak_bot.pipeline.errors import DeadlineExceededError
+from vak_bot.pipeline.orchestrator import stage_run_async
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture()
+def session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        brand = Brand(slug="b", name="B")
+        db.add(brand)
+        db.commit()
+        db.add(Post(brand_id=brand.id, status="processing"))
+        db.commit()
+        yield db
+
+
+def test_provider_timeouts_shrink_to_what_is_left() -> None:
+    clock = _Clock()
+    budget = DeadlineBudget(300, reserve_seconds=60, clock=clock)
+
+    async def _timeouts() -> list[float]:
+        timeouts = [provider_timeout("gemini").read]
+        clock.now += 200
+        timeouts.append(provider_timeout("gemini").read)
+        clock.now += 97
+        with pytest.raises(DeadlineExceededError):
+            provider_timeout("openai")
+        return timeouts
+
+    assert asyncio.run(within_budget(1, _timeouts(), budget)) == [180.0, 100.0]
+    # Outside a budgeted run every provider keeps its default.
+    assert provider_timeout("gemini").read == 180.0
+
+
+def test_fallbacks_are_dropped_once_the_budget_is_nearly_spent() -> None:
+    clock = _Clock()
+    budget = DeadlineBudget(300, reserve_seconds=60, clock=clock)
+    routes = ["pro:snake", "pro:camel", "flash:snake"]
+
+    assert budget.attempts(routes, "gemini_rest_fallback") == routes
+    clock.now += 250
+    assert budget.attempts(routes, "gemini_rest_fallback") == ["pro:snake"]
+    assert not budget.allows_optional("gemini_file_upload")
+    assert budget.skipped == ["gemini_rest_fallback", "gemini_file_upload"]
+    assert limit_attempts(routes, "unbudgeted") == routes
+
+
+def test_job_runs_record_the_budget_each_stage_consumed(session) -> None:
+    clock = _Clock()
+    budget = DeadlineBudget(900, clock=clock)
+    post = session.query(Post).one()
+
+    async def _stages() -> None:
+        async with stage_run_async(session, post.id, JobStage.DOWNLOAD, post.brand_id):
+            clock.now += 12
+        async with stage_run_async(session, post.id, JobStage.ANALYZE, post.brand_id) as run:
+            run.details_json = {"cache": "miss"}
+            clock.now += 30
+
+    asyncio.run(within_budget(post.id, _stages(), budget))
+
+    download, analyze = session.query(JobRun).order_by(JobRun.id).all()
+    assert download.details_json == {
+        "budget": {"stage_ms": 12000, "spent_ms": 12000, "remaining_ms": 888000, "total_ms": 900000}
+    }
+    assert analyze.details_json["cache"] == "miss"
+    assert analyze.details_json["budget"]["stage_ms"] == 30000
+    assert analyze.details_json["budget"]["remaining_ms"] == 858000
+    assert budget.stage_ms == {"download": 12000, "analyze": 30000}
@@ -0,0 +1,87 @@
+import asyncio
+
+import httpx
+import pytest
+
+from vak_bot.config import get_settings
+from vak_bot.pipeline import downloader
+from vak_bot.pipeline.downloader import DataBrightDownloader
+from vak_bot.pipeline.errors import DownloadError, PrivatePostError
+from vak_bot.services.cache_store import CacheStore
+
+REFERENCE = "https://www.instagram.com/p/ABC/"
+POST = {
+    "content_type": "carousel",
+    "photos": ["https://cdn.example/1.jpg", "https://cdn.example/2.jpg"],
+    "description": "Block-printed cotton",
+    "hashtags": ["#handloom"],
+}
+
+
+class _BrightData:
+    """Stands in for the Bright Data scrape endpoint and counts the calls it gets."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.reply: tuple[int, dict] = (200, {"json": [POST]})
+
+    def __call__(self, _request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        status_code, body = self.reply
+        return httpx.Response(status_code, **body)
+
+
+@pytest.fixture
+def bright_data(monkeypatch, tmp_path) -> _BrightData:
+    settings = get_settings().model_copy(update={"dry_run": False, "databright_api_key": "token"})
+    monkeypatch.setattr(downloader, "get_settings", lambda: settings)
+    monkeypatch.setattr(downloader, "_scrape_cache", CacheStore("scrapes", redis_url="", disk_dir=str(tmp_path)))
+    api = _BrightData()
+    monkeypatch.setattr(downloader, "get_client", lambda _provider: httpx.Client(transport=httpx.MockTransport(api)))
+    monkeypatch.setattr(
+        downloader, "get_async_client", lambda _provider: httpx.AsyncClient(transport=httpx.MockTransport(api))
+    )
+    return api
+
+
+def test_preflight_and_download_stage_share_one_scrape(bright_data: _BrightData) -> None:
+    preflight = DataBrightDownloader().download_post(f"{REFERENCE}?igsh=share-link")
+    downloaded = asyncio.run(DataBrightDownloader().download_post_async(REFERENCE))
+
+    assert bright_data.calls == 1
+    assert preflight.media_type == downloaded.media_type == "carousel"
+    assert downloaded.image_urls == POST["photos"]
+
+
+def test_corrupt_cache_entry_is_dropped_and_rescraped(bright_data: _BrightData) -> None:
+    downloader._cache().set("instagram:ABC", b"{not json")
+
+    reference = DataBrightDownloader().download_post(REFERENCE)
+
+    assert bright_data.calls == 1
+    assert reference.image_urls == POST["photos"]
+    DataBrightDownloader().download_post(REFERENCE)
+    assert bright_data.calls == 1
+
+
+def test_private_post_is_not_cached(bright_data: _BrightData) -> None:
+    bright_data.reply = (200, {"json": [{"error": "This post is private"}]})
+
+    for _ in range(2):
+        with pytest.raises(PrivatePostError):
+            DataBrightDownloader().download_post(REFERENCE)
+
+    assert bright_data.calls == 2
+    assert downloader._cache().get("instagram:ABC") is None
+
+
+def test_failed_scrape_is_not_cached(bright_data: _BrightData) -> None:
+    bright_data.reply = (502, {"text": "upstream timeout"})
+
+    with pytest.raises(DownloadError):
+        asyncio.run(DataBrightDownloader().download_post_async(REFERENCE))
+
+    assert downloader._cache().get("instagram:ABC") is None
+    bright_data.reply = (200, {"json": [POST]})
+    assert DataBrightDownloader().download_post(REFERENCE).image_urls == POST["photos"]
+    assert bright_data.calls == 2
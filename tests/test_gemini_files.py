@@ -0,0 +1,73 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from vak_bot.pipeline import gemini_files, http_clients
+from vak_bot.pipeline.gemini_files import GeminiFileCache
+from vak_bot.services.cache_store import CacheStore
+
+
+class _FilesHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    uploads = 0
+    expires_in = timedelta(hours=48)
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.headers.get("X-Goog-Upload-Command") == "start":
+            self.send_response(200)
+            self.send_header("x-goog-upload-url", f"http://{self.headers['Host']}/session/1")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        _FilesHandler.uploads += 1
+        expires = (datetime.now(timezone.utc) + _FilesHandler.expires_in).strftime("%Y-%m-%dT%H:%M:%S.123456789Z")
+        body = json.dumps(
+            {"file": {"uri": f"https://files/{_FilesHandler.uploads}", "mimeType": "image/jpeg", "state": "ACTIVE", "expirationTime": expires}}
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args) -> None:
+        pass
+
+
+@pytest.fixture
+def files(monkeypatch, tmp_path):
+    http_clients._reset_after_fork()
+    _FilesHandler.uploads = 0
+    _FilesHandler.expires_in = timedelta(hours=48)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FilesHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(gemini_files, "_UPLOAD_ENDPOINT", f"http://127.0.0.1:{server.server_address[1]}/upload")
+    monkeypatch.setattr(gemini_files, "_store", CacheStore("gemini-files", redis_url="", disk_dir=str(tmp_path)))
+    yield GeminiFileCache("test-key")
+    http_clients.close_all()
+    server.shutdown()
+    server.server_close()
+
+
+def test_same_bytes_are_uploaded_once(files: GeminiFileCache) -> None:
+    first = files.get_or_upload(b"product", "image/jpeg")
+    second = files.get_or_upload(b"product", "image/jpeg")
+
+    assert first is not None and first == second
+    assert first.expires_at > time.time() + 47 * 3600
+    assert _FilesHandler.uploads == 1
+    assert files.get_or_upload(b"reference", "image/jpeg").uri == "https://files/2"
+
+
+def test_handles_close_to_expiry_are_uploaded_again(files: GeminiFileCache) -> None:
+    _FilesHandler.expires_in = timedelta(minutes=30)
+
+    files.get_or_upload(b"product", "image/jpeg")
+    files.get_or_upload(b"product", "image/jpeg")
+
+    assert _FilesHandler.uploads == 2
@@ -0,0 +1,101 @@
+from vak_bot.config import get_settings
+from vak_bot.enums import RenderTier
+from vak_bot.pipeline.gemini_files import GeminiFile
+from vak_bot.pipeline.gemini_styler import ROUTING_PROVIDER, GeminiStyler, _ImageInput, _RenderedItem
+from vak_bot.pipeline.llm_utils import normalize_gemini_image_model
+from vak_bot.pipeline.provider_routing import RoutingTable
+from vak_bot.pipeline.render_pool import RenderJob
+from vak_bot.schemas import StyleBrief
+from vak_bot.services.cache_store import CacheStore
+
+
+def test_render_jobs_cover_only_requested_positions() -> None:
+    references = ["https://cdn.example/1.jpg", "https://cdn.example/2.jpg", "https://cdn.example/3.jpg"]
+    prompts = {1: "minimal", 2: "warm", 3: "editorial"}
+
+    lazy = GeminiStyler._render_jobs(prompts, GeminiStyler._positions(references, [1]))
+    assert lazy == [RenderJob(1, 1), RenderJob(2, 1), RenderJob(3, 1)]
+
+    remaining = GeminiStyler._render_jobs({2: "warm"}, GeminiStyler._positions(references, [2, 3, 7]))
+    assert remaining == [RenderJob(2, 2), RenderJob(2, 3)]
+
+
+def test_positions_default_to_every_slide() -> None:
+    assert GeminiStyler._positions(["a", "b"], None) == [1, 2]
+
+
+def test_draft_tier_renders_with_the_draft_model() -> None:
+    draft = GeminiStyler(tier=RenderTier.DRAFT)
+
+    assert draft.tier == RenderTier.DRAFT
+    assert draft.image_model == normalize_gemini_image_model(get_settings().gemini_draft_image_model)
+    assert GeminiStyler().tier == RenderTier.FINAL
+
+
+def test_replayed_seed_reaches_every_variant_and_request() -> None:
+    styler = GeminiStyler()
+    brief = StyleBrief.model_validate(
+        {
+            "layout_type": "flat-lay",
+            "color_mood": {"temperature": "warm", "dominant_colors": ["#D4A574"], "palette_name": "earthy"},
+            "vibe_words": ["warm", "artisan"],
+        }
+    )
+
+    assert GeminiStyler._seeds({1: "minimal", 2: "warm"}, 42) == {1: 42, 2: 42}
+    assert styler._build_generation_config(styler.image_model, brief, 42)["seed"] == 42
+    assert styler._render_spec("prompt", 42) == {"model": styler.image_model, "seed": 42, "prompt": "prompt"}
+
+
+def test_uploaded_inputs_are_referenced_by_uri_instead_of_inlined() -> None:
+    styler = GeminiStyler()
+    product = _ImageInput(b64="cHJvZHVjdA==", mime="image/png", file=GeminiFile("https://files/p", "image/png", 0.0))
+    reference = _ImageInput(b64="cmVm", mime="image/jpeg")
+
+    snake = styler._build_image_parts("prompt", reference, product, "snake")
+    camel = styler._build_image_parts("prompt", reference, product, "camel")
+
+    assert snake[2] == {"inline_data": {"mime_type": "image/jpeg", "data": "cmVm"}}
+    assert snake[4] == {"file_data": {"mime_type": "image/png", "file_uri": "https://files/p"}}
+    assert camel[4] == {"fileData": {"mimeType": "image/png", "fileUri": "https://files/p"}}
+
+
+def test_render_spec_records_the_model_that_rendered_each_variant() -> None:
+    styler = GeminiStyler()
+    prompts = {1: "minimal", 2: "warm"}
+    jobs = GeminiStyler._render_jobs(prompts, [1, 2])
+    # Variant 2's second slide fell back while variant 1 rendered on the configured model throughout.
+    rendered = [
+        _RenderedItem("https://media.example/1-1.jpg", b"a", styler.image_model, "sdk"),
+        _RenderedItem("https://media.example/1-2.jpg", b"b", styler.image_model, "sdk"),
+        _RenderedItem("https://media.example/2-1.jpg", b"c", styler.image_model, "sdk"),
+        _RenderedItem("https://media.example/2-2.jpg", b"d", "fallback-image-model", "camel"),
+    ]
+
+    first, second = styler._assemble_variants(prompts, {1: 7, 2: 7}, jobs, rendered, b"product")
+
+    assert first.render_spec["model"] == styler.image_model
+    assert second.render_spec["model"] == "fallback-image-model"
+    # A final render that fell back is kept as a draft so approval renders it again.
+    assert (first.render_tier, second.render_tier) == (RenderTier.FINAL.value, RenderTier.DRAFT.value)
+    assert second.item_urls == ["https://media.example/2-1.jpg", "https://media.example/2-2.jpg"]
+
+
+def test_render_routes_order_sdk_and_rest_routes_in_one_pass(tmp_path) -> None:
+    styler = GeminiStyler()
+    styler.image_model = "gemini-3-pro-image-preview"
+    styler._sdk_client = object()
+    styler._routes = RoutingTable(
+        CacheStore("provider-routing", redis_url="", disk_dir=str(tmp_path)), half_life_seconds=600
+    )
+    styler._routes.record(ROUTING_PROVIDER, "gemini-3-pro-image-preview:sdk", False, 1_000)
+
+    sdk_models, rest_routes = styler._render_routes({"snake": [], "camel": []})
+
+    assert sdk_models == ["gemini-2.5-flash-image", "gemini-3-pro-image-preview"]
+    assert rest_routes == [
+        ("gemini-3-pro-image-preview", "snake"),
+        ("gemini-3-pro-image-preview", "camel"),
+        ("gemini-2.5-flash-image", "snake"),
+        ("gemini-2.5-flash-image", "camel"),
+    ]
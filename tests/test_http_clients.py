@@ -0,0 +1,72 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from vak_bot.pipeline import http_clients
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args) -> None:
+        pass
+
+
+@pytest.fixture
+def server_url():
+    http_clients._reset_after_fork()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    http_clients.close_all()
+    server.shutdown()
+    server.server_close()
+
+
+def test_sync_client_is_shared_and_reuses_connections(server_url: str) -> None:
+    assert http_clients.get_client("media") is http_clients.get_client("media")
+
+    for _ in range(3):
+        assert http_clients.get_client("media").get(server_url).text == "ok"
+
+    assert http_clients.pool_stats()["media"] == {
+        "requests": 3,
+        "connections_opened": 1,
+        "connections_reused": 2,
+    }
+
+
+@pytest.mark.asyncio
+async def test_async_client_counts_per_provider(server_url: str) -> None:
+    client = http_clients.get_async_client("openai")
+    assert client is http_clients.get_async_client("openai")
+
+    for _ in range(2):
+        response = await client.get(server_url)
+        assert response.status_code == 200
+    await client.aclose()
+
+    stats = http_clients.pool_stats()
+    assert stats["openai"]["requests"] == 2
+    assert stats["openai"]["connections_opened"] == 1
+    assert "media" not in stats
+
+
+def test_fork_reset_drops_clients_and_counters(server_url: str) -> None:
+    client = http_clients.get_client("media")
+    client.get(server_url)
+
+    http_clients._reset_after_fork()
+
+    assert http_clients.pool_stats() == {}
+    assert http_clients.get_client("media") is not client
+    client.close()
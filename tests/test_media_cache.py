@@ -0,0 +1,105 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from vak_bot.pipeline import http_clients
+from vak_bot.pipeline.media_cache import MediaCache, _Meta
+
+DIGEST = "ab" + "0" * 62
+BODY = b"styled-jpeg-bytes"
+
+
+class _MediaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests: list[tuple[str, str | None]] = []
+
+    def do_GET(self) -> None:
+        _MediaHandler.requests.append((self.path, self.headers.get("If-None-Match")))
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *_args) -> None:
+        pass
+
+
+@pytest.fixture
+def server_url():
+    http_clients._reset_after_fork()
+    _MediaHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _MediaHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    http_clients.close_all()
+    server.shutdown()
+    server.server_close()
+
+
+def _cache(tmp_path, **overrides) -> MediaCache:
+    options = {"memory_bytes": 1024 * 1024, "disk_bytes": 10 * 1024 * 1024, "revalidate_seconds": 300}
+    options.update(overrides)
+    return MediaCache(tmp_path / "media", **options)
+
+
+def test_content_addressed_urls_are_fetched_once_per_host(server_url: str, tmp_path) -> None:
+    url = f"{server_url}/styled/ab/{DIGEST}.jpg"
+    cache = _cache(tmp_path)
+
+    assert cache.get(url).data == BODY
+    assert cache.get(url).content_type == "image/jpeg"
+    # A fresh process on the same host starts with an empty memory tier but shares the disk tier.
+    assert _cache(tmp_path).get(url).data == BODY
+
+    assert len(_MediaHandler.requests) == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["memory_hits"] == 1
+
+
+def test_stale_mutable_urls_are_revalidated_with_their_etag(server_url: str, tmp_path) -> None:
+    url = f"{server_url}/products/photo.jpg"
+    cache = _cache(tmp_path, revalidate_seconds=0)
+
+    cache.get(url)
+    again = cache.get(url)
+
+    assert again.data == BODY
+    assert _MediaHandler.requests == [("/products/photo.jpg", None), ("/products/photo.jpg", '"v1"')]
+    assert cache.stats()["revalidated"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_async_fetches_share_one_download(server_url: str, tmp_path) -> None:
+    url = f"{server_url}/references/1/ab/{DIGEST}.jpg"
+    cache = _cache(tmp_path)
+
+    results = await asyncio.gather(*(cache.get_async(url) for _ in range(3)))
+
+    assert {media.data for media in results} == {BODY}
+    assert len(_MediaHandler.requests) == 1
+
+
+def test_memory_tier_evicts_least_recently_used(tmp_path) -> None:
+    cache = _cache(tmp_path, memory_bytes=40, disk_bytes=0)
+    meta_args = {"content_type": "image/jpeg", "etag": None, "fetched_at": 0.0}
+
+    cache._remember("a", b"x" * 10, _Meta(**meta_args))
+    cache._remember("b", b"y" * 10, _Meta(**meta_args))
+    cache._from_memory("a")
+    cache._remember("c", b"z" * 10, _Meta(**meta_args))
+    cache._remember("d", b"w" * 10, _Meta(**meta_args))
+    cache._remember("e", b"v" * 10, _Meta(**meta_args))
+
+    assert cache._from_memory("b") is None
+    assert cache._from_memory("a") is not None
+    assert cache.stats()["evictions"] == 1
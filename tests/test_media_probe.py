@@ -0,0 +1,50 @@
+import hashlib
+import io
+import json
+import subprocess
+
+from PIL import Image
+
+from vak_bot.storage import media_probe
+
+
+def _png(width: int, height: int) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (10, 20, 30)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def test_image_probe_records_size_hash_and_dimensions(tmp_path) -> None:
+    data = _png(40, 50)
+    path = tmp_path / "frame.png"
+    path.write_bytes(data)
+
+    from_bytes = media_probe.probe_bytes(data, "image/png")
+    from_file = media_probe.probe_file(path, "image/png")
+
+    assert from_bytes == from_file
+    assert (from_bytes.width, from_bytes.height, from_bytes.byte_size) == (40, 50, len(data))
+    assert from_bytes.content_sha256 == hashlib.sha256(data).hexdigest()
+
+
+def test_video_probe_reads_ffprobe_stream_and_format(tmp_path, monkeypatch) -> None:
+    clip = tmp_path / "clip.mp4"
+    clip.write_bytes(b"\x00" * 64)
+    payload = {
+        "streams": [
+            {"codec_type": "audio", "codec_name": "aac"},
+            {"codec_type": "video", "codec_name": "h264", "width": 720, "height": 1280},
+        ],
+        "format": {"duration": "8.000000", "bit_rate": "4200000"},
+    }
+    monkeypatch.setattr(media_probe, "_ffprobe", lambda: "ffprobe")
+    monkeypatch.setattr(
+        media_probe.subprocess,
+        "run",
+        lambda cmd, **_kwargs: subprocess.CompletedProcess(cmd, 0, stdout=json.dumps(payload), stderr=""),
+    )
+
+    probe = media_probe.probe_file(clip, "video/mp4")
+
+    assert (probe.width, probe.height, probe.codec) == (720, 1280, "h264")
+    assert (probe.duration_seconds, probe.bitrate, probe.byte_size) == (8.0, 4200000, 64)
@@ -0,0 +1,871 @@
+import asyncio
+import io
+import threading
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from vak_bot.db.base import Base
+from vak_bot.db.models import Brand, JobRun, Post, PostVariant, PostVariantItem, TelegramSession, VideoJob
+from vak_bot.enums import JobStage, JobStatus, PostStatus, RenderTier, SessionState
+from vak_bot.pipeline import orchestrator, product_features
+from vak_bot.pipeline.interfaces import DownloadedReference
+from vak_bot.pipeline.product_validator import ProductValidator
+from vak_bot.schemas import StyleBrief, StyledVariant
+from vak_bot.services import post_service
+from vak_bot.services.cache_store import CacheStore
+from vak_bot.workers import tasks
+
+DRAFT_URL = "https://media.example/reels/draft.mp4"
+FINAL_URL = "https://media.example/reels/final.mp4"
+
+
+def _jpeg() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (32, 40), color=(180, 90, 60)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+class _FakeVeo:
+    def __init__(self, output_path) -> None:
+        self.output_path = output_path
+        self.submitted: list[dict] = []
+        # Raised by every poll when set; None polls return the output, and "pending" leaves it running.
+        self.poll_error: Exception | str | None = None
+
+    def submit_reel(self, **kwargs) -> str:
+        self.submitted.append(kwargs)
+        return "operations/final-1"
+
+    def build_video_prompt(self, style_brief, video_type) -> str:
+        return "keep the drape moving"
+
+    def submit_extension(self, video_path: str, prompt: str) -> str:
+        self.submitted.append({"video_path": video_path, "prompt": prompt})
+        return "operations/extension-1"
+
+    def render_spec(self, tier: RenderTier, seed: int | None) -> dict:
+        return {"model": "veo-final", "tier": tier.value, "seed": seed}
+
+    def check_operation(self, operation_name: str, output_prefix: str = "veo_output") -> str | None:
+        if self.poll_error == "pending":
+            return None
+        if self.poll_error is not None:
+            raise self.poll_error
+        self.output_path.write_bytes(b"mp4")
+        return str(self.output_path)
+
+
+class _FakeStorage:
+    def upload_file_content_addressed(self, prefix: str, path: str, content_type: str) -> str:
+        return FINAL_URL
+
+
+class _FakePoster:
+    def __init__(self) -> None:
+        self.reels: list[str] = []
+
+    def post_reel(self, video_s3_url: str, **_kwargs) -> dict:
+        self.reels.append(video_s3_url)
+        return {"id": "ig-1", "permalink": "https://instagram.example/p/1"}
+
+
+@pytest.fixture()
+def db(monkeypatch, tmp_path):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, expire_on_commit=False, class_=Session)
+    monkeypatch.setattr(orchestrator, "SessionLocal", factory)
+    texts: list[str] = []
+    monkeypatch.setattr(orchestrator, "send_text", lambda _brand_id, _chat_id, text: texts.append(text))
+    monkeypatch.setattr(orchestrator, "_fetch_bytes", lambda _url: _jpeg())
+    veo = _FakeVeo(tmp_path / "final.mp4")
+    monkeypatch.setattr(orchestrator, "VeoGenerator", lambda: veo)
+    monkeypatch.setattr(orchestrator, "R2StorageClient", _FakeStorage)
+    monkeypatch.setattr(orchestrator, "_check_video_first_frames", lambda *_args: None)
+    monkeypatch.setattr(orchestrator, "_publishable_video_url", lambda _session, post: post.video_url)
+    with factory() as session:
+        yield session, texts, veo
+
+
+def test_scheduled_draft_reel_is_published_once_its_final_render_lands(db, monkeypatch) -> None:
+    session, texts, veo = db
+    brand = Brand(slug="b", name="B")
+    session.add(brand)
+    session.flush()
+    # dispatch_scheduled_posts_task has already moved the post from SCHEDULED to APPROVED.
+    post = Post(
+        brand_id=brand.id,
+        status=PostStatus.APPROVED.value,
+        media_type="reel",
+        video_url=DRAFT_URL,
+        styled_image="https://media.example/styled/1.jpg",
+        selected_variant_index=1,
+        caption="caption",
+        hashtags="#tags",
+    )
+    session.add(post)
+    session.flush()
+    session.add(
+        VideoJob(
+            brand_id=brand.id,
+            post_id=post.id,
+            variation_number=1,
+            status="done",
+            video_url=DRAFT_URL,
+            prompt_used="drape in motion",
+            render_tier=RenderTier.DRAFT.value,
+            render_spec={"seed": 7},
+        )
+    )
+    session.commit()
+    poster = _FakePoster()
+
+    orchestrator.run_publish(post.id, 42, "scheduler", poster, brand.id)
+
+    assert poster.reels == []
+    assert veo.submitted[0]["seed"] == 7
+    assert session.query(JobRun).filter(JobRun.stage == JobStage.POST.value).count() == 0
+    session.expire_all()
+    assert session.get(Post, post.id).status == PostStatus.APPROVED.value
+
+    enqueued: list[tuple] = []
+    monkeypatch.setattr(tasks.publish_post_task, "delay", lambda *args: enqueued.append(args))
+    tasks.poll_veo_operations_task()
+
+    assert enqueued == [(post.id, 42, "scheduler", brand.id)]
+    orchestrator.run_publish(*enqueued[0][:3], poster, enqueued[0][3])
+
+    session.expire_all()
+    published = session.get(Post, post.id)
+    assert poster.reels == [FINAL_URL]
+    assert published.status == PostStatus.POSTED.value
+    assert [run.status for run in session.query(JobRun).filter(JobRun.stage == JobStage.POST.value)] == ["succeeded"]
+    assert "Posting it now" in texts[-2]
+
+
+def test_validation_scores_the_bytes_handed_over_by_style(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(product_features, "_store", CacheStore("product-features", redis_url="", disk_dir=str(tmp_path)))
+
+    def _no_download(url: str) -> bytes:
+        raise AssertionError(f"re-downloaded {url}")
+
+    monkeypatch.setattr(orchestrator, "_fetch_bytes", _no_download)
+    styled = _jpeg()
+    variant = StyledVariant(
+        variant_index=1,
+        preview_url="https://media.example/styled/1.jpg",
+        ssim_score=0.0,
+        is_valid=False,
+        item_bytes=[styled],
+        source_bytes=_jpeg(),
+    )
+    validator = ProductValidator()
+
+    original = orchestrator._product_reference([variant], "https://media.example/products/saree.jpg", validator)
+    _variant, items, results = orchestrator._score_variant(validator, variant, original)
+
+    assert items == [styled]
+    assert results[0].score > 0.99
+
+
+def _pending_reel_run(session, statuses: tuple[str, ...], started_minutes_ago: int = 0) -> tuple[Post, JobRun]:
+    brand = Brand(slug="b", name="B")
+    session.add(brand)
+    session.flush()
+    post = Post(
+        brand_id=brand.id,
+        status=PostStatus.PROCESSING.value,
+        media_type="reel",
+        styled_image="https://media.example/styled/1.jpg",
+    )
+    session.add(post)
+    session.flush()
+    jobs = [
+        VideoJob(
+            brand_id=brand.id,
+            post_id=post.id,
+            variation_number=number,
+            veo_operation_id=f"operations/{number}" if status == orchestrator.VIDEO_JOB_GENERATING else None,
+            status=status,
+            prompt_used="drape in motion",
+            render_tier=RenderTier.DRAFT.value,
+        )
+        for number, status in enumerate(statuses, start=1)
+    ]
+    session.add_all(jobs)
+    session.flush()
+    run = JobRun(
+        brand_id=brand.id,
+        post_id=post.id,
+        stage=JobStage.VIDEO_GENERATE.value,
+        status="started",
+        started_at=datetime.now(timezone.utc) - timedelta(minutes=started_minutes_ago),
+        details_json={
+            "chat_id": 42,
+            "resume": orchestrator.VEO_RESUME_PIPELINE,
+            "video_job_ids": [job.id for job in jobs],
+        },
+    )
+    session.add(run)
+    session.commit()
+    return post, run
+
+
+def test_final_render_publish_survives_a_failed_notification(db, monkeypatch) -> None:
+    session, _texts, veo = db
+    post, run = _pending_reel_run(session, (orchestrator.VIDEO_JOB_GENERATING,))
+    run.details_json = {**run.details_json, "resume": orchestrator.VEO_RESUME_FINAL, "publish_as": "scheduler"}
+    session.commit()
+
+    def _unreachable_chat(*_args) -> None:
+        raise RuntimeError("Bad Request: chat not found")
+
+    monkeypatch.setattr(orchestrator, "send_text", _unreachable_chat)
+    enqueued: list[tuple] = []
+    monkeypatch.setattr(tasks.publish_post_task, "delay", lambda *args: enqueued.append(args))
+
+    tasks.poll_veo_operations_task()
+
+    assert enqueued == [(post.id, 42, "scheduler", post.brand_id)]
+    session.expire_all()
+    assert session.get(JobRun, run.id).status == "succeeded"
+
+
+def test_sweep_notifies_only_after_its_commit_lands(db) -> None:
+    session, texts, veo = db
+    _post, run = _pending_reel_run(session, (orchestrator.VIDEO_JOB_GENERATING,))
+    run.details_json = {**run.details_json, "resume": orchestrator.VEO_RESUME_FINAL}
+    session.commit()
+
+    def _commit_fails(_session) -> None:
+        raise RuntimeError("could not serialize access")
+
+    event.listen(Session, "before_commit", _commit_fails)
+    try:
+        assert orchestrator.run_veo_sweep() == []
+    finally:
+        event.remove(Session, "before_commit", _commit_fails)
+
+    assert texts == []
+    session.expire_all()
+    assert session.get(JobRun, run.id).status == "started"
+
+    assert orchestrator.run_veo_sweep() == []
+
+    assert texts == ["The final Reel is ready. Reply 'post now' to publish."]
+    session.expire_all()
+    assert session.get(JobRun, run.id).status == "succeeded"
+
+
+def test_sweep_retries_a_failing_poll_until_the_deadline(db) -> None:
+    session, texts, veo = db
+    post, run = _pending_reel_run(session, (orchestrator.VIDEO_JOB_GENERATING,))
+    veo.poll_error = RuntimeError("404 operation not found")
+
+    assert orchestrator.run_veo_sweep() == []
+
+    session.expire_all()
+    assert session.get(JobRun, run.id).status == "started"
+    assert session.query(VideoJob).one().status == orchestrator.VIDEO_JOB_GENERATING
+    assert texts == []
+
+
+def test_sweep_fails_a_poll_that_still_errors_past_the_deadline(db) -> None:
+    session, texts, veo = db
+    post, run = _pending_reel_run(session, (orchestrator.VIDEO_JOB_GENERATING,), started_minutes_ago=30)
+    veo.poll_error = RuntimeError("404 operation not found")
+
+    assert orchestrator.run_veo_sweep() == []
+
+    session.expire_all()
+    assert session.get(JobRun, run.id).status == "failed"
+    assert session.query(VideoJob).one().status == "failed"
+    assert session.get(Post, post.id).status == PostStatus.FAILED.value
+    assert orchestrator._veo_in_flight(session, post.brand_id) == 0
+    assert len(texts) == 1
+
+
+def test_sweep_submits_queued_jobs_and_resumes_once_every_variation_lands(db) -> None:
+    session, texts, veo = db
+    post, run = _pending_reel_run(session, (orchestrator.VIDEO_JOB_GENERATING, orchestrator.VIDEO_JOB_QUEUED))
+
+    # The first variation lands and frees its slot for the queued one; the run waits for it.
+    assert orchestrator.run_veo_sweep() == []
+    session.expire_all()
+    statuses = [job.status for job in session.query(VideoJob).order_by(VideoJob.variation_number)]
+    assert statuses == ["done", orchestrator.VIDEO_JOB_GENERATING]
+    assert len(veo.submitted) == 1
+    assert str(session.query(VideoJob).filter(VideoJob.variation_number == 2).one().id) in (
+        session.get(JobRun, run.id).details_json["submitted_at"]
+    )
+
+    resumes = orchestrator.run_veo_sweep()
+
+    assert resumes == [
+        orchestrator.VeoResume(kind=orchestrator.VEO_RESUME_PIPELINE, post_id=post.id, chat_id=42, brand_id=post.brand_id)
+    ]
+    session.expire_all()
+    assert session.get(JobRun, run.id).status == "succeeded"
+    assert session.get(Post, post.id).video_url == FINAL_URL
+    assert orchestrator.run_veo_sweep() == []
+
+
+def test_a_queued_submit_that_keeps_failing_is_retried_then_failed(db, monkeypatch) -> None:
+    session, texts, veo = db
+    post, run = _pending_reel_run(session, (orchestrator.VIDEO_JOB_GENERATING, orchestrator.VIDEO_JOB_QUEUED))
+
+    def _purged(url: str) -> bytes:
+        raise RuntimeError(f"404 Not Found: {url}")
+
+    monkeypatch.setattr(orchestrator, "_fetch_bytes", _purged)
+
+    # The finished variation is kept and the queued one waits for a later sweep.
+    assert orchestrator.run_veo_sweep() == []
+    session.expire_all()
+    statuses = [job.status for job in session.query(VideoJob).order_by(VideoJob.variation_number)]
+    assert statuses == ["done", orchestrator.VIDEO_JOB_QUEUED]
+    assert session.get(JobRun, run.id).status == "started"
+
+    # Past the deadline since its first failure the queued variation is given up on.
+    stored = session.get(JobRun, run.id)
+    long_ago = (datetime.now(timezone.utc) - timedelta(minutes=30)).isoformat()
+    failed_at = {job_id: long_ago for job_id in stored.details_json["submit_failed_at"]}
+    stored.details_json = {**stored.details_json, "submit_failed_at": failed_at}
+    session.commit()
+
+    resumes = orchestrator.run_veo_sweep()
+
+    assert [resume.post_id for resume in resumes] == [post.id]
+    session.expire_all()
+    statuses = [job.status for job in session.query(VideoJob).order_by(VideoJob.variation_number)]
+    assert statuses == ["done", "failed"]
+    assert session.get(JobRun, run.id).status == "succeeded"
+    assert veo.submitted == []
+
+
+def test_queued_jobs_wait_for_a_free_brand_slot(db, monkeypatch) -> None:
+    session, _texts, veo = db
+    settings = orchestrator.get_settings().model_copy(update={"veo_brand_max_concurrent_operations": 1})
+    monkeypatch.setattr(orchestrator, "get_settings", lambda: settings)
+    veo.poll_error = "pending"
+    _post, run = _pending_reel_run(session, (orchestrator.VIDEO_JOB_GENERATING, orchestrator.VIDEO_JOB_QUEUED))
+
+    assert orchestrator.run_veo_sweep() == []
+
+    session.expire_all()
+    statuses = [job.status for job in session.query(VideoJob).order_by(VideoJob.variation_number)]
+    assert statuses == [orchestrator.VIDEO_JOB_GENERATING, orchestrator.VIDEO_JOB_QUEUED]
+    assert veo.submitted == []
+    assert session.get(JobRun, run.id).status == "started"
+
+
+def _preview(variant_index: int) -> StyledVariant:
+    return StyledVariant(
+        variant_index=variant_index,
+        preview_url=f"https://media.example/styled/{variant_index}.jpg",
+        ssim_score=0.9,
+        is_valid=True,
+        item_bytes=[_jpeg()],
+    )
+
+
+def test_progressive_review_falls_back_to_the_batch_package_when_a_preview_failed(monkeypatch) -> None:
+    sent: list[int] = []
+    finished: list[int] = []
+
+    def _send_option(_brand_id, _chat_id, _message_id, *, option, **_kwargs) -> None:
+        if option == 2:
+            raise RuntimeError("Too Many Requests: retry after 3")
+        sent.append(option)
+
+    monkeypatch.setattr(orchestrator, "send_review_option", _send_option)
+    monkeypatch.setattr(orchestrator, "finish_progressive_review", lambda *_args, **kwargs: finished.append(kwargs["option_count"]))
+    progress = orchestrator._ProgressiveReview(brand_id=1, chat_id=42, expected_count=2, status_message_id=7)
+
+    async def _review() -> tuple[bool, bool]:
+        await asyncio.gather(progress.deliver(_preview(1)), progress.deliver(_preview(2)))
+        return await progress.finish(5, [1, 2], "caption", "#tags"), await progress.finish(5, [1], "caption", "#tags")
+
+    incomplete, complete = asyncio.run(_review())
+
+    assert sent == [1]
+    assert incomplete is False
+    assert complete is True
+    assert finished == [1]
+
+
+class _RowLock:
+    """Stands in for the variant's Postgres row lock, which sqlite ignores.
+
+    A ``FOR UPDATE`` select blocks until no other session's transaction holds the
+    lock; waiting too long counts as a timeout instead of hanging the test.
+    """
+
+    def __init__(self, factory) -> None:
+        self._lock = threading.Lock()
+        self._holder = None
+        self.contended = threading.Event()
+        self.timeouts = 0
+        event.listen(factory, "do_orm_execute", self._on_execute)
+        event.listen(factory, "after_transaction_end", self._on_transaction_end)
+
+    def _on_execute(self, state) -> None:
+        if not state.is_select or state.statement._for_update_arg is None or self._holder is state.session:
+            return
+        if not self._lock.acquire(blocking=False):
+            self.contended.set()
+            if not self._lock.acquire(timeout=5):
+                self.timeouts += 1
+                raise TimeoutError("row lock wait timed out")
+        self._holder = state.session
+
+    def _on_transaction_end(self, session, transaction) -> None:
+        if transaction.parent is None and self._holder is session:
+            self._holder = None
+            self._lock.release()
+
+
+def test_carousel_completion_waits_for_a_concurrent_finalize_of_the_same_post(monkeypatch, tmp_path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'vak.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, expire_on_commit=False, class_=Session)
+    row_lock = _RowLock(factory)
+    monkeypatch.setattr(orchestrator, "SessionLocal", factory)
+    reference = ProductValidator().prepare_reference(_jpeg())
+    monkeypatch.setattr(orchestrator, "_product_reference", lambda *_args: reference)
+    rendering = threading.Event()
+    rendered_positions: list[list[int]] = []
+
+    class _Styler:
+        def __init__(self, brand_id=None) -> None:
+            pass
+
+        async def generate_variants_async(self, *, variant_indexes, positions, **_kwargs) -> list[StyledVariant]:
+            rendered_positions.append(positions)
+            rendering.set()
+            # Finish only once the completion task is waiting on the row the finalize holds.
+            await asyncio.to_thread(row_lock.contended.wait, 5)
+            return [
+                StyledVariant(
+                    variant_index=variant_indexes[0],
+                    preview_url="https://media.example/styled/1-1.jpg",
+                    item_urls=[f"https://media.example/styled/1-{position}.jpg" for position in positions],
+                    ssim_score=1.0,
+                    is_valid=True,
+                    item_bytes=[_jpeg() for _ in positions],
+                )
+            ]
+
+    monkeypatch.setattr(orchestrator, "GeminiStyler", _Styler)
+
+    with factory() as session:
+        brand = Brand(slug="b", name="B")
+        session.add(brand)
+        session.flush()
+        post = Post(
+            brand_id=brand.id,
+            status=PostStatus.APPROVED.value,
+            media_type="carousel",
+            selected_variant_index=1,
+            input_photo_urls=["https://media.example/products/saree.jpg"],
+            source_image_urls=[f"https://media.example/refs/{position}.jpg" for position in (1, 2, 3)],
+            style_brief={
+                "layout_type": "flat-lay",
+                "color_mood": {"temperature": "warm", "dominant_colors": ["#D4A574"], "palette_name": "earthy"},
+                "vibe_words": ["warm", "artisan"],
+            },
+        )
+        session.add(post)
+        session.flush()
+        variant = PostVariant(
+            brand_id=brand.id,
+            post_id=post.id,
+            variant_index=1,
+            preview_url="https://media.example/styled/1-1.jpg",
+            ssim_score=0.9,
+            is_valid=True,
+            render_tier=RenderTier.FINAL.value,
+        )
+        session.add(variant)
+        session.flush()
+        session.add(PostVariantItem(brand_id=brand.id, variant_id=variant.id, position=1, image_url=variant.preview_url))
+        session.commit()
+        post_id, brand_id = post.id, brand.id
+
+    def _finalize() -> None:
+        with factory() as session:
+            post = session.get(Post, post_id)
+            orchestrator._finalize_variant(session, post, orchestrator._selected_variant(session, post))
+
+    finalize = threading.Thread(target=_finalize)
+    completion = threading.Thread(target=orchestrator.run_carousel_completion, args=(post_id, 1, brand_id))
+    finalize.start()
+    assert rendering.wait(5)
+    completion.start()
+    finalize.join(15)
+    completion.join(15)
+
+    assert not finalize.is_alive() and not completion.is_alive()
+    assert row_lock.timeouts == 0
+    # The completion found the slides the finalize committed and rendered nothing itself.
+    assert rendered_positions == [[2, 3]]
+    with factory() as session:
+        items = session.query(PostVariantItem).order_by(PostVariantItem.position).all()
+        assert [item.position for item in items] == [1, 2, 3]
+
+
+def test_selecting_a_draft_carousel_variant_renders_it_at_final_quality(db, monkeypatch) -> None:
+    session, _texts, _veo = db
+    reference = ProductValidator().prepare_reference(_jpeg())
+    monkeypatch.setattr(orchestrator, "_product_reference", lambda *_args: reference)
+    rendered_positions: list[list[int]] = []
+
+    class _Styler:
+        def __init__(self, brand_id=None) -> None:
+            pass
+
+        async def generate_variants_async(self, *, variant_indexes, positions, seed, **_kwargs) -> list[StyledVariant]:
+            rendered_positions.append(positions)
+            assert seed == 11
+            return [
+                StyledVariant(
+                    variant_index=variant_indexes[0],
+                    preview_url="https://media.example/styled/final-1.jpg",
+                    item_urls=[f"https://media.example/styled/final-{position}.jpg" for position in positions],
+                    ssim_score=1.0,
+                    is_valid=True,
+                    render_tier=RenderTier.FINAL.value,
+                    item_bytes=[_jpeg() for _ in positions],
+                )
+            ]
+
+    monkeypatch.setattr(orchestrator, "GeminiStyler", _Styler)
+    brand = Brand(slug="b", name="B")
+    session.add(brand)
+    session.flush()
+    post = Post(
+        brand_id=brand.id,
+        status=PostStatus.REVIEW_READY.value,
+        media_type="carousel",
+        selected_variant_index=1,
+        input_photo_urls=["https://media.example/products/saree.jpg"],
+        source_image_urls=[f"https://media.example/refs/{position}.jpg" for position in (1, 2, 3)],
+        style_brief={
+            "layout_type": "flat-lay",
+            "color_mood": {"temperature": "warm", "dominant_colors": ["#D4A574"], "palette_name": "earthy"},
+            "vibe_words": ["warm", "artisan"],
+        },
+    )
+    session.add(post)
+    session.flush()
+    variant = PostVariant(
+        brand_id=brand.id,
+        post_id=post.id,
+        variant_index=1,
+        preview_url="https://media.example/styled/draft-1.jpg",
+        ssim_score=0.9,
+        is_valid=True,
+        render_tier=RenderTier.DRAFT.value,
+        render_spec={"seed": 11},
+    )
+    session.add(variant)
+    session.flush()
+    session.add(PostVariantItem(brand_id=brand.id, variant_id=variant.id, position=1, image_url=variant.preview_url))
+    session.commit()
+
+    orchestrator.run_carousel_completion(post.id, 1, brand.id)
+
+    assert rendered_positions == [[1, 2, 3]]
+    session.expire_all()
+    completed = session.get(PostVariant, variant.id)
+    assert completed.render_tier == RenderTier.FINAL.value
+    assert [item.image_url for item in sorted(completed.items, key=lambda item: item.position)] == [
+        f"https://media.example/styled/final-{position}.jpg" for position in (1, 2, 3)
+    ]
+    assert session.get(Post, post.id).styled_image == "https://media.example/styled/final-1.jpg"
+
+
+def test_extension_starts_from_the_clip_on_review_not_a_superseded_one(db, monkeypatch) -> None:
+    session, _texts, veo = db
+    downloads: list[str] = []
+    monkeypatch.setattr(orchestrator, "download_media", lambda url, _path: downloads.append(url))
+    brand = Brand(slug="b", name="B")
+    session.add(brand)
+    session.flush()
+    post = Post(
+        brand_id=brand.id,
+        status=PostStatus.REVIEW_READY.value,
+        media_type="reel",
+        video_url=FINAL_URL,
+        style_brief={
+            "layout_type": "flat-lay",
+            "color_mood": {"temperature": "warm", "dominant_colors": ["#D4A574"], "palette_name": "earthy"},
+            "vibe_words": ["warm", "artisan"],
+        },
+    )
+    session.add(post)
+    session.flush()
+    # The first render was redone; the superseded row sorts first without an explicit order.
+    session.add_all(
+        [
+            VideoJob(brand_id=brand.id, post_id=post.id, variation_number=1, status="superseded", video_url=DRAFT_URL),
+            VideoJob(brand_id=brand.id, post_id=post.id, variation_number=1, status="done", video_url=FINAL_URL),
+        ]
+    )
+    session.commit()
+
+    orchestrator.run_video_extension(post.id, 42, video_variation=1, brand_id=brand.id)
+
+    assert downloads == [FINAL_URL]
+    session.expire_all()
+    extending = session.query(VideoJob).filter(VideoJob.status == orchestrator.VIDEO_JOB_GENERATING).one()
+    assert extending.video_url == FINAL_URL
+    assert extending.veo_operation_id == "operations/extension-1"
+
+
+def test_an_extended_draft_reel_is_sent_back_to_review_instead_of_posted(db) -> None:
+    session, texts, veo = db
+    brand = Brand(slug="b", name="B")
+    session.add(brand)
+    session.flush()
+    post = Post(
+        brand_id=brand.id,
+        status=PostStatus.APPROVED.value,
+        media_type="reel",
+        video_url=DRAFT_URL,
+        selected_variant_index=1,
+        video_duration=16,
+    )
+    session.add(post)
+    session.flush()
+    session.add(
+        VideoJob(
+            brand_id=brand.id,
+            post_id=post.id,
+            variation_number=1,
+            status="extended",
+            video_url=DRAFT_URL,
+            render_tier=RenderTier.DRAFT.value,
+        )
+    )
+    session.commit()
+    poster = _FakePoster()
+
+    orchestrator.run_publish(post.id, 42, "scheduler", poster, brand.id)
+
+    assert poster.reels == []
+    assert veo.submitted == []
+    session.expire_all()
+    assert session.get(Post, post.id).status == PostStatus.REVIEW_READY.value
+    assert "draft preview" in texts[-1]
+
+
+def test_a_draft_clip_is_not_extended(db) -> None:
+    session, texts, veo = db
+    brand = Brand(slug="b", name="B")
+    session.add(brand)
+    session.flush()
+    post = Post(brand_id=brand.id, status=PostStatus.REVIEW_READY.value, media_type="reel", video_url=DRAFT_URL)
+    session.add(post)
+    session.flush()
+    session.add(
+        VideoJob(
+            brand_id=brand.id,
+            post_id=post.id,
+            variation_number=1,
+            status="done",
+            video_url=DRAFT_URL,
+            render_tier=RenderTier.DRAFT.value,
+        )
+    )
+    session.commit()
+
+    orchestrator.run_video_extension(post.id, 42, video_variation=1, brand_id=brand.id)
+
+    assert veo.submitted == []
+    assert session.query(JobRun).count() == 0
+    assert "approve" in texts[-1]
+
+
+PREFETCHED_REFERENCE = "https://media.example/references/1.jpg"
+
+
+class _StyleReached(Exception):
+    pass
+
+
+@pytest.fixture()
+def prefetch_pipeline(db, monkeypatch) -> dict[str, list]:
+    """Runs the prefetch, or a pipeline up to STYLE, with every provider faked, recording what each stage did."""
+    calls: dict[str, list] = {"download": [], "analyze": [], "style": []}
+
+    class _Downloader:
+        async def download_post_async(self, source_url: str) -> DownloadedReference:
+            calls["download"].append(source_url)
+            return DownloadedReference(
+                source_url=source_url,
+                image_urls=[PREFETCHED_REFERENCE],
+                caption="Block-printed cotton",
+                hashtags="#handloom",
+                media_type="reel",
+            )
+
+    class _Analyzer:
+        def __init__(self, brand_id=None) -> None:
+            self.brand_id = brand_id
+            self.settings = orchestrator.get_settings().model_copy(update={"dry_run": True})
+
+        async def analyze_reference_async(self, reference_image, reference_caption, is_video=False):
+            calls["analyze"].append((reference_image, is_video))
+            video = {"video_analysis": {"recommended_video_type": "detail-zoom"}} if is_video else {}
+            return StyleBrief.model_validate({**_brief_dict("cool"), **video})
+
+    async def _style(_session, post, **kwargs):
+        calls["style"].append(kwargs["style_brief"])
+        raise _StyleReached()
+
+    class _Styler:
+        image_model = "gemini-draft"
+
+        def __init__(self, brand_id=None, tier=None) -> None:
+            self.settings = orchestrator.get_settings()
+
+        async def generate_variants_async(self, **kwargs):
+            await _style(None, None, **kwargs)
+
+    monkeypatch.setattr(orchestrator, "DataBrightDownloader", _Downloader)
+    monkeypatch.setattr(orchestrator, "OpenAIReferenceAnalyzer", _Analyzer)
+    monkeypatch.setattr(
+        orchestrator, "ClaudeCaptionWriter", lambda brand_id=None: SimpleNamespace(settings=orchestrator.get_settings())
+    )
+    monkeypatch.setattr(orchestrator, "GeminiStyler", _Styler)
+    monkeypatch.setattr(orchestrator, "_run_style_caption_graph", _style)
+    return calls
+
+
+def _brief_dict(temperature: str) -> dict:
+    return {
+        "layout_type": "flat-lay",
+        "color_mood": {"temperature": temperature, "dominant_colors": ["#D4A574"], "palette_name": "earthy"},
+        "vibe_words": ["warm", "artisan"],
+    }
+
+
+PREFETCHED_SOURCE = "https://www.instagram.com/p/ABC/"
+
+
+def _session_awaiting_photos(session) -> Brand:
+    brand = Brand(slug="b", name="B")
+    session.add(brand)
+    session.flush()
+    session.add(
+        TelegramSession(
+            brand_id=brand.id,
+            telegram_user_id="7",
+            chat_id="42",
+            state=SessionState.AWAITING_PHOTOS.value,
+            context_json={"pending_source_url": PREFETCHED_SOURCE, "prefetch_id": "p1"},
+        )
+    )
+    session.commit()
+    return brand
+
+
+def _post_from_parked_prefetch(session, brand: Brand) -> Post:
+    """Apply the parked prefetch to the new post as the photo handler does."""
+    session.expire_all()
+    parked = session.query(TelegramSession).one().context_json["prefetch"]
+    post = Post(brand_id=brand.id, reference_url=PREFETCHED_SOURCE, input_photo_urls=["https://media.example/products/1.jpg"])
+    session.add(post)
+    session.flush()
+    post_service.apply_reference_prefetch(session, post, parked)
+    session.commit()
+    return post
+
+
+def _post_with_parked_prefetch(session, pipeline_type: str) -> Post:
+    """Park a prefetch on a session awaiting photos, then apply it to the new post."""
+    source_url = PREFETCHED_SOURCE
+    brand = _session_awaiting_photos(session)
+    prefetch = {
+        "source_url": source_url,
+        "pipeline_type": pipeline_type,
+        "reference_image": PREFETCHED_REFERENCE,
+        "source_image_urls": [PREFETCHED_REFERENCE],
+        "source_caption": "Block-printed cotton",
+        "source_hashtags": "#handloom",
+        "style_brief": _brief_dict("warm"),
+    }
+    assert orchestrator._park_prefetch(brand.id, 7, 42, source_url, "p1", prefetch)
+    return _post_from_parked_prefetch(session, brand)
+
+
+def _stage_statuses(session, post_id: int) -> list[tuple[str, str]]:
+    runs = session.query(JobRun).filter(JobRun.post_id == post_id).order_by(JobRun.id)
+    return [(run.stage, run.status) for run in runs]
+
+
+def test_prefetched_post_starts_the_pipeline_at_style(db, prefetch_pipeline) -> None:
+    session, _texts, _veo = db
+    post = _post_with_parked_prefetch(session, "image")
+
+    asyncio.run(orchestrator.run_generation_pipeline_async(post.id, 42))
+
+    assert prefetch_pipeline["download"] == []
+    assert prefetch_pipeline["analyze"] == []
+    assert prefetch_pipeline["style"] == [StyleBrief.model_validate(_brief_dict("warm"))]
+    session.expire_all()
+    assert session.get(Post, post.id).reference_image == PREFETCHED_REFERENCE
+    assert _stage_statuses(session, post.id)[-2:] == [
+        (JobStage.DOWNLOAD.value, JobStatus.SKIPPED.value),
+        (JobStage.ANALYZE.value, JobStatus.SKIPPED.value),
+    ]
+
+
+def test_prefetch_analyzed_as_a_reel_is_reanalyzed_for_the_image_pipeline(db, prefetch_pipeline) -> None:
+    session, _texts, _veo = db
+    post = _post_with_parked_prefetch(session, "reel")
+
+    asyncio.run(orchestrator.run_generation_pipeline_async(post.id, 42))
+
+    assert prefetch_pipeline["download"] == []
+    assert prefetch_pipeline["analyze"] == [(PREFETCHED_REFERENCE, False)]
+    assert prefetch_pipeline["style"] == [StyleBrief.model_validate(_brief_dict("cool"))]
+    session.expire_all()
+    assert _stage_statuses(session, post.id)[-2:] == [
+        (JobStage.DOWNLOAD.value, JobStatus.SKIPPED.value),
+        (JobStage.ANALYZE.value, JobStatus.SUCCEEDED.value),
+    ]
+
+
+def test_prefetched_reel_styles_a_9_16_start_frame(db, prefetch_pipeline, monkeypatch) -> None:
+    session, _texts, _veo = db
+    dry_run = orchestrator.get_settings().model_copy(update={"dry_run": True})
+    monkeypatch.setattr(orchestrator, "R2StorageClient", lambda: SimpleNamespace(settings=dry_run))
+    brand = _session_awaiting_photos(session)
+    asyncio.run(orchestrator.run_reference_prefetch_async(brand.id, 7, 42, PREFETCHED_SOURCE, "p1"))
+    post = _post_from_parked_prefetch(session, brand)
+    assert prefetch_pipeline["analyze"] == [(PREFETCHED_REFERENCE, True)]
+    prefetch_pipeline["download"].clear()
+    prefetch_pipeline["analyze"].clear()
+
+    asyncio.run(orchestrator.run_video_generation_pipeline_async(post.id, 42))
+
+    assert prefetch_pipeline["download"] == []
+    assert prefetch_pipeline["analyze"] == []
+    assert [brief.composition.aspect_ratio for brief in prefetch_pipeline["style"]] == ["9:16"]
+    session.expire_all()
+    styled = session.get(Post, post.id)
+    assert styled.video_type == "detail-zoom"
+    assert styled.video_style_brief["recommended_video_type"] == "detail-zoom"
+    assert _stage_statuses(session, post.id)[-3:] == [
+        (JobStage.DOWNLOAD.value, JobStatus.SKIPPED.value),
+        (JobStage.ANALYZE.value, JobStatus.SKIPPED.value),
+        (JobStage.STYLE.value, JobStatus.FAILED.value),
+    ]
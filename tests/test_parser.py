@@ -24,6 +24,12 @@ def test_parse_action_command() -> None:
     assert parsed.source_url is None
 
 
+def test_parse_show_another_command() -> None:
+    parsed = parse_message_text("Show another")
+    assert parsed.command == "show another"
+    assert parsed.media_override is None
+
+
 def test_parse_reel_command_with_url() -> None:
     parsed = parse_message_text("/reel https://www.instagram.com/p/abc123 VAK-042")
     assert parsed.command == "/reel"
@@ -0,0 +1,67 @@
+import io
+import time
+
+import pytest
+from PIL import Image
+
+from vak_bot.config import get_settings
+from vak_bot.pipeline import product_features
+from vak_bot.pipeline.product_validator import ProductValidator
+from vak_bot.services.cache_store import CacheStore
+
+PHOTO_URL = "https://media.example/products/saree.jpg"
+
+
+def _jpeg(color: tuple[int, int, int]) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (32, 40), color=color).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def photos(monkeypatch, tmp_path) -> dict[str, bytes]:
+    monkeypatch.setattr(product_features, "_store", CacheStore("product-features", redis_url="", disk_dir=str(tmp_path)))
+    return {PHOTO_URL: _jpeg((180, 90, 60))}
+
+
+def _fetcher(photos: dict[str, bytes], fetched: list[str]):
+    def _fetch(url: str) -> bytes:
+        fetched.append(url)
+        return photos[url]
+
+    return _fetch
+
+
+def test_features_are_computed_once_then_served_from_the_cache(photos) -> None:
+    validator = ProductValidator()
+    fetched: list[str] = []
+
+    first = product_features.product_reference(PHOTO_URL, validator, _fetcher(photos, fetched))
+    second = product_features.product_reference(PHOTO_URL, validator, _fetcher(photos, fetched))
+
+    assert fetched == [PHOTO_URL]
+    assert second.to_bytes() == first.to_bytes()
+
+
+def test_handed_over_bytes_skip_the_download_and_point_the_url_at_them(photos) -> None:
+    validator = ProductValidator()
+    fetched: list[str] = []
+
+    product_features.product_reference(PHOTO_URL, validator, _fetcher(photos, fetched), source_bytes=photos[PHOTO_URL])
+    product_features.product_reference(PHOTO_URL, validator, _fetcher(photos, fetched))
+
+    assert fetched == []
+
+
+def test_a_photo_replaced_in_place_is_scored_once_the_url_pointer_expires(photos, monkeypatch) -> None:
+    validator = ProductValidator()
+    fetched: list[str] = []
+    original = product_features.product_reference(PHOTO_URL, validator, _fetcher(photos, fetched))
+
+    photos[PHOTO_URL] = _jpeg((20, 60, 200))
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + get_settings().product_feature_url_ttl_seconds + 1)
+    replaced = product_features.product_reference(PHOTO_URL, validator, _fetcher(photos, fetched))
+
+    assert fetched == [PHOTO_URL, PHOTO_URL]
+    assert replaced.to_bytes() != original.to_bytes()
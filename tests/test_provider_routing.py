@@ -0,0 +1,82 @@
+import threading
+import time
+
+import httpx
+import pytest
+
+from vak_bot.pipeline.provider_routing import RoutingTable, error_class
+from vak_bot.services.cache_store import CacheStore
+
+ROUTES = ["pro:sdk", "flash:sdk"]
+
+
+@pytest.fixture
+def store(tmp_path) -> CacheStore:
+    return CacheStore("provider-routing", redis_url="", disk_dir=str(tmp_path))
+
+
+def test_failing_route_is_demoted_until_it_succeeds_again(store: CacheStore) -> None:
+    table = RoutingTable(store, half_life_seconds=600)
+    assert table.order("gemini-image", ROUTES) == ROUTES
+
+    table.record("gemini-image", "pro:sdk", False, 180_000, httpx.ReadTimeout("slow"))
+    assert table.order("gemini-image", ROUTES) == ["flash:sdk", "pro:sdk"]
+    assert table.health("gemini-image", "pro:sdk").last_error == "timeout"
+
+    table.record("gemini-image", "pro:sdk", True, 20_000)
+    assert table.order("gemini-image", ROUTES) == ROUTES
+
+
+def test_failures_decay_with_the_half_life(store: CacheStore, monkeypatch) -> None:
+    now = time.time()
+    table = RoutingTable(store, half_life_seconds=100)
+    table.record("gemini-image", "pro:sdk", False, 1_000)
+
+    monkeypatch.setattr(time, "time", lambda: now + 50)
+    assert table.order("gemini-image", ROUTES) == ["flash:sdk", "pro:sdk"]
+    monkeypatch.setattr(time, "time", lambda: now + 110)
+    assert table.order("gemini-image", ROUTES) == ROUTES
+
+
+def test_health_is_shared_between_workers(store: CacheStore) -> None:
+    RoutingTable(store, half_life_seconds=600).record("gemini-image", "pro:sdk", False, 1_000)
+
+    assert RoutingTable(store, half_life_seconds=600).order("gemini-image", ROUTES) == ["flash:sdk", "pro:sdk"]
+
+
+def test_concurrent_workers_never_overwrite_each_others_counts(store: CacheStore) -> None:
+    first = RoutingTable(store, half_life_seconds=600)
+    second = RoutingTable(store, half_life_seconds=600)
+    first.record("gemini-image", "pro:sdk", True, 1_000)
+    # The second worker now holds a local mirror that misses the failure recorded next.
+    second.order("gemini-image", ROUTES)
+
+    first.record("gemini-image", "pro:sdk", False, 1_000)
+    second.record("gemini-image", "pro:sdk", True, 1_000)
+
+    health = RoutingTable(store, half_life_seconds=600).health("gemini-image", "pro:sdk")
+    assert health.failures == pytest.approx(1, rel=1e-3)
+    assert health.successes == pytest.approx(2, rel=1e-3)
+
+
+def test_records_from_many_threads_are_all_counted(store: CacheStore) -> None:
+    tables = [RoutingTable(store, half_life_seconds=3600) for _ in range(4)]
+
+    def _record(table: RoutingTable) -> None:
+        for _ in range(10):
+            table.record("gemini-image", "pro:sdk", True, 1_000)
+
+    threads = [threading.Thread(target=_record, args=(table,)) for table in tables]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    health = RoutingTable(store, half_life_seconds=3600).health("gemini-image", "pro:sdk")
+    assert health.successes == pytest.approx(40, rel=1e-3)
+
+
+def test_error_classes() -> None:
+    response = httpx.Response(404, request=httpx.Request("POST", "https://example.com"))
+    assert error_class(httpx.HTTPStatusError("nope", request=response.request, response=response)) == "http_404"
+    assert error_class(ValueError("bad")) == "ValueError"
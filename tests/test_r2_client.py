@@ -0,0 +1,110 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from botocore.exceptions import ClientError
+
+from vak_bot.pipeline import http_clients
+from vak_bot.storage import R2StorageClient
+from vak_bot.storage.r2_client import IMMUTABLE_CACHE_CONTROL
+
+_BODY = bytes(range(256)) * 4096
+
+
+class _FlakyRangeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    ranges: list[str | None] = []
+
+    def do_GET(self) -> None:
+        requested = self.headers.get("Range")
+        self.ranges.append(requested)
+        start = int(requested.split("=", 1)[1].rstrip("-")) if requested else 0
+        body = _BODY[start:]
+        self.send_response(206 if requested else 200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if requested is None:
+            # Drop the connection halfway through the first response.
+            self.wfile.write(body[: len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            self.connection.shutdown(2)
+            return
+        self.wfile.write(body)
+
+    def log_message(self, *_args) -> None:
+        pass
+
+
+@pytest.fixture
+def server_url():
+    http_clients._reset_after_fork()
+    _FlakyRangeHandler.ranges = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FlakyRangeHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/clip.mp4"
+    http_clients.close_all()
+    server.shutdown()
+    server.server_close()
+
+
+def test_download_resumes_from_the_bytes_already_on_disk(server_url: str, tmp_path) -> None:
+    target = R2StorageClient().download_to_path(server_url, tmp_path / "clip.mp4")
+
+    assert target.read_bytes() == _BODY
+    assert _FlakyRangeHandler.ranges == [None, f"bytes={len(_BODY) // 2}-"]
+
+
+def test_only_bucket_urls_map_to_keys() -> None:
+    storage = R2StorageClient()
+    storage._public_base_url = "https://media.example"
+
+    assert storage.key_for_url("https://media.example/reels/1/final_1.mp4?v=2") == "reels/1/final_1.mp4"
+    assert storage.key_for_url("https://cdn.instagram.com/reels/1.mp4") is None
+
+
+class _FakeS3:
+    def __init__(self) -> None:
+        self.objects: dict[str, dict] = {}
+        self.heads = 0
+        self.copies: list[dict] = []
+
+    def head_object(self, Bucket: str, Key: str) -> dict:
+        self.heads += 1
+        if Key not in self.objects:
+            raise ClientError({"Error": {"Code": "404"}}, "HeadObject")
+        return {}
+
+    def put_object(self, Bucket: str, Key: str, Body: bytes, **extra) -> None:
+        self.objects[Key] = extra
+
+    def copy_object(self, Bucket: str, Key: str, CopySource: dict, **extra) -> None:
+        self.copies.append({"Key": Key, "CopySource": CopySource, **extra})
+
+
+def test_identical_bytes_are_uploaded_once_with_immutable_caching() -> None:
+    storage = R2StorageClient()
+    storage._dry_run = False
+    storage._public_base_url = "https://media.example"
+    storage._client = _FakeS3()
+    storage.settings = storage.settings.model_copy(update={"media_asset_registry_enabled": False})
+
+    first = storage.upload_content_addressed("styled", b"same pixels")
+    second = storage.upload_content_addressed("styled", b"same pixels")
+
+    assert first == second
+    assert list(storage._client.objects) == [storage.key_for_url(first)]
+    assert storage._client.objects[storage.key_for_url(first)]["CacheControl"] == IMMUTABLE_CACHE_CONTROL
+    assert storage._client.heads == 2
+    # The repeat rewrites the object in place so the orphan sweep sees it as just uploaded.
+    key = storage.key_for_url(first)
+    assert storage._client.copies == [
+        {
+            "Key": key,
+            "CopySource": {"Bucket": storage._bucket, "Key": key},
+            "MetadataDirective": "REPLACE",
+            "ContentType": "image/jpeg",
+            "CacheControl": IMMUTABLE_CACHE_CONTROL,
+        }
+    ]
@@ -0,0 +1,89 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from vak_bot.pipeline import render_pool
+from vak_bot.pipeline.render_pool import RenderJob, render_jobs, render_jobs_async
+
+
+def _jobs(variants: int, positions: int) -> list[RenderJob]:
+    return [RenderJob(variant_index=v, position=p) for v in range(1, variants + 1) for p in range(1, positions + 1)]
+
+
+def test_render_jobs_preserves_job_order() -> None:
+    jobs = _jobs(3, 2)
+
+    def _render(job: RenderJob) -> str:
+        # Later jobs finish first to prove ordering does not follow completion.
+        time.sleep(0.01 * (10 - job.variant_index * 2 - job.position))
+        return f"{job.variant_index}-{job.position}"
+
+    assert render_jobs(jobs, _render, brand_id=101) == ["1-1", "1-2", "2-1", "2-2", "3-1", "3-2"]
+
+
+def test_render_jobs_respects_brand_cap() -> None:
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+
+    def _render(job: RenderJob) -> int:
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(0.02)
+        with lock:
+            state["active"] -= 1
+        return job.position
+
+    render_jobs(_jobs(3, 3), _render, brand_id=102)
+    assert 1 < state["peak"] <= render_pool.get_settings().gemini_brand_max_concurrent_renders
+
+
+def test_render_jobs_cancels_siblings_on_failure() -> None:
+    started: list[RenderJob] = []
+
+    def _render(job: RenderJob) -> str:
+        started.append(job)
+        if job == RenderJob(variant_index=1, position=1):
+            raise RuntimeError("gemini exploded")
+        time.sleep(0.2)
+        return "ok"
+
+    with pytest.raises(RuntimeError, match="gemini exploded"):
+        render_jobs(_jobs(3, 5), _render, brand_id=103)
+    assert len(started) < 15
+
+
+@pytest.mark.asyncio
+async def test_render_jobs_async_preserves_order_under_brand_cap() -> None:
+    state = {"active": 0, "peak": 0}
+
+    async def _render(job: RenderJob) -> str:
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        await asyncio.sleep(0.01 * (10 - job.variant_index * 2 - job.position))
+        state["active"] -= 1
+        return f"{job.variant_index}-{job.position}"
+
+    result = await render_jobs_async(_jobs(3, 2), _render, brand_id=104)
+
+    assert result == ["1-1", "1-2", "2-1", "2-2", "3-1", "3-2"]
+    assert 1 < state["peak"] <= render_pool.get_settings().gemini_brand_max_concurrent_renders
+
+
+@pytest.mark.asyncio
+async def test_render_jobs_async_cancels_siblings_on_failure() -> None:
+    finished: list[RenderJob] = []
+
+    async def _render(job: RenderJob) -> str:
+        if job == RenderJob(variant_index=1, position=1):
+            raise RuntimeError("gemini exploded")
+        await asyncio.sleep(0.2)
+        finished.append(job)
+        return "ok"
+
+    with pytest.raises(RuntimeError, match="gemini exploded"):
+        await render_jobs_async(_jobs(3, 5), _render, brand_id=105)
+    await asyncio.sleep(0.3)
+    assert finished == []
@@ -1,6 +1,7 @@
 """Tests for route_detector — URL pattern detection, user overrides, pipeline routing."""
 
 from vak_bot.pipeline.route_detector import (
+    canonical_reference_key,
     confirm_media_type_from_mime,
     detect_media_type,
     detect_user_override,
@@ -78,3 +79,16 @@ class TestResolvePipelineType:
 
     def test_unknown_url_defaults_to_image(self) -> None:
         assert resolve_pipeline_type("https://pin.it/abc", None) == "image"
+
+
+class TestCanonicalReferenceKey:
+    def test_instagram_variants_share_shortcode(self) -> None:
+        assert canonical_reference_key("https://www.instagram.com/p/ABC123/?igsh=xyz") == "instagram:ABC123"
+        assert canonical_reference_key("https://instagram.com/reel/ABC123") == "instagram:ABC123"
+        assert canonical_reference_key("https://www.instagram.com/someuser/reel/ABC123/") == "instagram:ABC123"
+
+    def test_pinterest_pin_id(self) -> None:
+        assert canonical_reference_key("https://in.pinterest.com/pin/123456789/?mt=login") == "pinterest:123456789"
+
+    def test_other_urls_drop_query_and_trailing_slash(self) -> None:
+        assert canonical_reference_key("https://pin.it/AbCd/?utm=1") == "url:pin.it/AbCd"
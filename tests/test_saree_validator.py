@@ -1,8 +1,8 @@
 import io
 
-from PIL import Image
+from PIL import Image, ImageDraw, ImageEnhance
 
-from vak_bot.pipeline.product_validator import ProductValidator
+from vak_bot.pipeline.product_validator import ProductValidator, ReferenceFeatures
 
 
 def _make_img(color: tuple[int, int, int]) -> bytes:
@@ -27,3 +27,74 @@ def test_product_validator_scores_lower_for_different_image() -> None:
     valid, score = validator.verify_preserved(first, second)
     assert not valid
     assert score < 0.6
+
+
+def test_product_validator_scores_batch_in_candidate_order() -> None:
+    validator = ProductValidator(threshold=0.6)
+    original = _make_img((200, 150, 120))
+    results = validator.score_batch(original, [original, _make_img((10, 10, 10)), original])
+    assert [result.is_valid for result in results] == [True, False, True]
+    assert results[0].score == results[2].score
+
+
+def test_product_validator_region_map_localizes_change() -> None:
+    validator = ProductValidator(threshold=0.6)
+    base = Image.new("L", (128, 128), color=0)
+    for x in range(0, 128, 4):
+        base.paste(255, (x, 0, x + 2, 128))
+    altered = base.copy()
+    altered.paste(128, (0, 0, 64, 64))
+
+    def _encode(image: Image.Image) -> bytes:
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    result = validator.score_batch(_encode(base), [_encode(altered)], regions=2)[0]
+    assert result.region_map is not None
+    assert result.region_map.shape == (2, 2)
+    assert result.region_map[0, 0] < 0.5
+    assert result.region_map[1, 1] > 0.99
+
+
+def test_product_validator_accepts_prepared_reference_features() -> None:
+    validator = ProductValidator(threshold=0.6)
+    original = _make_img((200, 150, 120))
+    candidate = _make_img((190, 140, 110))
+    features = ReferenceFeatures.from_bytes(validator.prepare_reference(original).to_bytes())
+    from_bytes = validator.score_batch(original, [candidate])[0]
+    from_features = validator.score_batch(features, [candidate])[0]
+    assert abs(from_bytes.score - from_features.score) < 1e-4
+
+
+def _product_shot() -> Image.Image:
+    # A patterned drape on a plain backdrop: stripes, motifs and a solid border.
+    image = Image.new("RGB", (512, 640), color=(230, 225, 215))
+    draw = ImageDraw.Draw(image)
+    draw.polygon([(80, 40), (430, 60), (470, 600), (60, 590)], fill=(150, 60, 70))
+    for y in range(0, 640, 12):
+        draw.line([(80, y), (470, y + 20)], fill=(200 - y // 4, 120, 40 + y // 5), width=3)
+    for index in range(60):
+        x, y = 100 + (index * 53) % 330, 70 + (index * 97) % 500
+        draw.ellipse([x, y, x + 10, y + 10], fill=(240, 200, 60))
+    return image
+
+
+def _jpeg(image: Image.Image) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+
+def test_lightly_restyled_product_passes_the_default_threshold() -> None:
+    validator = ProductValidator()
+    product = _product_shot()
+    graded = ImageEnhance.Contrast(ImageEnhance.Brightness(product).enhance(1.12)).enhance(1.1)
+    # Re-rendered shots are never pixel-aligned with the catalog photo.
+    restyled = graded.transform(product.size, Image.AFFINE, (1, 0, 4, 0, 1, 3))
+    backdrop = Image.new("RGB", product.size, color=(200, 190, 180))
+
+    light, blank = validator.score_batch(_jpeg(product), [_jpeg(restyled), _jpeg(backdrop)])
+
+    assert light.is_valid
+    assert not blank.is_valid
@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from vak_bot.db.base import Base
+from vak_bot.db.models import Brand, MediaAsset, Post, PostVariant, PostVariantItem
+from vak_bot.storage import R2StorageClient
+from vak_bot.storage.lifecycle import purge_reference_images, sweep_orphans
+
+BASE = "https://media.example"
+NOW = datetime.now(timezone.utc)
+OLD = NOW - timedelta(days=10)
+
+
+class _FakeS3:
+    def __init__(self, objects: dict[str, tuple[int, datetime]]) -> None:
+        self.objects = objects
+        self.delete_calls: list[int] = []
+
+    def get_paginator(self, _operation: str):
+        fake = self
+
+        class _Paginator:
+            def paginate(self, Bucket: str, Prefix: str):
+                yield {
+                    "Contents": [
+                        {"Key": key, "Size": size, "LastModified": modified}
+                        for key, (size, modified) in fake.objects.items()
+                        if key.startswith(Prefix)
+                    ]
+                }
+
+        return _Paginator()
+
+    def delete_objects(self, Bucket: str, Delete: dict) -> dict:
+        self.delete_calls.append(len(Delete["Objects"]))
+        for obj in Delete["Objects"]:
+            self.objects.pop(obj["Key"], None)
+        return {}
+
+
+@pytest.fixture()
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add(Brand(slug="b", name="B"))
+        db.commit()
+        yield db
+
+
+def _storage(objects: dict[str, tuple[int, datetime]]) -> R2StorageClient:
+    storage = R2StorageClient()
+    storage._dry_run = False
+    storage._public_base_url = BASE
+    storage._client = _FakeS3(objects)
+    storage.settings = storage.settings.model_copy(update={"dry_run": False})
+    return storage
+
+
+def test_sweep_deletes_unreferenced_objects_past_the_grace_period(session) -> None:
+    storage = _storage(
+        {
+            "styled/aa/kept.jpg": (100, OLD),
+            "styled/bb/redo-leftover.jpg": (250, OLD),
+            "styled/cc/just-uploaded.jpg": (300, NOW),
+        }
+    )
+    post = Post(brand_id=1, status="review_ready")
+    session.add(post)
+    session.flush()
+    variant = PostVariant(brand_id=1, post_id=post.id, variant_index=1, preview_url=f"{BASE}/styled/aa/kept.jpg", ssim_score=0.9)
+    session.add(variant)
+    session.flush()
+    session.add(PostVariantItem(brand_id=1, variant_id=variant.id, position=1, image_url=f"{BASE}/styled/aa/kept.jpg"))
+    session.add(MediaAsset(url=f"{BASE}/styled/bb/redo-leftover.jpg", storage_key="styled/bb/redo-leftover.jpg", byte_size=250, mime_type="image/jpeg"))
+    session.commit()
+
+    report = sweep_orphans(session, storage, prefixes=["styled/"], grace=timedelta(days=2))
+
+    assert set(storage._client.objects) == {"styled/aa/kept.jpg", "styled/cc/just-uploaded.jpg"}
+    assert (report.scanned, report.deleted, report.reclaimed_bytes) == (3, 1, 250)
+    assert session.query(MediaAsset).count() == 0
+
+
+def test_purge_keeps_reference_images_shared_with_newer_posts(session) -> None:
+    storage = _storage({"references/1/ab/shared.jpg": (10, OLD), "references/1/cd/old-only.jpg": (20, OLD)})
+    session.add(MediaAsset(url=f"{BASE}/references/1/cd/old-only.jpg", storage_key="references/1/cd/old-only.jpg", byte_size=20, mime_type="image/jpeg"))
+    session.add(
+        Post(
+            brand_id=1,
+            status="posted",
+            created_at=NOW - timedelta(days=60),
+            reference_image=f"{BASE}/references/1/cd/old-only.jpg",
+            source_image_urls=[f"{BASE}/references/1/cd/old-only.jpg", f"{BASE}/references/1/ab/shared.jpg"],
+        )
+    )
+    session.add(Post(brand_id=1, status="review_ready", reference_image=f"{BASE}/references/1/ab/shared.jpg"))
+    session.commit()
+
+    report = purge_reference_images(session, storage, days=30)
+
+    assert set(storage._client.objects) == {"references/1/ab/shared.jpg"}
+    assert (report.scanned, report.deleted, report.reclaimed_bytes, report.kept_shared) == (1, 1, 20, 1)
+    old = session.query(Post).order_by(Post.id).first()
+    session.refresh(old)
+    assert old.reference_image is None and old.source_image_urls is None
+
+
+def test_deletes_are_batched_by_a_thousand_keys() -> None:
+    storage = _storage({f"reels/{index:04d}.mp4": (1, OLD) for index in range(2500)})
+
+    deleted = storage.delete_keys(list(storage._client.objects))
+
+    assert len(deleted) == 2500
+    assert storage._client.delete_calls == [1000, 1000, 500]
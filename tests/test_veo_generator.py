@@ -1,7 +1,13 @@
 """Tests for VeoGenerator — prompt building, video type presets, dry-run mode."""
 
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from vak_bot.enums import RenderTier
 from vak_bot.pipeline.errors import VeoGenerationError
-from vak_bot.pipeline.veo_generator import VIDEO_TYPE_PROMPTS, VeoGenerator
+from vak_bot.pipeline.veo_generator import DRY_RUN_OPERATION_PREFIX, VIDEO_TYPE_PROMPTS, VeoGenerator
 from vak_bot.schemas import StyleBrief, VideoAnalysis
 
 
@@ -94,39 +100,73 @@ class TestVideoAnalysisSchema:
 
 
 class TestVariationResilience:
-    def test_generate_reel_variations_continues_when_one_fails(self, monkeypatch) -> None:
+    def test_submit_reel_variations_continues_when_one_fails(self, monkeypatch) -> None:
         gen = VeoGenerator()
         brief = _make_style_brief()
 
         calls = {"n": 0}
 
-        def _fake_generate(*args, **kwargs):
+        def _fake_submit(*args, **kwargs):
             calls["n"] += 1
             if calls["n"] == 1:
-                return "/tmp/ok.mp4"
+                return "operations/ok"
             raise VeoGenerationError("simulated veo failure")
 
-        monkeypatch.setattr(gen, "generate_reel_from_styled_image", _fake_generate)
-        results = gen.generate_reel_variations("/tmp/start.jpg", brief)
-        assert results == ["/tmp/ok.mp4"]
+        monkeypatch.setattr(gen, "submit_reel", _fake_submit)
+        results = gen.submit_reel_variations("/tmp/start.jpg", brief)
+        assert [(r.variation_number, r.operation_name) for r in results] == [(1, "operations/ok")]
+        assert "MOTION STYLE" in results[0].prompt
+
+    def test_sdk_errors_do_not_drop_variations_already_submitted(self, monkeypatch) -> None:
+        gen = VeoGenerator()
+        first_prompt = gen._variation_prompts(_make_style_brief(), None)[0][2]
+
+        def _fake_submit(styled_frame_path: str, video_prompt: str, **kwargs) -> str:
+            if video_prompt == first_prompt:
+                return "operations/ok"
+            raise RuntimeError("429 RESOURCE_EXHAUSTED")
+
+        monkeypatch.setattr(gen, "submit_reel", _fake_submit)
+        results = gen.submit_reel_variations("/tmp/start.jpg", _make_style_brief())
+
+        assert [(r.variation_number, r.operation_name) for r in results] == [(1, "operations/ok")]
+
+    def test_an_sdk_error_on_every_variation_is_raised(self, monkeypatch) -> None:
+        gen = VeoGenerator()
+
+        def _fake_submit(*args, **kwargs) -> str:
+            raise RuntimeError("401 UNAUTHENTICATED")
 
-    def test_generate_reel_variations_raises_when_all_fail(self, monkeypatch) -> None:
+        monkeypatch.setattr(gen, "submit_reel", _fake_submit)
+
+        with pytest.raises(RuntimeError, match="UNAUTHENTICATED"):
+            gen.submit_reel_variations("/tmp/start.jpg", _make_style_brief())
+
+    def test_submit_reel_variations_raises_when_all_fail(self, monkeypatch) -> None:
         gen = VeoGenerator()
         brief = _make_style_brief()
 
         def _always_fail(*args, **kwargs):
             raise VeoGenerationError("simulated veo failure")
 
-        monkeypatch.setattr(gen, "generate_reel_from_styled_image", _always_fail)
+        monkeypatch.setattr(gen, "submit_reel", _always_fail)
 
         try:
-            gen.generate_reel_variations("/tmp/start.jpg", brief)
+            gen.submit_reel_variations("/tmp/start.jpg", brief)
             assert False, "Expected VeoGenerationError"
         except VeoGenerationError as exc:
             assert "No video variation was successfully generated" in str(exc)
             assert "simulated veo failure" in str(exc)
 
 
+class TestOperationPolling:
+    def test_dry_run_operations_complete_on_first_check(self) -> None:
+        path = VeoGenerator().check_operation(f"{DRY_RUN_OPERATION_PREFIX}test")
+
+        assert path is not None and Path(path).exists()
+        Path(path).unlink()
+
+
 class TestOperationExtraction:
     def test_extract_generated_video_surfaces_rai_filter_details(self) -> None:
         gen = VeoGenerator()
@@ -147,3 +187,72 @@ class TestOperationExtraction:
         except VeoGenerationError as exc:
             assert "rai_filtered_count=1" in str(exc)
             assert "SAFETY" in str(exc)
+
+
+class TestParallelSubmission:
+    @pytest.mark.asyncio
+    async def test_variations_are_submitted_together(self, monkeypatch) -> None:
+        gen = VeoGenerator()
+        in_flight = {"now": 0, "peak": 0}
+
+        async def _fake_submit(styled_frame_path: str, video_prompt: str, **_kwargs) -> str:
+            in_flight["now"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+            await asyncio.sleep(0.01)
+            in_flight["now"] -= 1
+            return f"operations/{len(video_prompt)}"
+
+        monkeypatch.setattr(gen, "submit_reel_async", _fake_submit)
+        results = await gen.submit_reel_variations_async("/tmp/start.jpg", _make_style_brief())
+
+        assert in_flight["peak"] == len(results) == 2
+        assert all(result.operation_name for result in results)
+
+    def test_variations_past_the_cap_are_returned_unsubmitted(self, monkeypatch) -> None:
+        gen = VeoGenerator()
+        monkeypatch.setattr(gen, "submit_reel", lambda **_kwargs: "operations/1")
+
+        results = gen.submit_reel_variations("/tmp/start.jpg", _make_style_brief(), max_operations=1)
+
+        assert [(r.variation_number, r.operation_name) for r in results] == [(1, "operations/1"), (2, None)]
+
+    def test_only_requested_variations_are_submitted(self, monkeypatch) -> None:
+        gen = VeoGenerator()
+        prompts: list[str] = []
+
+        def _fake_submit(styled_frame_path: str, video_prompt: str, **_kwargs) -> str:
+            prompts.append(video_prompt)
+            return "operations/2"
+
+        monkeypatch.setattr(gen, "submit_reel", _fake_submit)
+        results = gen.submit_reel_variations("/tmp/start.jpg", _make_style_brief(), variation_numbers=[2])
+
+        assert [(r.variation_number, r.operation_name) for r in results] == [(2, "operations/2")]
+        assert prompts == [results[0].prompt]
+
+
+class TestRenderTiers:
+    def test_draft_variations_record_the_seed_they_were_submitted_with(self, monkeypatch) -> None:
+        gen = VeoGenerator()
+        seeds: list[int] = []
+
+        def _fake_submit(styled_frame_path: str, video_prompt: str, tier: RenderTier, seed: int) -> str:
+            assert tier == RenderTier.DRAFT
+            seeds.append(seed)
+            return f"operations/{seed}"
+
+        monkeypatch.setattr(gen, "submit_reel", _fake_submit)
+        results = gen.submit_reel_variations("/tmp/start.jpg", _make_style_brief(), tier=RenderTier.DRAFT)
+
+        assert [r.render_spec["seed"] for r in results] == seeds
+        assert {r.render_tier for r in results} == {"draft"}
+        assert results[0].render_spec["model"] == gen.settings.veo_draft_model
+
+    def test_final_profile_uses_the_configured_model(self) -> None:
+        gen = VeoGenerator()
+
+        assert gen.tier_profile(RenderTier.FINAL) == (
+            RenderTier.FINAL,
+            gen.settings.veo_model,
+            gen.settings.veo_default_resolution,
+        )
@@ -25,6 +25,7 @@ from vak_bot.db.models import (
 )
 from vak_bot.db.session import get_db_session
 from vak_bot.enums import PostStatus
+from vak_bot.pipeline.analysis_cache import purge_style_briefs
 from vak_bot.pipeline.prompts import load_brand_config
 from vak_bot.schemas.brand_config import (
     CATEGORY_CHOICES,
@@ -70,6 +71,10 @@ class BrandCreatePayload(BaseModel):
     allowed_user_ids: str | None = None
 
 
+class StyleBriefPurgePayload(BaseModel):
+    reference_url: str | None = Field(default=None, max_length=500)
+
+
 class BrandUpdatePayload(BaseModel):
     name: str | None = Field(default=None, min_length=1, max_length=200)
     category: str | None = Field(default=None, min_length=2, max_length=50)
@@ -1890,6 +1895,29 @@ def calendar(brand_id: int, request: Request, db: Session = Depends(get_db_sessi
     }
 
 
+@router.post("/cache/style-briefs/purge")
+def purge_style_brief_cache(
+    payload: StyleBriefPurgePayload, request: Request, db: Session = Depends(get_db_session)
+) -> dict[str, Any]:
+    user = _require_user(request, db)
+    _require_csrf(request, user)
+    if not _is_super_admin(db, user.id):
+        raise HTTPException(status_code=403, detail="forbidden")
+
+    reference_url = (payload.reference_url or "").strip() or None
+    removed = purge_style_briefs(reference_url)
+
+    write_audit_log(
+        db,
+        action="cache.style_briefs.purge",
+        user_id=user.id,
+        entity_type="style_brief_cache",
+        entity_id=reference_url,
+        details={"reference_url": reference_url, "removed": removed},
+    )
+    return {"ok": True, "removed": removed}
+
+
 @router.get("/audit-logs")
 def audit_logs(brand_id: int | None = None, request: Request = None, db: Session = Depends(get_db_session)) -> dict[str, Any]:
     user = _require_user(request, db)
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import time
+import uuid
 from datetime import datetime, timedelta, timezone
 
 import structlog
@@ -19,11 +20,11 @@ from vak_bot.config import get_settings
 from vak_bot.db.models import Brand, Post, Product, VideoJob
 from vak_bot.db.session import SessionLocal
 from vak_bot.db.tenant import get_or_create_default_brand, parse_allowed_users_csv
-from vak_bot.enums import CallbackAction, PostStatus, SessionState
-from vak_bot.pipeline.downloader import DataBrightDownloader
+from vak_bot.enums import CallbackAction, JobStage, PostStatus, SessionState
 from vak_bot.pipeline.prompts import load_brand_config
-from vak_bot.pipeline.route_detector import detect_media_type, resolve_pipeline_type
+from vak_bot.pipeline.route_detector import detect_media_type, detect_user_override, resolve_pipeline_type
 from vak_bot.services.post_service import (
+    apply_reference_prefetch,
     create_draft_post,
     get_or_create_session,
     lookup_product_by_code,
@@ -32,11 +33,16 @@ from vak_bot.services.post_service import (
 )
 from vak_bot.workers.tasks import (
     extend_video_task,
+    finalize_render_task,
     process_post_task,
+    prefetch_reference_task,
     process_video_post_task,
     publish_post_task,
     reel_this_task,
+    render_carousel_slides_task,
+    render_reel_variation_task,
     rewrite_caption_task,
+    route_reference_task,
 )
 
 logger = structlog.get_logger(__name__)
@@ -44,6 +50,14 @@ settings = get_settings()
 
 ALBUM_CACHE: dict[str, dict] = {}
 ALBUM_LOCK = asyncio.Lock()
+# "redo <target>" commands that re-run the pipeline from a stage instead of changing the video style.
+_REDO_STAGES = {
+    "caption": JobStage.CAPTION,
+    "caption only": JobStage.CAPTION,
+    "style": JobStage.STYLE,
+    "styling": JobStage.STYLE,
+    "styling only": JobStage.STYLE,
+}
 VALID_VIDEO_TYPES = {"fabric-flow", "product-motion", "detail-zoom", "close-up", "lifestyle", "reveal"}
 
 
@@ -117,21 +131,13 @@ def _product_code_pattern_for_brand(brand_id: int) -> str | None:
     return None
 
 
-def _resolve_pipeline_type_with_preflight(source_url: str, user_text: str | None) -> str:
-    pipeline_type = resolve_pipeline_type(source_url, user_text)
-    if pipeline_type != "image":
-        return pipeline_type
-    if detect_media_type(source_url) != "unknown":
-        return pipeline_type
-
-    # Ambiguous URL (commonly Pinterest short links): use downloader metadata when available.
-    try:
-        reference = DataBrightDownloader().download_post(source_url)
-        if (reference.media_type or "").lower() == "reel":
-            return "reel"
-    except Exception:
-        pass
-    return pipeline_type
+def _known_pipeline_type(source_url: str, text: str | None, media_override: str | None) -> str | None:
+    """Pipeline type decidable without scraping, or None for ambiguous links."""
+    if media_override:
+        return media_override
+    if detect_user_override(text) is not None or detect_media_type(source_url) != "unknown":
+        return resolve_pipeline_type(source_url, text)
+    return None
 
 
 async def _process_ingestion(
@@ -142,6 +148,7 @@ async def _process_ingestion(
     photo_urls: list[str],
     photo_file_ids: list[str],
     send_via_message: Message | None = None,
+    prefetch: dict | None = None,
 ) -> None:
     texts = load_bot_texts(brand_id)
 
@@ -156,6 +163,8 @@ async def _process_ingestion(
     if not parsed.source_url or not is_supported_reference_url(parsed.source_url):
         await respond(texts.unsupported_link_message)
         return
+    if prefetch and prefetch.get("source_url") != parsed.source_url:
+        prefetch = None
 
     with SessionLocal() as db:
         if user_posts_today(db, brand_id, user_id) >= 10:
@@ -175,9 +184,23 @@ async def _process_ingestion(
             # Save the reference URL in the session so photos can be sent separately
             session = get_or_create_session(db, brand_id, user_id, chat_id)
             session.state = SessionState.AWAITING_PHOTOS.value
-            session.context_json = {"pending_source_url": parsed.source_url, "product_code": parsed.product_code}
+            prefetch_id = uuid.uuid4().hex
+            session.context_json = {
+                "pending_source_url": parsed.source_url,
+                "product_code": parsed.product_code,
+                "prefetch_id": prefetch_id,
+            }
             db.commit()
             await respond(texts.need_photo_message)
+            # Scrape and analyze the reference while the user picks photos.
+            prefetch_reference_task.delay(
+                brand_id,
+                user_id,
+                chat_id,
+                parsed.source_url,
+                prefetch_id,
+                _known_pipeline_type(parsed.source_url, text, parsed.media_override),
+            )
             return
 
         post = create_draft_post(
@@ -199,15 +222,25 @@ async def _process_ingestion(
     await respond(texts.processing_message)
 
     # Auto-detect media type and route to the right pipeline.
-    pipeline_type = _resolve_pipeline_type_with_preflight(parsed.source_url, text)
+    pipeline_type = resolve_pipeline_type(parsed.source_url, text)
     if parsed.media_override:  # explicit user override takes priority
         pipeline_type = parsed.media_override
+    elif prefetch and detect_user_override(text) is None:
+        # The prefetch already routed the link (including any override sent with it).
+        pipeline_type = prefetch["pipeline_type"]
+    elif detect_user_override(text) is None and detect_media_type(parsed.source_url) == "unknown":
+        # Ambiguous URL (commonly Pinterest short links): a worker scrapes it and picks the pipeline,
+        # so the webhook never waits on Bright Data.
+        route_reference_task.delay(post.id, chat_id, brand_id)
+        return
 
     # Store detected media type
     with SessionLocal() as db_update:
         p = db_update.get(Post, post.id)
         if p:
             p.detected_media_type = pipeline_type
+            if prefetch:
+                apply_reference_prefetch(db_update, p, prefetch)
             db_update.commit()
 
     if pipeline_type == "reel":
@@ -240,6 +273,7 @@ async def _handle_action(message: Message, action: str) -> bool:
                 video_job = (
                     db.query(VideoJob)
                     .filter(VideoJob.post_id == post.id, VideoJob.variation_number == selected)
+                    .order_by(VideoJob.id.desc())
                     .first()
                 )
                 if not video_job or not video_job.video_url:
@@ -259,6 +293,8 @@ async def _handle_action(message: Message, action: str) -> bool:
                     await message.answer("That option is not available yet. Choose one of the visible options.")
                     return True
             db.commit()
+            if post.media_type == "carousel":
+                render_carousel_slides_task.delay(post.id, selected, brand_id)
             await message.answer(f"Selected option {selected}. Reply 'approve' when ready.")
             return True
 
@@ -271,6 +307,20 @@ async def _handle_action(message: Message, action: str) -> bool:
             return True
 
         if action_lower == "redo" or action_lower.startswith("redo "):
+            redo_stage = _REDO_STAGES.get(action_lower.split(" ", 1)[1].strip()) if " " in action_lower else None
+            if redo_stage:
+                post.status = PostStatus.PROCESSING.value
+                db.commit()
+                if post.media_type == "reel":
+                    process_video_post_task.delay(post.id, chat_id, brand_id, redo_stage.value)
+                else:
+                    process_post_task.delay(post.id, chat_id, brand_id, redo_stage.value)
+                if redo_stage == JobStage.CAPTION:
+                    await message.answer("Rewriting the caption...")
+                else:
+                    await message.answer("Regenerating styling...")
+                return True
+
             requested_video_type = None
             if action_lower.startswith("redo "):
                 requested_video_type = _normalize_video_type(action_lower.split(" ", 1)[1])
@@ -298,7 +348,8 @@ async def _handle_action(message: Message, action: str) -> bool:
                     await message.answer("Regenerating Reel options...")
             else:
                 await message.answer("Regenerating options...")
-                process_post_task.delay(post.id, chat_id, brand_id)
+                # The stored scrape and style brief are still valid; only re-render.
+                process_post_task.delay(post.id, chat_id, brand_id, JobStage.STYLE.value)
             return True
 
         if action_lower == "cancel":
@@ -312,6 +363,7 @@ async def _handle_action(message: Message, action: str) -> bool:
             post.status = PostStatus.APPROVED.value
             session.state = SessionState.AWAITING_POST_CONFIRMATION.value
             db.commit()
+            finalize_render_task.delay(post.id, chat_id, brand_id)
             await message.answer("Ready to post. Reply 'post now'.")
             return True
 
@@ -349,6 +401,11 @@ async def _handle_action(message: Message, action: str) -> bool:
             await message.answer("Converting to a Reel... This takes ~5 minutes.")
             return True
 
+        if action_lower == "show another" and post.media_type == "reel":
+            render_reel_variation_task.delay(post.id, chat_id, brand_id)
+            await message.answer("Rendering another Reel option. This takes a few minutes...")
+            return True
+
         if action_lower == "extend" or action_lower.startswith("extend "):
             parts = action_lower.split()
             variation = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else (post.selected_variant_index or 1)
@@ -574,7 +631,7 @@ def register_handlers(dispatcher: Dispatcher) -> None:
             await message.answer("Unknown command. Use /help.")
             return
 
-        if parsed.command in {"1", "2", "3", "approve", "redo", "cancel", "edit caption", "post now", "reel this", "extend"} or (
+        if parsed.command in {"1", "2", "3", "approve", "redo", "cancel", "edit caption", "post now", "reel this", "extend", "show another"} or (
             parsed.command and (parsed.command.startswith("schedule") or parsed.command.startswith("extend ") or parsed.command.startswith("redo "))
         ):
             handled = await _handle_action(message, parsed.command)
@@ -608,10 +665,12 @@ def register_handlers(dispatcher: Dispatcher) -> None:
         # Check if there's a pending reference URL from a previous text message
         with SessionLocal() as db:
             session = get_or_create_session(db, brand_id, message.from_user.id, message.chat.id)
+            prefetch = None
             if session.state == SessionState.AWAITING_PHOTOS.value and session.context_json:
                 pending_url = session.context_json.get("pending_source_url", "")
                 if pending_url and not caption_text:
                     caption_text = pending_url
+                prefetch = session.context_json.get("prefetch")
                 session.state = SessionState.IDLE.value
                 db.commit()
 
@@ -627,6 +686,7 @@ def register_handlers(dispatcher: Dispatcher) -> None:
             photo_urls=photo_urls,
             photo_file_ids=photo_file_ids,
             send_via_message=message,
+            prefetch=prefetch,
         )
 
     @router.message(F.media_group_id)
@@ -698,6 +758,8 @@ def register_handlers(dispatcher: Dispatcher) -> None:
                     return
                 post.selected_variant_index = parsed.variant
                 db.commit()
+                if post.media_type == "carousel":
+                    render_carousel_slides_task.delay(post.id, parsed.variant, brand_id)
                 await callback.message.answer(f"Selected option {parsed.variant}. Reply 'approve' when ready.")
             elif parsed.action == CallbackAction.EDIT_CAPTION:
                 session = get_or_create_session(db, brand_id, callback.from_user.id, callback.message.chat.id)
@@ -714,7 +776,7 @@ def register_handlers(dispatcher: Dispatcher) -> None:
                         process_video_post_task.delay(post.id, callback.message.chat.id, brand_id)
                     await callback.message.answer("Regenerating Reel options...")
                 else:
-                    process_post_task.delay(post.id, callback.message.chat.id, brand_id)
+                    process_post_task.delay(post.id, callback.message.chat.id, brand_id, JobStage.STYLE.value)
                     await callback.message.answer("Regenerating options...")
             elif parsed.action == CallbackAction.CANCEL:
                 post.status = PostStatus.CANCELLED.value
@@ -723,6 +785,7 @@ def register_handlers(dispatcher: Dispatcher) -> None:
             elif parsed.action == CallbackAction.APPROVE:
                 post.status = PostStatus.APPROVED.value
                 db.commit()
+                finalize_render_task.delay(post.id, callback.message.chat.id, brand_id)
                 await callback.message.answer("Approved. Reply 'post now' to publish.")
             elif parsed.action == CallbackAction.SELECT_VIDEO:
                 # Video variant selection
@@ -730,6 +793,7 @@ def register_handlers(dispatcher: Dispatcher) -> None:
                 video_job = (
                     db.query(VideoJob)
                     .filter(VideoJob.brand_id == brand_id, VideoJob.post_id == parsed.post_id, VideoJob.variation_number == parsed.variant)
+                    .order_by(VideoJob.id.desc())
                     .first()
                 )
                 if video_job and video_job.video_url:
@@ -742,6 +806,9 @@ def register_handlers(dispatcher: Dispatcher) -> None:
             elif parsed.action == CallbackAction.EXTEND:
                 extend_video_task.delay(post.id, callback.message.chat.id, post.selected_variant_index or 1, brand_id)
                 await callback.message.answer("Extending video by 8 seconds...")
+            elif parsed.action == CallbackAction.ANOTHER_VIDEO:
+                render_reel_variation_task.delay(post.id, callback.message.chat.id, brand_id)
+                await callback.message.answer("Rendering another Reel option. This takes a few minutes...")
             elif parsed.action == CallbackAction.REEL_THIS:
                 reel_this_task.delay(post.id, callback.message.chat.id, brand_id)
                 await callback.message.answer("Converting to a Reel... This takes ~5 minutes.")
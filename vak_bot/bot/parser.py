@@ -71,7 +71,7 @@ def parse_message_text(text: str | None, product_code_pattern: str | None = None
             )
         return ParsedMessage(command=command, source_url=None, product_code=None, free_text=text)
 
-    if lower in {"1", "2", "3", "approve", "redo", "cancel", "edit caption", "post now", "reel this", "extend"}\
+    if lower in {"1", "2", "3", "approve", "redo", "cancel", "edit caption", "post now", "reel this", "extend", "show another"}\
             or lower.startswith("schedule") or lower.startswith("extend ") or lower.startswith("redo "):
         return ParsedMessage(command=lower, source_url=None, product_code=None, free_text=text)
 
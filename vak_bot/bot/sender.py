@@ -1,13 +1,28 @@
 from __future__ import annotations
 
 import asyncio
+import threading
 
-from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup, InputMediaPhoto
+import structlog
+from aiogram.exceptions import TelegramAPIError
+from aiogram.types import BufferedInputFile, InlineKeyboardButton, InlineKeyboardMarkup, InputMediaPhoto
 
 from vak_bot.bot.callbacks import make_callback
 from vak_bot.bot.runtime import get_bot_for_brand
 from vak_bot.enums import CallbackAction
 
+logger = structlog.get_logger(__name__)
+
+# Progressive review updates come from pipeline worker threads; keep each chat's in order
+# without holding up most other chats on this worker. Chats share a fixed set of locks,
+# so a long-running worker does not keep one per chat it has ever served.
+_PROGRESSIVE_LOCK_STRIPES = 64
+_progressive_locks = tuple(threading.Lock() for _ in range(_PROGRESSIVE_LOCK_STRIPES))
+
+
+def _progressive_lock(chat_id: int) -> threading.Lock:
+    return _progressive_locks[chat_id % _PROGRESSIVE_LOCK_STRIPES]
+
 
 def _run(coro):
     try:
@@ -60,39 +75,174 @@ def send_text(brand_id: int | None, chat_id: int, text: str) -> None:
     _run(_send_text_async(brand_id, chat_id, text))
 
 
-async def _send_review_async(brand_id: int | None, chat_id: int, post_id: int, image_urls: list[str], caption: str, hashtags: str) -> None:
+def _review_media(image_urls: list[str], image_bytes: list[bytes | None] | None) -> list[InputMediaPhoto]:
+    media: list[InputMediaPhoto] = []
+    payloads = list(image_bytes or [])
+    for idx, url in enumerate(image_urls[:3]):
+        data = payloads[idx] if idx < len(payloads) else None
+        if data:
+            media.append(InputMediaPhoto(media=BufferedInputFile(data, filename=f"option-{idx + 1}.jpg")))
+        elif url:
+            media.append(InputMediaPhoto(media=url))
+    return media
+
+
+def _review_message(caption: str, hashtags: str, option_count: int) -> str:
+    return (
+        "Here are your options for this post:\n\n"
+        f"Caption:\n\"{caption}\"\n\n"
+        f"Hashtags:\n{hashtags}\n\n"
+        f"Reply with 1-{option_count}; or use the buttons below."
+    )
+
+
+async def _send_review_async(
+    brand_id: int | None,
+    chat_id: int,
+    post_id: int,
+    image_urls: list[str],
+    caption: str,
+    hashtags: str,
+    image_bytes: list[bytes | None] | None = None,
+) -> None:
     bot = get_bot_for_brand(brand_id)
-    media = [InputMediaPhoto(media=url) for url in image_urls[:3] if url]
+    media = _review_media(image_urls, image_bytes)
     option_count = len(media)
     if media:
         await bot.send_media_group(chat_id=chat_id, media=media)
     else:
         option_count = 1
 
-    message = (
-        "Here are your options for this post:\n\n"
-        f"Caption:\n\"{caption}\"\n\n"
-        f"Hashtags:\n{hashtags}\n\n"
-        f"Reply with 1-{option_count}; or use the buttons below."
+    await bot.send_message(
+        chat_id=chat_id,
+        text=_review_message(caption, hashtags, option_count),
+        reply_markup=build_review_keyboard(post_id, option_count),
     )
-    await bot.send_message(chat_id=chat_id, text=message, reply_markup=build_review_keyboard(post_id, option_count))
 
 
-def send_review_package(brand_id: int | None, chat_id: int, post_id: int, image_urls: list[str], caption: str, hashtags: str) -> None:
-    _run(_send_review_async(brand_id, chat_id, post_id, image_urls, caption, hashtags))
+def send_review_package(
+    brand_id: int | None,
+    chat_id: int,
+    post_id: int,
+    image_urls: list[str],
+    caption: str,
+    hashtags: str,
+    image_bytes: list[bytes | None] | None = None,
+) -> None:
+    _run(_send_review_async(brand_id, chat_id, post_id, image_urls, caption, hashtags, image_bytes))
 
 
-def build_video_review_keyboard(post_id: int, option_count: int) -> InlineKeyboardMarkup:
+def _progress_message(ready_count: int, expected_count: int) -> str:
+    return f"Styling your options... {ready_count}/{expected_count} ready."
+
+
+async def _start_progressive_review_async(brand_id: int | None, chat_id: int, expected_count: int) -> int:
+    bot = get_bot_for_brand(brand_id)
+    message = await bot.send_message(chat_id=chat_id, text=_progress_message(0, expected_count))
+    return message.message_id
+
+
+def start_progressive_review(brand_id: int | None, chat_id: int, expected_count: int) -> int:
+    """Send the placeholder that tracks variant progress and return its message id."""
+    with _progressive_lock(chat_id):
+        return _run(_start_progressive_review_async(brand_id, chat_id, expected_count))
+
+
+async def _send_review_option_async(
+    brand_id: int | None,
+    chat_id: int,
+    status_message_id: int,
+    option: int,
+    image_url: str,
+    image_bytes: bytes | None,
+    ready_count: int,
+    expected_count: int,
+) -> None:
+    bot = get_bot_for_brand(brand_id)
+    photo = BufferedInputFile(image_bytes, filename=f"option-{option}.jpg") if image_bytes else image_url
+    await bot.send_photo(chat_id=chat_id, photo=photo, caption=f"Option {option}")
+    try:
+        await bot.edit_message_text(
+            chat_id=chat_id,
+            message_id=status_message_id,
+            text=_progress_message(ready_count, expected_count),
+        )
+    except TelegramAPIError as exc:
+        logger.info("review_progress_edit_failed", chat_id=chat_id, error=str(exc))
+
+
+def send_review_option(
+    brand_id: int | None,
+    chat_id: int,
+    status_message_id: int,
+    option: int,
+    image_url: str,
+    image_bytes: bytes | None,
+    ready_count: int,
+    expected_count: int,
+) -> None:
+    """Send one finished variant and bump the placeholder's progress count."""
+    with _progressive_lock(chat_id):
+        _run(
+            _send_review_option_async(
+                brand_id, chat_id, status_message_id, option, image_url, image_bytes, ready_count, expected_count
+            )
+        )
+
+
+async def _finish_progressive_review_async(
+    brand_id: int | None,
+    chat_id: int,
+    post_id: int,
+    status_message_id: int,
+    caption: str,
+    hashtags: str,
+    option_count: int,
+) -> None:
+    bot = get_bot_for_brand(brand_id)
+    option_count = max(1, option_count)
+    await bot.send_message(
+        chat_id=chat_id,
+        text=_review_message(caption, hashtags, option_count),
+        reply_markup=build_review_keyboard(post_id, option_count),
+    )
+    try:
+        await bot.delete_message(chat_id=chat_id, message_id=status_message_id)
+    except TelegramAPIError as exc:
+        logger.info("review_progress_delete_failed", chat_id=chat_id, error=str(exc))
+
+
+def finish_progressive_review(
+    brand_id: int | None,
+    chat_id: int,
+    post_id: int,
+    status_message_id: int,
+    caption: str,
+    hashtags: str,
+    option_count: int,
+) -> None:
+    """Send the caption with the review keyboard and drop the progress placeholder."""
+    with _progressive_lock(chat_id):
+        _run(
+            _finish_progressive_review_async(
+                brand_id, chat_id, post_id, status_message_id, caption, hashtags, option_count
+            )
+        )
+
+
+def build_video_review_keyboard(post_id: int, option_count: int, can_show_another: bool = False) -> InlineKeyboardMarkup:
+    actions = [InlineKeyboardButton(text="Extend", callback_data=make_callback(post_id, 0, CallbackAction.EXTEND))]
+    if can_show_another:
+        actions.append(
+            InlineKeyboardButton(text="Show Another", callback_data=make_callback(post_id, 0, CallbackAction.ANOTHER_VIDEO))
+        )
+    actions.append(
+        InlineKeyboardButton(text="Edit Caption", callback_data=make_callback(post_id, 0, CallbackAction.EDIT_CAPTION))
+    )
     return InlineKeyboardMarkup(
         inline_keyboard=[
             _choice_buttons(post_id, option_count, CallbackAction.SELECT_VIDEO),
-            [
-                InlineKeyboardButton(text="Extend", callback_data=make_callback(post_id, 0, CallbackAction.EXTEND)),
-                InlineKeyboardButton(
-                    text="Edit Caption",
-                    callback_data=make_callback(post_id, 0, CallbackAction.EDIT_CAPTION),
-                ),
-            ],
+            actions,
             [
                 InlineKeyboardButton(text="Redo", callback_data=make_callback(post_id, 0, CallbackAction.REDO)),
                 InlineKeyboardButton(text="Approve", callback_data=make_callback(post_id, 0, CallbackAction.APPROVE)),
@@ -110,6 +260,7 @@ async def _send_video_review_async(
     start_frame_url: str,
     caption: str,
     hashtags: str,
+    can_show_another: bool,
 ) -> None:
     bot = get_bot_for_brand(brand_id)
     option_count = max(1, min(3, len(video_urls)))
@@ -125,8 +276,13 @@ async def _send_video_review_async(
         f'Caption:\n"{caption}"\n\n'
         f"Hashtags:\n{hashtags}\n\n"
         f"Reply with 1-{option_count} to select, or use the buttons below."
+        + ("\nReply 'show another' to render a different take." if can_show_another else "")
+    )
+    await bot.send_message(
+        chat_id=chat_id,
+        text=message,
+        reply_markup=build_video_review_keyboard(post_id, option_count, can_show_another),
     )
-    await bot.send_message(chat_id=chat_id, text=message, reply_markup=build_video_review_keyboard(post_id, option_count))
 
 
 def send_video_review_package(
@@ -137,5 +293,10 @@ def send_video_review_package(
     start_frame_url: str,
     caption: str,
     hashtags: str,
+    can_show_another: bool = False,
 ) -> None:
-    _run(_send_video_review_async(brand_id, chat_id, post_id, video_urls, start_frame_url, caption, hashtags))
+    _run(
+        _send_video_review_async(
+            brand_id, chat_id, post_id, video_urls, start_frame_url, caption, hashtags, can_show_another
+        )
+    )
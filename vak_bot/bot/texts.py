@@ -28,7 +28,7 @@ _HELP_TEMPLATE = (
     "How to use:\n"
     "1) Send inspiration link + product photo(s)\n"
     "2) Or send link + product code (SKU-042)\n"
-    "3) Review options and reply: 1/2/3, edit caption, redo, redo close-up, redo product-motion, redo detail-zoom, approve, cancel\n"
+    "3) Review options and reply: 1/2/3, edit caption, redo, redo caption, redo styling, redo close-up, redo product-motion, redo detail-zoom, approve, cancel\n"
     "4) After approve, reply post now or schedule <datetime>\n\n"
     "Commands:\n"
     "/reel <link> [SKU-XXX] (force reel mode)\n"
@@ -4,9 +4,11 @@ from datetime import datetime
 
 from sqlalchemy import (
     JSON,
+    BigInteger,
     Boolean,
     DateTime,
     DECIMAL,
+    Float,
     ForeignKey,
     Index,
     Integer,
@@ -243,6 +245,9 @@ class PostVariant(Base):
     preview_url: Mapped[str] = mapped_column(String(500), nullable=False)
     ssim_score: Mapped[float] = mapped_column(DECIMAL(5, 4), nullable=False)
     is_valid: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True, server_default="true")
+    render_tier: Mapped[str] = mapped_column(String(10), nullable=False, default="final", server_default="final")
+    # Model, seed and prompt of the render, so a draft can be re-rendered at final quality.
+    render_spec: Mapped[dict | None] = mapped_column(JSON, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     post: Mapped[Post] = relationship(back_populates="variants")
@@ -291,6 +296,9 @@ class JobRun(Base):
     status: Mapped[str] = mapped_column(String(20), nullable=False)
     error_code: Mapped[str | None] = mapped_column(String(80), nullable=True)
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
+    cache_hit: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default="false")
+    input_fingerprint: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    details_json: Mapped[dict | None] = mapped_column(JSON, nullable=True)
     started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
@@ -309,14 +317,37 @@ class VideoJob(Base):
     video_url: Mapped[str | None] = mapped_column(String(500), nullable=True)
     generation_time_seconds: Mapped[int | None] = mapped_column(Integer, nullable=True)
     prompt_used: Mapped[str | None] = mapped_column(Text, nullable=True)
+    render_tier: Mapped[str] = mapped_column(String(10), nullable=False, default="final", server_default="final")
+    render_spec: Mapped[dict | None] = mapped_column(JSON, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     post: Mapped[Post] = relationship(back_populates="video_jobs")
 
 
+class MediaAsset(Base):
+    """One object written to the media bucket, probed once when it was uploaded."""
+
+    __tablename__ = "media_assets"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    url: Mapped[str] = mapped_column(String(500), unique=True, nullable=False)
+    storage_key: Mapped[str] = mapped_column(String(500), nullable=False)
+    content_sha256: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
+    byte_size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    mime_type: Mapped[str] = mapped_column(String(100), nullable=False)
+    width: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    height: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    duration_seconds: Mapped[float | None] = mapped_column(Float, nullable=True)
+    codec: Mapped[str | None] = mapped_column(String(40), nullable=True)
+    bitrate: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
 Index("ix_posts_status_created_at", Post.status, Post.created_at)
 Index("ix_telegram_sessions_user_state", TelegramSession.telegram_user_id, TelegramSession.state)
 Index("ix_posts_brand_status_created_at", Post.brand_id, Post.status, Post.created_at)
 Index("ix_job_runs_brand_status_started_at", JobRun.brand_id, JobRun.status, JobRun.started_at)
+Index("ix_job_runs_post_stage", JobRun.post_id, JobRun.stage)
+Index("ix_job_runs_status_stage", JobRun.status, JobRun.stage)
 Index("ix_brand_category_templates_category_active", BrandCategoryTemplate.category, BrandCategoryTemplate.is_active)
@@ -7,7 +7,13 @@ from vak_bot.config import get_settings
 
 settings = get_settings()
 
-engine = create_engine(settings.database_url, pool_pre_ping=True)
+# Every worker thread and pipeline-loop executor thread may hold a connection at once.
+engine = create_engine(
+    settings.database_url,
+    pool_pre_ping=True,
+    pool_size=settings.worker_concurrency,
+    max_overflow=settings.worker_concurrency,
+)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False, class_=Session)
 
 
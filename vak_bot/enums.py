@@ -27,6 +27,11 @@ class VideoType(str, Enum):
     REVEAL = "reveal"
 
 
+class RenderTier(str, Enum):
+    DRAFT = "draft"
+    FINAL = "final"
+
+
 class SessionState(str, Enum):
     IDLE = "idle"
     AWAITING_PHOTOS = "awaiting_photos"
@@ -55,6 +60,7 @@ class JobStage(str, Enum):
 class JobStatus(str, Enum):
     STARTED = "started"
     SUCCEEDED = "succeeded"
+    SKIPPED = "skipped"
     FAILED = "failed"
 
 
@@ -67,3 +73,4 @@ class CallbackAction(str, Enum):
     SELECT_VIDEO = "select_video"
     EXTEND = "extend"
     REEL_THIS = "reel_this"
+    ANOTHER_VIDEO = "another_video"
@@ -0,0 +1,90 @@
+"""Cache of reference-analysis StyleBriefs, shared by every request that would send the analyzer the same inputs."""
+
+from __future__ import annotations
+
+import hashlib
+
+import structlog
+
+from vak_bot.config import get_settings
+from vak_bot.pipeline.llm_utils import normalize_openai_model
+from vak_bot.pipeline.prompts import analysis_prompt_version
+from vak_bot.pipeline.route_detector import canonical_reference_key
+from vak_bot.schemas import StyleBrief
+from vak_bot.services.cache_store import CacheStore
+
+logger = structlog.get_logger(__name__)
+
+_store: CacheStore | None = None
+
+
+def _cache() -> CacheStore:
+    global _store
+    if _store is None:
+        _store = CacheStore("style-briefs")
+    return _store
+
+
+def _index_key(canonical_ref: str) -> str:
+    return f"index:{canonical_ref}"
+
+
+def style_brief_cache_key(
+    reference_url: str,
+    reference_image_bytes: bytes,
+    category: str,
+    brand_id: int | None = None,
+    is_video: bool = False,
+) -> str:
+    """Key a brief by reference identity, reference pixels, brand-rendered prompt/model version and brand category.
+
+    The analysis prompt is rendered with the brand's name, palette and guardrails, so
+    brands only share a brief when everything they would send the analyzer matches.
+    """
+    canonical_ref = canonical_reference_key(reference_url)
+    image_hash = hashlib.sha256(reference_image_bytes).hexdigest()[:16]
+    model = normalize_openai_model(get_settings().openai_model)
+    prompt_version = hashlib.sha256(f"{analysis_prompt_version(brand_id, is_video)}:{model}".encode("utf-8")).hexdigest()[:12]
+    kind = "video" if is_video else "image"
+    return f"{canonical_ref}|{image_hash}|{prompt_version}|{category}|{kind}"
+
+
+def get_cached_style_brief(key: str) -> StyleBrief | None:
+    raw = _cache().get(key)
+    if raw is None:
+        return None
+    try:
+        return StyleBrief.model_validate_json(raw)
+    except Exception as exc:
+        logger.warning("style_brief_cache_corrupt", key=key, error=str(exc))
+        _cache().delete(key)
+        return None
+
+
+def store_style_brief(key: str, style_brief: StyleBrief) -> None:
+    ttl = get_settings().style_brief_cache_ttl_seconds
+    _cache().set(key, style_brief.model_dump_json().encode("utf-8"), ttl_seconds=ttl)
+
+    # Track keys per reference so a single reference can be purged without a scan. The index
+    # is updated atomically: two workers caching briefs for one reference must not drop a key.
+    canonical_ref = key.split("|", 1)[0]
+
+    def _add_key(raw: bytes | None) -> bytes:
+        known = set((raw or b"").decode("utf-8").splitlines())
+        known.add(key)
+        return "\n".join(sorted(known)).encode("utf-8")
+
+    _cache().update(_index_key(canonical_ref), _add_key, ttl_seconds=ttl)
+
+
+def purge_style_briefs(reference_url: str | None = None) -> int:
+    """Drop cached briefs for one reference URL, or every cached brief when no URL is given."""
+    if reference_url is None:
+        return _cache().clear()
+
+    index_key = _index_key(canonical_reference_key(reference_url))
+    keys = [key for key in (_cache().get(index_key) or b"").decode("utf-8").splitlines() if key]
+    for key in keys:
+        _cache().delete(key)
+    _cache().delete(index_key)
+    return len(keys)
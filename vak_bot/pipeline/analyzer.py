@@ -1,78 +1,75 @@
 from __future__ import annotations
 
+import asyncio
 import json
 
 import httpx
 import structlog
 
 from vak_bot.config import get_settings
+from vak_bot.pipeline.deadline import provider_timeout
 from vak_bot.pipeline.errors import AnalysisError
+from vak_bot.pipeline.http_clients import get_async_client, get_client
 from vak_bot.pipeline.llm_utils import (
     extract_openai_response_text,
     normalize_openai_model,
     parse_json_object,
 )
-from vak_bot.pipeline.prompts import load_analysis_prompt, load_brand_config, load_video_analysis_prompt
+from vak_bot.pipeline.prompts import load_analysis_brand_context, load_full_analysis_prompt
 from vak_bot.schemas import StyleBrief
 
 logger = structlog.get_logger(__name__)
 
+OPENAI_RESPONSES_URL = "https://api.openai.com/v1/responses"
+
 
 class OpenAIReferenceAnalyzer:
     def __init__(self, brand_id: int | None = None) -> None:
         self.settings = get_settings()
         self.brand_id = brand_id
 
-    def analyze_reference(self, reference_image_url: str, reference_caption: str | None, is_video: bool = False) -> StyleBrief:
-        if self.settings.dry_run:
-            return StyleBrief.model_validate(
-                {
-                    "layout_type": "flat-lay",
-                    "composition": {
-                        "product_placement": "center",
-                        "whitespace": "moderate",
-                        "text_area": "bottom",
-                        "aspect_ratio": "4:5",
-                    },
-                    "color_mood": {
-                        "temperature": "warm",
-                        "dominant_colors": ["#CFAF7A", "#F5E8D0", "#2C2C2C"],
-                        "palette_name": "earthy",
-                    },
-                    "background": {
-                        "type": "textured",
-                        "description": "Beige textured surface with soft natural accents",
-                        "suggested_background": "Warm neutral cloth backdrop with subtle handcrafted props",
-                    },
-                    "lighting": "natural-soft",
-                    "text_overlay": {
-                        "has_text": False,
-                        "text_style": "none",
-                        "text_position": "none",
-                        "text_purpose": "none",
-                    },
-                    "content_format": "single-image",
-                    "vibe_words": ["elegant", "warm", "artisan"],
-                    "adaptation_notes": "Keep the original product fully accurate; use minimal supporting props.",
-                }
-            )
+    @staticmethod
+    def _dry_run_brief() -> StyleBrief:
+        return StyleBrief.model_validate(
+            {
+                "layout_type": "flat-lay",
+                "composition": {
+                    "product_placement": "center",
+                    "whitespace": "moderate",
+                    "text_area": "bottom",
+                    "aspect_ratio": "4:5",
+                },
+                "color_mood": {
+                    "temperature": "warm",
+                    "dominant_colors": ["#CFAF7A", "#F5E8D0", "#2C2C2C"],
+                    "palette_name": "earthy",
+                },
+                "background": {
+                    "type": "textured",
+                    "description": "Beige textured surface with soft natural accents",
+                    "suggested_background": "Warm neutral cloth backdrop with subtle handcrafted props",
+                },
+                "lighting": "natural-soft",
+                "text_overlay": {
+                    "has_text": False,
+                    "text_style": "none",
+                    "text_position": "none",
+                    "text_purpose": "none",
+                },
+                "content_format": "single-image",
+                "vibe_words": ["elegant", "warm", "artisan"],
+                "adaptation_notes": "Keep the original product fully accurate; use minimal supporting props.",
+            }
+        )
 
+    def _build_request(
+        self, reference_image_url: str, reference_caption: str | None, is_video: bool
+    ) -> tuple[str, dict, dict[str, str]]:
         if not self.settings.openai_api_key:
             raise AnalysisError("Missing OPENAI_API_KEY")
 
-        prompt = load_analysis_prompt(self.brand_id)
-        if is_video:
-            video_addon = load_video_analysis_prompt(self.brand_id)
-            if video_addon:
-                prompt = f"{prompt}\n\n{video_addon}"
-        brand_cfg = load_brand_config(self.brand_id)
-        brand_context = {
-            "brand": brand_cfg.get("brand", {}),
-            "visual_identity": brand_cfg.get("visual_identity", {}),
-            "display_styles": brand_cfg.get("display_styles", {}),
-            "product_vocabulary": brand_cfg.get("product_vocabulary", {}),
-            "variation_modifiers": brand_cfg.get("variation_modifiers", [])[:3],
-        }
+        prompt = load_full_analysis_prompt(self.brand_id, is_video)
+        brand_context = load_analysis_brand_context(self.brand_id)
         user_text = (
             f"Reference caption: {reference_caption or 'N/A'}\n\n"
             f"Brand context JSON: {json.dumps(brand_context)}"
@@ -105,17 +102,19 @@ class OpenAIReferenceAnalyzer:
             "Authorization": f"Bearer {self.settings.openai_api_key}",
             "Content-Type": "application/json",
         }
+        return model, payload, headers
 
-        try:
-            with httpx.Client(timeout=90.0) as client:
-                response = client.post("https://api.openai.com/v1/responses", headers=headers, json=payload)
-                response.raise_for_status()
-                data = response.json()
-                raw_text = extract_openai_response_text(data)
-                logger.info("openai_analysis_success", model=model, response_id=data.get("id"))
-                parsed = parse_json_object(raw_text)
-            return StyleBrief.model_validate(parsed)
-        except httpx.HTTPStatusError as exc:
+    @staticmethod
+    def _parse_response(response: httpx.Response, model: str) -> StyleBrief:
+        response.raise_for_status()
+        data = response.json()
+        raw_text = extract_openai_response_text(data)
+        logger.info("openai_analysis_success", model=model, response_id=data.get("id"))
+        return StyleBrief.model_validate(parse_json_object(raw_text))
+
+    @staticmethod
+    def _request_error(exc: Exception, model: str) -> AnalysisError:
+        if isinstance(exc, httpx.HTTPStatusError):
             body_preview = exc.response.text[:400] if exc.response is not None else ""
             logger.error(
                 "openai_analysis_http_error",
@@ -123,7 +122,37 @@ class OpenAIReferenceAnalyzer:
                 status_code=exc.response.status_code if exc.response is not None else None,
                 body_preview=body_preview,
             )
-            raise AnalysisError(str(exc)) from exc
-        except Exception as exc:
+        else:
             logger.error("openai_analysis_failed", model=model, error=str(exc))
-            raise AnalysisError(str(exc)) from exc
+        return AnalysisError(str(exc))
+
+    def analyze_reference(self, reference_image_url: str, reference_caption: str | None, is_video: bool = False) -> StyleBrief:
+        if self.settings.dry_run:
+            return self._dry_run_brief()
+
+        model, payload, headers = self._build_request(reference_image_url, reference_caption, is_video)
+        timeout = provider_timeout("openai")
+        try:
+            response = get_client("openai").post(OPENAI_RESPONSES_URL, headers=headers, json=payload, timeout=timeout)
+            return self._parse_response(response, model)
+        except Exception as exc:
+            raise self._request_error(exc, model) from exc
+
+    async def analyze_reference_async(
+        self, reference_image_url: str, reference_caption: str | None, is_video: bool = False
+    ) -> StyleBrief:
+        if self.settings.dry_run:
+            return self._dry_run_brief()
+
+        # Prompt and brand config loads may touch the database; build the request off the loop.
+        model, payload, headers = await asyncio.to_thread(
+            self._build_request, reference_image_url, reference_caption, is_video
+        )
+        timeout = provider_timeout("openai")
+        try:
+            response = await get_async_client("openai").post(
+                OPENAI_RESPONSES_URL, headers=headers, json=payload, timeout=timeout
+            )
+            return self._parse_response(response, model)
+        except Exception as exc:
+            raise self._request_error(exc, model) from exc
@@ -0,0 +1,73 @@
+"""Process-wide event loop that drives async pipeline runs for sync callers such as Celery tasks.
+
+Every pipeline run submitted from any thread of a worker process shares one loop,
+so a thread-pool worker can keep dozens of posts in flight while they wait on
+providers. The loop lives on a daemon thread and is recreated after ``fork``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Coroutine, TypeVar
+
+import structlog
+
+from vak_bot.config import get_settings
+
+logger = structlog.get_logger(__name__)
+
+T = TypeVar("T")
+
+_lock = threading.Lock()
+_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _start_loop() -> asyncio.AbstractEventLoop:
+    loop = asyncio.new_event_loop()
+    # Database work, SSIM scoring, uploads and Telegram sends all leave the loop through
+    # asyncio.to_thread; the default executor's min(32, cpu + 4) threads would queue them.
+    threads = 2 * get_settings().worker_concurrency
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=threads, thread_name_prefix="pipeline-io"))
+    thread = threading.Thread(target=loop.run_forever, name="pipeline-loop", daemon=True)
+    thread.start()
+    logger.info("pipeline_loop_started", pid=os.getpid(), executor_threads=threads)
+    return loop
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            _loop = _start_loop()
+        return _loop
+
+
+def _reset_after_fork() -> None:
+    # The loop thread does not survive fork; a prefork child starts its own on first use.
+    global _loop, _lock
+    _loop = None
+    _lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def submit(coro: Coroutine[object, object, T]) -> Future[T]:
+    """Schedule ``coro`` on the shared loop and return a thread-safe future."""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop())
+
+
+def run(coro: Coroutine[object, object, T]) -> T:
+    """Run ``coro`` on the shared loop and block the calling thread until it finishes."""
+    loop = get_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("async_runtime.run() called from the pipeline loop; await the coroutine instead")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
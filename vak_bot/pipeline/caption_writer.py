@@ -1,12 +1,16 @@
 from __future__ import annotations
 
+import asyncio
+import base64
 import json
 
 import httpx
 import structlog
 
 from vak_bot.config import get_settings
+from vak_bot.pipeline.deadline import provider_timeout
 from vak_bot.pipeline.errors import CaptionError
+from vak_bot.pipeline.http_clients import get_async_client, get_client
 from vak_bot.pipeline.llm_utils import (
     extract_anthropic_response_text,
     normalize_claude_model,
@@ -17,6 +21,8 @@ from vak_bot.schemas import CaptionPackage, ReelCaptionPackage, StyleBrief
 
 logger = structlog.get_logger(__name__)
 
+ANTHROPIC_MESSAGES_URL = "https://api.anthropic.com/v1/messages"
+
 _REEL_CAPTION_ADDON = """\
 When writing captions for REELS (video posts), adjust your approach:
 
@@ -52,12 +58,31 @@ Return as JSON with additional fields:
 """
 
 
+def _sniff_image_mime(data: bytes) -> str:
+    if data.startswith(b"\x89PNG"):
+        return "image/png"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return "image/jpeg"
+
+
+def _image_source(styled_image_url: str, styled_image_bytes: bytes | None) -> dict:
+    # Prefer bytes already in memory from the STYLE stage over another fetch by Anthropic.
+    if styled_image_bytes:
+        return {
+            "type": "base64",
+            "media_type": _sniff_image_mime(styled_image_bytes),
+            "data": base64.b64encode(styled_image_bytes).decode("utf-8"),
+        }
+    return {"type": "url", "url": styled_image_url}
+
+
 class ClaudeCaptionWriter:
     def __init__(self, brand_id: int | None = None) -> None:
         self.settings = get_settings()
         self.brand_id = brand_id
 
-    def generate_caption(self, styled_image_url: str, style_brief: StyleBrief, product_info: dict, is_reel: bool = False) -> CaptionPackage:
+    def _dry_run_caption(self, product_info: dict, is_reel: bool) -> CaptionPackage:
         brand_cfg = load_brand_config(self.brand_id)
         hashtags_cfg = brand_cfg.get("hashtags", {}) if isinstance(brand_cfg.get("hashtags", {}), dict) else {}
         product_type = str(product_info.get("product_type") or "").strip()
@@ -71,33 +96,43 @@ class ClaudeCaptionWriter:
         hashtag_pool = list(dict.fromkeys(tag for tag in hashtag_pool if isinstance(tag, str) and tag.strip()))
         dry_run_hashtags = " ".join(hashtag_pool[:24]) if hashtag_pool else "#brand #handmade #crafted"
 
-        if self.settings.dry_run:
-            if is_reel:
-                return ReelCaptionPackage(
-                    caption=(
-                        "Built by hand. Made to be remembered. "
-                        "This piece was crafted slowly so every detail feels intentional."
-                    ),
-                    hashtags=dry_run_hashtags + " #reelsinstagram #reelvideo",
-                    alt_text="Video showing a handcrafted product in motion with soft, premium lighting.",
-                    overlay_text=None,
-                    cover_frame_description="The moment the hero detail catches light",
-                    thumb_offset_ms=3000,
-                )
-            return CaptionPackage(
+        if is_reel:
+            return ReelCaptionPackage(
                 caption=(
-                    "Some pieces do more than look good, they make a point quietly. "
-                    "This one was made slowly by hand so every detail still feels personal and real. "
-                    "Wear it when you want to feel confident without trying too hard."
+                    "Built by hand. Made to be remembered. "
+                    "This piece was crafted slowly so every detail feels intentional."
                 ),
-                hashtags=dry_run_hashtags,
-                alt_text="Handcrafted product styled in warm tones on a textured, premium background.",
+                hashtags=dry_run_hashtags + " #reelsinstagram #reelvideo",
+                alt_text="Video showing a handcrafted product in motion with soft, premium lighting.",
                 overlay_text=None,
+                cover_frame_description="The moment the hero detail catches light",
+                thumb_offset_ms=3000,
             )
+        return CaptionPackage(
+            caption=(
+                "Some pieces do more than look good, they make a point quietly. "
+                "This one was made slowly by hand so every detail still feels personal and real. "
+                "Wear it when you want to feel confident without trying too hard."
+            ),
+            hashtags=dry_run_hashtags,
+            alt_text="Handcrafted product styled in warm tones on a textured, premium background.",
+            overlay_text=None,
+        )
 
+    def _build_request(
+        self,
+        styled_image_url: str,
+        style_brief: StyleBrief,
+        product_info: dict,
+        is_reel: bool,
+        styled_image_bytes: bytes | None,
+    ) -> tuple[str, dict, dict[str, str]]:
         if not self.settings.anthropic_api_key:
             raise CaptionError("Missing ANTHROPIC_API_KEY")
 
+        brand_cfg = load_brand_config(self.brand_id)
+        hashtags_cfg = brand_cfg.get("hashtags", {}) if isinstance(brand_cfg.get("hashtags", {}), dict) else {}
+
         prompt = load_caption_prompt(self.brand_id)
         if is_reel:
             prompt += "\n\n" + _REEL_CAPTION_ADDON
@@ -144,10 +179,7 @@ class ClaudeCaptionWriter:
                     "content": [
                         {
                             "type": "image",
-                            "source": {
-                                "type": "url",
-                                "url": styled_image_url,
-                            },
+                            "source": _image_source(styled_image_url, styled_image_bytes),
                         },
                         {
                             "type": "text",
@@ -174,19 +206,20 @@ class ClaudeCaptionWriter:
             "anthropic-version": "2023-06-01",
             "content-type": "application/json",
         }
+        return model, payload, headers
 
-        try:
-            with httpx.Client(timeout=90.0) as client:
-                response = client.post("https://api.anthropic.com/v1/messages", headers=headers, json=payload)
-                response.raise_for_status()
-                data = response.json()
-            text = extract_anthropic_response_text(data)
-            logger.info("claude_caption_success", model=model, raw_text_preview=text[:300])
-            parsed = parse_json_object(text)
-            if is_reel:
-                return ReelCaptionPackage.model_validate(parsed)
-            return CaptionPackage.model_validate(parsed)
-        except httpx.HTTPStatusError as exc:
+    def _parse_response(self, response: httpx.Response, model: str, is_reel: bool) -> CaptionPackage:
+        response.raise_for_status()
+        text = extract_anthropic_response_text(response.json())
+        logger.info("claude_caption_success", model=model, raw_text_preview=text[:300])
+        parsed = parse_json_object(text)
+        if is_reel:
+            return ReelCaptionPackage.model_validate(parsed)
+        return CaptionPackage.model_validate(parsed)
+
+    @staticmethod
+    def _request_error(exc: Exception, model: str) -> CaptionError:
+        if isinstance(exc, httpx.HTTPStatusError):
             body_preview = exc.response.text[:400] if exc.response is not None else ""
             logger.error(
                 "claude_caption_http_error",
@@ -194,7 +227,51 @@ class ClaudeCaptionWriter:
                 status_code=exc.response.status_code if exc.response is not None else None,
                 body_preview=body_preview,
             )
-            raise CaptionError(str(exc)) from exc
-        except Exception as exc:
+        else:
             logger.error("claude_caption_failed", model=model, error=str(exc))
-            raise CaptionError(str(exc)) from exc
+        return CaptionError(str(exc))
+
+    def generate_caption(
+        self,
+        styled_image_url: str,
+        style_brief: StyleBrief,
+        product_info: dict,
+        is_reel: bool = False,
+        styled_image_bytes: bytes | None = None,
+    ) -> CaptionPackage:
+        if self.settings.dry_run:
+            return self._dry_run_caption(product_info, is_reel)
+
+        model, payload, headers = self._build_request(
+            styled_image_url, style_brief, product_info, is_reel, styled_image_bytes
+        )
+        timeout = provider_timeout("anthropic")
+        try:
+            response = get_client("anthropic").post(ANTHROPIC_MESSAGES_URL, headers=headers, json=payload, timeout=timeout)
+            return self._parse_response(response, model, is_reel)
+        except Exception as exc:
+            raise self._request_error(exc, model) from exc
+
+    async def generate_caption_async(
+        self,
+        styled_image_url: str,
+        style_brief: StyleBrief,
+        product_info: dict,
+        is_reel: bool = False,
+        styled_image_bytes: bytes | None = None,
+    ) -> CaptionPackage:
+        if self.settings.dry_run:
+            return await asyncio.to_thread(self._dry_run_caption, product_info, is_reel)
+
+        # Prompt and brand config loads may touch the database; build the request off the loop.
+        model, payload, headers = await asyncio.to_thread(
+            self._build_request, styled_image_url, style_brief, product_info, is_reel, styled_image_bytes
+        )
+        timeout = provider_timeout("anthropic")
+        try:
+            response = await get_async_client("anthropic").post(
+                ANTHROPIC_MESSAGES_URL, headers=headers, json=payload, timeout=timeout
+            )
+            return self._parse_response(response, model, is_reel)
+        except Exception as exc:
+            raise self._request_error(exc, model) from exc
@@ -0,0 +1,123 @@
+"""Stage checkpoints: reuse a stage's stored output when its inputs have not changed."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+from datetime import datetime, timezone
+from typing import Any
+
+import structlog
+
+from vak_bot.db.models import JobRun, Post
+from vak_bot.enums import JobStage, JobStatus
+
+logger = structlog.get_logger(__name__)
+
+IMAGE_STAGES = [JobStage.DOWNLOAD, JobStage.ANALYZE, JobStage.STYLE, JobStage.CAPTION, JobStage.REVIEW]
+VIDEO_STAGES = [
+    JobStage.DOWNLOAD,
+    JobStage.ANALYZE,
+    JobStage.STYLE,
+    JobStage.VIDEO_GENERATE,
+    JobStage.CAPTION,
+    JobStage.REVIEW,
+]
+
+_REUSABLE_STATUSES = {JobStatus.SUCCEEDED.value, JobStatus.SKIPPED.value}
+
+
+def input_fingerprint(*parts: Any) -> str:
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def download_fingerprint(post: Post) -> str:
+    return input_fingerprint(post.reference_url)
+
+
+def analyze_fingerprint(post: Post, is_video: bool) -> str:
+    return input_fingerprint(post.reference_image, post.source_caption, is_video)
+
+
+def record_checkpoint(
+    session,
+    post: Post,
+    stage: JobStage,
+    fingerprint: str,
+    details: dict | None = None,
+) -> None:
+    """Record a stage as done outside the pipeline (e.g. by the link-only prefetch)."""
+    now = datetime.now(timezone.utc)
+    session.add(
+        JobRun(
+            brand_id=post.brand_id,
+            post_id=post.id,
+            stage=stage.value,
+            status=JobStatus.SUCCEEDED.value,
+            cache_hit=True,
+            input_fingerprint=fingerprint,
+            details_json=details,
+            started_at=now,
+            finished_at=now,
+        )
+    )
+
+
+class StageCheckpoints:
+    """Decide which stages of one pipeline run can reuse their previous output.
+
+    A stage is reused when its latest run succeeded (or was itself reused) with the
+    same input fingerprint and its output is still on the post. ``from_stage`` forces
+    that stage and everything after it to run again.
+    """
+
+    def __init__(
+        self,
+        session,
+        post_id: int,
+        brand_id: int,
+        stages: list[JobStage],
+        from_stage: JobStage | None = None,
+    ) -> None:
+        self.session = session
+        self.post_id = post_id
+        self.brand_id = brand_id
+        self._forced = set(stages[stages.index(from_stage) :]) if from_stage in stages else set()
+
+    def _latest(self, stage: JobStage) -> JobRun | None:
+        return (
+            self.session.query(JobRun)
+            .filter(JobRun.post_id == self.post_id, JobRun.stage == stage.value)
+            .order_by(JobRun.id.desc())
+            .first()
+        )
+
+    def try_skip(self, stage: JobStage, fingerprint: str, ready: bool) -> bool:
+        """Record a skipped run and return True when ``stage`` can reuse its stored output."""
+        if stage in self._forced or not ready:
+            return False
+        latest = self._latest(stage)
+        if latest is None or latest.status not in _REUSABLE_STATUSES or latest.input_fingerprint != fingerprint:
+            return False
+
+        now = datetime.now(timezone.utc)
+        self.session.add(
+            JobRun(
+                brand_id=self.brand_id,
+                post_id=self.post_id,
+                stage=stage.value,
+                status=JobStatus.SKIPPED.value,
+                input_fingerprint=fingerprint,
+                started_at=now,
+                finished_at=now,
+            )
+        )
+        self.session.commit()
+        logger.info("stage_checkpoint_reused", post_id=self.post_id, stage=stage.value)
+        return True
+
+    async def try_skip_async(self, stage: JobStage, fingerprint: str, ready: bool) -> bool:
+        """``try_skip`` for pipeline coroutines; the lookup and the skipped run are written on a worker thread."""
+        return await asyncio.to_thread(self.try_skip, stage, fingerprint, ready)
@@ -0,0 +1,145 @@
+"""Minimal dependency-graph executor for overlapping pipeline stages within one post."""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass
+class Node:
+    """One unit of work. ``fn`` receives the results of ``deps`` keyed by node name.
+
+    Coroutine functions run concurrently on the event loop. Plain functions run
+    inline on the loop, so they must not block: the SQLAlchemy session is never used
+    on the loop, and a node hands session work, like CPU-heavy work, to
+    ``asyncio.to_thread``.
+    """
+
+    name: str
+    fn: Callable[[dict[str, Any]], Any]
+    deps: tuple[str, ...] = ()
+
+
+@dataclass
+class NodeTiming:
+    start_ms: int
+    duration_ms: int
+    status: str
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"start_ms": self.start_ms, "duration_ms": self.duration_ms, "status": self.status}
+
+
+@dataclass
+class DagResult:
+    results: dict[str, Any] = field(default_factory=dict)
+    timings: dict[str, NodeTiming] = field(default_factory=dict)
+
+
+class DagError(Exception):
+    """Raised when a node fails; carries the timings gathered up to the failure."""
+
+    def __init__(self, node: str, cause: BaseException, timings: dict[str, NodeTiming]) -> None:
+        super().__init__(f"node {node} failed: {cause}")
+        self.node = node
+        self.cause = cause
+        self.timings = timings
+
+
+def _validate(nodes: list[Node]) -> dict[str, Node]:
+    by_name: dict[str, Node] = {}
+    for node in nodes:
+        if node.name in by_name:
+            raise ValueError(f"duplicate node {node.name}")
+        by_name[node.name] = node
+    for node in nodes:
+        missing = [dep for dep in node.deps if dep not in by_name]
+        if missing:
+            raise ValueError(f"node {node.name} depends on unknown {missing}")
+
+    # Kahn's algorithm, only to reject cycles before anything runs.
+    remaining = {node.name: set(node.deps) for node in nodes}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"dependency cycle among {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return by_name
+
+
+async def _call(fn: Callable[[dict[str, Any]], Any], inputs: dict[str, Any]) -> Any:
+    result = fn(inputs)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+async def run_dag(nodes: list[Node]) -> DagResult:
+    """Run every node as soon as its dependencies have finished.
+
+    The first failing node cancels every node still running or waiting and is
+    raised as ``DagError``.
+    """
+    by_name = _validate(nodes)
+    outcome = DagResult()
+    started_at = time.monotonic()
+    pending = dict(by_name)
+    running: dict[asyncio.Task, tuple[str, float]] = {}
+    failure: tuple[str, BaseException] | None = None
+
+    def _record(name: str, began: float, status: str) -> None:
+        outcome.timings[name] = NodeTiming(
+            start_ms=int((began - started_at) * 1000),
+            duration_ms=int((time.monotonic() - began) * 1000),
+            status=status,
+        )
+
+    try:
+        while pending or running:
+            for node in [node for node in pending.values() if all(dep in outcome.results for dep in node.deps)]:
+                del pending[node.name]
+                inputs = {dep: outcome.results[dep] for dep in node.deps}
+                running[asyncio.ensure_future(_call(node.fn, inputs))] = (node.name, time.monotonic())
+            if not running:
+                raise RuntimeError(f"dag stalled with pending nodes {sorted(pending)}")
+
+            done, _ = await asyncio.wait(list(running), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name, began = running.pop(task)
+                exc = task.exception()
+                if exc is None:
+                    outcome.results[name] = task.result()
+                    _record(name, began, "succeeded")
+                else:
+                    _record(name, began, "failed")
+                    failure = failure or (name, exc)
+            if failure is not None:
+                break
+    finally:
+        # Also reached when the caller itself is cancelled; never leave orphaned node tasks.
+        for task, (name, began) in running.items():
+            task.cancel()
+            _record(name, began, "cancelled")
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+
+    now_ms = int((time.monotonic() - started_at) * 1000)
+    for name in pending:
+        outcome.timings[name] = NodeTiming(start_ms=now_ms, duration_ms=0, status="cancelled")
+
+    if failure is not None:
+        name, exc = failure
+        logger.warning("dag_node_failed", node=name, error=str(exc))
+        raise DagError(name, exc, outcome.timings)
+    return outcome
@@ -0,0 +1,159 @@
+"""Per-post deadline budgets, so one post's whole pipeline run finishes in bounded time.
+
+A ``DeadlineBudget`` is created when a post's run starts and travels with it in a
+context variable, so every provider call under that run sees it without threading
+an argument through each layer. Calls take the smaller of their usual timeout and
+what is left; fallbacks and other optional work are dropped once less than the
+reserve remains; and each JobRun records what its stage consumed. Code running
+outside a budgeted run keeps the provider defaults.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Coroutine, TypeVar
+
+import httpx
+import structlog
+
+from vak_bot.config import get_settings
+from vak_bot.pipeline.errors import DeadlineExceededError
+from vak_bot.pipeline.http_clients import PROVIDERS
+
+logger = structlog.get_logger(__name__)
+
+T = TypeVar("T")
+
+# A call given less than this would only fail on its own timeout; fail the post instead.
+_MIN_CALL_SECONDS = 5.0
+
+
+class DeadlineBudget:
+    def __init__(
+        self,
+        total_seconds: float,
+        reserve_seconds: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.total_seconds = total_seconds
+        self.reserve_seconds = reserve_seconds
+        self._clock = clock
+        self._started = clock()
+        self._lock = threading.Lock()
+        self._open_stages: dict[int, float] = {}
+        self.stage_ms: dict[str, int] = {}
+        self.skipped: list[str] = []
+
+    @classmethod
+    def from_settings(cls) -> DeadlineBudget:
+        settings = get_settings()
+        return cls(settings.post_deadline_seconds, settings.post_deadline_reserve_seconds)
+
+    def elapsed(self) -> float:
+        return self._clock() - self._started
+
+    def remaining(self) -> float:
+        return max(0.0, self.total_seconds - self.elapsed())
+
+    @property
+    def nearly_spent(self) -> bool:
+        return self.remaining() < self.reserve_seconds
+
+    def check(self, what: str) -> None:
+        if self.remaining() < _MIN_CALL_SECONDS:
+            raise DeadlineExceededError(f"post deadline of {self.total_seconds:.0f}s spent before {what}")
+
+    def cap(self, seconds: float, what: str) -> float:
+        """``seconds`` shortened to what is left; raises when too little is left to try."""
+        self.check(what)
+        return min(seconds, self.remaining())
+
+    def attempts(self, candidates: list[T], what: str) -> list[T]:
+        """``candidates`` in order, cut to the first one once the budget is nearly spent."""
+        self.check(what)
+        if len(candidates) > 1 and self.nearly_spent:
+            self._skip(what, dropped=len(candidates) - 1)
+            return candidates[:1]
+        return candidates
+
+    def allows_optional(self, what: str) -> bool:
+        if self.nearly_spent:
+            self._skip(what)
+            return False
+        return True
+
+    def _skip(self, what: str, dropped: int | None = None) -> None:
+        with self._lock:
+            self.skipped.append(what)
+        logger.info("deadline_optional_work_skipped", what=what, dropped=dropped, remaining_s=round(self.remaining(), 1))
+
+    def begin_stage(self, key: int) -> None:
+        with self._lock:
+            self._open_stages[key] = self.elapsed()
+
+    def end_stage(self, key: int, stage: str) -> dict | None:
+        """What the stage opened under ``key`` consumed, for its JobRun; None if it was not opened here."""
+        elapsed = self.elapsed()
+        with self._lock:
+            began = self._open_stages.pop(key, None)
+            if began is None:
+                return None
+            spent_ms = int((elapsed - began) * 1000)
+            self.stage_ms[stage] = self.stage_ms.get(stage, 0) + spent_ms
+        return {
+            "stage_ms": spent_ms,
+            "spent_ms": int(elapsed * 1000),
+            "remaining_ms": int(max(0.0, self.total_seconds - elapsed) * 1000),
+            "total_ms": int(self.total_seconds * 1000),
+        }
+
+
+_current_budget: ContextVar[DeadlineBudget | None] = ContextVar("post_deadline_budget", default=None)
+
+
+def current_budget() -> DeadlineBudget | None:
+    return _current_budget.get()
+
+
+async def within_budget(post_id: int, coro: Coroutine[object, object, T], budget: DeadlineBudget | None = None) -> T:
+    """Await ``coro`` with a deadline budget for ``post_id`` in effect.
+
+    ``async_runtime.run`` schedules each coroutine as its own task, so the budget
+    is set here, inside that task, and is never visible to other posts.
+    """
+    budget = budget or DeadlineBudget.from_settings()
+    token = _current_budget.set(budget)
+    try:
+        return await coro
+    finally:
+        _current_budget.reset(token)
+        logger.info(
+            "post_deadline_spent",
+            post_id=post_id,
+            spent_ms=int(budget.elapsed() * 1000),
+            remaining_ms=int(budget.remaining() * 1000),
+            stages=budget.stage_ms,
+            skipped=budget.skipped,
+        )
+
+
+def provider_timeout(provider: str, seconds: float | None = None) -> httpx.Timeout:
+    """The timeout for one call to ``provider``: its profile default (or ``seconds``), capped by the budget."""
+    profile = PROVIDERS[provider]
+    seconds = seconds or profile.timeout
+    budget = current_budget()
+    if budget is not None:
+        seconds = budget.cap(seconds, provider)
+    return httpx.Timeout(seconds, connect=min(profile.connect_timeout, seconds))
+
+
+def limit_attempts(candidates: list[T], what: str) -> list[T]:
+    budget = current_budget()
+    return candidates if budget is None else budget.attempts(candidates, what)
+
+
+def optional_work_allowed(what: str) -> bool:
+    budget = current_budget()
+    return budget is None or budget.allows_optional(what)
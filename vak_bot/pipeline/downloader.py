@@ -1,14 +1,20 @@
 from __future__ import annotations
 
+import asyncio
 import json
+from dataclasses import asdict
 from urllib.parse import urlparse
 
 import httpx
 import structlog
 
 from vak_bot.config import get_settings
+from vak_bot.pipeline.deadline import provider_timeout
 from vak_bot.pipeline.errors import DownloadError, PrivatePostError
+from vak_bot.pipeline.http_clients import get_async_client, get_client
 from vak_bot.pipeline.interfaces import DownloadedReference
+from vak_bot.pipeline.route_detector import canonical_reference_key
+from vak_bot.services.cache_store import CacheStore
 
 logger = structlog.get_logger(__name__)
 
@@ -16,54 +22,110 @@ BRIGHTDATA_SCRAPE_URL = "https://api.brightdata.com/datasets/v3/scrape"
 BRIGHTDATA_DATASET_ID = "gd_lk5ns7kz21pck8jpis"  # Instagram Posts dataset
 
 
+_scrape_cache: CacheStore | None = None
+
+
+def _cache() -> CacheStore:
+    global _scrape_cache
+    if _scrape_cache is None:
+        _scrape_cache = CacheStore("scrapes")
+    return _scrape_cache
+
+
 class DataBrightDownloader:
     def __init__(self) -> None:
         self.settings = get_settings()
 
+    def _cached(self, cache_key: str) -> DownloadedReference | None:
+        raw = _cache().get(cache_key)
+        if raw is None:
+            return None
+        try:
+            return DownloadedReference(**json.loads(raw))
+        except Exception as exc:
+            logger.warning("bright_data_cache_corrupt", cache_key=cache_key, error=str(exc))
+            _cache().delete(cache_key)
+            return None
+
     def _validate_source(self, source_url: str) -> None:
         host = (urlparse(source_url).hostname or "").lower()
         if "instagram.com" not in host and "pinterest.com" not in host and "pin.it" not in host:
             raise DownloadError("Unsupported source")
 
-    def download_post(self, source_url: str) -> DownloadedReference:
+    def _prepare(self, source_url: str) -> tuple[DownloadedReference | None, str]:
+        """Return a reference that needs no scrape (dry run or cache hit) and the scrape cache key."""
         self._validate_source(source_url)
 
         if self.settings.dry_run:
-            return DownloadedReference(
+            reference = DownloadedReference(
                 source_url=source_url,
                 image_urls=["https://images.unsplash.com/photo-1521572163474-6864f9cf17ab?w=1080"],
                 caption="Product inspiration post",
                 hashtags="#productdesign #brandstory",
                 media_type="image",
             )
+            return reference, ""
+
+        # Preflight routing and the DOWNLOAD stage scrape the same link; share one result.
+        cache_key = canonical_reference_key(source_url)
+        cached = self._cached(cache_key)
+        if cached is not None:
+            logger.info("bright_data_cache_hit", source_url=source_url, cache_key=cache_key)
+            return cached, cache_key
 
         if not self.settings.databright_api_key:
             raise DownloadError("Missing DATABRIGHT_API_KEY (Bright Data API token)")
-
-        headers = {
-            "Authorization": f"Bearer {self.settings.databright_api_key}",
-            "Content-Type": "application/json",
+        return None, cache_key
+
+    def _scrape_request(self, source_url: str) -> dict:
+        return {
+            "url": f"{BRIGHTDATA_SCRAPE_URL}?dataset_id={BRIGHTDATA_DATASET_ID}&notify=false&include_errors=true&format=json",
+            "headers": {
+                "Authorization": f"Bearer {self.settings.databright_api_key}",
+                "Content-Type": "application/json",
+            },
+            "content": json.dumps({
+                "input": [{"url": source_url}],
+            }),
+            "timeout": provider_timeout("brightdata"),
         }
 
-        payload = json.dumps({
-            "input": [{"url": source_url}],
-        })
+    @staticmethod
+    def _read_response(response: httpx.Response) -> tuple[object, str]:
+        response.raise_for_status()
+        raw_text = response.text
+        logger.info("bright_data_raw_response", status=response.status_code, body=raw_text[:500])
+        return response.json(), raw_text
 
+    def download_post(self, source_url: str) -> DownloadedReference:
+        reference, cache_key = self._prepare(source_url)
+        if reference is not None:
+            return reference
+
+        request = self._scrape_request(source_url)
         try:
-            with httpx.Client(timeout=120.0) as client:
-                response = client.post(
-                    f"{BRIGHTDATA_SCRAPE_URL}?dataset_id={BRIGHTDATA_DATASET_ID}&notify=false&include_errors=true&format=json",
-                    headers=headers,
-                    content=payload,
-                )
-                response.raise_for_status()
-                raw_text = response.text
-                logger.info("bright_data_raw_response", status=response.status_code, body=raw_text[:500])
-                results = response.json()
+            results, raw_text = self._read_response(get_client("brightdata").post(**request))
         except Exception as exc:
             logger.error("bright_data_request_failed", error=str(exc))
             raise DownloadError(str(exc)) from exc
+        return self._build_reference(source_url, cache_key, results, raw_text)
+
+    async def download_post_async(self, source_url: str) -> DownloadedReference:
+        # Cache lookups and writes are blocking Redis/disk calls; keep them off the event loop.
+        reference, cache_key = await asyncio.to_thread(self._prepare, source_url)
+        if reference is not None:
+            return reference
 
+        request = self._scrape_request(source_url)
+        try:
+            response = await get_async_client("brightdata").post(**request)
+            results, raw_text = self._read_response(response)
+        except Exception as exc:
+            logger.error("bright_data_request_failed", error=str(exc))
+            raise DownloadError(str(exc)) from exc
+        return await asyncio.to_thread(self._build_reference, source_url, cache_key, results, raw_text)
+
+    def _build_reference(self, source_url: str, cache_key: str, results, raw_text: str) -> DownloadedReference:
         # Handle different response formats
         if isinstance(results, dict):
             # Might be a snapshot_id response or a single post object
@@ -138,7 +200,7 @@ class DataBrightDownloader:
             is_video=is_video,
         )
 
-        return DownloadedReference(
+        reference = DownloadedReference(
             source_url=source_url,
             image_urls=image_urls,
             caption=caption,
@@ -147,3 +209,9 @@ class DataBrightDownloader:
             video_url=video_url,
             thumbnail_url=thumbnail_url,
         )
+        _cache().set(
+            cache_key,
+            json.dumps(asdict(reference)).encode("utf-8"),
+            ttl_seconds=self.settings.scrape_cache_ttl_seconds,
+        )
+        return reference
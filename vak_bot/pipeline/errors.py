@@ -28,6 +28,11 @@ class StylingError(PipelineError):
     user_message = "Styling is taking longer. Trying a different approach..."
 
 
+class DeadlineExceededError(PipelineError):
+    error_code = "deadline_exceeded"
+    user_message = "This one is taking much longer than it should. Please try again in a few minutes."
+
+
 class ProductPreservationError(PipelineError):
     error_code = "product_preservation_failed"
     user_message = "The styled image didn't look right. Let me try again with a different approach..."
@@ -73,3 +78,11 @@ class VideoQualityError(PipelineError):
 class SceneExtensionError(PipelineError):
     error_code = "scene_extension_error"
     user_message = "Couldn't extend the video. Want to post the 8-second version instead?"
+
+
+class DraftReelError(PipelineError):
+    error_code = "draft_reel"
+    user_message = (
+        "This Reel was extended from a draft preview, so it can't be posted at final quality. "
+        "Reply 'redo' for a fresh clip, approve it, then extend the final version."
+    )
@@ -0,0 +1,161 @@
+"""Gemini Files API handles for styling inputs, so each image is uploaded once and referenced by URI.
+
+Uploaded files expire after 48 hours. Handles are cached by content hash until
+shortly before their ``expirationTime``, so a render never points at a file
+that could disappear mid-request.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import re
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+
+import structlog
+
+from vak_bot.pipeline.deadline import provider_timeout
+from vak_bot.pipeline.http_clients import get_async_client, get_client
+from vak_bot.services.cache_store import CacheStore
+
+logger = structlog.get_logger(__name__)
+
+_UPLOAD_ENDPOINT = "https://generativelanguage.googleapis.com/upload/v1beta/files"
+# Used when the response carries no parseable expirationTime.
+_FILE_LIFETIME_SECONDS = 48 * 3600
+# A handle this close to expiry is re-uploaded rather than handed to a render.
+_EXPIRY_MARGIN_SECONDS = 3600
+_FRACTION = re.compile(r"\.(\d{6})\d+")
+
+_store: CacheStore | None = None
+
+
+def _cache() -> CacheStore:
+    global _store
+    if _store is None:
+        _store = CacheStore("gemini-files")
+    return _store
+
+
+@dataclass(frozen=True)
+class GeminiFile:
+    uri: str
+    mime_type: str
+    expires_at: float
+
+
+def _expiry(raw: str | None) -> float:
+    if raw:
+        try:
+            # fromisoformat takes at most microseconds; the API may send nanoseconds.
+            return datetime.fromisoformat(_FRACTION.sub(r".\1", raw)).timestamp()
+        except ValueError:
+            logger.warning("gemini_file_expiry_unparsed", expiration_time=raw)
+    return time.time() + _FILE_LIFETIME_SECONDS
+
+
+class GeminiFileCache:
+    def __init__(self, api_key: str) -> None:
+        self.api_key = api_key
+        # Files belong to the API key's project; never hand one project's URIs to another.
+        self._project = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12]
+
+    def _key(self, data: bytes) -> str:
+        return f"{self._project}:{hashlib.sha256(data).hexdigest()}"
+
+    def _cached(self, key: str) -> GeminiFile | None:
+        raw = _cache().get(key)
+        if raw is None:
+            return None
+        try:
+            handle = GeminiFile(**json.loads(raw))
+        except (ValueError, TypeError):
+            _cache().delete(key)
+            return None
+        if handle.expires_at - time.time() <= _EXPIRY_MARGIN_SECONDS:
+            return None
+        return handle
+
+    def _remember(self, key: str, handle: GeminiFile) -> None:
+        ttl = int(handle.expires_at - time.time() - _EXPIRY_MARGIN_SECONDS)
+        if ttl > 0:
+            _cache().set(key, json.dumps(asdict(handle)).encode("utf-8"), ttl_seconds=ttl)
+
+    def _start_headers(self, data: bytes, mime_type: str) -> dict[str, str]:
+        return {
+            "x-goog-api-key": self.api_key,
+            "X-Goog-Upload-Protocol": "resumable",
+            "X-Goog-Upload-Command": "start",
+            "X-Goog-Upload-Header-Content-Length": str(len(data)),
+            "X-Goog-Upload-Header-Content-Type": mime_type,
+            "Content-Type": "application/json",
+        }
+
+    @staticmethod
+    def _finalize_headers() -> dict[str, str]:
+        return {"X-Goog-Upload-Offset": "0", "X-Goog-Upload-Command": "upload, finalize"}
+
+    @staticmethod
+    def _handle(payload: dict, mime_type: str) -> GeminiFile | None:
+        file = payload.get("file") or {}
+        if not file.get("uri") or file.get("state", "ACTIVE") != "ACTIVE":
+            # Images are normally ACTIVE at once; anything still processing goes inline instead.
+            logger.warning("gemini_file_not_active", name=file.get("name"), state=file.get("state"))
+            return None
+        return GeminiFile(uri=file["uri"], mime_type=file.get("mimeType", mime_type), expires_at=_expiry(file.get("expirationTime")))
+
+    def get_or_upload(self, data: bytes, mime_type: str) -> GeminiFile | None:
+        """A live handle for ``data``, uploading it if needed; None means send the bytes inline."""
+        key = self._key(data)
+        handle = self._cached(key)
+        if handle is not None:
+            logger.info("gemini_file_reused", uri=handle.uri)
+            return handle
+        try:
+            client = get_client("gemini")
+            timeout = provider_timeout("gemini")
+            start = client.post(
+                _UPLOAD_ENDPOINT, headers=self._start_headers(data, mime_type), json={"file": {}}, timeout=timeout
+            )
+            start.raise_for_status()
+            upload = client.post(
+                start.headers["x-goog-upload-url"], headers=self._finalize_headers(), content=data, timeout=timeout
+            )
+            upload.raise_for_status()
+            handle = self._handle(upload.json(), mime_type)
+        except Exception as exc:
+            logger.warning("gemini_file_upload_failed", error=str(exc), byte_size=len(data))
+            return None
+        if handle is not None:
+            self._remember(key, handle)
+            logger.info("gemini_file_uploaded", uri=handle.uri, byte_size=len(data))
+        return handle
+
+    async def get_or_upload_async(self, data: bytes, mime_type: str) -> GeminiFile | None:
+        key = self._key(data)
+        handle = await asyncio.to_thread(self._cached, key)
+        if handle is not None:
+            logger.info("gemini_file_reused", uri=handle.uri)
+            return handle
+        try:
+            client = get_async_client("gemini")
+            timeout = provider_timeout("gemini")
+            start = await client.post(
+                _UPLOAD_ENDPOINT, headers=self._start_headers(data, mime_type), json={"file": {}}, timeout=timeout
+            )
+            start.raise_for_status()
+            upload = await client.post(
+                start.headers["x-goog-upload-url"], headers=self._finalize_headers(), content=data, timeout=timeout
+            )
+            upload.raise_for_status()
+            handle = self._handle(upload.json(), mime_type)
+        except Exception as exc:
+            logger.warning("gemini_file_upload_failed", error=str(exc), byte_size=len(data))
+            return None
+        if handle is not None:
+            await asyncio.to_thread(self._remember, key, handle)
+            logger.info("gemini_file_uploaded", uri=handle.uri, byte_size=len(data))
+        return handle
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import asyncio
 import base64
 import io
 import json
-import uuid
+import secrets
+import time
+from dataclasses import dataclass
+from functools import cached_property
 from typing import Any
 
 import httpx
@@ -18,14 +22,26 @@ except Exception:  # pragma: no cover - optional dependency
     genai_types = None
 
 from vak_bot.config import get_settings
-from vak_bot.pipeline.errors import StylingError
+from vak_bot.enums import RenderTier
+from vak_bot.pipeline.deadline import limit_attempts, optional_work_allowed, provider_timeout
+from vak_bot.pipeline.errors import DeadlineExceededError, StylingError
+from vak_bot.pipeline.gemini_files import GeminiFile, GeminiFileCache
+from vak_bot.pipeline.http_clients import PROVIDERS, get_async_client, get_client
 from vak_bot.pipeline.llm_utils import normalize_gemini_image_model
+from vak_bot.pipeline.media_cache import fetch_media, fetch_media_async
 from vak_bot.pipeline.prompts import load_brand_config, load_styling_prompt
+from vak_bot.pipeline.provider_routing import get_routing_table
+from vak_bot.pipeline.render_pool import RenderJob, render_jobs, render_jobs_async
 from vak_bot.schemas import StyleBrief, StyledVariant
 from vak_bot.storage import R2StorageClient
 
 logger = structlog.get_logger(__name__)
 
+# Rendered slides are stored content-addressed, so a re-render of identical bytes is not uploaded again.
+STYLED_PREFIX = "styled"
+# Provider name under which (model, part style) routes are tracked in the shared routing table.
+ROUTING_PROVIDER = "gemini-image"
+_PART_STYLES = ("snake", "camel")
 _SUPPORTED_INPUT_MIMES = {"image/jpeg", "image/png", "image/webp", "image/heic", "image/heif"}
 _PIL_TO_MIME = {
     "JPEG": "image/jpeg",
@@ -66,11 +82,8 @@ def _create_placeholder_variant(source_url: str, mode: str) -> bytes:
     # Placeholder styling for dry-run: tint and contrast to create distinct previews.
     image = Image.new("RGB", (1080, 1350), color=(245, 240, 232))
     try:
-        with httpx.Client(timeout=30.0) as client:
-            resp = client.get(source_url)
-            resp.raise_for_status()
-            image = Image.open(io.BytesIO(resp.content)).convert("RGB")
-            image = ImageOps.fit(image, (1080, 1350))
+        image = Image.open(io.BytesIO(fetch_media(source_url, timeout=30.0).data)).convert("RGB")
+        image = ImageOps.fit(image, (1080, 1350))
     except Exception:
         pass
 
@@ -87,33 +100,67 @@ def _create_placeholder_variant(source_url: str, mode: str) -> bytes:
     return buf.getvalue()
 
 
+def _encode_image(data: bytes, content_type: str) -> tuple[str, str]:
+    header_mime = _normalize_mime(content_type)
+    detected_mime = _detect_image_mime(data)
+    mime = header_mime if header_mime in _SUPPORTED_INPUT_MIMES else (detected_mime or "")
+    if mime not in _SUPPORTED_INPUT_MIMES:
+        data = _convert_to_jpeg(data)
+        mime = "image/jpeg"
+    return base64.b64encode(data).decode("utf-8"), mime
+
+
 def _download_image_as_base64(url: str) -> tuple[str, str]:
     """Download an image URL and return (base64_data, mime_type)."""
-    with httpx.Client(timeout=30.0) as client:
-        resp = client.get(url)
-        resp.raise_for_status()
-        data = resp.content
-        header_mime = _normalize_mime(resp.headers.get("content-type", ""))
-        detected_mime = _detect_image_mime(data)
-        mime = header_mime if header_mime in _SUPPORTED_INPUT_MIMES else (detected_mime or "")
-        if mime not in _SUPPORTED_INPUT_MIMES:
-            data = _convert_to_jpeg(data)
-            mime = "image/jpeg"
-        return base64.b64encode(data).decode("utf-8"), mime
+    media = fetch_media(url, timeout=30.0)
+    return _encode_image(media.data, media.content_type)
+
+
+async def _download_image_as_base64_async(url: str) -> tuple[str, str]:
+    media = await fetch_media_async(url, timeout=30.0)
+    # Decoding and any JPEG conversion is CPU work; keep it off the event loop.
+    return await asyncio.to_thread(_encode_image, media.data, media.content_type)
+
+
+@dataclass
+class _ImageInput:
+    """A styling input image; ``file`` is set when it is referenced through the Files API instead of inlined."""
+
+    b64: str
+    mime: str
+    file: GeminiFile | None = None
+
+    @cached_property
+    def data(self) -> bytes:
+        return base64.b64decode(self.b64)
+
+
+@dataclass(frozen=True)
+class _RenderedItem:
+    """One rendered slide and the route that produced it."""
+
+    url: str
+    data: bytes
+    model: str
+    part_style: str
 
 
 class GeminiStyler:
-    def __init__(self, brand_id: int | None = None) -> None:
+    def __init__(self, brand_id: int | None = None, tier: RenderTier = RenderTier.FINAL) -> None:
         self.settings = get_settings()
         self.brand_id = brand_id
         self.storage = R2StorageClient()
         self.api_key = self.settings.google_api_key or self.settings.gemini_api_key
-        self.image_model = normalize_gemini_image_model(self.settings.gemini_image_model)
+        draft_model = self.settings.gemini_draft_image_model.strip()
+        # Without a draft model configured, drafts are simply rendered at final quality.
+        self.tier = RenderTier.DRAFT if tier == RenderTier.DRAFT and draft_model else RenderTier.FINAL
+        configured_model = draft_model if self.tier == RenderTier.DRAFT else self.settings.gemini_image_model
+        self.image_model = normalize_gemini_image_model(configured_model)
         self._sdk_client = None
-        self._runtime_model: str | None = None
-        self._runtime_part_style: str | None = None
-        if self.image_model != self.settings.gemini_image_model:
-            logger.info("gemini_model_normalized", configured=self.settings.gemini_image_model, normalized=self.image_model)
+        self._routes = get_routing_table()
+        if self.image_model != configured_model:
+            logger.info("gemini_model_normalized", configured=configured_model, normalized=self.image_model)
+        self._files = GeminiFileCache(self.api_key) if self.api_key and self.settings.gemini_files_enabled else None
         if genai is not None and self.api_key:
             try:
                 self._sdk_client = genai.Client(api_key=self.api_key)
@@ -121,42 +168,82 @@ class GeminiStyler:
             except Exception as exc:
                 logger.warning("gemini_sdk_init_failed", error=str(exc))
 
-    def _model_candidates(self) -> list[str]:
-        if self._runtime_model:
-            return [self._runtime_model]
+    def _remember_route(self, model: str, part_style: str, started: float) -> None:
+        self._routes.record(ROUTING_PROVIDER, f"{model}:{part_style}", True, (time.monotonic() - started) * 1000)
+
+    def _route_failed(self, model: str, part_style: str, started: float, exc: Exception) -> None:
+        self._routes.record(ROUTING_PROVIDER, f"{model}:{part_style}", False, (time.monotonic() - started) * 1000, exc)
+
+    def _attempt_failed(self, model: str, part_style: str, started: float, timeout: httpx.Timeout, exc: Exception) -> None:
+        # A timeout the post's deadline shortened says nothing about the route's health.
+        if isinstance(exc, httpx.TimeoutException) and timeout.read < PROVIDERS["gemini"].timeout:
+            return
+        self._route_failed(model, part_style, started, exc)
+
+    @staticmethod
+    def _sdk_exhausted(last_error: Exception | None) -> None:
+        """Hand over to the REST routes, unless the post's deadline leaves no room for that fallback."""
+        if not optional_work_allowed("gemini_rest_fallback"):
+            raise StylingError(str(last_error) if last_error else "Gemini SDK request failed")
+        logger.warning("gemini_sdk_fallback_to_rest", error=str(last_error) if last_error else "unknown")
+        return None
+
+    def _configured_models(self) -> list[str]:
         if self.image_model == "gemini-3-pro-image-preview":
             return [self.image_model, "gemini-2.5-flash-image"]
         return [self.image_model]
 
+    def _ordered_routes(self, routes: list[tuple[str, str]]) -> list[tuple[str, str]]:
+        """``routes`` with those failing across workers moved to the end (see ``provider_routing``)."""
+        by_name = {f"{model}:{part_style}": (model, part_style) for model, part_style in routes}
+        return [by_name[name] for name in self._routes.order(ROUTING_PROVIDER, list(by_name))]
+
+    def _render_routes(
+        self, parts_by_style: dict[str, list[dict[str, Any]]]
+    ) -> tuple[list[str], list[tuple[str, str]]]:
+        """SDK models and REST (model, part_style) routes for one render, in preference order.
+
+        Both come from one pass over the routing table: ordering the combined list and
+        splitting it keeps each half in the order it would get on its own.
+        """
+        sdk_routes = [(model, "sdk") for model in self._configured_models()] if self._sdk_client is not None else []
+        rest_routes = [
+            (model, part_style)
+            for model in self._configured_models()
+            for part_style in self._part_style_candidates()
+            if part_style in parts_by_style
+        ]
+        ordered = self._ordered_routes(sdk_routes + rest_routes)
+        return (
+            [model for model, part_style in ordered if part_style == "sdk"],
+            [route for route in ordered if route[1] != "sdk"],
+        )
+
     def _part_style_candidates(self) -> list[str]:
-        if self._runtime_part_style:
-            return [self._runtime_part_style]
-        return ["snake", "camel"]
+        return list(_PART_STYLES)
+
+    @staticmethod
+    def _image_part(image: _ImageInput, part_style: str) -> dict[str, Any]:
+        if image.file is not None:
+            if part_style == "camel":
+                return {"fileData": {"mimeType": image.file.mime_type, "fileUri": image.file.uri}}
+            return {"file_data": {"mime_type": image.file.mime_type, "file_uri": image.file.uri}}
+        if part_style == "camel":
+            return {"inlineData": {"mimeType": image.mime, "data": image.b64}}
+        return {"inline_data": {"mime_type": image.mime, "data": image.b64}}
 
     def _build_image_parts(
-        self,
-        prompt: str,
-        ref_mime: str,
-        ref_b64: str,
-        product_mime: str,
-        product_b64: str,
-        part_style: str,
+        self, prompt: str, reference: _ImageInput, product: _ImageInput, part_style: str
     ) -> list[dict[str, Any]]:
-        if part_style == "camel":
-            ref_image_part = {"inlineData": {"mimeType": ref_mime, "data": ref_b64}}
-            product_image_part = {"inlineData": {"mimeType": product_mime, "data": product_b64}}
-        else:
-            ref_image_part = {"inline_data": {"mime_type": ref_mime, "data": ref_b64}}
-            product_image_part = {"inline_data": {"mime_type": product_mime, "data": product_b64}}
         return [
             {"text": prompt},
             {"text": "Reference image (style inspiration):"},
-            ref_image_part,
+            self._image_part(reference, part_style),
             {"text": "Product image (keep product accurate):"},
-            product_image_part,
+            self._image_part(product, part_style),
         ]
 
-    def _build_generation_config(self, model: str, style_brief: StyleBrief) -> dict[str, Any]:
+    def _build_generation_config(self, model: str, style_brief: StyleBrief, seed: int) -> dict[str, Any]:
         image_config: dict[str, Any] = {
             "aspectRatio": style_brief.composition.aspect_ratio,
         }
@@ -165,6 +252,7 @@ class GeminiStyler:
         return {
             "responseModalities": ["TEXT", "IMAGE"],
             "imageConfig": image_config,
+            "seed": seed,
         }
 
     def _extract_image_bytes_from_sdk_response(self, response: Any) -> bytes:
@@ -195,148 +283,257 @@ class GeminiStyler:
                         return base64.b64decode(data)
         raise StylingError("Gemini SDK did not return image bytes")
 
+    @staticmethod
+    def _sdk_part(image: _ImageInput) -> Any:
+        if image.file is not None:
+            return genai_types.Part.from_uri(file_uri=image.file.uri, mime_type=image.file.mime_type)
+        return genai_types.Part.from_bytes(data=image.data, mime_type=image.mime)
+
+    def _sdk_request(
+        self,
+        model: str,
+        prompt: str,
+        reference: _ImageInput,
+        product: _ImageInput,
+        style_brief: StyleBrief,
+        seed: int,
+        timeout: httpx.Timeout,
+    ) -> dict[str, Any]:
+        image_cfg_kwargs: dict[str, Any] = {"aspect_ratio": style_brief.composition.aspect_ratio}
+        if model == "gemini-3-pro-image-preview":
+            image_cfg_kwargs["image_size"] = "1K"
+        config = genai_types.GenerateContentConfig(
+            response_modalities=["TEXT", "IMAGE"],
+            image_config=genai_types.ImageConfig(**image_cfg_kwargs),
+            seed=seed,
+            http_options=genai_types.HttpOptions(timeout=int(timeout.read * 1000)),
+        )
+        contents = [
+            genai_types.Content(
+                role="user",
+                parts=[
+                    genai_types.Part.from_text(text=prompt),
+                    self._sdk_part(reference),
+                    self._sdk_part(product),
+                ],
+            )
+        ]
+        return {"model": model, "contents": contents, "config": config}
+
+    def _sdk_attempt_failed(
+        self, exc: Exception, model_candidates: list[str], idx: int, variant: int, position: int
+    ) -> bool:
+        """Log a failed SDK attempt; True when another model is left to try."""
+        model = model_candidates[idx]
+        logger.error(
+            "gemini_sdk_generation_failed",
+            error=str(exc),
+            model=model,
+            variant=variant,
+            position=position,
+        )
+        if idx == len(model_candidates) - 1:
+            return False
+        logger.warning("gemini_model_fallback", from_model=model, to_model=model_candidates[idx + 1])
+        return True
+
     def _request_generation_sdk(
         self,
         prompt: str,
-        ref_bytes: bytes,
-        ref_mime: str,
-        product_bytes: bytes,
-        product_mime: str,
+        reference: _ImageInput,
+        product: _ImageInput,
         style_brief: StyleBrief,
+        seed: int,
         variant: int,
         position: int,
-    ) -> bytes | None:
+        models: list[str],
+    ) -> tuple[bytes, str] | None:
+        """Image bytes and the model that rendered them; None hands over to the REST routes."""
         if self._sdk_client is None or genai_types is None:
             return None
 
-        model_candidates = self._model_candidates()
+        model_candidates = limit_attempts(models, "gemini_sdk_model_fallback")
         last_error: Exception | None = None
         for idx, model in enumerate(model_candidates):
-            is_last = idx == (len(model_candidates) - 1)
-            image_cfg_kwargs: dict[str, Any] = {"aspect_ratio": style_brief.composition.aspect_ratio}
-            if model == "gemini-3-pro-image-preview":
-                image_cfg_kwargs["image_size"] = "1K"
+            timeout = provider_timeout("gemini")
+            started = time.monotonic()
             try:
-                config = genai_types.GenerateContentConfig(
-                    response_modalities=["TEXT", "IMAGE"],
-                    image_config=genai_types.ImageConfig(**image_cfg_kwargs),
-                )
-                contents = [
-                    genai_types.Content(
-                        role="user",
-                        parts=[
-                            genai_types.Part.from_text(text=prompt),
-                            genai_types.Part.from_bytes(data=ref_bytes, mime_type=ref_mime),
-                            genai_types.Part.from_bytes(data=product_bytes, mime_type=product_mime),
-                        ],
-                    )
-                ]
                 response = self._sdk_client.models.generate_content(
-                    model=model,
-                    contents=contents,
-                    config=config,
+                    **self._sdk_request(model, prompt, reference, product, style_brief, seed, timeout)
                 )
-                self._runtime_model = model
-                self._runtime_part_style = "sdk"
-                return self._extract_image_bytes_from_sdk_response(response)
+                self._remember_route(model, "sdk", started)
+                return self._extract_image_bytes_from_sdk_response(response), model
             except Exception as exc:
-                logger.error(
-                    "gemini_sdk_generation_failed",
-                    error=str(exc),
-                    model=model,
-                    variant=variant,
-                    position=position,
+                self._attempt_failed(model, "sdk", started, timeout, exc)
+                last_error = exc
+                if not self._sdk_attempt_failed(exc, model_candidates, idx, variant, position):
+                    break
+        return self._sdk_exhausted(last_error)
+
+    async def _request_generation_sdk_async(
+        self,
+        prompt: str,
+        reference: _ImageInput,
+        product: _ImageInput,
+        style_brief: StyleBrief,
+        seed: int,
+        variant: int,
+        position: int,
+        models: list[str],
+    ) -> tuple[bytes, str] | None:
+        """Image bytes and the model that rendered them; None hands over to the REST routes."""
+        if self._sdk_client is None or genai_types is None:
+            return None
+
+        model_candidates = limit_attempts(models, "gemini_sdk_model_fallback")
+        last_error: Exception | None = None
+        for idx, model in enumerate(model_candidates):
+            timeout = provider_timeout("gemini")
+            started = time.monotonic()
+            try:
+                response = await self._sdk_client.aio.models.generate_content(
+                    **self._sdk_request(model, prompt, reference, product, style_brief, seed, timeout)
                 )
+                await asyncio.to_thread(self._remember_route, model, "sdk", started)
+                return await asyncio.to_thread(self._extract_image_bytes_from_sdk_response, response), model
+            except Exception as exc:
+                await asyncio.to_thread(self._attempt_failed, model, "sdk", started, timeout, exc)
                 last_error = exc
-                if not is_last:
-                    logger.warning("gemini_model_fallback", from_model=model, to_model=model_candidates[idx + 1])
-                    continue
-                break
-        logger.warning("gemini_sdk_fallback_to_rest", error=str(last_error) if last_error else "unknown")
+                if not self._sdk_attempt_failed(exc, model_candidates, idx, variant, position):
+                    break
+        return self._sdk_exhausted(last_error)
+
+    def _rest_attempts(
+        self,
+        routes: list[tuple[str, str]],
+        parts_by_style: dict[str, list[dict[str, Any]]],
+        style_brief: StyleBrief,
+        seed: int,
+    ) -> list[tuple[str, str, str, dict[str, Any]]]:
+        """(model, part_style, endpoint, payload) for every REST fallback in ``routes``, in order."""
+        return [
+            (
+                model,
+                part_style,
+                f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent",
+                {
+                    "contents": [{"parts": parts_by_style[part_style]}],
+                    "generationConfig": self._build_generation_config(model, style_brief, seed),
+                },
+            )
+            for model, part_style in limit_attempts(routes, "gemini_rest_fallback")
+        ]
+
+    def _rest_attempt_failed(
+        self,
+        exc: Exception,
+        attempts: list[tuple[str, str, str, dict[str, Any]]],
+        idx: int,
+        variant: int,
+        position: int,
+    ) -> StylingError | None:
+        """Log a failed REST attempt; return the error to raise, or None to try the next attempt."""
+        model, part_style, _endpoint, _payload = attempts[idx]
+        is_last_attempt = idx == (len(attempts) - 1)
+        if isinstance(exc, httpx.HTTPStatusError):
+            body_preview = exc.response.text[:600] if exc.response is not None else ""
+            logger.error(
+                "gemini_styling_http_error",
+                error=str(exc),
+                model=model,
+                part_style=part_style,
+                status_code=exc.response.status_code if exc.response is not None else None,
+                body_preview=body_preview,
+                variant=variant,
+                position=position,
+            )
+            error_message = str(exc)
+            if body_preview:
+                error_message = f"{exc} | response={body_preview}"
+            should_fallback = (
+                exc.response is not None
+                and exc.response.status_code in {400, 404}
+                and not is_last_attempt
+            )
+            if not should_fallback:
+                return StylingError(error_message)
+        else:
+            logger.error(
+                "gemini_styling_failed",
+                error=str(exc),
+                model=model,
+                part_style=part_style,
+                variant=variant,
+                position=position,
+            )
+            if is_last_attempt:
+                return StylingError(str(exc))
+
+        next_model, next_part_style = attempts[idx + 1][:2]
+        logger.warning(
+            "gemini_request_fallback",
+            from_model=model,
+            from_part_style=part_style,
+            to_model=next_model,
+            to_part_style=next_part_style,
+        )
         return None
 
     def _request_generation(
         self,
         parts_by_style: dict[str, list[dict[str, Any]]],
         style_brief: StyleBrief,
+        seed: int,
         headers: dict[str, str],
         variant: int,
         position: int,
-    ) -> dict[str, Any]:
-        last_error: Exception | None = None
-        model_candidates = self._model_candidates()
-        part_style_candidates = [style for style in self._part_style_candidates() if style in parts_by_style]
-        attempts = [(model, part_style) for model in model_candidates for part_style in part_style_candidates]
-
-        for idx, (model, part_style) in enumerate(attempts):
-            is_last_attempt = idx == (len(attempts) - 1)
-            endpoint = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent"
-            payload = {
-                "contents": [{"parts": parts_by_style[part_style]}],
-                "generationConfig": self._build_generation_config(model, style_brief),
-            }
+        routes: list[tuple[str, str]],
+    ) -> tuple[dict[str, Any], str, str]:
+        """The response JSON with the model and part style that produced it."""
+        attempts = self._rest_attempts(routes, parts_by_style, style_brief, seed)
+        for idx, (model, part_style, endpoint, payload) in enumerate(attempts):
+            timeout = provider_timeout("gemini")
+            started = time.monotonic()
             try:
-                with httpx.Client(timeout=180.0) as client:
-                    resp = client.post(endpoint, headers=headers, json=payload)
-                    resp.raise_for_status()
-                    data = resp.json()
-                    self._runtime_model = model
-                    self._runtime_part_style = part_style
-                    return data
-            except httpx.HTTPStatusError as exc:
-                body_preview = exc.response.text[:600] if exc.response is not None else ""
-                logger.error(
-                    "gemini_styling_http_error",
-                    error=str(exc),
-                    model=model,
-                    part_style=part_style,
-                    status_code=exc.response.status_code if exc.response is not None else None,
-                    body_preview=body_preview,
-                    variant=variant,
-                    position=position,
-                )
-                error_message = str(exc)
-                if body_preview:
-                    error_message = f"{exc} | response={body_preview}"
-                last_error = StylingError(error_message)
-                should_fallback = (
-                    exc.response is not None
-                    and exc.response.status_code in {400, 404}
-                    and not is_last_attempt
-                )
-                if should_fallback:
-                    next_model, next_part_style = attempts[idx + 1]
-                    logger.warning(
-                        "gemini_request_fallback",
-                        from_model=model,
-                        from_part_style=part_style,
-                        to_model=next_model,
-                        to_part_style=next_part_style,
-                    )
-                    continue
-                raise StylingError(error_message) from exc
+                resp = get_client("gemini").post(endpoint, headers=headers, json=payload, timeout=timeout)
+                resp.raise_for_status()
+                data = resp.json()
+                self._remember_route(model, part_style, started)
+                return data, model, part_style
             except Exception as exc:
-                logger.error(
-                    "gemini_styling_failed",
-                    error=str(exc),
-                    model=model,
-                    part_style=part_style,
-                    variant=variant,
-                    position=position,
-                )
-                last_error = exc
-                if not is_last_attempt:
-                    next_model, next_part_style = attempts[idx + 1]
-                    logger.warning(
-                        "gemini_request_fallback",
-                        from_model=model,
-                        from_part_style=part_style,
-                        to_model=next_model,
-                        to_part_style=next_part_style,
-                    )
-                    continue
-                raise StylingError(str(exc)) from exc
-        raise StylingError(str(last_error) if last_error is not None else "Gemini request failed")
+                self._attempt_failed(model, part_style, started, timeout, exc)
+                error = self._rest_attempt_failed(exc, attempts, idx, variant, position)
+                if error is not None:
+                    raise error from exc
+        raise StylingError("Gemini request failed")
+
+    async def _request_generation_async(
+        self,
+        parts_by_style: dict[str, list[dict[str, Any]]],
+        style_brief: StyleBrief,
+        seed: int,
+        headers: dict[str, str],
+        variant: int,
+        position: int,
+        routes: list[tuple[str, str]],
+    ) -> tuple[dict[str, Any], str, str]:
+        """The response JSON with the model and part style that produced it."""
+        attempts = self._rest_attempts(routes, parts_by_style, style_brief, seed)
+        for idx, (model, part_style, endpoint, payload) in enumerate(attempts):
+            timeout = provider_timeout("gemini")
+            started = time.monotonic()
+            try:
+                resp = await get_async_client("gemini").post(endpoint, headers=headers, json=payload, timeout=timeout)
+                resp.raise_for_status()
+                data = await asyncio.to_thread(resp.json)
+                await asyncio.to_thread(self._remember_route, model, part_style, started)
+                return data, model, part_style
+            except Exception as exc:
+                await asyncio.to_thread(self._attempt_failed, model, part_style, started, timeout, exc)
+                error = self._rest_attempt_failed(exc, attempts, idx, variant, position)
+                if error is not None:
+                    raise error from exc
+        raise StylingError("Gemini request failed")
 
     def _build_prompt(self, style_brief: StyleBrief, overlay_text: str | None, modifier: str) -> str:
         base = load_styling_prompt(self.brand_id)
@@ -441,13 +638,7 @@ class GeminiStyler:
                 + (f"Overlay text: {overlay_text}\n" if overlay_text else "")
             )
 
-    def generate_variants(
-        self,
-        product_image_url: str,
-        reference_image_urls: list[str],
-        style_brief: StyleBrief,
-        overlay_text: str | None,
-    ) -> list[StyledVariant]:
+    def _variation_modifiers(self) -> dict[int, str]:
         config = load_brand_config(self.brand_id)
         modifiers = config.get("variation_modifiers", [])[:3]
         if not isinstance(modifiers, list) or not modifiers:
@@ -456,122 +647,386 @@ class GeminiStyler:
                 "Warm and intimate with tactile textures.",
                 "Editorial and bold with controlled contrast.",
             ]
+        return dict(enumerate(modifiers, start=1))
+
+    def variant_count(self) -> int:
+        return len(self._variation_modifiers())
+
+    def generate_variants(
+        self,
+        product_image_url: str,
+        reference_image_urls: list[str],
+        style_brief: StyleBrief,
+        overlay_text: str | None,
+        variant_indexes: list[int] | None = None,
+        positions: list[int] | None = None,
+        seed: int | None = None,
+        prompt: str | None = None,
+    ) -> list[StyledVariant]:
+        """Render every variant, or only ``variant_indexes`` (1-based) when given.
+
+        ``positions`` (1-based carousel slides) limits which slides are rendered; each
+        variant's ``item_urls`` then holds just those slides, in that order. ``seed`` and
+        ``prompt`` replay a variant's stored ``render_spec``; otherwise every variant gets
+        a fresh seed and its brand prompt.
+        """
+        modifiers = self._variation_modifiers()
+        if variant_indexes is not None:
+            modifiers = {idx: modifiers[idx] for idx in variant_indexes if idx in modifiers}
 
+        seeds = self._seeds(modifiers, seed)
         if self.settings.dry_run:
             variants: list[StyledVariant] = []
-            for idx, modifier in enumerate(modifiers, start=1):
+            for idx, modifier in modifiers.items():
                 mode = "minimal" if idx == 1 else "warm" if idx == 2 else "editorial"
                 item_urls: list[str] = []
-                first_image_url = ""
-                for position, _ref_url in enumerate(reference_image_urls, start=1):
+                item_bytes: list[bytes] = []
+                for position in self._positions(reference_image_urls, positions):
                     content = _create_placeholder_variant(product_image_url, mode)
-                    key = f"styled/post-{uuid.uuid4().hex}/variant-{idx}/item-{position}.jpg"
-                    uploaded = self.storage.upload_bytes(key, content)
-                    item_urls.append(uploaded)
-                    if position == 1:
-                        first_image_url = uploaded
+                    item_urls.append(self.storage.upload_content_addressed(STYLED_PREFIX, content))
+                    item_bytes.append(content)
                 variants.append(
                     StyledVariant(
                         variant_index=idx,
-                        preview_url=first_image_url,
+                        preview_url=item_urls[0],
                         item_urls=item_urls,
                         ssim_score=0.82,
                         is_valid=True,
+                        render_tier=self.tier.value,
+                        render_spec=self._render_spec(prompt, seeds[idx]),
+                        item_bytes=item_bytes,
                     )
                 )
             return variants
 
-        if not self.api_key:
-            raise StylingError("Missing GOOGLE_API_KEY or GEMINI_API_KEY")
+        headers = self._rest_headers()
 
-        generated: list[StyledVariant] = []
-        headers = {
-            "x-goog-api-key": self.api_key,
-            "Content-Type": "application/json",
+        # Product and references are downloaded (and uploaded to the Files API) once, not per render.
+        try:
+            product = self._image_input(*_download_image_as_base64(product_image_url))
+        except DeadlineExceededError:
+            raise
+        except Exception as exc:
+            raise StylingError(f"Failed to download product image: {exc}") from exc
+        render_positions = self._positions(reference_image_urls, positions)
+        references = self._reference_inputs(reference_image_urls, render_positions)
+
+        prompts = {
+            idx: prompt or self._build_prompt(style_brief, overlay_text, modifier) for idx, modifier in modifiers.items()
         }
+        jobs = self._render_jobs(prompts, render_positions)
+
+        def _render(job: RenderJob) -> _RenderedItem:
+            return self._render_item(
+                prompt=prompts[job.variant_index],
+                reference=references[job.position],
+                product=product,
+                style_brief=style_brief,
+                seed=seeds[job.variant_index],
+                headers=headers,
+                variant=job.variant_index,
+                position=job.position,
+                total_positions=len(reference_image_urls),
+            )
+
+        rendered = render_jobs(jobs, _render, brand_id=self.brand_id)
+        return self._assemble_variants(prompts, seeds, jobs, rendered, product.data)
+
+    async def generate_variants_async(
+        self,
+        product_image_url: str,
+        reference_image_urls: list[str],
+        style_brief: StyleBrief,
+        overlay_text: str | None,
+        variant_indexes: list[int] | None = None,
+        positions: list[int] | None = None,
+        seed: int | None = None,
+        prompt: str | None = None,
+    ) -> list[StyledVariant]:
+        """Async ``generate_variants``: provider calls share the event loop, CPU work runs on threads."""
+        if self.settings.dry_run:
+            return await asyncio.to_thread(
+                self.generate_variants,
+                product_image_url,
+                reference_image_urls,
+                style_brief,
+                overlay_text,
+                variant_indexes,
+                positions,
+                seed,
+                prompt,
+            )
+
+        modifiers = await asyncio.to_thread(self._variation_modifiers)
+        if variant_indexes is not None:
+            modifiers = {idx: modifiers[idx] for idx in variant_indexes if idx in modifiers}
+        seeds = self._seeds(modifiers, seed)
+        headers = self._rest_headers()
 
-        # Download product image once (same for all positions)
         try:
-            product_b64, product_mime = _download_image_as_base64(product_image_url)
+            product = await self._image_input_async(*await _download_image_as_base64_async(product_image_url))
+        except DeadlineExceededError:
+            raise
         except Exception as exc:
             raise StylingError(f"Failed to download product image: {exc}") from exc
+        render_positions = self._positions(reference_image_urls, positions)
+        references = await self._reference_inputs_async(reference_image_urls, render_positions)
 
-        for idx, modifier in enumerate(modifiers, start=1):
-            prompt = self._build_prompt(style_brief, overlay_text, modifier)
-            item_urls: list[str] = []
-            for position, ref_url in enumerate(reference_image_urls, start=1):
-                # Download reference image for this carousel position
-                try:
-                    ref_b64, ref_mime = _download_image_as_base64(ref_url)
-                except Exception as exc:
-                    raise StylingError(f"Failed to download reference image {position}: {exc}") from exc
-
-                part_style_candidates = self._part_style_candidates()
-                parts_by_style = {
-                    part_style: self._build_image_parts(
-                        prompt=prompt,
-                        ref_mime=ref_mime,
-                        ref_b64=ref_b64,
-                        product_mime=product_mime,
-                        product_b64=product_b64,
-                        part_style=part_style,
-                    )
-                    for part_style in part_style_candidates
-                }
-                logger.info(
-                    "gemini_request_prepared",
-                    variant=idx,
-                    position=position,
-                    total_positions=len(reference_image_urls),
-                    candidate_models=self._model_candidates(),
-                    candidate_part_styles=part_style_candidates,
-                    ref_mime=ref_mime,
-                    product_mime=product_mime,
-                    using_sdk=self._sdk_client is not None,
-                )
+        prompts = {
+            idx: prompt or await asyncio.to_thread(self._build_prompt, style_brief, overlay_text, modifier)
+            for idx, modifier in modifiers.items()
+        }
+        jobs = self._render_jobs(prompts, render_positions)
 
-                sdk_image_bytes = self._request_generation_sdk(
-                    prompt=prompt,
-                    ref_bytes=base64.b64decode(ref_b64),
-                    ref_mime=ref_mime,
-                    product_bytes=base64.b64decode(product_b64),
-                    product_mime=product_mime,
-                    style_brief=style_brief,
-                    variant=idx,
-                    position=position,
-                )
-                if sdk_image_bytes is not None:
-                    image_bytes = sdk_image_bytes
-                else:
-                    data = self._request_generation(
-                        parts_by_style=parts_by_style,
-                        style_brief=style_brief,
-                        headers=headers,
-                        variant=idx,
-                        position=position,
-                    )
-                    image_bytes = self._extract_image_bytes(data)
-                key = f"styled/post-{uuid.uuid4().hex}/variant-{idx}/item-{position}.jpg"
-                item_url = self.storage.upload_bytes(key, image_bytes)
-                item_urls.append(item_url)
-                logger.info(
-                    "gemini_variant_generated",
-                    variant=idx,
-                    position=position,
-                    model=self._runtime_model,
-                    part_style=self._runtime_part_style,
-                )
+        async def _render(job: RenderJob) -> _RenderedItem:
+            return await self._render_item_async(
+                prompt=prompts[job.variant_index],
+                reference=references[job.position],
+                product=product,
+                style_brief=style_brief,
+                seed=seeds[job.variant_index],
+                headers=headers,
+                variant=job.variant_index,
+                position=job.position,
+                total_positions=len(reference_image_urls),
+            )
 
-            generated.append(
-                StyledVariant(
-                    variant_index=idx,
-                    preview_url=item_urls[0],
-                    item_urls=item_urls,
-                    ssim_score=0.75,
-                    is_valid=True,
-                )
+        rendered = await render_jobs_async(jobs, _render, brand_id=self.brand_id)
+        return self._assemble_variants(prompts, seeds, jobs, rendered, product.data)
+
+    def _image_input(self, b64: str, mime: str) -> _ImageInput:
+        image = _ImageInput(b64=b64, mime=mime)
+        if self._files is not None and optional_work_allowed("gemini_file_upload"):
+            image.file = self._files.get_or_upload(image.data, mime)
+        return image
+
+    async def _image_input_async(self, b64: str, mime: str) -> _ImageInput:
+        image = _ImageInput(b64=b64, mime=mime)
+        if self._files is not None and optional_work_allowed("gemini_file_upload"):
+            image.file = await self._files.get_or_upload_async(image.data, mime)
+        return image
+
+    def _reference_inputs(self, reference_image_urls: list[str], positions: list[int]) -> dict[int, _ImageInput]:
+        references: dict[int, _ImageInput] = {}
+        for position in positions:
+            try:
+                b64, mime = _download_image_as_base64(reference_image_urls[position - 1])
+            except DeadlineExceededError:
+                raise
+            except Exception as exc:
+                raise StylingError(f"Failed to download reference image {position}: {exc}") from exc
+            references[position] = self._image_input(b64, mime)
+        return references
+
+    async def _reference_inputs_async(
+        self, reference_image_urls: list[str], positions: list[int]
+    ) -> dict[int, _ImageInput]:
+        async def _reference(position: int) -> tuple[int, _ImageInput]:
+            try:
+                b64, mime = await _download_image_as_base64_async(reference_image_urls[position - 1])
+            except DeadlineExceededError:
+                raise
+            except Exception as exc:
+                raise StylingError(f"Failed to download reference image {position}: {exc}") from exc
+            return position, await self._image_input_async(b64, mime)
+
+        return dict(await asyncio.gather(*(_reference(position) for position in positions)))
+
+    def _rest_headers(self) -> dict[str, str]:
+        if not self.api_key:
+            raise StylingError("Missing GOOGLE_API_KEY or GEMINI_API_KEY")
+        return {
+            "x-goog-api-key": self.api_key,
+            "Content-Type": "application/json",
+        }
+
+    @staticmethod
+    def _seeds(modifiers: dict[int, str], seed: int | None) -> dict[int, int]:
+        return {idx: secrets.randbelow(2**31) if seed is None else seed for idx in modifiers}
+
+    def _render_spec(self, prompt: str | None, seed: int, model: str | None = None) -> dict[str, Any]:
+        return {"model": model or self.image_model, "seed": seed, "prompt": prompt}
+
+    @staticmethod
+    def _positions(reference_image_urls: list[str], positions: list[int] | None) -> list[int]:
+        available = range(1, len(reference_image_urls) + 1)
+        if positions is None:
+            return list(available)
+        return [position for position in positions if position in available]
+
+    @staticmethod
+    def _render_jobs(prompts: dict[int, str], positions: list[int]) -> list[RenderJob]:
+        return [RenderJob(variant_index=idx, position=position) for idx in prompts for position in positions]
+
+    def _assemble_variants(
+        self,
+        prompts: dict[int, str],
+        seeds: dict[int, int],
+        jobs: list[RenderJob],
+        rendered: list[_RenderedItem],
+        product_bytes: bytes,
+    ) -> list[StyledVariant]:
+        items_by_variant: dict[int, list[_RenderedItem]] = {idx: [] for idx in prompts}
+        for job, item in zip(jobs, rendered):
+            items_by_variant[job.variant_index].append(item)
+
+        return [
+            StyledVariant(
+                variant_index=idx,
+                preview_url=items[0].url,
+                item_urls=[item.url for item in items],
+                ssim_score=0.75,
+                is_valid=True,
+                render_tier=self._variant_tier(idx, items).value,
+                render_spec=self._render_spec(prompts[idx], seeds[idx], self._variant_model(items)),
+                item_bytes=[item.data for item in items],
+                source_bytes=product_bytes,
+            )
+            for idx, items in items_by_variant.items()
+        ]
+
+    def _variant_tier(self, variant: int, items: list[_RenderedItem]) -> RenderTier:
+        """The tier the slides actually reached.
+
+        A final render that fell back to another model (by default the draft model)
+        is stored as a draft, so approving or publishing renders it again instead of
+        shipping draft quality marked final.
+        """
+        if self.tier == RenderTier.DRAFT:
+            return RenderTier.DRAFT
+        fallbacks = sorted({item.model for item in items if item.model != self.image_model})
+        if not fallbacks:
+            return RenderTier.FINAL
+        logger.warning("gemini_final_render_fell_back", variant=variant, model=self.image_model, fallback_models=fallbacks)
+        return RenderTier.DRAFT
+
+    def _variant_model(self, items: list[_RenderedItem]) -> str:
+        """The model behind a variant's slides; a fallback model wins if any slide needed one."""
+        return next((item.model for item in items if item.model != self.image_model), self.image_model)
+
+    def _prepare_parts(
+        self,
+        prompt: str,
+        reference: _ImageInput,
+        product: _ImageInput,
+        variant: int,
+        position: int,
+        total_positions: int,
+    ) -> dict[str, list[dict[str, Any]]]:
+        part_style_candidates = self._part_style_candidates()
+        parts_by_style = {
+            part_style: self._build_image_parts(prompt, reference, product, part_style)
+            for part_style in part_style_candidates
+        }
+        logger.info(
+            "gemini_request_prepared",
+            variant=variant,
+            position=position,
+            total_positions=total_positions,
+            configured_models=self._configured_models(),
+            candidate_part_styles=part_style_candidates,
+            ref_mime=reference.mime,
+            product_mime=product.mime,
+            file_inputs=reference.file is not None and product.file is not None,
+            using_sdk=self._sdk_client is not None,
+        )
+        return parts_by_style
+
+    @staticmethod
+    def _log_item_generated(variant: int, position: int, model: str, part_style: str) -> None:
+        logger.info(
+            "gemini_variant_generated",
+            variant=variant,
+            position=position,
+            model=model,
+            part_style=part_style,
+        )
+
+    def _render_item(
+        self,
+        prompt: str,
+        reference: _ImageInput,
+        product: _ImageInput,
+        style_brief: StyleBrief,
+        seed: int,
+        headers: dict[str, str],
+        variant: int,
+        position: int,
+        total_positions: int,
+    ) -> _RenderedItem:
+        parts_by_style = self._prepare_parts(prompt, reference, product, variant, position, total_positions)
+        sdk_models, rest_routes = self._render_routes(parts_by_style)
+        sdk_result = self._request_generation_sdk(
+            prompt=prompt,
+            reference=reference,
+            product=product,
+            style_brief=style_brief,
+            seed=seed,
+            variant=variant,
+            position=position,
+            models=sdk_models,
+        )
+        if sdk_result is not None:
+            image_bytes, model = sdk_result
+            part_style = "sdk"
+        else:
+            data, model, part_style = self._request_generation(
+                parts_by_style=parts_by_style,
+                style_brief=style_brief,
+                seed=seed,
+                headers=headers,
+                variant=variant,
+                position=position,
+                routes=rest_routes,
+            )
+            image_bytes = self._extract_image_bytes(data)
+        item_url = self.storage.upload_content_addressed(STYLED_PREFIX, image_bytes)
+        self._log_item_generated(variant, position, model, part_style)
+        return _RenderedItem(item_url, image_bytes, model, part_style)
+
+    async def _render_item_async(
+        self,
+        prompt: str,
+        reference: _ImageInput,
+        product: _ImageInput,
+        style_brief: StyleBrief,
+        seed: int,
+        headers: dict[str, str],
+        variant: int,
+        position: int,
+        total_positions: int,
+    ) -> _RenderedItem:
+        parts_by_style = self._prepare_parts(prompt, reference, product, variant, position, total_positions)
+        # Route health lives in Redis or on disk, so it is read off the shared loop.
+        sdk_models, rest_routes = await asyncio.to_thread(self._render_routes, parts_by_style)
+        sdk_result = await self._request_generation_sdk_async(
+            prompt=prompt,
+            reference=reference,
+            product=product,
+            style_brief=style_brief,
+            seed=seed,
+            variant=variant,
+            position=position,
+            models=sdk_models,
+        )
+        if sdk_result is not None:
+            image_bytes, model = sdk_result
+            part_style = "sdk"
+        else:
+            data, model, part_style = await self._request_generation_async(
+                parts_by_style=parts_by_style,
+                style_brief=style_brief,
+                seed=seed,
+                headers=headers,
+                variant=variant,
+                position=position,
+                routes=rest_routes,
             )
-        return generated
+            # Decoding a multi-MB inline image would stall every other post on the loop.
+            image_bytes = await asyncio.to_thread(self._extract_image_bytes, data)
+        item_url = await self.storage.upload_content_addressed_async(STYLED_PREFIX, image_bytes)
+        self._log_item_generated(variant, position, model, part_style)
+        return _RenderedItem(item_url, image_bytes, model, part_style)
 
     def _extract_image_bytes(self, response_json: dict) -> bytes:
         candidates = response_json.get("candidates", [])
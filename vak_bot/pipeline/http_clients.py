@@ -0,0 +1,173 @@
+"""Process-wide pooled HTTP clients, one per provider.
+
+Each worker process keeps one keep-alive ``httpx.Client`` per provider (and one
+``httpx.AsyncClient`` per provider per event loop), so repeated calls to the same
+host skip DNS, TCP and TLS setup. HTTP/2 is negotiated through ``h2`` (pulled in by
+``httpx[http2]``) unless ``HTTP2_ENABLED`` is off; without ``h2`` the clients stay on
+HTTP/1.1. Clients are dropped after ``fork`` so prefork children never
+share sockets with their parent.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import os
+import threading
+import weakref
+from dataclasses import dataclass
+
+import httpx
+import structlog
+
+from vak_bot.config import get_settings
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class ProviderProfile:
+    timeout: float
+    connect_timeout: float = 10.0
+    follow_redirects: bool = False
+
+
+PROVIDERS: dict[str, ProviderProfile] = {
+    "openai": ProviderProfile(timeout=90.0),
+    "anthropic": ProviderProfile(timeout=90.0),
+    "gemini": ProviderProfile(timeout=180.0),
+    "brightdata": ProviderProfile(timeout=120.0),
+    "meta": ProviderProfile(timeout=60.0),
+    # Reference and styled-image downloads from CDNs and our own bucket.
+    "media": ProviderProfile(timeout=40.0, follow_redirects=True),
+}
+
+
+class _Counters:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests: dict[str, int] = {}
+        self.connections: dict[str, int] = {}
+
+    def add(self, table: dict[str, int], provider: str) -> None:
+        with self._lock:
+            table[provider] = table.get(provider, 0) + 1
+
+    def snapshot(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            stats = {}
+            for provider in sorted(set(self.requests) | set(self.connections)):
+                requests = self.requests.get(provider, 0)
+                connections = self.connections.get(provider, 0)
+                stats[provider] = {
+                    "requests": requests,
+                    "connections_opened": connections,
+                    "connections_reused": max(0, requests - connections),
+                }
+            return stats
+
+
+_lock = threading.Lock()
+_clients: dict[str, httpx.Client] = {}
+_async_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, httpx.AsyncClient]] = (
+    weakref.WeakKeyDictionary()
+)
+_counters = _Counters()
+
+
+def _reset_after_fork() -> None:
+    # Sockets are shared with the parent after fork; drop the pools without closing them.
+    global _lock, _clients, _async_clients, _counters
+    _lock = threading.Lock()
+    _clients = {}
+    _async_clients = weakref.WeakKeyDictionary()
+    _counters = _Counters()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def http2_available() -> bool:
+    return get_settings().http2_enabled and importlib.util.find_spec("h2") is not None
+
+
+def _client_options(provider: str) -> dict:
+    profile = PROVIDERS[provider]
+    settings = get_settings()
+    return {
+        "timeout": httpx.Timeout(profile.timeout, connect=profile.connect_timeout),
+        "limits": httpx.Limits(
+            max_connections=settings.http_max_connections_per_provider,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry_seconds,
+        ),
+        "http2": http2_available(),
+        "follow_redirects": profile.follow_redirects,
+    }
+
+
+def _sync_hooks(provider: str) -> dict:
+    def _trace(event_name: str, _info: dict) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            _counters.add(_counters.connections, provider)
+
+    def _on_request(request: httpx.Request) -> None:
+        _counters.add(_counters.requests, provider)
+        request.extensions["trace"] = _trace
+
+    return {"request": [_on_request]}
+
+
+def _async_hooks(provider: str) -> dict:
+    async def _trace(event_name: str, _info: dict) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            _counters.add(_counters.connections, provider)
+
+    async def _on_request(request: httpx.Request) -> None:
+        _counters.add(_counters.requests, provider)
+        request.extensions["trace"] = _trace
+
+    return {"request": [_on_request]}
+
+
+def get_client(provider: str) -> httpx.Client:
+    """Return this process's shared client for ``provider``; never close it."""
+    with _lock:
+        client = _clients.get(provider)
+        if client is None or client.is_closed:
+            client = httpx.Client(event_hooks=_sync_hooks(provider), **_client_options(provider))
+            _clients[provider] = client
+            logger.info("http_client_created", provider=provider, http2=http2_available())
+        return client
+
+
+def get_async_client(provider: str) -> httpx.AsyncClient:
+    """Return the shared async client for ``provider`` on the running event loop; never close it."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(provider)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(event_hooks=_async_hooks(provider), **_client_options(provider))
+            clients[provider] = client
+        return client
+
+
+def pool_stats() -> dict[str, dict[str, int]]:
+    """Requests and TCP connections per provider since this process started."""
+    return _counters.snapshot()
+
+
+def log_pool_stats() -> None:
+    stats = pool_stats()
+    if stats:
+        logger.info("http_pool_stats", pid=os.getpid(), http2=http2_available(), providers=stats)
+
+
+def close_all() -> None:
+    """Close the sync clients; async clients are released with their loop."""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
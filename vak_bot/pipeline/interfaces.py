@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Protocol
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, Protocol
 
+from vak_bot.enums import RenderTier
 from vak_bot.schemas import CaptionPackage, StyleBrief, StyledVariant
 
 
@@ -17,13 +19,28 @@ class DownloadedReference:
     thumbnail_url: str | None = None
 
 
+@dataclass(frozen=True)
+class VeoSubmission:
+    variation_number: int
+    # None when the variation was held back by the per-brand operation cap.
+    operation_name: str | None
+    prompt: str
+    render_tier: str = "final"
+    # Model, resolution and seed, so a draft can be re-rendered at final quality.
+    render_spec: dict | None = None
+
+
 class DataBrightClient(Protocol):
     def download_post(self, source_url: str) -> DownloadedReference: ...
 
+    async def download_post_async(self, source_url: str) -> DownloadedReference: ...
+
 
 class OpenAIAnalyzerClient(Protocol):
     def analyze_reference(self, reference_image_url: str, reference_caption: str | None) -> StyleBrief: ...
 
+    async def analyze_reference_async(self, reference_image_url: str, reference_caption: str | None) -> StyleBrief: ...
+
 
 class GeminiStylerClient(Protocol):
     def generate_variants(
@@ -32,6 +49,22 @@ class GeminiStylerClient(Protocol):
         reference_image_urls: list[str],
         style_brief: StyleBrief,
         overlay_text: str | None,
+        variant_indexes: list[int] | None = None,
+        positions: list[int] | None = None,
+        seed: int | None = None,
+        prompt: str | None = None,
+    ) -> list[StyledVariant]: ...
+
+    async def generate_variants_async(
+        self,
+        product_image_url: str,
+        reference_image_urls: list[str],
+        style_brief: StyleBrief,
+        overlay_text: str | None,
+        variant_indexes: list[int] | None = None,
+        positions: list[int] | None = None,
+        seed: int | None = None,
+        prompt: str | None = None,
     ) -> list[StyledVariant]: ...
 
 
@@ -41,6 +74,17 @@ class ClaudeCaptionClient(Protocol):
         styled_image_url: str,
         style_brief: StyleBrief,
         product_info: dict,
+        is_reel: bool = False,
+        styled_image_bytes: bytes | None = None,
+    ) -> CaptionPackage: ...
+
+    async def generate_caption_async(
+        self,
+        styled_image_url: str,
+        style_brief: StyleBrief,
+        product_info: dict,
+        is_reel: bool = False,
+        styled_image_bytes: bytes | None = None,
     ) -> CaptionPackage: ...
 
 
@@ -55,18 +99,44 @@ class MetaGraphPosterClient(Protocol):
 
 
 class VeoGeneratorClient(Protocol):
-    def generate_reel_variations(
+    def submit_reel_variations(
+        self,
+        styled_frame_path: str,
+        style_brief: StyleBrief,
+        video_type: str | None,
+        max_operations: int | None,
+        variation_numbers: list[int] | None = None,
+        tier: RenderTier = RenderTier.FINAL,
+    ) -> list[VeoSubmission]: ...
+
+    async def submit_reel_variations_async(
         self,
         styled_frame_path: str,
         style_brief: StyleBrief,
         video_type: str | None,
-        reference_image_path: str | None,
-    ) -> list[str]: ...
+        max_operations: int | None,
+        variation_numbers: list[int] | None = None,
+        tier: RenderTier = RenderTier.FINAL,
+    ) -> list[VeoSubmission]: ...
 
-    def extend_reel(self, original_video_path: str, continuation_prompt: str) -> str: ...
+    def submit_extension(self, original_video_path: str, continuation_prompt: str) -> str: ...
+
+    def check_operation(self, operation_name: str, output_prefix: str) -> str | None: ...
 
 
 class StorageClient(Protocol):
     def upload_bytes(self, key: str, data: bytes, content_type: str = "image/jpeg") -> str: ...
 
+    async def upload_bytes_async(self, key: str, data: bytes, content_type: str = "image/jpeg") -> str: ...
+
+    def upload_file(self, key: str, path: str | Path, content_type: str = "application/octet-stream") -> str: ...
+
+    def upload_stream(self, key: str, stream: BinaryIO, content_type: str = "application/octet-stream") -> str: ...
+
+    def download_to_path(self, url: str, path: str | Path) -> Path: ...
+
+    def iter_objects(self, prefix: str = "") -> Iterator[dict]: ...
+
+    def delete_keys(self, keys: Iterable[str]) -> list[str]: ...
+
     def delete_by_url(self, url: str) -> None: ...
@@ -0,0 +1,369 @@
+"""Worker-local cache for media fetched by URL: a bounded in-memory LRU over a size-capped disk directory.
+
+Objects stored content-addressed in our bucket carry their sha256 in the URL and
+never change, so they are keyed by that digest and served without revalidation.
+Any other URL is keyed by the URL itself and, once its entry is older than
+``MEDIA_CACHE_REVALIDATE_SECONDS``, revalidated with a conditional GET on its ETag.
+The disk tier lives under ``CACHE_DIR`` and is shared by every process on the host.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import structlog
+
+from vak_bot.config import get_settings
+from vak_bot.pipeline.deadline import provider_timeout
+from vak_bot.pipeline.http_clients import get_async_client, get_client
+from vak_bot.storage import R2StorageClient
+
+logger = structlog.get_logger(__name__)
+
+_MB = 1024 * 1024
+# Matches R2StorageClient.content_key: <prefix>/<digest[:2]>/<sha256><extension>.
+_CONTENT_ADDRESSED = re.compile(r"/([0-9a-f]{2})/(\1[0-9a-f]{62})\.[A-Za-z0-9]+$")
+# A single entry may use at most this share of the memory tier; larger files stay on disk only.
+_MEMORY_ENTRY_SHARE = 4
+# Trimming the disk tier leaves this much headroom so it is not rescanned on every write.
+_DISK_TRIM_RATIO = 0.9
+
+
+@dataclass(frozen=True)
+class CachedMedia:
+    data: bytes
+    content_type: str
+
+
+@dataclass
+class _Meta:
+    content_type: str
+    etag: str | None
+    fetched_at: float
+
+
+class MediaCache:
+    def __init__(self, directory: str | Path, memory_bytes: int, disk_bytes: int, revalidate_seconds: int) -> None:
+        self._dir = Path(directory)
+        self._memory_cap = memory_bytes
+        self._disk_cap = disk_bytes
+        self._revalidate_seconds = revalidate_seconds
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, tuple[bytes, _Meta]] = OrderedDict()
+        self._memory_size = 0
+        self._disk_size: int | None = None
+        self._counters = dict.fromkeys(("memory_hits", "disk_hits", "revalidated", "misses", "evictions"), 0)
+        self._key_locks: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, weakref.WeakValueDictionary[str, asyncio.Lock]
+        ] = weakref.WeakKeyDictionary()
+
+    # ── keys and tiers ──────────────────────────────────────────────────
+
+    @staticmethod
+    def key_for(url: str) -> tuple[str, bool]:
+        """Cache key for ``url`` and whether its content can never change."""
+        match = _CONTENT_ADDRESSED.search(url.split("?", 1)[0])
+        if match:
+            return f"sha256-{match.group(2)}", True
+        return f"url-{hashlib.sha256(url.encode('utf-8')).hexdigest()}", False
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        data_path = self._dir / key[-2:] / key
+        return data_path, data_path.with_name(f"{key}.json")
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+    def _fresh(self, meta: _Meta, immutable: bool) -> bool:
+        return immutable or time.time() - meta.fetched_at < self._revalidate_seconds
+
+    def _remember(self, key: str, data: bytes, meta: _Meta) -> None:
+        if not self._memory_cap or len(data) > self._memory_cap // _MEMORY_ENTRY_SHARE:
+            return
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_size -= len(previous[0])
+            self._memory[key] = (data, meta)
+            self._memory_size += len(data)
+            while self._memory_size > self._memory_cap:
+                _key, (evicted, _meta) = self._memory.popitem(last=False)
+                self._memory_size -= len(evicted)
+                self._counters["evictions"] += 1
+
+    def _from_memory(self, key: str) -> tuple[bytes, _Meta] | None:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+            return entry
+
+    def _read_meta(self, key: str) -> _Meta | None:
+        data_path, meta_path = self._paths(key)
+        try:
+            meta = _Meta(**json.loads(meta_path.read_text()))
+        except (OSError, ValueError, TypeError):
+            return None
+        if not data_path.exists():
+            return None
+        return meta
+
+    def _from_disk(self, key: str) -> tuple[bytes, _Meta] | None:
+        meta = self._read_meta(key)
+        if meta is None:
+            return None
+        data_path, _meta_path = self._paths(key)
+        try:
+            data = data_path.read_bytes()
+            # mtime doubles as the disk tier's recency for eviction.
+            os.utime(data_path)
+        except OSError:
+            return None
+        return data, meta
+
+    def _write_meta(self, key: str, meta: _Meta) -> None:
+        _data_path, meta_path = self._paths(key)
+        tmp_path = meta_path.with_name(f"{meta_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps(asdict(meta)))
+        os.replace(tmp_path, meta_path)
+
+    def _store_file(self, key: str, source: Path, meta: _Meta) -> Path:
+        """Move ``source`` into the disk tier; it must be on the cache's filesystem."""
+        data_path, _meta_path = self._paths(key)
+        size = source.stat().st_size
+        os.replace(source, data_path)
+        self._write_meta(key, meta)
+        self._trim_disk(size)
+        return data_path
+
+    def _store_bytes(self, key: str, data: bytes, meta: _Meta) -> None:
+        self._remember(key, data, meta)
+        if not self._disk_cap:
+            return
+        data_path, _meta_path = self._paths(key)
+        try:
+            data_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = data_path.with_name(f"{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(data)
+            self._store_file(key, tmp_path, meta)
+        except OSError as exc:
+            logger.warning("media_cache_disk_write_failed", key=key, error=str(exc))
+
+    def _trim_disk(self, added: int) -> None:
+        with self._lock:
+            if self._disk_size is None:
+                self._disk_size = sum(size for _mtime, size, _path in self._data_files())
+            else:
+                self._disk_size += added
+            if self._disk_size <= self._disk_cap:
+                return
+            # Other processes write here too; recount before deciding what to drop.
+            files = sorted(self._data_files())
+            total = sum(size for _mtime, size, _path in files)
+            for _mtime, size, path in files:
+                if total <= self._disk_cap * _DISK_TRIM_RATIO:
+                    break
+                path.unlink(missing_ok=True)
+                path.with_name(f"{path.name}.json").unlink(missing_ok=True)
+                total -= size
+                self._counters["evictions"] += 1
+            self._disk_size = total
+
+    def _data_files(self) -> list[tuple[float, int, Path]]:
+        files = []
+        for path in self._dir.glob("*/*") if self._dir.exists() else []:
+            if path.suffix in {".json", ".tmp"}:
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    # ── fetching ────────────────────────────────────────────────────────
+
+    def _cached(self, key: str) -> tuple[bytes, _Meta, str] | None:
+        entry = self._from_memory(key)
+        if entry is not None:
+            return entry[0], entry[1], "memory_hits"
+        entry = self._from_disk(key) if self._disk_cap else None
+        if entry is not None:
+            self._remember(key, *entry)
+            return entry[0], entry[1], "disk_hits"
+        return None
+
+    def _settle(self, key: str, cached: tuple[bytes, _Meta, str] | None, response) -> CachedMedia:
+        if cached is not None and response.status_code == 304:
+            data, meta, _tier = cached
+            meta = _Meta(content_type=meta.content_type, etag=meta.etag, fetched_at=time.time())
+            self._count("revalidated")
+            self._remember(key, data, meta)
+            if self._disk_cap:
+                try:
+                    self._write_meta(key, meta)
+                except OSError as exc:
+                    logger.warning("media_cache_disk_write_failed", key=key, error=str(exc))
+            return CachedMedia(data, meta.content_type)
+        response.raise_for_status()
+        self._count("misses")
+        meta = _Meta(
+            content_type=response.headers.get("content-type", ""),
+            etag=response.headers.get("etag"),
+            fetched_at=time.time(),
+        )
+        self._store_bytes(key, response.content, meta)
+        return CachedMedia(response.content, meta.content_type)
+
+    @staticmethod
+    def _conditional_headers(cached: tuple[bytes, _Meta, str] | None) -> dict[str, str]:
+        if cached is not None and cached[1].etag:
+            return {"If-None-Match": cached[1].etag}
+        return {}
+
+    def get(self, url: str, timeout: float | None = None) -> CachedMedia:
+        key, immutable = self.key_for(url)
+        cached = self._cached(key)
+        if cached is not None and self._fresh(cached[1], immutable):
+            self._count(cached[2])
+            return CachedMedia(cached[0], cached[1].content_type)
+        response = get_client("media").get(
+            url, headers=self._conditional_headers(cached), timeout=provider_timeout("media", timeout)
+        )
+        return self._settle(key, cached, response)
+
+    def _key_lock(self, key: str) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            locks = self._key_locks.setdefault(loop, weakref.WeakValueDictionary())
+            lock = locks.get(key)
+            if lock is None:
+                lock = asyncio.Lock()
+                locks[key] = lock
+            return lock
+
+    async def get_async(self, url: str, timeout: float | None = None) -> CachedMedia:
+        key, immutable = self.key_for(url)
+        # Concurrent renders of one post ask for the same reference at once; only the first goes to the network.
+        async with self._key_lock(key):
+            cached = self._from_memory(key)
+            if cached is not None:
+                cached = (cached[0], cached[1], "memory_hits")
+            else:
+                cached = await asyncio.to_thread(self._cached, key)
+            if cached is not None and self._fresh(cached[1], immutable):
+                self._count(cached[2])
+                return CachedMedia(cached[0], cached[1].content_type)
+            response = await get_async_client("media").get(
+                url, headers=self._conditional_headers(cached), timeout=provider_timeout("media", timeout)
+            )
+            return await asyncio.to_thread(self._settle, key, cached, response)
+
+    def download_to_path(self, url: str, path: str | Path) -> Path:
+        """Place the file behind ``url`` at ``path``, downloading it into the disk tier only on a miss.
+
+        Meant for clips: the file is streamed to disk by the storage client and never
+        held in memory. ``path`` gets a hard link (or a copy) so eviction cannot pull it
+        away from a caller that is still reading it.
+        """
+        key, immutable = self.key_for(url)
+        data_path, _meta_path = self._paths(key)
+        meta = self._read_meta(key) if self._disk_cap else None
+        if meta is not None and self._fresh(meta, immutable):
+            self._count("disk_hits")
+            data_path.touch()
+        elif self._disk_cap:
+            self._count("misses")
+            data_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = data_path.with_name(f"{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+            try:
+                R2StorageClient().download_to_path(url, tmp_path)
+                self._store_file(key, tmp_path, _Meta(content_type="", etag=None, fetched_at=time.time()))
+            finally:
+                tmp_path.unlink(missing_ok=True)
+        else:
+            self._count("misses")
+            return R2StorageClient().download_to_path(url, path)
+
+        target = Path(path)
+        target.unlink(missing_ok=True)
+        try:
+            os.link(data_path, target)
+        except FileNotFoundError:
+            # Evicted by another process since the lookup.
+            return R2StorageClient().download_to_path(url, target)
+        except OSError:
+            shutil.copyfile(data_path, target)
+        return target
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                **self._counters,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_size,
+                "disk_bytes": self._disk_size or 0,
+            }
+
+
+_lock = threading.Lock()
+_cache: MediaCache | None = None
+
+
+def _reset_after_fork() -> None:
+    # Counters and the memory tier are per process; the disk tier is picked up again from CACHE_DIR.
+    global _lock, _cache
+    _lock = threading.Lock()
+    _cache = None
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_media_cache() -> MediaCache:
+    global _cache
+    with _lock:
+        if _cache is None:
+            settings = get_settings()
+            enabled = settings.media_cache_enabled
+            _cache = MediaCache(
+                Path(settings.cache_dir) / "media",
+                memory_bytes=settings.media_cache_memory_mb * _MB if enabled else 0,
+                disk_bytes=settings.media_cache_disk_mb * _MB if enabled else 0,
+                revalidate_seconds=settings.media_cache_revalidate_seconds if enabled else 0,
+            )
+        return _cache
+
+
+def fetch_media(url: str, timeout: float | None = None) -> CachedMedia:
+    return get_media_cache().get(url, timeout=timeout)
+
+
+async def fetch_media_async(url: str, timeout: float | None = None) -> CachedMedia:
+    return await get_media_cache().get_async(url, timeout=timeout)
+
+
+def download_media(url: str, path: str | Path) -> Path:
+    return get_media_cache().download_to_path(url, path)
+
+
+def media_cache_stats() -> dict[str, int]:
+    return get_media_cache().stats()
+
+
+def log_media_cache_stats() -> None:
+    stats = media_cache_stats()
+    if stats["memory_hits"] or stats["disk_hits"] or stats["revalidated"] or stats["misses"]:
+        logger.info("media_cache_stats", pid=os.getpid(), **stats)
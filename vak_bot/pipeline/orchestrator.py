@@ -1,60 +1,547 @@
 from __future__ import annotations
 
+import asyncio
+import tempfile
 import uuid
-from contextlib import contextmanager
+from collections.abc import Callable
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
 from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
 
-import httpx
 import structlog
-
-from vak_bot.bot.sender import send_review_package, send_text, send_video_review_package
-from vak_bot.db.models import JobRun, Post, PostVariant, PostVariantItem, VideoJob
+from sqlalchemy import func
+from sqlalchemy.orm import selectinload
+
+from vak_bot.bot.sender import (
+    finish_progressive_review,
+    send_review_option,
+    send_review_package,
+    send_text,
+    send_video_review_package,
+    start_progressive_review,
+)
+from vak_bot.db.models import JobRun, Post, PostVariant, PostVariantItem, Product, TelegramSession, VideoJob
+from vak_bot.config import get_settings
 from vak_bot.db.session import SessionLocal
-from vak_bot.enums import JobStage, JobStatus, PostStatus
+from vak_bot.enums import JobStage, JobStatus, PostStatus, RenderTier, SessionState
+from vak_bot.pipeline import async_runtime
+from vak_bot.pipeline.analysis_cache import get_cached_style_brief, store_style_brief, style_brief_cache_key
 from vak_bot.pipeline.analyzer import OpenAIReferenceAnalyzer
 from vak_bot.pipeline.caption_writer import ClaudeCaptionWriter
+from vak_bot.pipeline.checkpoints import (
+    IMAGE_STAGES,
+    VIDEO_STAGES,
+    StageCheckpoints,
+    analyze_fingerprint,
+    download_fingerprint,
+    input_fingerprint,
+)
+from vak_bot.pipeline.dag import DagError, Node, NodeTiming, run_dag
+from vak_bot.pipeline.deadline import current_budget, within_budget
 from vak_bot.pipeline.downloader import DataBrightDownloader
-from vak_bot.pipeline.errors import PipelineError, VideoQualityError
+from vak_bot.pipeline.errors import DraftReelError, PipelineError, VeoGenerationError, VeoTimeoutError
 from vak_bot.pipeline.gemini_styler import GeminiStyler
+from vak_bot.pipeline.http_clients import get_async_client, log_pool_stats
+from vak_bot.pipeline.interfaces import VeoSubmission
 from vak_bot.pipeline.llm_utils import normalize_claude_model, normalize_gemini_image_model, normalize_openai_model
-from vak_bot.pipeline.product_validator import ProductValidator
+from vak_bot.pipeline.media_cache import download_media, fetch_media, fetch_media_async, log_media_cache_stats
+from vak_bot.pipeline.product_features import product_reference
+from vak_bot.pipeline.product_validator import FIRST_FRAME_THRESHOLD, ProductValidator, ReferenceFeatures
+from vak_bot.pipeline.prompts import load_brand_profile
+from vak_bot.pipeline.route_detector import canonical_reference_key
 from vak_bot.pipeline.veo_generator import VeoGenerator
 from vak_bot.pipeline.video_stitcher import extract_first_frame, compress_video
-from vak_bot.schemas import StyleBrief
+from vak_bot.schemas import StyleBrief, StyledVariant
 from vak_bot.storage import R2StorageClient
+from vak_bot.storage.asset_registry import asset_for_url
 
 logger = structlog.get_logger(__name__)
 
-
-@contextmanager
-def stage_run(session, post_id: int, stage: JobStage, brand_id: int):
+# Veo renders outlive the task that submits them: VideoJobs wait in this status until
+# the sweep collects them, and the run's ``resume`` kind says how the post continues.
+VIDEO_JOB_GENERATING = "generating"
+# Held back by the per-brand operation cap; the sweep submits it when a slot frees up.
+VIDEO_JOB_QUEUED = "queued"
+VEO_RESUME_PIPELINE = "video_pipeline"
+VEO_RESUME_REEL_THIS = "reel_this"
+VEO_RESUME_EXTENSION = "extension"
+# An extra variation the reviewer asked for; the sweep sends the review itself.
+VEO_RESUME_VARIATION = "variation"
+# The approved draft clip re-rendered at final quality in place.
+VEO_RESUME_FINAL = "final"
+# Rendered for an earlier VIDEO_GENERATE run of the same post and no longer offered for review.
+VIDEO_JOB_SUPERSEDED = "superseded"
+_VEO_STAGES = (JobStage.VIDEO_GENERATE.value, JobStage.VIDEO_EXTEND.value)
+# Instagram rejects larger reels; leaves a safety margin under the 1 GB limit.
+_PUBLISH_MAX_VIDEO_MB = 950
+
+
+@dataclass(frozen=True)
+class VeoResume:
+    """A post whose Veo renders have all finished and whose pipeline should continue."""
+
+    kind: str
+    post_id: int
+    chat_id: int
+    brand_id: int
+    # Set on a final render that a publish was waiting for; the caller publishes the post as this user.
+    publish_as: str | None = None
+
+
+def _start_run(session, post_id: int, stage: JobStage, brand_id: int, input_fingerprint: str | None = None) -> JobRun:
     run = JobRun(
         brand_id=brand_id,
         post_id=post_id,
         stage=stage.value,
         status=JobStatus.STARTED.value,
+        input_fingerprint=input_fingerprint,
     )
     session.add(run)
     session.commit()
-    try:
-        yield
+    budget = current_budget()
+    if budget is not None:
+        budget.begin_stage(run.id)
+    return run
+
+
+def _finish_run(session, run: JobRun, exc: BaseException | None = None, commit: bool = True) -> None:
+    if exc is None:
         run.status = JobStatus.SUCCEEDED.value
-        run.finished_at = datetime.now(timezone.utc)
-        session.commit()
-    except Exception as exc:
+    else:
         run.status = JobStatus.FAILED.value
         run.error_code = getattr(exc, "error_code", "internal_error")
         run.error_message = str(exc)
-        run.finished_at = datetime.now(timezone.utc)
+    run.finished_at = datetime.now(timezone.utc)
+    budget = current_budget()
+    usage = budget.end_stage(run.id, run.stage) if budget is not None else None
+    if usage is not None:
+        run.details_json = {**(run.details_json or {}), "budget": usage}
+    if commit:
         session.commit()
+
+
+@contextmanager
+def stage_run(session, post_id: int, stage: JobStage, brand_id: int, input_fingerprint: str | None = None):
+    run = _start_run(session, post_id, stage, brand_id, input_fingerprint=input_fingerprint)
+    try:
+        yield run
+        _finish_run(session, run)
+    except Exception as exc:
+        _finish_run(session, run, exc)
         raise
 
 
+@asynccontextmanager
+async def stage_run_async(session, post_id: int, stage: JobStage, brand_id: int, input_fingerprint: str | None = None):
+    """``stage_run`` for the pipeline coroutines; the run rows are written on a worker thread."""
+    run = await asyncio.to_thread(_start_run, session, post_id, stage, brand_id, input_fingerprint)
+    try:
+        yield run
+        await asyncio.to_thread(_finish_run, session, run)
+    except Exception as exc:
+        await asyncio.to_thread(_finish_run, session, run, exc)
+        raise
+
+
+@asynccontextmanager
+async def _loop_session():
+    """A session for a pipeline coroutine on the shared loop.
+
+    Sessions block, so every query, commit and row lock made through this one goes
+    through ``asyncio.to_thread``, and so does closing it. A task thread may hold a
+    row lock while it waits on the loop (``_finalize_variant``); a loop blocked on
+    the database would deadlock with it.
+    """
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        await asyncio.to_thread(session.close)
+
+
+def _load_post(session, post_id: int) -> Post | None:
+    # The product and its photos come along so coroutines never lazy-load them on the loop.
+    return session.get(Post, post_id, options=[selectinload(Post.product).selectinload(Product.photos)])
+
+
 def _fetch_bytes(url: str) -> bytes:
-    with httpx.Client(timeout=40.0) as client:
-        response = client.get(url)
-        response.raise_for_status()
-        return response.content
+    return fetch_media(url).data
+
+
+async def _fetch_bytes_async(url: str) -> bytes:
+    return (await fetch_media_async(url)).data
+
+
+async def _preview_bytes(variant: StyledVariant) -> bytes:
+    if variant.item_bytes:
+        return variant.item_bytes[0]
+    return await _fetch_bytes_async(variant.preview_url)
+
+
+def _validation_bytes(variant: StyledVariant) -> list[bytes]:
+    if variant.item_bytes:
+        return list(variant.item_bytes)
+    return [_fetch_bytes(variant.preview_url)]
+
+
+def _check_video_first_frames(
+    validator: ProductValidator, styled_bytes: bytes, video_paths: dict[int, str], post_id: int
+) -> None:
+    frames: dict[int, bytes] = {}
+    for idx, video_path in video_paths.items():
+        try:
+            frames[idx] = extract_first_frame(video_path)
+        except Exception as exc:
+            logger.warning(
+                "video_first_frame_check_skipped",
+                post_id=post_id,
+                variation=idx,
+                error=str(exc),
+            )
+    if not frames:
+        return
+
+    results = validator.score_batch(styled_bytes, list(frames.values()))
+    for idx, result in zip(frames, results):
+        if not result.is_valid:
+            logger.warning(
+                "video_first_frame_ssim_low",
+                post_id=post_id,
+                variation=idx,
+                ssim_score=round(result.score, 4),
+                threshold=validator.threshold,
+            )
+
+
+def _product_reference(
+    variants: list[StyledVariant], product_source_url: str, validator: ProductValidator
+) -> ReferenceFeatures:
+    source_bytes = next((variant.source_bytes for variant in variants if variant.source_bytes), None)
+    return product_reference(product_source_url, validator, _fetch_bytes, source_bytes=source_bytes)
+
+
+def _score_variant(
+    validator: ProductValidator, variant: StyledVariant, original: ReferenceFeatures
+) -> tuple[StyledVariant, list[bytes], list]:
+    items = _validation_bytes(variant)
+    return variant, items, validator.score_batch(original, items)
+
+
+def _persist_variants(
+    session,
+    post: Post,
+    validator: ProductValidator,
+    scored: list[tuple[StyledVariant, list[bytes], list]],
+) -> dict[int, bytes]:
+    """Replace the post's variants with freshly scored ones and return preview bytes by variant index."""
+    existing = session.query(PostVariant).filter(PostVariant.brand_id == post.brand_id, PostVariant.post_id == post.id).all()
+    for old_variant in existing:
+        for old_item in old_variant.items:
+            session.delete(old_item)
+        session.delete(old_variant)
+    session.commit()
+
+    preview_bytes_by_index: dict[int, bytes] = {}
+    persisted_preview_urls: list[str] = []
+    low_ssim_variants: list[int] = []
+    for variant, items, item_results in scored:
+        preview_bytes_by_index[variant.variant_index] = items[0]
+        # A carousel variant is only as faithful as its worst slide.
+        score = min(result.score for result in item_results)
+        is_valid = score >= validator.threshold
+        if not is_valid:
+            low_ssim_variants.append(variant.variant_index)
+            logger.warning(
+                "low_ssim_score",
+                variant=variant.variant_index,
+                ssim_score=round(score, 4),
+                low_positions=[pos for pos, result in enumerate(item_results, start=1) if not result.is_valid],
+                threshold=validator.threshold,
+            )
+        record = PostVariant(
+            brand_id=post.brand_id,
+            post_id=post.id,
+            variant_index=variant.variant_index,
+            preview_url=variant.preview_url,
+            ssim_score=score,
+            is_valid=is_valid,
+            render_tier=variant.render_tier,
+            render_spec=variant.render_spec,
+        )
+        session.add(record)
+        session.flush()
+        for idx, image_url in enumerate(variant.item_urls, start=1):
+            session.add(PostVariantItem(brand_id=post.brand_id, variant_id=record.id, position=idx, image_url=image_url))
+        persisted_preview_urls.append(variant.preview_url)
+
+    if low_ssim_variants:
+        logger.warning(
+            "product_preservation_warning",
+            post_id=post.id,
+            low_ssim_variants=low_ssim_variants,
+            message="Some variants may have altered the product. Human review recommended.",
+        )
+
+    post.styled_image = persisted_preview_urls[0]
+    session.commit()
+    return preview_bytes_by_index
+
+
+def _node_timings(timings: dict[str, NodeTiming], names: list[str]) -> dict:
+    return {"nodes": {name: timings[name].as_dict() for name in names if name in timings}}
+
+
+class _ProgressiveReview:
+    """Streams each variant preview to the reviewer as soon as it is rendered.
+
+    Delivery problems never fail the pipeline: REVIEW falls back to the batch
+    package for any post whose previews did not all go out.
+    """
+
+    def __init__(self, brand_id: int, chat_id: int, expected_count: int, status_message_id: int) -> None:
+        self.brand_id = brand_id
+        self.chat_id = chat_id
+        self.expected_count = expected_count
+        self.status_message_id = status_message_id
+        self.delivered: set[int] = set()
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    async def start(cls, brand_id: int, chat_id: int, expected_count: int) -> _ProgressiveReview | None:
+        if get_settings().review_delivery_mode != "progressive":
+            return None
+        try:
+            message_id = await asyncio.to_thread(start_progressive_review, brand_id, chat_id, expected_count)
+        except Exception as exc:
+            logger.warning("progressive_review_unavailable", chat_id=chat_id, error=str(exc))
+            return None
+        return cls(brand_id, chat_id, expected_count, message_id)
+
+    async def deliver(self, variant: StyledVariant) -> None:
+        async with self._lock:
+            try:
+                await asyncio.to_thread(
+                    send_review_option,
+                    self.brand_id,
+                    self.chat_id,
+                    self.status_message_id,
+                    option=variant.variant_index,
+                    image_url=variant.preview_url,
+                    image_bytes=variant.item_bytes[0] if variant.item_bytes else None,
+                    ready_count=len(self.delivered) + 1,
+                    expected_count=self.expected_count,
+                )
+            except Exception as exc:
+                logger.warning("progressive_review_option_failed", variant=variant.variant_index, error=str(exc))
+                return
+            self.delivered.add(variant.variant_index)
+
+    async def finish(self, post_id: int, option_indexes: list[int], caption: str, hashtags: str) -> bool:
+        """Attach caption and keyboard; False when the previews are incomplete and the batch package is needed."""
+        if not option_indexes or not set(option_indexes) <= self.delivered:
+            return False
+        await asyncio.to_thread(
+            finish_progressive_review,
+            self.brand_id,
+            self.chat_id,
+            post_id,
+            self.status_message_id,
+            caption=caption,
+            hashtags=hashtags,
+            option_count=len(option_indexes),
+        )
+        return True
+
+
+async def _run_style_caption_graph(
+    session,
+    post: Post,
+    styler: GeminiStyler,
+    captioner: ClaudeCaptionWriter,
+    validator: ProductValidator,
+    style_brief: StyleBrief,
+    product_sources: list[str],
+    reference_urls: list[str],
+    style_fingerprint: str,
+    chat_id: int,
+) -> tuple[dict[int, bytes], _ProgressiveReview | None]:
+    """Run STYLE and CAPTION as one dependency graph.
+
+    Each variant renders on its own (only slide 1 of a lazy carousel), its SSIM check
+    starts as soon as it is ready and the caption is written from the first variant
+    while the others are still rendering. In progressive review mode every variant
+    is also sent to the chat the moment it exists. Only the persist node touches the
+    session, on a worker thread. Node timings are stored on the STYLE and CAPTION
+    job runs.
+
+    Returns preview bytes by variant index and the progressive review, if one started.
+    """
+    brand_id = post.brand_id
+    style_run = await asyncio.to_thread(
+        _start_run, session, post.id, JobStage.STYLE, brand_id, input_fingerprint=style_fingerprint
+    )
+    caption_run: JobRun | None = None
+    persisted = False
+    try:
+        if not product_sources:
+            raise PipelineError("No product photo found for this post")
+
+        if len(reference_urls) > 1:
+            post.media_type = "carousel"
+        # Lazy carousels review slide 1 only; the chosen variant's other slides render after selection.
+        positions = [1] if post.media_type == "carousel" and get_settings().carousel_render_mode == "lazy" else None
+        product_info = _build_product_info(post)
+        caption_run = await asyncio.to_thread(_start_run, session, post.id, JobStage.CAPTION, brand_id)
+
+        indexes = list(range(1, await asyncio.to_thread(styler.variant_count) + 1))
+        first = f"style_{indexes[0]}"
+        progress = await _ProgressiveReview.start(brand_id, chat_id, len(indexes))
+
+        def _style(index: int):
+            async def _render(_inputs: dict) -> StyledVariant:
+                variants = await styler.generate_variants_async(
+                    product_image_url=product_sources[0],
+                    reference_image_urls=reference_urls,
+                    style_brief=style_brief,
+                    overlay_text=None,
+                    variant_indexes=[index],
+                    positions=positions,
+                )
+                return variants[0]
+
+            return _render
+
+        def _validate(index: int):
+            # SSIM is CPU-bound; score on a worker thread so other posts keep moving.
+            return lambda inputs: asyncio.to_thread(_score_variant, validator, inputs[f"style_{index}"], inputs["reference"])
+
+        async def _caption(inputs: dict):
+            variant = inputs[first]
+            return await captioner.generate_caption_async(
+                styled_image_url=variant.preview_url,
+                style_brief=style_brief,
+                product_info=product_info,
+                styled_image_bytes=await _preview_bytes(variant),
+            )
+
+        nodes = [Node(f"style_{index}", _style(index)) for index in indexes]
+        nodes += [Node(f"validate_{index}", _validate(index), deps=(f"style_{index}", "reference")) for index in indexes]
+        nodes += [
+            Node(
+                "reference",
+                lambda inputs: asyncio.to_thread(_product_reference, [inputs[first]], product_sources[0], validator),
+                deps=(first,),
+            ),
+            Node("caption", _caption, deps=(first,)),
+            Node(
+                "persist",
+                lambda inputs: asyncio.to_thread(
+                    _persist_variants, session, post, validator, [inputs[f"validate_{index}"] for index in indexes]
+                ),
+                deps=tuple(f"validate_{index}" for index in indexes),
+            ),
+        ]
+        if progress is not None:
+            nodes += [
+                Node(
+                    f"deliver_{index}",
+                    lambda inputs, index=index: progress.deliver(inputs[f"style_{index}"]),
+                    deps=(f"style_{index}",),
+                )
+                for index in indexes
+            ]
+        style_nodes = [node.name for node in nodes if node.name != "caption"]
+
+        try:
+            outcome = await run_dag(nodes)
+        except DagError as exc:
+            persist_timing = exc.timings.get("persist")
+            persisted = persist_timing is not None and persist_timing.status == "succeeded"
+            style_run.details_json = _node_timings(exc.timings, style_nodes)
+            caption_run.details_json = _node_timings(exc.timings, ["caption"])
+            raise exc.cause from exc
+
+        caption_package = outcome.results["caption"]
+        post.caption = caption_package.caption
+        post.hashtags = caption_package.hashtags
+        post.alt_text = caption_package.alt_text
+        style_run.details_json = _node_timings(outcome.timings, style_nodes)
+        caption_run.details_json = _node_timings(outcome.timings, ["caption"])
+        caption_run.input_fingerprint = input_fingerprint(post.styled_image, post.style_brief, product_info, False)
+        await asyncio.to_thread(_finish_run, session, style_run)
+        await asyncio.to_thread(_finish_run, session, caption_run)
+        return outcome.results["persist"], progress
+    except Exception as exc:
+        # Variants already persisted keep STYLE reusable; the caption only lands after the graph.
+        if style_run.status == JobStatus.STARTED.value:
+            await asyncio.to_thread(_finish_run, session, style_run, None if persisted else exc)
+        if caption_run is not None and caption_run.status == JobStatus.STARTED.value:
+            await asyncio.to_thread(_finish_run, session, caption_run, exc)
+        raise
+
+
+async def _analyze_reference(
+    analyzer: OpenAIReferenceAnalyzer,
+    reference_url: str,
+    reference_image: str,
+    reference_caption: str | None,
+    is_video: bool = False,
+) -> tuple[StyleBrief, bool]:
+    """Return the StyleBrief for a reference and whether it came from the brief cache."""
+    if analyzer.settings.dry_run:
+        return await analyzer.analyze_reference_async(reference_image, reference_caption, is_video=is_video), False
+
+    try:
+        category = (await asyncio.to_thread(load_brand_profile, analyzer.brand_id))["category"]
+        reference_bytes = await _fetch_bytes_async(reference_image)
+        # Rendering the brand prompt reads brand config from the database; keep it off the loop.
+        cache_key = await asyncio.to_thread(
+            style_brief_cache_key,
+            reference_url or reference_image,
+            reference_bytes,
+            category,
+            analyzer.brand_id,
+            is_video,
+        )
+    except Exception as exc:
+        logger.warning("style_brief_cache_skipped", reference_url=reference_url, error=str(exc))
+        return await analyzer.analyze_reference_async(reference_image, reference_caption, is_video=is_video), False
+
+    cached = await asyncio.to_thread(get_cached_style_brief, cache_key)
+    if cached is not None:
+        logger.info("style_brief_cache_hit", reference=canonical_reference_key(reference_url or reference_image))
+        return cached, True
+
+    style_brief = await analyzer.analyze_reference_async(reference_image, reference_caption, is_video=is_video)
+    await asyncio.to_thread(store_style_brief, cache_key, style_brief)
+    return style_brief, False
+
+
+def _parse_stage(value: str | None) -> JobStage | None:
+    if not value:
+        return None
+    try:
+        return JobStage(value)
+    except ValueError:
+        logger.warning("unknown_from_stage", from_stage=value)
+        return None
+
+
+def _reel_brief_fields(style_brief: StyleBrief) -> dict:
+    """Post fields a reel takes from its analyzed brief: a 9:16 start frame and the video direction."""
+    style_brief.composition.aspect_ratio = "9:16"
+    fields = {"style_brief": style_brief.model_dump()}
+    if style_brief.video_analysis:
+        fields["video_style_brief"] = style_brief.video_analysis.model_dump()
+        fields["video_type"] = style_brief.video_analysis.recommended_video_type
+    return fields
+
+
+def _apply_reel_brief(post: Post, style_brief: StyleBrief) -> None:
+    for name, value in _reel_brief_fields(style_brief).items():
+        setattr(post, name, value)
 
 
 def _build_product_info(post: Post) -> dict:
@@ -75,6 +562,13 @@ def _build_product_info(post: Post) -> dict:
     }
 
 
+def _reference_urls(post: Post) -> list[str]:
+    reference_urls = list(post.source_image_urls or [])
+    if not reference_urls and post.reference_image:
+        reference_urls = [post.reference_image]
+    return reference_urls
+
+
 def _resolve_product_sources(post: Post) -> list[str]:
     if post.input_photo_urls:
         return list(post.input_photo_urls)
@@ -84,12 +578,171 @@ def _resolve_product_sources(post: Post) -> list[str]:
     return []
 
 
-def run_generation_pipeline(post_id: int, chat_id: int, brand_id: int | None = None) -> None:
-    downloader = DataBrightDownloader()
-    validator = ProductValidator(threshold=0.6)
+def resolve_reference_pipeline_type(post_id: int, brand_id: int | None = None) -> str:
+    """Scrape an ambiguous reference link (e.g. pin.it) to decide between the image and reel pipelines.
 
+    The scrape result lands in the shared scrape cache, so the pipeline's DOWNLOAD
+    stage does not hit Bright Data a second time.
+    """
     with SessionLocal() as session:
         post = session.get(Post, post_id)
+        if not post or (brand_id is not None and post.brand_id != brand_id):
+            return "image"
+
+        pipeline_type = "image"
+        try:
+            reference = DataBrightDownloader().download_post(post.reference_url or "")
+            if (reference.media_type or "").lower() == "reel":
+                pipeline_type = "reel"
+        except Exception as exc:
+            logger.warning("reference_preflight_failed", post_id=post_id, error=str(exc))
+
+        post.detected_media_type = pipeline_type
+        session.commit()
+        return pipeline_type
+
+
+async def _mirror_reference_images(storage: R2StorageClient, brand_id: int, urls: list[str]) -> list[str]:
+    """Copy scraped CDN images into our bucket; signed Instagram/Pinterest URLs expire within hours."""
+    if storage.settings.dry_run:
+        return list(urls)
+
+    client = get_async_client("media")
+    mirrored: list[str] = []
+    for url in urls:
+        response = await client.get(url)
+        response.raise_for_status()
+        content_type = response.headers.get("content-type", "image/jpeg").split(";")[0].strip() or "image/jpeg"
+        # Content-addressed, so the same scraped image is stored once however often it is prefetched.
+        mirrored.append(
+            await storage.upload_content_addressed_async(f"references/{brand_id}", response.content, content_type=content_type)
+        )
+    return mirrored
+
+
+def _park_prefetch(
+    brand_id: int, telegram_user_id: int, chat_id: int, source_url: str, prefetch_id: str, prefetch: dict
+) -> bool:
+    """Store ``prefetch`` on the Telegram session; False once the session has moved on from this link."""
+    with SessionLocal() as session:
+        record = (
+            session.query(TelegramSession)
+            .filter(
+                TelegramSession.brand_id == brand_id,
+                TelegramSession.telegram_user_id == str(telegram_user_id),
+                TelegramSession.chat_id == str(chat_id),
+            )
+            # Locked so the check and the write cannot interleave with the photo handler moving the session on.
+            .with_for_update()
+            .first()
+        )
+        context = dict(record.context_json or {}) if record else {}
+        if (
+            not record
+            or record.state != SessionState.AWAITING_PHOTOS.value
+            or context.get("pending_source_url") != source_url
+            or context.get("prefetch_id") != prefetch_id
+        ):
+            return False
+
+        context["prefetch"] = prefetch
+        record.context_json = context
+        session.commit()
+    return True
+
+
+def run_reference_prefetch(
+    brand_id: int,
+    telegram_user_id: int,
+    chat_id: int,
+    source_url: str,
+    prefetch_id: str,
+    pipeline_type: str | None = None,
+) -> None:
+    async_runtime.run(
+        run_reference_prefetch_async(brand_id, telegram_user_id, chat_id, source_url, prefetch_id, pipeline_type)
+    )
+
+
+async def run_reference_prefetch_async(
+    brand_id: int,
+    telegram_user_id: int,
+    chat_id: int,
+    source_url: str,
+    prefetch_id: str,
+    pipeline_type: str | None = None,
+) -> None:
+    """Scrape, mirror and analyze a link while the user is still choosing product photos.
+
+    Results are parked in the Telegram session's ``context_json["prefetch"]`` and are
+    only kept if the session is still waiting for photos for the same link.
+    """
+    downloader = DataBrightDownloader()
+    analyzer = OpenAIReferenceAnalyzer(brand_id=brand_id)
+    storage = R2StorageClient()
+
+    try:
+        reference = await downloader.download_post_async(source_url)
+        if pipeline_type is None:
+            pipeline_type = "reel" if (reference.media_type or "").lower() == "reel" else "image"
+        source_image_urls = list(reference.image_urls)
+        if not source_image_urls and reference.thumbnail_url:
+            source_image_urls = [reference.thumbnail_url]
+        source_image_urls = await _mirror_reference_images(storage, brand_id, source_image_urls)
+        style_brief, cache_hit = await _analyze_reference(
+            analyzer,
+            source_url,
+            source_image_urls[0],
+            reference.caption,
+            is_video=pipeline_type == "reel",
+        )
+    except Exception as exc:
+        logger.warning("reference_prefetch_failed", brand_id=brand_id, source_url=source_url, error=str(exc))
+        return
+
+    prefetch = {
+        "source_url": source_url,
+        "pipeline_type": pipeline_type,
+        "reference_image": source_image_urls[0],
+        "source_image_urls": source_image_urls,
+        "source_caption": reference.caption,
+        "source_hashtags": reference.hashtags,
+        # A reel post skips the video ANALYZE step, so park the brief as that step would apply it.
+        **(_reel_brief_fields(style_brief) if pipeline_type == "reel" else {"style_brief": style_brief.model_dump()}),
+    }
+    parked = await asyncio.to_thread(
+        _park_prefetch, brand_id, telegram_user_id, chat_id, source_url, prefetch_id, prefetch
+    )
+    if not parked:
+        logger.info("reference_prefetch_discarded", brand_id=brand_id, source_url=source_url)
+        return
+    logger.info(
+        "reference_prefetch_ready",
+        brand_id=brand_id,
+        source_url=source_url,
+        pipeline_type=pipeline_type,
+        style_brief_cache_hit=cache_hit,
+    )
+
+
+def run_generation_pipeline(post_id: int, chat_id: int, brand_id: int | None = None, from_stage: str | None = None) -> None:
+    try:
+        async_runtime.run(
+            within_budget(post_id, run_generation_pipeline_async(post_id, chat_id, brand_id, from_stage=from_stage))
+        )
+    finally:
+        log_pool_stats()
+        log_media_cache_stats()
+
+
+async def run_generation_pipeline_async(
+    post_id: int, chat_id: int, brand_id: int | None = None, from_stage: str | None = None
+) -> None:
+    downloader = DataBrightDownloader()
+    validator = ProductValidator()
+
+    async with _loop_session() as session:
+        post = await asyncio.to_thread(_load_post, session, post_id)
         if not post:
             logger.error("post_not_found", post_id=post_id)
             return
@@ -99,11 +752,12 @@ def run_generation_pipeline(post_id: int, chat_id: int, brand_id: int | None = N
             return
         analyzer = OpenAIReferenceAnalyzer(brand_id=brand_id)
         captioner = ClaudeCaptionWriter(brand_id=brand_id)
-        styler = GeminiStyler(brand_id=brand_id)
+        # Review options are drafts; the approved one is re-rendered at final quality.
+        styler = GeminiStyler(brand_id=brand_id, tier=RenderTier.DRAFT)
         logger.info(
             "generation_models_configured",
             openai_model=normalize_openai_model(analyzer.settings.openai_model),
-            gemini_model=normalize_gemini_image_model(styler.settings.gemini_image_model),
+            gemini_model=styler.image_model,
             claude_model=normalize_claude_model(captioner.settings.claude_model),
             brand_id=brand_id,
         )
@@ -114,134 +768,99 @@ def run_generation_pipeline(post_id: int, chat_id: int, brand_id: int | None = N
         post.status = PostStatus.PROCESSING.value
         post.error_code = None
         post.error_message = None
-        session.commit()
+        await asyncio.to_thread(session.commit)
 
+        checkpoints = StageCheckpoints(session, post_id, brand_id, IMAGE_STAGES, from_stage=_parse_stage(from_stage))
+        preview_bytes_by_index: dict[int, bytes] = {}
+        progress: _ProgressiveReview | None = None
         try:
-            with stage_run(session, post_id, JobStage.DOWNLOAD, brand_id):
-                reference = downloader.download_post(post.reference_url or "")
-                post.reference_image = reference.image_urls[0]
-                post.source_caption = reference.caption
-                post.source_hashtags = reference.hashtags
-                post.source_image_urls = reference.image_urls
-                session.commit()
-
-            with stage_run(session, post_id, JobStage.ANALYZE, brand_id):
-                style_brief = analyzer.analyze_reference(post.reference_image or "", post.source_caption)
-                post.style_brief = style_brief.model_dump()
-                session.commit()
-
-            with stage_run(session, post_id, JobStage.STYLE, brand_id):
-                product_sources = _resolve_product_sources(post)
-                if not product_sources:
-                    raise PipelineError("No product photo found for this post")
-
-                reference_urls = list(post.source_image_urls or [])
-                if not reference_urls and post.reference_image:
-                    reference_urls = [post.reference_image]
-
-                if len(reference_urls) > 1:
-                    post.media_type = "carousel"
-
-                variants = styler.generate_variants(
-                    product_image_url=product_sources[0],
-                    reference_image_urls=reference_urls,
-                    style_brief=style_brief,
-                    overlay_text=None,
-                )
-
-                existing = session.query(PostVariant).filter(PostVariant.brand_id == brand_id, PostVariant.post_id == post_id).all()
-                for old_variant in existing:
-                    for old_item in old_variant.items:
-                        session.delete(old_item)
-                    session.delete(old_variant)
-                session.commit()
-
-                original_bytes = _fetch_bytes(product_sources[0])
-
-                persisted_preview_urls: list[str] = []
-                low_ssim_variants: list[int] = []
-                for variant in variants:
-                    generated_bytes = _fetch_bytes(variant.preview_url)
-                    is_valid, score = validator.verify_preserved(original_bytes, generated_bytes)
-                    if not is_valid:
-                        low_ssim_variants.append(variant.variant_index)
-                        logger.warning(
-                            "low_ssim_score",
-                            variant=variant.variant_index,
-                            ssim_score=round(score, 4),
-                            threshold=validator.threshold,
-                        )
-                    record = PostVariant(
-                        brand_id=brand_id,
-                        post_id=post_id,
-                        variant_index=variant.variant_index,
-                        preview_url=variant.preview_url,
-                        ssim_score=score,
-                        is_valid=is_valid,
+            fingerprint = download_fingerprint(post)
+            if not await checkpoints.try_skip_async(JobStage.DOWNLOAD, fingerprint, ready=bool(post.reference_image)):
+                async with stage_run_async(session, post_id, JobStage.DOWNLOAD, brand_id, input_fingerprint=fingerprint):
+                    reference = await downloader.download_post_async(post.reference_url or "")
+                    post.reference_image = reference.image_urls[0]
+                    post.source_caption = reference.caption
+                    post.source_hashtags = reference.hashtags
+                    post.source_image_urls = reference.image_urls
+                    await asyncio.to_thread(session.commit)
+
+            fingerprint = analyze_fingerprint(post, is_video=False)
+            if await checkpoints.try_skip_async(JobStage.ANALYZE, fingerprint, ready=bool(post.style_brief)):
+                style_brief = StyleBrief.model_validate(post.style_brief)
+            else:
+                async with stage_run_async(session, post_id, JobStage.ANALYZE, brand_id, input_fingerprint=fingerprint) as run:
+                    style_brief, run.cache_hit = await _analyze_reference(
+                        analyzer, post.reference_url or "", post.reference_image or "", post.source_caption
                     )
-                    session.add(record)
-                    session.flush()
-                    for idx, image_url in enumerate(variant.item_urls, start=1):
-                        session.add(
-                            PostVariantItem(brand_id=brand_id, variant_id=record.id, position=idx, image_url=image_url)
+                    post.style_brief = style_brief.model_dump()
+                    await asyncio.to_thread(session.commit)
+
+            product_sources = _resolve_product_sources(post)
+            reference_urls = _reference_urls(post)
+            fingerprint = input_fingerprint(post.style_brief, product_sources, reference_urls, styler.image_model)
+            has_variants = await asyncio.to_thread(_has_variants, session, post_id)
+            if await checkpoints.try_skip_async(JobStage.STYLE, fingerprint, ready=bool(post.styled_image) and has_variants):
+                fingerprint = input_fingerprint(post.styled_image, post.style_brief, _build_product_info(post), False)
+                if not await checkpoints.try_skip_async(JobStage.CAPTION, fingerprint, ready=bool(post.caption)):
+                    async with stage_run_async(session, post_id, JobStage.CAPTION, brand_id, input_fingerprint=fingerprint):
+                        caption_package = await captioner.generate_caption_async(
+                            styled_image_url=post.styled_image or "",
+                            style_brief=style_brief,
+                            product_info=_build_product_info(post),
                         )
-                    persisted_preview_urls.append(variant.preview_url)
-
-                if low_ssim_variants:
-                    logger.warning(
-                        "product_preservation_warning",
-                        post_id=post_id,
-                        low_ssim_variants=low_ssim_variants,
-                        message="Some variants may have altered the product. Human review recommended.",
-                    )
-
-                post.styled_image = persisted_preview_urls[0]
-                session.commit()
-
-            with stage_run(session, post_id, JobStage.CAPTION, brand_id):
-                caption_package = captioner.generate_caption(
-                    styled_image_url=post.styled_image or "",
+                        post.caption = caption_package.caption
+                        post.hashtags = caption_package.hashtags
+                        post.alt_text = caption_package.alt_text
+                        await asyncio.to_thread(session.commit)
+            else:
+                preview_bytes_by_index, progress = await _run_style_caption_graph(
+                    session,
+                    post,
+                    styler=styler,
+                    captioner=captioner,
+                    validator=validator,
                     style_brief=style_brief,
-                    product_info=_build_product_info(post),
-                )
-                post.caption = caption_package.caption
-                post.hashtags = caption_package.hashtags
-                post.alt_text = caption_package.alt_text
-                post.status = PostStatus.REVIEW_READY.value
-                session.commit()
-
-            with stage_run(session, post_id, JobStage.REVIEW, brand_id):
-                all_variants = (
-                    session.query(PostVariant)
-                    .filter(PostVariant.brand_id == brand_id, PostVariant.post_id == post_id)
-                    .order_by(PostVariant.variant_index.asc())
-                    .limit(3)
-                    .all()
-                )
-                preview_urls = [variant.preview_url for variant in all_variants if variant.preview_url]
-                send_review_package(
-                    brand_id=brand_id,
+                    product_sources=product_sources,
+                    reference_urls=reference_urls,
+                    style_fingerprint=fingerprint,
                     chat_id=chat_id,
-                    post_id=post.id,
-                    image_urls=preview_urls,
+                )
+            post.status = PostStatus.REVIEW_READY.value
+            await asyncio.to_thread(session.commit)
+
+            async with stage_run_async(session, post_id, JobStage.REVIEW, brand_id):
+                review_variants = await asyncio.to_thread(_review_variants, session, brand_id, post_id)
+                if progress is None or not await progress.finish(
+                    post.id,
+                    [variant.variant_index for variant in review_variants],
                     caption=post.caption or "",
                     hashtags=post.hashtags or "",
-                )
+                ):
+                    await asyncio.to_thread(
+                        send_review_package,
+                        brand_id=brand_id,
+                        chat_id=chat_id,
+                        post_id=post.id,
+                        image_urls=[variant.preview_url for variant in review_variants],
+                        caption=post.caption or "",
+                        hashtags=post.hashtags or "",
+                        image_bytes=[preview_bytes_by_index.get(variant.variant_index) for variant in review_variants],
+                    )
 
             logger.info("generation_pipeline_complete", post_id=post_id)
         except PipelineError as exc:
             post.status = PostStatus.FAILED.value
             post.error_code = exc.error_code
             post.error_message = str(exc)
-            session.commit()
-            send_text(brand_id, chat_id, exc.user_message)
+            await asyncio.to_thread(session.commit)
+            await asyncio.to_thread(send_text, brand_id, chat_id, exc.user_message)
             logger.warning("pipeline_error", post_id=post_id, error_code=exc.error_code, error=str(exc))
         except Exception as exc:
             post.status = PostStatus.FAILED.value
             post.error_code = "internal_error"
             post.error_message = str(exc)
-            session.commit()
-            send_text(brand_id, chat_id, "Something unexpected happened. Please retry.")
+            await asyncio.to_thread(session.commit)
+            await asyncio.to_thread(send_text, brand_id, chat_id, "Something unexpected happened. Please retry.")
             logger.exception("pipeline_unhandled_error", post_id=post_id, error=str(exc))
 
 
@@ -279,6 +898,252 @@ def run_caption_rewrite(post_id: int, chat_id: int, rewrite_instruction: str, br
             send_text(brand_id, chat_id, "Caption rewrite failed. Please try again.")
 
 
+async def _complete_variant(session, post: Post, variant: PostVariant, validator: ProductValidator) -> list[int]:
+    """Bring ``variant`` to publish quality and return the slide positions rendered.
+
+    A draft is re-rendered at final quality from its stored prompt and seed, replacing
+    every slide; a final variant only gets the carousel slides it does not have yet.
+    The session is only used on worker threads; callers hold the variant row.
+    """
+    reference_urls = _reference_urls(post)
+    draft = variant.render_tier == RenderTier.DRAFT.value
+    present = await asyncio.to_thread(_item_positions, variant)
+    positions = [position for position in range(1, len(reference_urls) + 1) if draft or position not in present]
+    if not positions:
+        return []
+    product_sources = await asyncio.to_thread(_resolve_product_sources, post)
+    if not product_sources:
+        raise PipelineError("No product photo found for this post")
+
+    spec = variant.render_spec or {}
+    rendered = (
+        await GeminiStyler(brand_id=post.brand_id).generate_variants_async(
+            product_image_url=product_sources[0],
+            reference_image_urls=reference_urls,
+            style_brief=StyleBrief.model_validate(post.style_brief),
+            overlay_text=None,
+            variant_indexes=[variant.variant_index],
+            positions=positions,
+            seed=spec.get("seed"),
+            prompt=spec.get("prompt"),
+        )
+    )[0]
+    original = await asyncio.to_thread(_product_reference, [rendered], product_sources[0], validator)
+    _, _, item_results = await asyncio.to_thread(_score_variant, validator, rendered, original)
+    await asyncio.to_thread(_store_completed_variant, session, post, variant, validator, rendered, positions, item_results)
+    return positions
+
+
+def _item_positions(variant: PostVariant) -> set[int]:
+    return {item.position for item in variant.items}
+
+
+def _store_completed_variant(
+    session,
+    post: Post,
+    variant: PostVariant,
+    validator: ProductValidator,
+    rendered: StyledVariant,
+    positions: list[int],
+    item_results: list,
+) -> None:
+    """Write the slides ``_complete_variant`` rendered onto ``variant``; the caller commits."""
+    scores = [result.score for result in item_results]
+    if variant.render_tier == RenderTier.DRAFT.value:
+        for old_item in list(variant.items):
+            session.delete(old_item)
+        session.flush()
+        variant.preview_url = rendered.preview_url
+        variant.render_tier = rendered.render_tier
+        variant.render_spec = rendered.render_spec
+        if post.selected_variant_index in (None, variant.variant_index):
+            post.styled_image = rendered.preview_url
+    else:
+        scores.append(float(variant.ssim_score))
+    for position, image_url in zip(positions, rendered.item_urls):
+        session.add(PostVariantItem(brand_id=post.brand_id, variant_id=variant.id, position=position, image_url=image_url))
+    score = min(scores)
+    variant.ssim_score = score
+    variant.is_valid = score >= validator.threshold
+    if not variant.is_valid:
+        logger.warning(
+            "low_ssim_score",
+            variant=variant.variant_index,
+            ssim_score=round(score, 4),
+            low_positions=[pos for pos, result in zip(positions, item_results) if not result.is_valid],
+            threshold=validator.threshold,
+        )
+
+
+def _has_variants(session, post_id: int) -> bool:
+    return session.query(PostVariant.id).filter(PostVariant.post_id == post_id).first() is not None
+
+
+def _review_variants(session, brand_id: int, post_id: int) -> list[PostVariant]:
+    variants = (
+        session.query(PostVariant)
+        .filter(PostVariant.brand_id == brand_id, PostVariant.post_id == post_id)
+        .order_by(PostVariant.variant_index.asc())
+        .limit(3)
+        .all()
+    )
+    return [variant for variant in variants if variant.preview_url]
+
+
+def _selected_variant(session, post: Post, lock: bool = False) -> PostVariant | None:
+    query = session.query(PostVariant).filter(
+        PostVariant.brand_id == post.brand_id,
+        PostVariant.post_id == post.id,
+        PostVariant.variant_index == (post.selected_variant_index or 1),
+    )
+    return (query.with_for_update() if lock else query).one_or_none()
+
+
+def _finalize_variant(session, post: Post, variant: PostVariant) -> None:
+    # Blocks while a background render holds the variant row, then renders whatever is still draft or missing.
+    session.refresh(variant, with_for_update=True)
+    tier = variant.render_tier
+    rendered = async_runtime.run(_complete_variant(session, post, variant, ProductValidator()))
+    session.commit()
+    if rendered:
+        logger.info(
+            "variant_finalized_inline", post_id=post.id, variant=variant.variant_index, from_tier=tier, positions=rendered
+        )
+
+
+def run_carousel_completion(post_id: int, variant_index: int, brand_id: int | None = None) -> None:
+    """Bring the selected carousel variant to publish quality ahead of approval.
+
+    A final-quality variant gets its remaining slides. A draft, which every review
+    variant is while GEMINI_DRAFT_IMAGE_MODEL is set, is re-rendered at final quality
+    with all of its slides, so approving it has nothing left to render.
+
+    The variant row is locked here, on the task's own thread, and stays locked until
+    the slides are committed, so an approve or publish that starts meanwhile waits for
+    them instead of rendering them twice; only the render itself runs on the shared
+    loop. Failures are only logged; publishing renders whatever is still missing itself.
+    """
+    with SessionLocal() as session:
+        post = session.get(Post, post_id)
+        if not post:
+            logger.error("post_not_found", post_id=post_id)
+            return
+        brand_id = post.brand_id if brand_id is None else brand_id
+        if post.brand_id != brand_id:
+            logger.error("brand_scope_violation", post_id=post_id, expected_brand_id=brand_id, actual_brand_id=post.brand_id)
+            return
+        if (
+            post.media_type != "carousel"
+            or post.selected_variant_index != variant_index
+            or post.status not in {PostStatus.REVIEW_READY.value, PostStatus.APPROVED.value, PostStatus.SCHEDULED.value}
+        ):
+            return
+
+        variant = _selected_variant(session, post, lock=True)
+        if variant is None:
+            session.rollback()
+            return
+        tier = variant.render_tier
+        try:
+            rendered = async_runtime.run(
+                within_budget(post_id, _complete_variant(session, post, variant, ProductValidator()))
+            )
+            session.commit()
+        except Exception as exc:
+            session.rollback()
+            logger.warning("carousel_slides_failed", post_id=post_id, variant=variant_index, error=str(exc))
+            return
+        finally:
+            log_pool_stats()
+            log_media_cache_stats()
+        if rendered:
+            logger.info(
+                "carousel_slides_rendered", post_id=post_id, variant=variant_index, from_tier=tier, positions=rendered
+            )
+
+
+def run_final_render(post_id: int, chat_id: int, brand_id: int | None = None) -> None:
+    """Re-render the approved option at final quality.
+
+    Images render here, holding the variant row so a concurrent publish waits for
+    them. Reels submit a final Veo render of the selected clip that the Veo sweep
+    collects; options already rendered at final quality are left alone.
+    """
+    with SessionLocal() as session:
+        post = session.get(Post, post_id)
+        if not post:
+            return
+        brand_id = post.brand_id if brand_id is None else brand_id
+        if post.brand_id != brand_id:
+            return
+        if post.status not in {PostStatus.REVIEW_READY.value, PostStatus.APPROVED.value, PostStatus.SCHEDULED.value}:
+            return
+
+        if post.media_type == "reel":
+            try:
+                started = _submit_final_reel(session, post, chat_id)
+            except DraftReelError as exc:
+                send_text(brand_id, chat_id, exc.user_message)
+                return
+            except Exception as exc:
+                send_text(brand_id, chat_id, "Couldn't start the final Reel render. Reply 'approve' to try again.")
+                logger.exception("final_reel_submit_failed", post_id=post_id, error=str(exc))
+                return
+            if started:
+                send_text(brand_id, chat_id, "Rendering the final Reel. I'll let you know when it's ready to post.")
+            return
+
+        variant = _selected_variant(session, post, lock=True)
+        if variant is None or variant.render_tier != RenderTier.DRAFT.value:
+            session.rollback()
+            return
+        try:
+            rendered = async_runtime.run(
+                within_budget(post_id, _complete_variant(session, post, variant, ProductValidator()))
+            )
+            session.commit()
+        except Exception as exc:
+            session.rollback()
+            logger.warning("final_render_failed", post_id=post_id, variant=variant.variant_index, error=str(exc))
+            return
+        finally:
+            log_pool_stats()
+            log_media_cache_stats()
+        logger.info("final_render_complete", post_id=post_id, variant=variant.variant_index, positions=rendered)
+
+
+def _publishable_video_url(session, post: Post) -> str:
+    """URL of a clip within Instagram's size limit, uploading a compressed copy when needed.
+
+    The size probed at upload time usually settles it, so the clip is only
+    downloaded when it is too large or was never registered.
+    """
+    asset = asset_for_url(session, post.video_url)
+    if asset is not None and asset.byte_size <= _PUBLISH_MAX_VIDEO_MB * 1024 * 1024:
+        return post.video_url
+
+    publish_video_url = post.video_url
+    storage = R2StorageClient()
+    tmp_paths: list[str] = []
+    try:
+        with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as tf:
+            local_video_path = tf.name
+        tmp_paths.append(local_video_path)
+        download_media(post.video_url, local_video_path)
+
+        compressed_path = compress_video(local_video_path, max_size_mb=_PUBLISH_MAX_VIDEO_MB)
+        if compressed_path != local_video_path:
+            tmp_paths.append(compressed_path)
+            publish_video_url = storage.upload_file_content_addressed("reels/compressed", compressed_path, content_type="video/mp4")
+    finally:
+        for path in tmp_paths:
+            try:
+                Path(path).unlink(missing_ok=True)
+            except Exception:
+                logger.warning("tmp_cleanup_failed", path=path)
+    return publish_video_url
+
+
 def run_publish(post_id: int, chat_id: int, posted_by: str, poster_client, brand_id: int | None = None) -> None:
     with SessionLocal() as session:
         post = session.get(Post, post_id)
@@ -299,40 +1164,18 @@ def run_publish(post_id: int, chat_id: int, posted_by: str, poster_client, brand
         session.commit()
 
         try:
+            if post.media_type == "reel":
+                if not post.video_url:
+                    send_text(brand_id, chat_id, "No video found for this post.")
+                    return
+                # Nothing is posted yet, so no POST stage is recorded; the Veo sweep publishes once the render lands.
+                if _submit_final_reel(session, post, chat_id, publish_as=posted_by):
+                    send_text(brand_id, chat_id, "The final Reel is still rendering. I'll post it as soon as it's ready.")
+                    return
+
             with stage_run(session, post_id, JobStage.POST, brand_id):
                 if post.media_type == "reel":
-                    if not post.video_url:
-                        send_text(brand_id, chat_id, "No video found for this post.")
-                        return
-
-                    publish_video_url = post.video_url
-                    tmp_paths: list[str] = []
-                    try:
-                        import tempfile
-                        from pathlib import Path
-
-                        local_bytes = _fetch_bytes(post.video_url)
-                        with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as tf:
-                            tf.write(local_bytes)
-                            local_video_path = tf.name
-                        tmp_paths.append(local_video_path)
-
-                        compressed_path = compress_video(local_video_path, max_size_mb=950)
-                        if compressed_path != local_video_path:
-                            tmp_paths.append(compressed_path)
-                            compressed_bytes = Path(compressed_path).read_bytes()
-                            storage = R2StorageClient()
-                            comp_key = f"reels/{post.id}/publish_compressed_{uuid.uuid4().hex[:6]}.mp4"
-                            publish_video_url = storage.upload_bytes(comp_key, compressed_bytes, content_type="video/mp4")
-                    finally:
-                        for path in tmp_paths:
-                            try:
-                                from pathlib import Path
-
-                                Path(path).unlink(missing_ok=True)
-                            except Exception:
-                                logger.warning("tmp_cleanup_failed", path=path)
-
+                    publish_video_url = _publishable_video_url(session, post)
                     result = poster_client.post_reel(
                         video_s3_url=publish_video_url,
                         caption=f"{post.caption}\n\n{post.hashtags}",
@@ -340,18 +1183,11 @@ def run_publish(post_id: int, chat_id: int, posted_by: str, poster_client, brand
                         share_to_feed=True,
                     )
                 else:
-                    variant = (
-                        session.query(PostVariant)
-                        .filter(
-                            PostVariant.brand_id == brand_id,
-                            PostVariant.post_id == post_id,
-                            PostVariant.variant_index == (post.selected_variant_index or 1),
-                        )
-                        .first()
-                    )
+                    variant = _selected_variant(session, post)
                     if not variant:
                         send_text(brand_id, chat_id, "Please select a variant first (1, 2, or 3).")
                         return
+                    _finalize_variant(session, post, variant)
                     if post.media_type == "carousel":
                         items = (
                             session.query(PostVariantItem)
@@ -381,6 +1217,11 @@ def run_publish(post_id: int, chat_id: int, posted_by: str, poster_client, brand
             session.commit()
 
             send_text(brand_id, chat_id, f"Posted successfully: {post.instagram_url}")
+        except DraftReelError as exc:
+            # Nothing went wrong with the post itself; it goes back to review for a final clip.
+            post.status = PostStatus.REVIEW_READY.value
+            session.commit()
+            send_text(brand_id, chat_id, exc.user_message)
         except PipelineError as exc:
             post.status = PostStatus.FAILED.value
             post.error_code = exc.error_code
@@ -395,20 +1236,6 @@ def run_publish(post_id: int, chat_id: int, posted_by: str, poster_client, brand
             send_text(brand_id, chat_id, "Posting failed. You can retry with 'post now'.")
 
 
-def purge_old_reference_images(days: int, storage_client) -> int:
-    cutoff = datetime.now(timezone.utc).timestamp() - (days * 24 * 3600)
-    deleted = 0
-    with SessionLocal() as session:
-        posts = session.query(Post).filter(Post.reference_image.is_not(None)).all()
-        for post in posts:
-            if post.created_at.timestamp() <= cutoff and post.reference_image:
-                storage_client.delete_by_url(post.reference_image)
-                post.reference_image = None
-                deleted += 1
-        session.commit()
-    return deleted
-
-
 def notify_token_expiry(chat_id: int, expiry_text: str, brand_id: int | None = None) -> None:
     send_text(brand_id, chat_id, f"Meta page token is nearing expiry ({expiry_text}). Refresh it this week.")
 
@@ -417,16 +1244,26 @@ def notify_token_expiry(chat_id: int, expiry_text: str, brand_id: int | None = N
 # VIDEO / REEL PIPELINE
 # ══════════════════════════════════════════════════════════════════════════════
 
-def run_video_generation_pipeline(post_id: int, chat_id: int, brand_id: int | None = None) -> None:
+def run_video_generation_pipeline(post_id: int, chat_id: int, brand_id: int | None = None, from_stage: str | None = None) -> None:
+    try:
+        async_runtime.run(
+            within_budget(post_id, run_video_generation_pipeline_async(post_id, chat_id, brand_id, from_stage=from_stage))
+        )
+    finally:
+        log_pool_stats()
+        log_media_cache_stats()
+
+
+async def run_video_generation_pipeline_async(
+    post_id: int, chat_id: int, brand_id: int | None = None, from_stage: str | None = None
+) -> None:
     """Full video generation pipeline — download → analyze → style start frame → Veo → caption → review."""
     downloader = DataBrightDownloader()
     veo = VeoGenerator()
-    validator = ProductValidator(threshold=0.6)
-    video_validator = ProductValidator(threshold=0.7)
-    storage = R2StorageClient()
+    validator = ProductValidator()
 
-    with SessionLocal() as session:
-        post = session.get(Post, post_id)
+    async with _loop_session() as session:
+        post = await asyncio.to_thread(_load_post, session, post_id)
         if not post:
             logger.error("post_not_found", post_id=post_id)
             return
@@ -444,186 +1281,150 @@ def run_video_generation_pipeline(post_id: int, chat_id: int, brand_id: int | No
         post.media_type = "reel"
         post.error_code = None
         post.error_message = None
-        session.commit()
+        await asyncio.to_thread(session.commit)
 
+        checkpoints = StageCheckpoints(session, post_id, brand_id, VIDEO_STAGES, from_stage=_parse_stage(from_stage))
+        start_frame_bytes: bytes | None = None
         try:
             # ── Step 1: Download ──
-            with stage_run(session, post_id, JobStage.DOWNLOAD, brand_id):
-                reference = downloader.download_post(post.reference_url or "")
-                post.reference_image = reference.image_urls[0] if reference.image_urls else reference.thumbnail_url
-                post.source_caption = reference.caption
-                post.source_hashtags = reference.hashtags
-                post.source_image_urls = reference.image_urls
-                session.commit()
+            fingerprint = download_fingerprint(post)
+            if not await checkpoints.try_skip_async(JobStage.DOWNLOAD, fingerprint, ready=bool(post.reference_image)):
+                async with stage_run_async(session, post_id, JobStage.DOWNLOAD, brand_id, input_fingerprint=fingerprint):
+                    reference = await downloader.download_post_async(post.reference_url or "")
+                    post.reference_image = reference.image_urls[0] if reference.image_urls else reference.thumbnail_url
+                    post.source_caption = reference.caption
+                    post.source_hashtags = reference.hashtags
+                    post.source_image_urls = reference.image_urls
+                    await asyncio.to_thread(session.commit)
 
             # ── Step 2: Analyze (with video fields) ──
-            with stage_run(session, post_id, JobStage.ANALYZE, brand_id):
-                style_brief = analyzer.analyze_reference(
-                    post.reference_image or "",
-                    post.source_caption,
-                    is_video=True,
-                )
-                style_brief.composition.aspect_ratio = "9:16"
-                post.style_brief = style_brief.model_dump()
-                if style_brief.video_analysis:
-                    post.video_style_brief = style_brief.video_analysis.model_dump()
-                    post.video_type = style_brief.video_analysis.recommended_video_type
-                session.commit()
+            fingerprint = analyze_fingerprint(post, is_video=True)
+            if await checkpoints.try_skip_async(JobStage.ANALYZE, fingerprint, ready=bool(post.style_brief)):
+                style_brief = StyleBrief.model_validate(post.style_brief)
+            else:
+                async with stage_run_async(session, post_id, JobStage.ANALYZE, brand_id, input_fingerprint=fingerprint) as run:
+                    style_brief, run.cache_hit = await _analyze_reference(
+                        analyzer, post.reference_url or "", post.reference_image or "", post.source_caption, is_video=True
+                    )
+                    _apply_reel_brief(post, style_brief)
+                    await asyncio.to_thread(session.commit)
 
             # ── Step 3: Style Start Frame (9:16) ──
-            with stage_run(session, post_id, JobStage.STYLE, brand_id):
-                product_sources = _resolve_product_sources(post)
-                if not product_sources:
-                    raise PipelineError("No product photo found for this post")
-
-                reference_urls = list(post.source_image_urls or [])
-                if not reference_urls and post.reference_image:
-                    reference_urls = [post.reference_image]
-
-                variants = styler.generate_variants(
-                    product_image_url=product_sources[0],
-                    reference_image_urls=reference_urls,
-                    style_brief=style_brief,
-                    overlay_text=None,
-                )
-
-                if variants:
-                    original_bytes = _fetch_bytes(product_sources[0])
-                    generated_bytes = _fetch_bytes(variants[0].preview_url)
-                    is_valid, score = validator.verify_preserved(original_bytes, generated_bytes)
-
-                    post.styled_image = variants[0].preview_url
-                    post.start_frame_url = variants[0].preview_url
-                    session.commit()
-
-            # ── Step 4: Generate Video (Veo 3.1) ──
-            with stage_run(session, post_id, JobStage.VIDEO_GENERATE, brand_id):
-                # Download the styled frame to a temp file for Veo
-                import tempfile
-                from pathlib import Path
-
-                styled_bytes = _fetch_bytes(post.styled_image or "")
-                tmp_paths: list[str] = []
-                try:
-                    with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as tf:
-                        tf.write(styled_bytes)
-                        styled_frame_path = tf.name
-                    tmp_paths.append(styled_frame_path)
-
-                    video_paths = veo.generate_reel_variations(
-                        styled_frame_path=styled_frame_path,
+            product_sources = _resolve_product_sources(post)
+            reference_urls = _reference_urls(post)
+            fingerprint = input_fingerprint(
+                post.style_brief,
+                product_sources,
+                reference_urls,
+                normalize_gemini_image_model(styler.settings.gemini_image_model),
+            )
+            if not await checkpoints.try_skip_async(JobStage.STYLE, fingerprint, ready=bool(post.styled_image and post.start_frame_url)):
+                async with stage_run_async(session, post_id, JobStage.STYLE, brand_id, input_fingerprint=fingerprint):
+                    if not product_sources:
+                        raise PipelineError("No product photo found for this post")
+
+                    variants = await styler.generate_variants_async(
+                        product_image_url=product_sources[0],
+                        reference_image_urls=reference_urls,
                         style_brief=style_brief,
-                        video_type=post.video_type,
+                        overlay_text=None,
                     )
 
-                    tmp_paths.extend(video_paths)
-
-                    # Upload videos to R2 and create VideoJob records
-                    video_urls: list[str] = []
-                    for idx, video_path in enumerate(video_paths, start=1):
-                        try:
-                            first_frame = extract_first_frame(video_path)
-                            is_valid_video, video_ssim = video_validator.verify_preserved(styled_bytes, first_frame)
-                            if not is_valid_video:
-                                logger.warning(
-                                    "video_first_frame_ssim_low",
-                                    post_id=post_id,
-                                    variation=idx,
-                                    ssim_score=round(video_ssim, 4),
-                                    threshold=video_validator.threshold,
-                                )
-                        except Exception as exc:
+                    if variants:
+                        start_frame_bytes = await _preview_bytes(variants[0])
+                        original = await asyncio.to_thread(_product_reference, variants, product_sources[0], validator)
+                        start_frame_check = (await asyncio.to_thread(validator.score_batch, original, [start_frame_bytes]))[0]
+                        if not start_frame_check.is_valid:
                             logger.warning(
-                                "video_first_frame_check_skipped",
+                                "low_ssim_score",
                                 post_id=post_id,
-                                variation=idx,
-                                error=str(exc),
+                                ssim_score=round(start_frame_check.score, 4),
+                                threshold=validator.threshold,
                             )
 
-                        video_bytes = Path(video_path).read_bytes()
-                        video_key = f"reels/{post.id}/variation_{idx}_{uuid.uuid4().hex[:6]}.mp4"
-                        video_s3_url = storage.upload_bytes(video_key, video_bytes, content_type="video/mp4")
-                        video_urls.append(video_s3_url)
-
-                        job = VideoJob(
-                            brand_id=brand_id,
-                            post_id=post_id,
-                            variation_number=idx,
-                            video_url=video_s3_url,
-                            status="done",
-                        )
-                        session.add(job)
-
-                    if not video_urls:
-                        raise VideoQualityError("No video variation was successfully generated or uploaded.")
+                        post.styled_image = variants[0].preview_url
+                        post.start_frame_url = variants[0].preview_url
+                        await asyncio.to_thread(session.commit)
 
-                    post.video_url = video_urls[0]  # default to first
-                    post.video_duration = 8
-                    session.commit()
-                finally:
-                    for path in tmp_paths:
-                        try:
-                            Path(path).unlink(missing_ok=True)
-                        except Exception:
-                            logger.warning("tmp_cleanup_failed", path=path)
+            # ── Step 4: Generate Video (Veo 3.1) ──
+            fingerprint = input_fingerprint(post.styled_image, post.video_type, post.video_style_brief)
+            has_videos = await asyncio.to_thread(_has_rendered_videos, session, post_id)
+            if not await checkpoints.try_skip_async(JobStage.VIDEO_GENERATE, fingerprint, ready=has_videos):
+                styled_bytes = start_frame_bytes or await _fetch_bytes_async(post.styled_image or "")
+                run = await asyncio.to_thread(
+                    _start_run, session, post_id, JobStage.VIDEO_GENERATE, brand_id, input_fingerprint=fingerprint
+                )
+                try:
+                    free_slots = await asyncio.to_thread(_veo_free_slots, session, brand_id)
+                    variation_numbers = await asyncio.to_thread(_initial_variations, session)
+                    with _temp_media(styled_bytes, ".jpg") as styled_frame_path:
+                        submissions = await veo.submit_reel_variations_async(
+                            styled_frame_path=styled_frame_path,
+                            style_brief=style_brief,
+                            video_type=post.video_type,
+                            max_operations=free_slots,
+                            variation_numbers=variation_numbers,
+                            tier=RenderTier.DRAFT,
+                        )
+                    await asyncio.to_thread(_track_veo_jobs, session, run, post, submissions, chat_id, VEO_RESUME_PIPELINE)
+                except Exception as exc:
+                    await asyncio.to_thread(_finish_run, session, run, exc)
+                    raise
+                # The Veo sweep re-runs this pipeline once the renders finish; checkpoints skip to Step 5.
+                return
 
             # ── Step 5: Caption (Reel mode) ──
-            with stage_run(session, post_id, JobStage.CAPTION, brand_id):
-                caption_package = captioner.generate_caption(
-                    styled_image_url=post.styled_image or "",
-                    style_brief=style_brief,
-                    product_info=_build_product_info(post),
-                    is_reel=True,
-                )
-                post.caption = caption_package.caption
-                post.hashtags = caption_package.hashtags
-                post.alt_text = caption_package.alt_text
-                if hasattr(caption_package, "thumb_offset_ms"):
-                    post.thumb_offset_ms = caption_package.thumb_offset_ms
-                post.status = PostStatus.REVIEW_READY.value
-                session.commit()
+            fingerprint = input_fingerprint(post.styled_image, post.style_brief, _build_product_info(post), True)
+            if not await checkpoints.try_skip_async(JobStage.CAPTION, fingerprint, ready=bool(post.caption)):
+                async with stage_run_async(session, post_id, JobStage.CAPTION, brand_id, input_fingerprint=fingerprint):
+                    caption_package = await captioner.generate_caption_async(
+                        styled_image_url=post.styled_image or "",
+                        style_brief=style_brief,
+                        product_info=_build_product_info(post),
+                        is_reel=True,
+                        styled_image_bytes=start_frame_bytes,
+                    )
+                    post.caption = caption_package.caption
+                    post.hashtags = caption_package.hashtags
+                    post.alt_text = caption_package.alt_text
+                    if hasattr(caption_package, "thumb_offset_ms"):
+                        post.thumb_offset_ms = caption_package.thumb_offset_ms
+                    await asyncio.to_thread(session.commit)
+            post.status = PostStatus.REVIEW_READY.value
+            await asyncio.to_thread(session.commit)
 
             # ── Step 6: Send for Review ──
-            with stage_run(session, post_id, JobStage.REVIEW, brand_id):
-                video_jobs = (
-                    session.query(VideoJob)
-                    .filter(VideoJob.brand_id == brand_id, VideoJob.post_id == post_id, VideoJob.status == "done")
-                    .order_by(VideoJob.variation_number.asc())
-                    .all()
-                )
-                video_review_urls = [j.video_url for j in video_jobs if j.video_url]
-                send_video_review_package(
-                    brand_id=brand_id,
-                    chat_id=chat_id,
-                    post_id=post.id,
-                    video_urls=video_review_urls,
-                    start_frame_url=post.start_frame_url or "",
-                    caption=post.caption or "",
-                    hashtags=post.hashtags or "",
-                )
+            async with stage_run_async(session, post_id, JobStage.REVIEW, brand_id):
+                payload = await asyncio.to_thread(_video_review_payload, session, post)
+                await asyncio.to_thread(send_video_review_package, chat_id=chat_id, **payload)
 
             logger.info("video_generation_pipeline_complete", post_id=post_id)
         except PipelineError as exc:
             post.status = PostStatus.FAILED.value
             post.error_code = exc.error_code
             post.error_message = str(exc)
-            session.commit()
-            send_text(brand_id, chat_id, exc.user_message)
+            await asyncio.to_thread(session.commit)
+            await asyncio.to_thread(send_text, brand_id, chat_id, exc.user_message)
             logger.warning("video_pipeline_error", post_id=post_id, error_code=exc.error_code, error=str(exc))
         except Exception as exc:
             post.status = PostStatus.FAILED.value
             post.error_code = "internal_error"
             post.error_message = str(exc)
-            session.commit()
-            send_text(brand_id, chat_id, "Something unexpected happened with video generation. Please retry.")
+            await asyncio.to_thread(session.commit)
+            await asyncio.to_thread(
+                send_text, brand_id, chat_id, "Something unexpected happened with video generation. Please retry."
+            )
             logger.exception("video_pipeline_unhandled_error", post_id=post_id, error=str(exc))
 
 
-def run_reel_this_conversion(post_id: int, chat_id: int, brand_id: int | None = None) -> None:
-    """Convert an already-styled image post into a Reel (skip Steps 1-3, start from Veo)."""
+def run_reel_this_conversion(post_id: int, chat_id: int, brand_id: int | None = None, resume: bool = False) -> None:
+    """Convert an already-styled image post into a Reel (skip Steps 1-3, start from Veo).
+
+    The first call submits the Veo renders; the Veo sweep calls it again with ``resume``
+    once they finish, and the checkpoint then carries on with caption and review. Every
+    other call (a new "reel this", Redo) renders fresh clips.
+    """
     veo = VeoGenerator()
-    video_validator = ProductValidator(threshold=0.7)
-    storage = R2StorageClient()
 
     with SessionLocal() as session:
         post = session.get(Post, post_id)
@@ -639,76 +1440,38 @@ def run_reel_this_conversion(post_id: int, chat_id: int, brand_id: int | None =
         post.status = PostStatus.PROCESSING.value
         session.commit()
 
+        checkpoints = StageCheckpoints(
+            session, post_id, brand_id, [JobStage.VIDEO_GENERATE], from_stage=None if resume else JobStage.VIDEO_GENERATE
+        )
         try:
+            # Veo animates the styled image, so start it from the final render rather than the review draft.
+            variant = _selected_variant(session, post)
+            if variant is not None and variant.render_tier == RenderTier.DRAFT.value:
+                _finalize_variant(session, post, variant)
+
             style_brief = StyleBrief.model_validate(post.style_brief or {})
             style_brief.composition.aspect_ratio = "9:16"
 
-            with stage_run(session, post_id, JobStage.VIDEO_GENERATE, brand_id):
-                import tempfile
-                from pathlib import Path
-
-                styled_bytes = _fetch_bytes(post.styled_image)
-                tmp_paths: list[str] = []
+            fingerprint = input_fingerprint(post.styled_image, post.video_type, style_brief.model_dump())
+            has_videos = _has_rendered_videos(session, post_id)
+            if not checkpoints.try_skip(JobStage.VIDEO_GENERATE, fingerprint, ready=has_videos):
+                post.start_frame_url = post.styled_image
+                run = _start_run(session, post_id, JobStage.VIDEO_GENERATE, brand_id, input_fingerprint=fingerprint)
                 try:
-                    with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as tf:
-                        tf.write(styled_bytes)
-                        styled_frame_path = tf.name
-                    tmp_paths.append(styled_frame_path)
-
-                    post.start_frame_url = post.styled_image
-
-                    video_paths = veo.generate_reel_variations(
-                        styled_frame_path=styled_frame_path,
-                        style_brief=style_brief,
-                        video_type=post.video_type,
-                    )
-                    tmp_paths.extend(video_paths)
-
-                    video_urls: list[str] = []
-                    for idx, video_path in enumerate(video_paths, start=1):
-                        try:
-                            first_frame = extract_first_frame(video_path)
-                            is_valid_video, video_ssim = video_validator.verify_preserved(styled_bytes, first_frame)
-                            if not is_valid_video:
-                                logger.warning(
-                                    "video_first_frame_ssim_low",
-                                    post_id=post_id,
-                                    variation=idx,
-                                    ssim_score=round(video_ssim, 4),
-                                    threshold=video_validator.threshold,
-                                )
-                        except Exception as exc:
-                            logger.warning(
-                                "video_first_frame_check_skipped",
-                                post_id=post_id,
-                                variation=idx,
-                                error=str(exc),
-                            )
-
-                        video_bytes = Path(video_path).read_bytes()
-                        video_key = f"reels/{post.id}/reelthis_{idx}_{uuid.uuid4().hex[:6]}.mp4"
-                        video_s3_url = storage.upload_bytes(video_key, video_bytes, content_type="video/mp4")
-                        video_urls.append(video_s3_url)
-                        session.add(VideoJob(
-                            brand_id=brand_id,
-                            post_id=post_id,
-                            variation_number=idx,
-                            video_url=video_s3_url,
-                            status="done",
-                        ))
-
-                    if not video_urls:
-                        raise VideoQualityError("No usable video variation passed the first-frame quality check.")
-
-                    post.video_url = video_urls[0]
-                    post.video_duration = 8
-                    session.commit()
-                finally:
-                    for path in tmp_paths:
-                        try:
-                            Path(path).unlink(missing_ok=True)
-                        except Exception:
-                            logger.warning("tmp_cleanup_failed", path=path)
+                    with _temp_media(_fetch_bytes(post.styled_image), ".jpg") as styled_frame_path:
+                        submissions = veo.submit_reel_variations(
+                            styled_frame_path=styled_frame_path,
+                            style_brief=style_brief,
+                            video_type=post.video_type,
+                            max_operations=_veo_free_slots(session, brand_id),
+                            variation_numbers=_initial_variations(session),
+                            tier=RenderTier.DRAFT,
+                        )
+                    _track_veo_jobs(session, run, post, submissions, chat_id, VEO_RESUME_REEL_THIS)
+                except Exception as exc:
+                    _finish_run(session, run, exc)
+                    raise
+                return
 
             with stage_run(session, post_id, JobStage.CAPTION, brand_id):
                 caption_package = captioner.generate_caption(
@@ -725,22 +1488,7 @@ def run_reel_this_conversion(post_id: int, chat_id: int, brand_id: int | None =
                 post.status = PostStatus.REVIEW_READY.value
                 session.commit()
 
-            video_jobs = (
-                session.query(VideoJob)
-                .filter(VideoJob.brand_id == brand_id, VideoJob.post_id == post_id, VideoJob.status == "done")
-                .order_by(VideoJob.variation_number.asc())
-                .all()
-            )
-            video_review_urls = [j.video_url for j in video_jobs if j.video_url]
-            send_video_review_package(
-                brand_id=brand_id,
-                chat_id=chat_id,
-                post_id=post.id,
-                video_urls=video_review_urls,
-                start_frame_url=post.start_frame_url or "",
-                caption=post.caption or "",
-                hashtags=post.hashtags or "",
-            )
+            send_video_review_package(chat_id=chat_id, **_video_review_payload(session, post))
 
             send_text(brand_id, chat_id, "Reel is ready for review!")
         except PipelineError as exc:
@@ -755,9 +1503,8 @@ def run_reel_this_conversion(post_id: int, chat_id: int, brand_id: int | None =
 
 
 def run_video_extension(post_id: int, chat_id: int, video_variation: int = 1, brand_id: int | None = None) -> None:
-    """Extend a selected video by 8 more seconds."""
+    """Submit an 8-second extension of a selected video; the Veo sweep delivers the result."""
     veo = VeoGenerator()
-    storage = R2StorageClient()
 
     with SessionLocal() as session:
         post = session.get(Post, post_id)
@@ -769,42 +1516,591 @@ def run_video_extension(post_id: int, chat_id: int, video_variation: int = 1, br
 
         video_job = (
             session.query(VideoJob)
-            .filter(VideoJob.brand_id == brand_id, VideoJob.post_id == post_id, VideoJob.variation_number == video_variation)
+            .filter(
+                VideoJob.brand_id == brand_id,
+                VideoJob.post_id == post_id,
+                VideoJob.variation_number == video_variation,
+                # Superseded, failed and queued rows of the same variation are never the clip on review.
+                VideoJob.status.in_(("done", "extended", VIDEO_JOB_GENERATING)),
+            )
+            .order_by(VideoJob.id.desc())
             .first()
         )
         if not video_job or not video_job.video_url:
             send_text(brand_id, chat_id, "No video found to extend.")
             return
+        if video_job.status == VIDEO_JOB_GENERATING:
+            send_text(brand_id, chat_id, "This video is already being extended.")
+            return
+        if video_job.render_tier == RenderTier.DRAFT.value:
+            # An extension keeps the draft's first 8 seconds, and a draft cannot be posted.
+            send_text(brand_id, chat_id, "This is a draft preview. Reply 'approve' to render the final clip, then 'extend' it.")
+            return
 
         send_text(brand_id, chat_id, "Extending video by 8 seconds. This will take ~3 minutes...")
 
+        run = _start_run(session, post_id, JobStage.VIDEO_EXTEND, brand_id)
         try:
-            with stage_run(session, post_id, JobStage.VIDEO_EXTEND, brand_id):
-                import tempfile
-                video_bytes = _fetch_bytes(video_job.video_url)
-                with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as tf:
-                    tf.write(video_bytes)
-                    original_path = tf.name
-
-                style_brief = StyleBrief.model_validate(post.style_brief or {})
-                continuation_prompt = veo.build_video_prompt(style_brief, post.video_type)
-
-                extended_path = veo.extend_reel(original_path, continuation_prompt)
-
-                from pathlib import Path
-                extended_bytes = Path(extended_path).read_bytes()
-                ext_key = f"reels/{post.id}/extended_{video_variation}_{uuid.uuid4().hex[:6]}.mp4"
-                ext_url = storage.upload_bytes(ext_key, extended_bytes, content_type="video/mp4")
-
-                video_job.video_url = ext_url
-                video_job.status = "extended"
-                post.video_url = ext_url
-                post.video_duration = (post.video_duration or 8) + 8
-                session.commit()
+            style_brief = StyleBrief.model_validate(post.style_brief or {})
+            continuation_prompt = veo.build_video_prompt(style_brief, post.video_type)
+            with _downloaded_media(video_job.video_url, ".mp4") as original_path:
+                operation_name = veo.submit_extension(original_path, continuation_prompt)
+
+            run.details_json = {
+                "chat_id": chat_id,
+                "resume": VEO_RESUME_EXTENSION,
+                "video_job_ids": [video_job.id],
+                "previous_status": video_job.status,
+            }
+            video_job.veo_operation_id = operation_name
+            video_job.status = VIDEO_JOB_GENERATING
+            session.commit()
+        except Exception as exc:
+            _finish_run(session, run, exc)
+            if isinstance(exc, PipelineError):
+                send_text(brand_id, chat_id, exc.user_message)
+            else:
+                send_text(brand_id, chat_id, "Video extension failed. You can still post the original clip.")
+                logger.exception("video_extension_error", post_id=post_id, error=str(exc))
 
-            send_text(brand_id, chat_id, f"Extended to {post.video_duration}s. Reply 'approve' to post, or 'extend' for more.")
-        except PipelineError as exc:
-            send_text(brand_id, chat_id, exc.user_message)
+
+def run_reel_variation(post_id: int, chat_id: int, brand_id: int | None = None) -> None:
+    """Submit the next Reel variation the post has not rendered; the Veo sweep sends it for review."""
+    veo = VeoGenerator()
+
+    with SessionLocal() as session:
+        post = session.get(Post, post_id)
+        if not post:
+            return
+        brand_id = post.brand_id if brand_id is None else brand_id
+        if post.brand_id != brand_id:
+            return
+        start_frame = post.start_frame_url or post.styled_image
+        if post.media_type != "reel" or not start_frame:
+            send_text(brand_id, chat_id, "There is no Reel to render another option for yet.")
+            return
+        remaining = _remaining_variations(session, post_id)
+        if not remaining:
+            send_text(brand_id, chat_id, "Every Reel option is already rendered or on its way.")
+            return
+
+        run = _start_run(
+            session, post_id, JobStage.VIDEO_GENERATE, brand_id, input_fingerprint=_latest_video_fingerprint(session, post_id)
+        )
+        try:
+            style_brief = StyleBrief.model_validate(post.style_brief or {})
+            style_brief.composition.aspect_ratio = "9:16"
+            with _temp_media(_fetch_bytes(start_frame), ".jpg") as styled_frame_path:
+                submissions = veo.submit_reel_variations(
+                    styled_frame_path=styled_frame_path,
+                    style_brief=style_brief,
+                    video_type=post.video_type,
+                    max_operations=_veo_free_slots(session, brand_id),
+                    variation_numbers=remaining[:1],
+                    tier=RenderTier.DRAFT,
+                )
+            _track_veo_jobs(session, run, post, submissions, chat_id, VEO_RESUME_VARIATION)
         except Exception as exc:
-            send_text(brand_id, chat_id, "Video extension failed. You can still post the original clip.")
-            logger.exception("video_extension_error", post_id=post_id, error=str(exc))
+            _finish_run(session, run, exc)
+            if isinstance(exc, PipelineError):
+                send_text(brand_id, chat_id, exc.user_message)
+            else:
+                send_text(brand_id, chat_id, "Couldn't start another option. You can still use the current one.")
+                logger.exception("reel_variation_error", post_id=post_id, error=str(exc))
+
+
+def _submit_final_reel(session, post: Post, chat_id: int, publish_as: str | None = None) -> bool:
+    """Start the final-quality render of the selected draft clip; False when it already is final.
+
+    The ``VideoJob`` is re-rendered in place with its prompt and seed, and keeps
+    serving its draft until the Veo sweep swaps in the final clip. With ``publish_as``
+    the sweep publishes the post once that render lands, including a render an
+    earlier approve already started. An extension of a draft cannot be re-rendered
+    that way and raises ``DraftReelError`` instead of being posted at draft quality.
+    """
+    pending_run = None
+    if publish_as is not None:
+        # Lock the in-flight run before the job, the order the Veo sweep takes them in.
+        pending_run = (
+            session.query(JobRun)
+            .filter(
+                JobRun.post_id == post.id,
+                JobRun.stage == JobStage.VIDEO_GENERATE.value,
+                JobRun.status == JobStatus.STARTED.value,
+            )
+            .order_by(JobRun.id.desc())
+            .with_for_update()
+            .first()
+        )
+    job = (
+        session.query(VideoJob)
+        .filter(
+            VideoJob.brand_id == post.brand_id,
+            VideoJob.post_id == post.id,
+            VideoJob.variation_number == (post.selected_variant_index or 1),
+            VideoJob.status.in_(("done", "extended", VIDEO_JOB_GENERATING)),
+        )
+        .order_by(VideoJob.id.desc())
+        .with_for_update()
+        .first()
+    )
+    if job is None or job.render_tier != RenderTier.DRAFT.value:
+        session.rollback()
+        return False
+    if job.status == "extended":
+        session.rollback()
+        raise DraftReelError(f"Variation {job.variation_number} of post {post.id} extends a draft clip")
+    if job.status == VIDEO_JOB_GENERATING:
+        details = (pending_run.details_json or {}) if pending_run is not None else {}
+        if details.get("resume") == VEO_RESUME_FINAL and job.id in details.get("video_job_ids", []):
+            pending_run.details_json = {**details, "publish_as": publish_as}
+            session.commit()
+        else:
+            session.rollback()
+        return True
+
+    veo = VeoGenerator()
+    seed = (job.render_spec or {}).get("seed")
+    previous_status = job.status
+    # Claimed before the row lock is released, so a concurrent approve or publish sees it in progress.
+    job.status = VIDEO_JOB_GENERATING
+    run = _start_run(
+        session, post.id, JobStage.VIDEO_GENERATE, post.brand_id, input_fingerprint=_latest_video_fingerprint(session, post.id)
+    )
+    try:
+        with _temp_media(_fetch_bytes(post.start_frame_url or post.styled_image or ""), ".jpg") as styled_frame_path:
+            job.veo_operation_id = veo.submit_reel(
+                styled_frame_path=styled_frame_path,
+                video_prompt=job.prompt_used or "",
+                tier=RenderTier.FINAL,
+                seed=seed,
+            )
+    except Exception as exc:
+        job.status = previous_status
+        _finish_run(session, run, exc)
+        raise
+    details = {
+        "chat_id": chat_id,
+        "resume": VEO_RESUME_FINAL,
+        "video_job_ids": [job.id],
+        "previous_status": previous_status,
+        "render_spec": veo.render_spec(RenderTier.FINAL, seed),
+    }
+    if publish_as is not None:
+        details["publish_as"] = publish_as
+    run.details_json = details
+    session.commit()
+    logger.info("veo_final_render_submitted", post_id=post.id, variation=job.variation_number, publish=publish_as is not None)
+    return True
+
+
+# ── Veo operation sweep ────────────────────────────────────────────────────
+
+@contextmanager
+def _temp_media(data: bytes, suffix: str):
+    with tempfile.NamedTemporaryFile(suffix=suffix) as tf:
+        tf.write(data)
+        tf.flush()
+        yield tf.name
+
+
+@contextmanager
+def _downloaded_media(url: str, suffix: str):
+    # Streams to disk instead of through memory; meant for clips, where _temp_media would buffer the whole file.
+    with tempfile.NamedTemporaryFile(suffix=suffix) as tf:
+        download_media(url, tf.name)
+        yield tf.name
+
+
+def _latest_video_fingerprint(session, post_id: int) -> str | None:
+    # Renders that add to an earlier VIDEO_GENERATE reuse its fingerprint so checkpoints still skip it.
+    latest = (
+        session.query(JobRun.input_fingerprint)
+        .filter(
+            JobRun.post_id == post_id,
+            JobRun.stage == JobStage.VIDEO_GENERATE.value,
+            JobRun.status.in_((JobStatus.SUCCEEDED.value, JobStatus.SKIPPED.value)),
+        )
+        .order_by(JobRun.id.desc())
+        .first()
+    )
+    return latest[0] if latest else None
+
+
+def _veo_in_flight(session, brand_id: int | None = None, statuses: tuple[str, ...] = (VIDEO_JOB_GENERATING,)) -> int:
+    query = session.query(func.count(VideoJob.id)).filter(VideoJob.status.in_(statuses))
+    if brand_id is not None:
+        query = query.filter(VideoJob.brand_id == brand_id)
+    return query.scalar() or 0
+
+
+def _has_rendered_videos(session, post_id: int) -> bool:
+    return (
+        session.query(VideoJob.id)
+        .filter(VideoJob.post_id == post_id, VideoJob.status == "done", VideoJob.video_url.is_not(None))
+        .first()
+        is not None
+    )
+
+
+def _veo_free_slots(session, brand_id: int) -> int:
+    """Operations this brand may still start under VEO_BRAND_MAX_CONCURRENT_OPERATIONS (a soft cap)."""
+    return max(0, get_settings().veo_brand_max_concurrent_operations - _veo_in_flight(session, brand_id))
+
+
+def _initial_variations(session) -> list[int]:
+    """Variation numbers to render before review; all of them while the Veo queue is quiet."""
+    settings = get_settings()
+    total = VeoGenerator.variation_count()
+    count = max(1, min(total, settings.veo_initial_variations))
+    if count < total and (
+        _veo_in_flight(session, statuses=(VIDEO_JOB_GENERATING, VIDEO_JOB_QUEUED)) < settings.veo_prewarm_below_in_flight
+    ):
+        count = total
+    return list(range(1, count + 1))
+
+
+def _remaining_variations(session, post_id: int) -> list[int]:
+    """Variation numbers this post has not rendered, or started rendering, yet."""
+    taken = {
+        number
+        for (number,) in session.query(VideoJob.variation_number).filter(
+            VideoJob.post_id == post_id,
+            VideoJob.status.in_(("done", "extended", VIDEO_JOB_GENERATING, VIDEO_JOB_QUEUED)),
+        )
+    }
+    return [number for number in range(1, VeoGenerator.variation_count() + 1) if number not in taken]
+
+
+def _video_review_payload(session, post: Post) -> dict:
+    """Keyword arguments for ``send_video_review_package`` covering every rendered variation."""
+    video_jobs = (
+        session.query(VideoJob)
+        .filter(VideoJob.brand_id == post.brand_id, VideoJob.post_id == post.id, VideoJob.status == "done")
+        .order_by(VideoJob.variation_number.asc())
+        .all()
+    )
+    return {
+        "brand_id": post.brand_id,
+        "post_id": post.id,
+        "video_urls": [job.video_url for job in video_jobs if job.video_url],
+        "start_frame_url": post.start_frame_url or "",
+        "caption": post.caption or "",
+        "hashtags": post.hashtags or "",
+        "can_show_another": bool(_remaining_variations(session, post.id)),
+    }
+
+
+def _track_veo_jobs(
+    session, run: JobRun, post: Post, submissions: list[VeoSubmission], chat_id: int, resume: str
+) -> None:
+    """Persist submitted operations; ``run`` stays started until the Veo sweep collects them."""
+    if resume in (VEO_RESUME_PIPELINE, VEO_RESUME_REEL_THIS):
+        # A fresh render replaces whatever an earlier run left for review.
+        session.query(VideoJob).filter(
+            VideoJob.post_id == post.id, VideoJob.status.in_(("done", "extended", "failed"))
+        ).update({VideoJob.status: VIDEO_JOB_SUPERSEDED}, synchronize_session=False)
+    jobs = [
+        VideoJob(
+            brand_id=post.brand_id,
+            post_id=post.id,
+            variation_number=submission.variation_number,
+            veo_operation_id=submission.operation_name,
+            prompt_used=submission.prompt,
+            status=VIDEO_JOB_GENERATING if submission.operation_name else VIDEO_JOB_QUEUED,
+            render_tier=submission.render_tier,
+            render_spec=submission.render_spec,
+        )
+        for submission in submissions
+    ]
+    session.add_all(jobs)
+    session.flush()
+    run.details_json = {"chat_id": chat_id, "resume": resume, "video_job_ids": [job.id for job in jobs]}
+    session.commit()
+    logger.info(
+        "veo_operations_pending",
+        post_id=post.id,
+        submitted=sum(1 for job in jobs if job.status == VIDEO_JOB_GENERATING),
+        queued=sum(1 for job in jobs if job.status == VIDEO_JOB_QUEUED),
+        resume=resume,
+    )
+
+
+def _seconds_since(started_at: datetime | str) -> int:
+    if isinstance(started_at, str):
+        started_at = datetime.fromisoformat(started_at)
+    if started_at.tzinfo is None:
+        started_at = started_at.replace(tzinfo=timezone.utc)
+    return int((datetime.now(timezone.utc) - started_at).total_seconds())
+
+
+def _collect_veo_outputs(
+    session, run: JobRun, jobs: list[VideoJob], veo: VeoGenerator, failures: list[str]
+) -> dict[int, tuple[VideoJob, str]]:
+    """Poll each generating job once; return finished downloads keyed by variation number."""
+    max_duration = get_settings().veo_max_poll_duration_seconds
+    submitted_at = run.details_json.get("submitted_at", {})
+    extension = run.details_json.get("resume") == VEO_RESUME_EXTENSION
+    finished: dict[int, tuple[VideoJob, str]] = {}
+    for job in jobs:
+        if job.status != VIDEO_JOB_GENERATING:
+            continue
+        # Queued jobs start their clock when the sweep submits them.
+        elapsed = _seconds_since(submitted_at.get(str(job.id)) or run.started_at)
+        timed_out = elapsed >= max_duration
+        try:
+            path = veo.check_operation(job.veo_operation_id or "", output_prefix="veo_extended" if extension else "veo_output")
+            if path is None and timed_out:
+                raise VeoTimeoutError(f"Veo generation timed out after {elapsed}s")
+        except (VeoGenerationError, VeoTimeoutError) as exc:
+            path = None
+            failures.append(f"[variation {job.variation_number}] {exc}")
+            job.status = run.details_json.get("previous_status", "failed")
+            logger.warning("veo_operation_failed", post_id=job.post_id, variation=job.variation_number, error=str(exc))
+        except Exception as exc:
+            path = None
+            if not timed_out:
+                # Transient poll errors are retried by the next sweep until the deadline.
+                logger.warning("veo_operation_poll_failed", post_id=job.post_id, variation=job.variation_number, error=str(exc))
+            else:
+                # Past the deadline a poll that keeps failing (expired operation, auth, download) fails the job.
+                failures.append(f"[variation {job.variation_number}] Veo polling failed after {elapsed}s: {exc}")
+                job.status = run.details_json.get("previous_status", "failed")
+                logger.warning("veo_operation_failed", post_id=job.post_id, variation=job.variation_number, error=str(exc))
+        if path is not None:
+            job.generation_time_seconds = elapsed
+            finished[job.variation_number] = (job, path)
+    return finished
+
+
+def _submit_queued_jobs(
+    session, run: JobRun, post: Post, jobs: list[VideoJob], veo: VeoGenerator, failures: list[str]
+) -> None:
+    queued = [job for job in jobs if job.status == VIDEO_JOB_QUEUED]
+    free = _veo_free_slots(session, post.brand_id) if queued else 0
+    if not free:
+        return
+
+    details = dict(run.details_json)
+    submitted_at = dict(details.get("submitted_at", {}))
+    # Submits that fail for other reasons than Veo rejecting them (rate limits, network, a
+    # purged start frame) are retried by later sweeps until the poll deadline has passed
+    # since their first failure; time spent waiting for a slot does not count.
+    submit_failed_at = dict(details.get("submit_failed_at", {}))
+    max_duration = get_settings().veo_max_poll_duration_seconds
+    batch = queued[:free]
+
+    def _retry_or_fail(job: VideoJob, exc: Exception) -> None:
+        first_failure = submit_failed_at.setdefault(str(job.id), datetime.now(timezone.utc).isoformat())
+        elapsed = _seconds_since(first_failure)
+        if elapsed < max_duration:
+            logger.warning("veo_queued_submit_failed", post_id=post.id, variation=job.variation_number, error=str(exc))
+            return
+        job.status = "failed"
+        failures.append(f"[variation {job.variation_number}] Veo submit failed for {elapsed}s: {exc}")
+        logger.warning("veo_variation_failed", post_id=post.id, variation=job.variation_number, error=str(exc))
+
+    try:
+        start_frame = _fetch_bytes(post.start_frame_url or post.styled_image or "")
+    except Exception as exc:
+        for job in batch:
+            _retry_or_fail(job, exc)
+    else:
+        with _temp_media(start_frame, ".jpg") as styled_frame_path:
+            for job in batch:
+                try:
+                    job.veo_operation_id = veo.submit_reel(
+                        styled_frame_path=styled_frame_path,
+                        video_prompt=job.prompt_used or "",
+                        tier=RenderTier(job.render_tier),
+                        seed=(job.render_spec or {}).get("seed"),
+                    )
+                    job.status = VIDEO_JOB_GENERATING
+                    submitted_at[str(job.id)] = datetime.now(timezone.utc).isoformat()
+                except (VeoGenerationError, VeoTimeoutError) as exc:
+                    job.status = "failed"
+                    failures.append(f"[variation {job.variation_number}] {exc}")
+                    logger.warning("veo_variation_failed", post_id=post.id, variation=job.variation_number, error=str(exc))
+                except Exception as exc:
+                    _retry_or_fail(job, exc)
+    details["submitted_at"] = submitted_at
+    details["submit_failed_at"] = submit_failed_at
+    run.details_json = details
+    session.flush()
+    logger.info(
+        "veo_queued_operations_submitted",
+        post_id=post.id,
+        submitted=sum(1 for job in batch if job.status == VIDEO_JOB_GENERATING),
+    )
+
+
+def _notify(send: Callable[[], None]) -> None:
+    """Send a Telegram message for a run the sweep has already committed; a send error is only logged."""
+    try:
+        send()
+    except Exception as exc:
+        logger.warning("veo_sweep_notify_failed", error=str(exc))
+
+
+def _sweep_veo_run(
+    session, run: JobRun, veo: VeoGenerator, storage: R2StorageClient, notices: list[Callable[[], None]]
+) -> VeoResume | None:
+    """Collect one run's finished renders and decide whether its pipeline resumes.
+
+    Nothing is committed here; the caller commits the decision. It holds ``run``
+    locked, and committing earlier would let an overlapping sweep poll the same
+    operations and enqueue a second resume. Telegram messages are appended to
+    ``notices`` for the caller to send once that commit has succeeded, so a failed
+    commit never tells the reviewer about a state that rolled back.
+    """
+    details = run.details_json or {}
+    kind = details["resume"]
+    chat_id = details["chat_id"]
+    post = session.get(Post, run.post_id)
+    jobs = (
+        session.query(VideoJob)
+        .filter(VideoJob.id.in_(details["video_job_ids"]))
+        .order_by(VideoJob.variation_number.asc())
+        .all()
+    )
+
+    failures: list[str] = []
+    finished = _collect_veo_outputs(session, run, jobs, veo, failures)
+    try:
+        if finished and kind != VEO_RESUME_EXTENSION:
+            try:
+                styled_bytes = _fetch_bytes(post.start_frame_url or post.styled_image or "")
+                _check_video_first_frames(
+                    ProductValidator(threshold=FIRST_FRAME_THRESHOLD),
+                    styled_bytes,
+                    {number: path for number, (_job, path) in finished.items()},
+                    post.id,
+                )
+            except Exception as exc:
+                logger.warning("video_first_frame_check_skipped", post_id=post.id, error=str(exc))
+
+        for number, (job, path) in finished.items():
+            job.video_url = storage.upload_file_content_addressed("reels", path, content_type="video/mp4")
+            job.status = "extended" if kind == VEO_RESUME_EXTENSION else "done"
+            job.completed_at = datetime.now(timezone.utc)
+            if kind == VEO_RESUME_FINAL:
+                job.render_tier = RenderTier.FINAL.value
+                job.render_spec = details.get("render_spec")
+    finally:
+        for _job, path in finished.values():
+            Path(path).unlink(missing_ok=True)
+    # No commit until the resume decision: committing releases the sweep's row lock on ``run``.
+    session.flush()
+
+    _submit_queued_jobs(session, run, post, jobs, veo, failures)
+    if any(job.status in (VIDEO_JOB_GENERATING, VIDEO_JOB_QUEUED) for job in jobs):
+        return None
+
+    if kind == VEO_RESUME_EXTENSION:
+        job = jobs[0]
+        if job.status == "extended":
+            post.video_url = job.video_url
+            post.video_duration = (post.video_duration or 8) + 8
+            _finish_run(session, run, commit=False)
+            notices.append(
+                partial(
+                    send_text,
+                    post.brand_id,
+                    chat_id,
+                    f"Extended to {post.video_duration}s. Reply 'approve' to post, or 'extend' for more.",
+                )
+            )
+        else:
+            _finish_run(session, run, VeoGenerationError(" | ".join(failures) or "Veo extension failed"), commit=False)
+            notices.append(partial(send_text, post.brand_id, chat_id, "Video extension failed. You can still post the original clip."))
+        return None
+
+    if kind == VEO_RESUME_FINAL:
+        job = jobs[0]
+        if job.render_tier == RenderTier.FINAL.value:
+            if (post.selected_variant_index or 1) == job.variation_number:
+                post.video_url = job.video_url
+            _finish_run(session, run, commit=False)
+            publish_as = details.get("publish_as")
+            if publish_as:
+                resume = VeoResume(kind=kind, post_id=post.id, chat_id=chat_id, brand_id=post.brand_id, publish_as=publish_as)
+                notices.append(partial(send_text, post.brand_id, chat_id, "The final Reel is ready. Posting it now."))
+                return resume
+            notices.append(partial(send_text, post.brand_id, chat_id, "The final Reel is ready. Reply 'post now' to publish."))
+        else:
+            _finish_run(session, run, VeoGenerationError(" | ".join(failures) or "Veo final render failed"), commit=False)
+            notices.append(partial(send_text, post.brand_id, chat_id, "Couldn't render the final Reel. Reply 'approve' to try again."))
+        return None
+
+    rendered = [job for job in jobs if job.status == "done" and job.video_url]
+    if kind == VEO_RESUME_VARIATION:
+        if rendered:
+            _finish_run(session, run, commit=False)
+            notices.append(partial(send_video_review_package, chat_id=chat_id, **_video_review_payload(session, post)))
+        else:
+            _finish_run(session, run, VeoGenerationError(" | ".join(failures) or "Veo variation failed"), commit=False)
+            notices.append(partial(send_text, post.brand_id, chat_id, "Couldn't render another option. You can still use the current one."))
+        return None
+
+    if not rendered:
+        exc = VeoGenerationError(f"No video variation was successfully generated. Failure details: {' | '.join(failures)}")
+        post.status = PostStatus.FAILED.value
+        post.error_code = exc.error_code
+        post.error_message = str(exc)
+        _finish_run(session, run, exc, commit=False)
+        notices.append(partial(send_text, post.brand_id, chat_id, exc.user_message))
+        return None
+
+    post.video_url = rendered[0].video_url
+    post.video_duration = 8
+    _finish_run(session, run, commit=False)
+    logger.info("veo_operations_complete", post_id=post.id, rendered=len(rendered), failed=len(failures))
+    return VeoResume(kind=kind, post_id=post.id, chat_id=chat_id, brand_id=post.brand_id)
+
+
+def run_veo_sweep() -> list[VeoResume]:
+    """Poll every in-flight Veo operation once.
+
+    Finished renders are uploaded and attached to their ``VideoJob``. Runs whose
+    operations have all finished are closed; the ones with at least one video are
+    returned so the caller can re-enqueue their pipeline, as are final renders a
+    publish is waiting for.
+    """
+    with SessionLocal() as session:
+        run_ids = [
+            run_id
+            for (run_id,) in session.query(JobRun.id)
+            .filter(JobRun.stage.in_(_VEO_STAGES), JobRun.status == JobStatus.STARTED.value)
+            .order_by(JobRun.id.asc())
+            .all()
+        ]
+    if not run_ids:
+        return []
+
+    veo = VeoGenerator()
+    storage = R2StorageClient()
+    resumes: list[VeoResume] = []
+    for run_id in run_ids:
+        with SessionLocal() as session:
+            # Overlapping sweeps skip runs another worker is already collecting.
+            run = (
+                session.query(JobRun)
+                .filter(JobRun.id == run_id, JobRun.status == JobStatus.STARTED.value)
+                .with_for_update(skip_locked=True)
+                .first()
+            )
+            if run is None or "video_job_ids" not in (run.details_json or {}):
+                continue
+            notices: list[Callable[[], None]] = []
+            try:
+                resume = _sweep_veo_run(session, run, veo, storage, notices)
+                session.commit()
+            except Exception as exc:
+                session.rollback()
+                logger.exception("veo_sweep_run_failed", run_id=run_id, error=str(exc))
+                continue
+            for notice in notices:
+                _notify(notice)
+            if resume is not None:
+                resumes.append(resume)
+    return resumes
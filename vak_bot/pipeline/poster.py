@@ -6,10 +6,14 @@ import structlog
 from vak_bot.config import get_settings
 from vak_bot.db.session import SessionLocal
 from vak_bot.pipeline.errors import PublishCredentialsError, PublishError
+from vak_bot.pipeline.http_clients import get_client
 from vak_bot.services.credentials_service import resolve_meta_credentials
 
 logger = structlog.get_logger(__name__)
 
+# Meta fetches the video from our bucket while the container request is open.
+_REEL_REQUEST_TIMEOUT_SECONDS = 120.0
+
 
 class MetaGraphPoster:
     def __init__(self, brand_id: int | None = None) -> None:
@@ -73,33 +77,33 @@ class MetaGraphPoster:
 
         try:
             ig_user_id = self._ig_user_id()
-            with httpx.Client(timeout=60.0) as client:
-                create_resp = client.post(
-                    f"{self._base}/{ig_user_id}/media",
-                    params=self._params(),
-                    data={
-                        "image_url": image_url,
-                        "caption": caption,
-                        "alt_text": alt_text,
-                    },
-                )
-                create_resp.raise_for_status()
-                container_id = create_resp.json()["id"]
+            client = get_client("meta")
+            create_resp = client.post(
+                f"{self._base}/{ig_user_id}/media",
+                params=self._params(),
+                data={
+                    "image_url": image_url,
+                    "caption": caption,
+                    "alt_text": alt_text,
+                },
+            )
+            create_resp.raise_for_status()
+            container_id = create_resp.json()["id"]
 
-                publish_resp = client.post(
-                    f"{self._base}/{ig_user_id}/media_publish",
-                    params=self._params(),
-                    data={"creation_id": container_id},
-                )
-                publish_resp.raise_for_status()
-                media_id = publish_resp.json()["id"]
+            publish_resp = client.post(
+                f"{self._base}/{ig_user_id}/media_publish",
+                params=self._params(),
+                data={"creation_id": container_id},
+            )
+            publish_resp.raise_for_status()
+            media_id = publish_resp.json()["id"]
 
-                permalink_resp = client.get(
-                    f"{self._base}/{media_id}",
-                    params={**self._params(), "fields": "permalink"},
-                )
-                permalink_resp.raise_for_status()
-                permalink = permalink_resp.json().get("permalink", "")
+            permalink_resp = client.get(
+                f"{self._base}/{media_id}",
+                params={**self._params(), "fields": "permalink"},
+            )
+            permalink_resp.raise_for_status()
+            permalink = permalink_resp.json().get("permalink", "")
 
             return {"id": media_id, "permalink": permalink}
         except httpx.HTTPStatusError as exc:
@@ -125,44 +129,44 @@ class MetaGraphPoster:
         try:
             children_ids: list[str] = []
             ig_user_id = self._ig_user_id()
-            with httpx.Client(timeout=60.0) as client:
-                for idx, image_url in enumerate(image_urls, start=1):
-                    logger.info("meta_carousel_child_create", position=idx, total=len(image_urls), brand_id=self.brand_id)
-                    media_resp = client.post(
-                        f"{self._base}/{ig_user_id}/media",
-                        params=self._params(),
-                        data={"image_url": image_url, "is_carousel_item": "true"},
-                    )
-                    media_resp.raise_for_status()
-                    children_ids.append(media_resp.json()["id"])
-
-                logger.info("meta_carousel_container_create", children_count=len(children_ids), brand_id=self.brand_id)
-                carousel_resp = client.post(
+            client = get_client("meta")
+            for idx, image_url in enumerate(image_urls, start=1):
+                logger.info("meta_carousel_child_create", position=idx, total=len(image_urls), brand_id=self.brand_id)
+                media_resp = client.post(
                     f"{self._base}/{ig_user_id}/media",
                     params=self._params(),
-                    data={
-                        "media_type": "CAROUSEL",
-                        "children": ",".join(children_ids),
-                        "caption": caption,
-                    },
+                    data={"image_url": image_url, "is_carousel_item": "true"},
                 )
-                carousel_resp.raise_for_status()
-                container_id = carousel_resp.json()["id"]
+                media_resp.raise_for_status()
+                children_ids.append(media_resp.json()["id"])
+
+            logger.info("meta_carousel_container_create", children_count=len(children_ids), brand_id=self.brand_id)
+            carousel_resp = client.post(
+                f"{self._base}/{ig_user_id}/media",
+                params=self._params(),
+                data={
+                    "media_type": "CAROUSEL",
+                    "children": ",".join(children_ids),
+                    "caption": caption,
+                },
+            )
+            carousel_resp.raise_for_status()
+            container_id = carousel_resp.json()["id"]
 
-                publish_resp = client.post(
-                    f"{self._base}/{ig_user_id}/media_publish",
-                    params=self._params(),
-                    data={"creation_id": container_id},
-                )
-                publish_resp.raise_for_status()
-                media_id = publish_resp.json()["id"]
+            publish_resp = client.post(
+                f"{self._base}/{ig_user_id}/media_publish",
+                params=self._params(),
+                data={"creation_id": container_id},
+            )
+            publish_resp.raise_for_status()
+            media_id = publish_resp.json()["id"]
 
-                permalink_resp = client.get(
-                    f"{self._base}/{media_id}",
-                    params={**self._params(), "fields": "permalink"},
-                )
-                permalink_resp.raise_for_status()
-                permalink = permalink_resp.json().get("permalink", "")
+            permalink_resp = client.get(
+                f"{self._base}/{media_id}",
+                params={**self._params(), "fields": "permalink"},
+            )
+            permalink_resp.raise_for_status()
+            permalink = permalink_resp.json().get("permalink", "")
 
             return {"id": media_id, "permalink": permalink}
         except httpx.HTTPStatusError as exc:
@@ -195,52 +199,53 @@ class MetaGraphPoster:
         ig_user_id = self._ig_user_id()
 
         try:
-            with httpx.Client(timeout=120.0) as client:
-                container_resp = client.post(
-                    f"{self._base}/{ig_user_id}/media",
-                    params=self._params(),
-                    data={
-                        "media_type": "REELS",
-                        "video_url": video_s3_url,
-                        "caption": caption,
-                        "share_to_feed": str(share_to_feed).lower(),
-                        "thumb_offset": str(thumb_offset_ms),
-                    },
-                )
-                container_resp.raise_for_status()
-                container_id = container_resp.json()["id"]
-
-                import time
-
-                max_retries = 30
-                for _ in range(max_retries):
-                    status_resp = client.get(
-                        f"{self._base}/{container_id}",
-                        params={**self._params(), "fields": "status_code"},
-                    )
-                    status_resp.raise_for_status()
-                    status = status_resp.json().get("status_code")
-
-                    if status == "FINISHED":
-                        break
-                    if status == "ERROR":
-                        raise PublishError("Instagram video processing failed")
-                    time.sleep(10)
-
-                publish_resp = client.post(
-                    f"{self._base}/{ig_user_id}/media_publish",
-                    params=self._params(),
-                    data={"creation_id": container_id},
-                )
-                publish_resp.raise_for_status()
-                media_id = publish_resp.json()["id"]
+            client = get_client("meta")
+            container_resp = client.post(
+                f"{self._base}/{ig_user_id}/media",
+                params=self._params(),
+                timeout=_REEL_REQUEST_TIMEOUT_SECONDS,
+                data={
+                    "media_type": "REELS",
+                    "video_url": video_s3_url,
+                    "caption": caption,
+                    "share_to_feed": str(share_to_feed).lower(),
+                    "thumb_offset": str(thumb_offset_ms),
+                },
+            )
+            container_resp.raise_for_status()
+            container_id = container_resp.json()["id"]
+
+            import time
 
-                permalink_resp = client.get(
-                    f"{self._base}/{media_id}",
-                    params={**self._params(), "fields": "permalink"},
+            max_retries = 30
+            for _ in range(max_retries):
+                status_resp = client.get(
+                    f"{self._base}/{container_id}",
+                    params={**self._params(), "fields": "status_code"},
                 )
-                permalink_resp.raise_for_status()
-                permalink = permalink_resp.json().get("permalink", "")
+                status_resp.raise_for_status()
+                status = status_resp.json().get("status_code")
+
+                if status == "FINISHED":
+                    break
+                if status == "ERROR":
+                    raise PublishError("Instagram video processing failed")
+                time.sleep(10)
+
+            publish_resp = client.post(
+                f"{self._base}/{ig_user_id}/media_publish",
+                params=self._params(),
+                data={"creation_id": container_id},
+            )
+            publish_resp.raise_for_status()
+            media_id = publish_resp.json()["id"]
+
+            permalink_resp = client.get(
+                f"{self._base}/{media_id}",
+                params={**self._params(), "fields": "permalink"},
+            )
+            permalink_resp.raise_for_status()
+            permalink = permalink_resp.json().get("permalink", "")
 
             return {"id": media_id, "permalink": permalink}
         except httpx.HTTPStatusError as exc:
@@ -265,17 +270,18 @@ class MetaGraphPoster:
             raise PublishCredentialsError("Missing META_PAGE_ACCESS_TOKEN")
 
         try:
-            with httpx.Client(timeout=30.0) as client:
-                response = client.get(
-                    f"{self._base}/oauth/access_token",
-                    params={
-                        "grant_type": "fb_exchange_token",
-                        "client_id": resolved["meta_app_id"],
-                        "client_secret": resolved["meta_app_secret"],
-                        "fb_exchange_token": resolved["meta_page_access_token"],
-                    },
-                )
-                response.raise_for_status()
-                return response.json()
+            client = get_client("meta")
+            response = client.get(
+                f"{self._base}/oauth/access_token",
+                timeout=30.0,
+                params={
+                    "grant_type": "fb_exchange_token",
+                    "client_id": resolved["meta_app_id"],
+                    "client_secret": resolved["meta_app_secret"],
+                    "fb_exchange_token": resolved["meta_page_access_token"],
+                },
+            )
+            response.raise_for_status()
+            return response.json()
         except Exception as exc:
             raise PublishError(str(exc)) from exc
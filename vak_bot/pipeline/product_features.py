@@ -0,0 +1,84 @@
+"""Cache of validator reference features for product photos, shared across posts."""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Callable
+
+import structlog
+
+from vak_bot.config import get_settings
+from vak_bot.pipeline.product_validator import ProductValidator, ReferenceFeatures
+from vak_bot.services.cache_store import CacheStore
+
+logger = structlog.get_logger(__name__)
+
+_store: CacheStore | None = None
+
+
+def _cache() -> CacheStore:
+    global _store
+    if _store is None:
+        _store = CacheStore("product-features")
+    return _store
+
+
+def _features_key(content_hash: str, validator: ProductValidator) -> str:
+    width, height = validator.size
+    return f"sha:{content_hash}:{width}x{height}:w{validator.window}"
+
+
+def _url_key(photo_url: str) -> str:
+    return f"url:{hashlib.sha256(photo_url.encode('utf-8')).hexdigest()}"
+
+
+def _load(key: str) -> ReferenceFeatures | None:
+    raw = _cache().get(key)
+    if raw is None:
+        return None
+    try:
+        return ReferenceFeatures.from_bytes(raw)
+    except Exception as exc:
+        logger.warning("product_features_corrupt", key=key, error=str(exc))
+        _cache().delete(key)
+        return None
+
+
+def product_reference(
+    photo_url: str,
+    validator: ProductValidator,
+    fetch: Callable[[str], bytes],
+    source_bytes: bytes | None = None,
+) -> ReferenceFeatures:
+    """Return validator features for a product photo, computing them at most once per photo content.
+
+    The photo URL points at a content hash, so a catalog photo is neither downloaded
+    nor decoded again while any recent post has used it. That pointer expires quickly
+    because a photo can be overwritten in place; the features stay cached per content
+    hash for much longer. When the caller already holds the photo bytes they are
+    hashed directly and the URL pointer is only refreshed.
+    """
+    settings = get_settings()
+    ttl = settings.product_feature_cache_ttl_seconds
+    url_key = _url_key(photo_url)
+
+    if source_bytes is None:
+        pointer = _cache().get(url_key)
+        if pointer is not None:
+            features = _load(_features_key(pointer.decode("ascii"), validator))
+            if features is not None:
+                logger.info("product_features_cache_hit", photo_url=photo_url)
+                return features
+        source_bytes = fetch(photo_url)
+
+    content_hash = hashlib.sha256(source_bytes).hexdigest()
+    features_key = _features_key(content_hash, validator)
+    features = _load(features_key)
+    if features is None:
+        features = validator.prepare_reference(source_bytes)
+        _cache().set(features_key, features.to_bytes(), ttl_seconds=ttl)
+        logger.info("product_features_computed", photo_url=photo_url, content_hash=content_hash[:12])
+    else:
+        logger.info("product_features_cache_hit", photo_url=photo_url)
+    _cache().set(url_key, content_hash.encode("ascii"), ttl_seconds=settings.product_feature_url_ttl_seconds)
+    return features
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import copy
+import hashlib
 import json
 from functools import lru_cache
 from pathlib import Path
@@ -352,6 +353,34 @@ def load_video_analysis_prompt(brand_id: int | None = None) -> str:
     return _render_prompt(_load_video_analysis_prompt_base(), brand_id)
 
 
+def load_full_analysis_prompt(brand_id: int | None = None, is_video: bool = False) -> str:
+    prompt = load_analysis_prompt(brand_id)
+    if is_video:
+        video_addon = load_video_analysis_prompt(brand_id)
+        if video_addon:
+            prompt = f"{prompt}\n\n{video_addon}"
+    return prompt
+
+
+def load_analysis_brand_context(brand_id: int | None = None) -> dict[str, Any]:
+    """The brand config excerpt sent alongside the analysis prompt."""
+    brand_cfg = load_brand_config(brand_id)
+    return {
+        "brand": brand_cfg.get("brand", {}),
+        "visual_identity": brand_cfg.get("visual_identity", {}),
+        "display_styles": brand_cfg.get("display_styles", {}),
+        "product_vocabulary": brand_cfg.get("product_vocabulary", {}),
+        "variation_modifiers": brand_cfg.get("variation_modifiers", [])[:3],
+    }
+
+
+def analysis_prompt_version(brand_id: int | None = None, is_video: bool = False) -> str:
+    """Short hash of the brand-rendered analysis prompt and brand context, i.e. everything brand-specific the analyzer sends."""
+    prompt = load_full_analysis_prompt(brand_id, is_video)
+    context = json.dumps(load_analysis_brand_context(brand_id), sort_keys=True, default=str)
+    return hashlib.sha256(f"{prompt}\n\n{context}".encode("utf-8")).hexdigest()[:12]
+
+
 @lru_cache(maxsize=1)
 def _load_veo_prompt_base() -> str:
     path = PROMPTS_DIR / "veo_video_prompt.txt"
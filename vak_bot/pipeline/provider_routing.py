@@ -0,0 +1,161 @@
+"""Shared health table for provider routes, so fallbacks learned by one worker help every other.
+
+A route is one way of calling a provider, e.g. ``gemini-3-pro-image-preview:snake``.
+Each attempt records success or its error class and latency. Counts decay with a
+half-life, so a route that failed an hour ago gets another chance. Entries live in
+the shared ``CacheStore`` (Redis, then local disk) and are updated atomically there,
+so concurrent workers never overwrite each other's counts. They are mirrored in
+process, which keeps routing working when neither is reachable.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from dataclasses import asdict, dataclass
+
+import httpx
+import structlog
+
+from vak_bot.config import get_settings
+from vak_bot.services.cache_store import CacheStore
+
+logger = structlog.get_logger(__name__)
+
+# A route below this health is tried only after every healthier one. One unanswered
+# failure puts a route below it for about one half-life; one success offsets one failure.
+_UNHEALTHY_BELOW = 0.4
+_LATENCY_ALPHA = 0.3
+# Shared entries are re-read at most this often per process.
+_LOCAL_READ_SECONDS = 5.0
+_ENTRY_TTL_SECONDS = 7 * 24 * 3600
+
+
+@dataclass
+class RouteHealth:
+    successes: float = 0.0
+    failures: float = 0.0
+    latency_ms: float | None = None
+    last_error: str | None = None
+    updated_at: float = 0.0
+
+    def decayed(self, now: float, half_life: float) -> RouteHealth:
+        if not self.updated_at or half_life <= 0:
+            return RouteHealth(self.successes, self.failures, self.latency_ms, self.last_error, now)
+        factor = 0.5 ** (max(0.0, now - self.updated_at) / half_life)
+        return RouteHealth(self.successes * factor, self.failures * factor, self.latency_ms, self.last_error, now)
+
+    @property
+    def score(self) -> float:
+        # Laplace-smoothed success rate: an unknown route scores 0.5, i.e. healthy until proven otherwise.
+        return (self.successes + 1) / (self.successes + self.failures + 2)
+
+
+def error_class(exc: BaseException) -> str:
+    if isinstance(exc, httpx.HTTPStatusError) and exc.response is not None:
+        return f"http_{exc.response.status_code}"
+    if isinstance(exc, httpx.TimeoutException):
+        return "timeout"
+    return type(exc).__name__
+
+
+class RoutingTable:
+    def __init__(self, store: CacheStore | None = None, half_life_seconds: float | None = None) -> None:
+        self._store = store or CacheStore("provider-routing")
+        self._half_life = (
+            get_settings().provider_routing_half_life_seconds if half_life_seconds is None else half_life_seconds
+        )
+        self._lock = threading.Lock()
+        self._local: dict[str, tuple[RouteHealth, float]] = {}
+
+    @staticmethod
+    def _key(provider: str, route: str) -> str:
+        return f"{provider}:{route}"
+
+    @staticmethod
+    def _parse(raw: bytes | None) -> RouteHealth | None:
+        if raw is None:
+            return None
+        try:
+            return RouteHealth(**json.loads(raw))
+        except (ValueError, TypeError):
+            return None
+
+    def health(self, provider: str, route: str) -> RouteHealth:
+        key = self._key(provider, route)
+        now = time.time()
+        with self._lock:
+            local = self._local.get(key)
+        if local is not None and now - local[1] < _LOCAL_READ_SECONDS:
+            return local[0].decayed(now, self._half_life)
+
+        entry = self._parse(self._store.get(key))
+        if entry is not None:
+            with self._lock:
+                self._local[key] = (entry, now)
+            return entry.decayed(now, self._half_life)
+        # Nothing shared (or the store is unreachable): fall back to what this process has seen.
+        return local[0].decayed(now, self._half_life) if local is not None else RouteHealth(updated_at=now)
+
+    def record(
+        self, provider: str, route: str, ok: bool, latency_ms: float, error: BaseException | None = None
+    ) -> None:
+        key = self._key(provider, route)
+        now = time.time()
+        with self._lock:
+            local = self._local.get(key)
+
+        def _apply(raw: bytes | None) -> bytes:
+            # Counted against the shared entry as it is now, never against the local mirror,
+            # so another worker's update since our last read is kept.
+            entry = self._parse(raw) or (local[0] if local is not None else RouteHealth(updated_at=now))
+            entry = entry.decayed(now, self._half_life)
+            if ok:
+                entry.successes += 1
+            else:
+                entry.failures += 1
+                entry.last_error = error_class(error) if error is not None else "error"
+            entry.latency_ms = (
+                latency_ms
+                if entry.latency_ms is None
+                else _LATENCY_ALPHA * latency_ms + (1 - _LATENCY_ALPHA) * entry.latency_ms
+            )
+            return json.dumps(asdict(entry)).encode("utf-8")
+
+        entry = self._parse(self._store.update(key, _apply, ttl_seconds=_ENTRY_TTL_SECONDS))
+        if entry is not None:
+            with self._lock:
+                self._local[key] = (entry, now)
+
+    def order(self, provider: str, routes: list[str]) -> list[str]:
+        """``routes`` in preference order, with unhealthy ones moved behind every healthy one.
+
+        Healthy routes keep the caller's order, so a fallback model is never preferred
+        just for being faster; unhealthy ones are sorted by health, then latency.
+        """
+        health = {route: self.health(provider, route) for route in routes}
+        healthy = [route for route in routes if health[route].score >= _UNHEALTHY_BELOW]
+        unhealthy = sorted(
+            (route for route in routes if health[route].score < _UNHEALTHY_BELOW),
+            key=lambda route: (-health[route].score, health[route].latency_ms or 0.0),
+        )
+        if unhealthy:
+            logger.info(
+                "provider_routes_demoted",
+                provider=provider,
+                routes={route: {"score": round(health[route].score, 3), "last_error": health[route].last_error} for route in unhealthy},
+            )
+        return healthy + unhealthy
+
+
+_table_lock = threading.Lock()
+_table: RoutingTable | None = None
+
+
+def get_routing_table() -> RoutingTable:
+    global _table
+    with _table_lock:
+        if _table is None:
+            _table = RoutingTable()
+        return _table
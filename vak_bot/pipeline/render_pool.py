@@ -0,0 +1,171 @@
+"""Bounded-concurrency execution of (variant, carousel position) render jobs."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import weakref
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Awaitable, Callable, TypeVar
+
+import structlog
+
+from vak_bot.config import get_settings
+
+logger = structlog.get_logger(__name__)
+
+T = TypeVar("T")
+
+_SLOT_POLL_SECONDS = 0.25
+
+# Slots are per worker process: every Celery pipeline process gets its own caps.
+_slots_lock = threading.Lock()
+_global_slots: threading.BoundedSemaphore | None = None
+_brand_slots: dict[int | None, threading.BoundedSemaphore] = {}
+# Async renders share the process's pipeline event loop, so their caps live with that loop.
+_async_slots: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, tuple[asyncio.Semaphore, dict[int | None, asyncio.Semaphore]]
+] = weakref.WeakKeyDictionary()
+
+
+@dataclass(frozen=True)
+class RenderJob:
+    variant_index: int
+    position: int
+
+
+class RenderCancelled(Exception):
+    """Raised for a queued job when a sibling job already failed."""
+
+
+def _global_semaphore() -> threading.BoundedSemaphore:
+    global _global_slots
+    with _slots_lock:
+        if _global_slots is None:
+            _global_slots = threading.BoundedSemaphore(max(1, get_settings().gemini_max_concurrent_renders))
+        return _global_slots
+
+
+def _brand_semaphore(brand_id: int | None) -> threading.BoundedSemaphore:
+    with _slots_lock:
+        semaphore = _brand_slots.get(brand_id)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(max(1, get_settings().gemini_brand_max_concurrent_renders))
+            _brand_slots[brand_id] = semaphore
+        return semaphore
+
+
+def _acquire(semaphore: threading.BoundedSemaphore, cancelled: threading.Event) -> bool:
+    while not cancelled.is_set():
+        if semaphore.acquire(timeout=_SLOT_POLL_SECONDS):
+            return True
+    return False
+
+
+def render_jobs(jobs: list[RenderJob], render: Callable[[RenderJob], T], brand_id: int | None = None) -> list[T]:
+    """Run ``render`` for every job under the global and per-brand concurrency caps.
+
+    Results are returned in the order of ``jobs``. The first failure cancels every
+    job that has not started rendering yet and is re-raised to the caller.
+    """
+    if not jobs:
+        return []
+
+    settings = get_settings()
+    cancelled = threading.Event()
+    global_slots = _global_semaphore()
+    brand_slots = _brand_semaphore(brand_id)
+
+    def _run(job: RenderJob) -> T:
+        # Take the brand slot first so a queued brand never sits on a global slot.
+        if not _acquire(brand_slots, cancelled):
+            raise RenderCancelled(f"variant {job.variant_index} position {job.position} cancelled")
+        try:
+            if not _acquire(global_slots, cancelled):
+                raise RenderCancelled(f"variant {job.variant_index} position {job.position} cancelled")
+            try:
+                return render(job)
+            finally:
+                global_slots.release()
+        finally:
+            brand_slots.release()
+
+    max_workers = min(len(jobs), max(1, settings.gemini_brand_max_concurrent_renders))
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gemini-render")
+    try:
+        futures = [executor.submit(_run, job) for job in jobs]
+        done, _pending = wait(futures, return_when=FIRST_EXCEPTION)
+        failed = [
+            (job, future)
+            for job, future in zip(jobs, futures)
+            if future in done and not future.cancelled() and future.exception() is not None
+        ]
+        if failed:
+            cancelled.set()
+            for future in futures:
+                future.cancel()
+            job, future = failed[0]
+            logger.warning(
+                "render_jobs_cancelled",
+                brand_id=brand_id,
+                failed_variant=job.variant_index,
+                failed_position=job.position,
+                total_jobs=len(jobs),
+                error=str(future.exception()),
+            )
+            raise future.exception()  # type: ignore[misc]
+        return [future.result() for future in futures]
+    finally:
+        # In-flight provider calls cannot be interrupted; let them finish in the background.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _async_semaphores(brand_id: int | None) -> tuple[asyncio.Semaphore, asyncio.Semaphore]:
+    loop = asyncio.get_running_loop()
+    settings = get_settings()
+    with _slots_lock:
+        slots = _async_slots.get(loop)
+        if slots is None:
+            slots = (asyncio.Semaphore(max(1, settings.gemini_max_concurrent_renders)), {})
+            _async_slots[loop] = slots
+        global_slots, brand_slots = slots
+        if brand_id not in brand_slots:
+            brand_slots[brand_id] = asyncio.Semaphore(max(1, settings.gemini_brand_max_concurrent_renders))
+        return global_slots, brand_slots[brand_id]
+
+
+async def render_jobs_async(
+    jobs: list[RenderJob], render: Callable[[RenderJob], Awaitable[T]], brand_id: int | None = None
+) -> list[T]:
+    """Async counterpart of ``render_jobs`` with the same caps, ordering and fail-fast behaviour."""
+    if not jobs:
+        return []
+
+    global_slots, brand_slots = _async_semaphores(brand_id)
+
+    async def _run(job: RenderJob) -> T:
+        # Take the brand slot first so a queued brand never sits on a global slot.
+        async with brand_slots:
+            async with global_slots:
+                return await render(job)
+
+    tasks = [asyncio.ensure_future(_run(job)) for job in jobs]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except Exception as exc:
+        for task in tasks:
+            task.cancel()
+        job = next(
+            (job for job, task in zip(jobs, tasks) if task.done() and not task.cancelled() and task.exception() is exc),
+            None,
+        )
+        logger.warning(
+            "render_jobs_cancelled",
+            brand_id=brand_id,
+            failed_variant=job.variant_index if job else None,
+            failed_position=job.position if job else None,
+            total_jobs=len(jobs),
+            error=str(exc),
+        )
+        raise
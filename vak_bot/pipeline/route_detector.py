@@ -55,6 +55,33 @@ def detect_media_type(url: str) -> str:
     return "unknown"
 
 
+def canonical_reference_key(url: str) -> str:
+    """
+    Stable identity for a reference post, independent of tracking params and URL variants.
+
+    Instagram posts/reels map to ``instagram:<shortcode>`` and Pinterest pins to
+    ``pinterest:<pin id>``; anything else falls back to the normalized URL.
+    """
+    parsed = urlparse(url.strip())
+    netloc = (parsed.netloc or "").lower()
+    if netloc.startswith("www."):
+        netloc = netloc[4:]
+    segments = [segment for segment in parsed.path.split("/") if segment]
+
+    if netloc.endswith("instagram.com"):
+        for idx, segment in enumerate(segments[:-1]):
+            if segment.lower() in {"p", "reel", "reels", "tv"}:
+                return f"instagram:{segments[idx + 1]}"
+
+    if "pinterest." in netloc:
+        for idx, segment in enumerate(segments[:-1]):
+            if segment.lower() == "pin":
+                return f"pinterest:{segments[idx + 1]}"
+
+    path = "/".join(segments)
+    return f"url:{netloc}/{path}"
+
+
 def detect_user_override(text: str | None) -> str | None:
     """
     Check if user message text contains an explicit media-type override.
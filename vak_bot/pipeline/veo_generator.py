@@ -1,15 +1,23 @@
-"""Veo 3.1 video generation — image-to-video, scene extension, prompt building."""
+"""Veo 3.1 video generation — image-to-video, scene extension, prompt building.
+
+Renders take minutes, so submission and completion are separate calls: callers
+persist the operation name and poll it later with ``check_operation``.
+"""
 
 from __future__ import annotations
 
-import time as _time
+import asyncio
+import secrets
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import structlog
 
 from vak_bot.config import get_settings
+from vak_bot.enums import RenderTier
 from vak_bot.pipeline.errors import VeoGenerationError, VeoTimeoutError
+from vak_bot.pipeline.interfaces import VeoSubmission
 from vak_bot.schemas import StyleBrief
 
 try:
@@ -60,7 +68,10 @@ VIDEO_TYPE_PROMPTS: dict[str, str] = {
     ),
 }
 
-# Variation modifiers — currently generate a single output variation.
+# Operation names handed out in dry-run mode; they complete on the first check.
+DRY_RUN_OPERATION_PREFIX = "dryrun/"
+
+# Variation modifiers, numbered from 1. Reels render the first up front; the others on request.
 VIDEO_VARIATION_MODIFIERS: list[str] = [
     "Use slow, gentle camera movement. Dreamy and meditative pacing.",
     "Use cleaner editorial pacing with slightly stronger contrast and framing.",
@@ -166,31 +177,15 @@ CRITICAL RULES:
             raise VeoGenerationError("Veo response did not include downloadable video content")
         return video
 
-    def generate_reel_from_styled_image(
+    def _video_request(
         self,
         styled_frame_path: str,
         video_prompt: str,
-        reference_images: list[str] | None = None,
-        aspect_ratio: str | None = None,
-        resolution: str | None = None,
-    ) -> str:
-        """
-        Generate a video using Veo 3.1 from a styled product image.
-
-        Returns: path to the generated MP4 file.
-        """
-        aspect_ratio = aspect_ratio or self.settings.veo_default_aspect_ratio
-        resolution = resolution or self.settings.veo_default_resolution
-
-        if self.settings.dry_run:
-            dummy_path = f"/tmp/veo_dryrun_{uuid.uuid4().hex[:8]}.mp4"
-            Path(dummy_path).write_bytes(b"\x00" * 1024)
-            logger.info("veo_dry_run", output=dummy_path)
-            return dummy_path
-
-        if not self._client:
-            raise VeoGenerationError("Veo client not initialised (missing GOOGLE_API_KEY)")
-
+        aspect_ratio: str,
+        resolution: str,
+        model: str,
+        seed: int | None,
+    ) -> dict:
         import mimetypes
 
         mime_type, _ = mimetypes.guess_type(styled_frame_path)
@@ -204,120 +199,243 @@ CRITICAL RULES:
         config = genai_types.GenerateVideosConfig(
             aspect_ratio=aspect_ratio,
             resolution=resolution,
+            seed=seed,
         )
+        return {
+            "model": model,
+            "prompt": video_prompt,
+            "image": start_frame,
+            "config": config,
+        }
+
+    def _dry_run_output(self, prefix: str = "veo_dryrun") -> str:
+        dummy_path = f"/tmp/{prefix}_{uuid.uuid4().hex[:8]}.mp4"
+        Path(dummy_path).write_bytes(b"\x00" * 1024)
+        logger.info("veo_dry_run", output=dummy_path)
+        return dummy_path
+
+    def _require_client(self):
+        if not self._client:
+            raise VeoGenerationError("Veo client not initialised (missing GOOGLE_API_KEY)")
+        return self._client
 
-        operation = self._client.models.generate_videos(
-            model=self.settings.veo_model,
-            prompt=video_prompt,
-            image=start_frame,
-            config=config,
-        )
-
-        # Poll until done
-        poll_interval = self.settings.veo_poll_interval_seconds
-        max_duration = self.settings.veo_max_poll_duration_seconds
-        elapsed = 0
-
-        while not operation.done:
-            if elapsed >= max_duration:
-                raise VeoTimeoutError(f"Veo generation timed out after {elapsed}s")
-            _time.sleep(poll_interval)
-            elapsed += poll_interval
-            operation = self._client.operations.get(operation)
-
-        if getattr(operation, "error", None):
-            raise VeoGenerationError(f"Veo generation failed: {operation.error}")
-
-        generated_video = self._extract_generated_video(operation)
-        self._client.files.download(file=generated_video)
-
-        output_path = f"/tmp/veo_output_{uuid.uuid4().hex[:8]}.mp4"
-        generated_video.save(output_path)
+    # ── Submission ─────────────────────────────────────────────────────────
 
-        logger.info("veo_generation_complete", output=output_path, elapsed_seconds=elapsed)
-        return output_path
+    def tier_profile(self, tier: RenderTier) -> tuple[RenderTier, str, str]:
+        """(tier, model, resolution) to render ``tier`` with; drafts fall back to final without a draft model."""
+        draft_model = self.settings.veo_draft_model.strip()
+        if tier == RenderTier.DRAFT and draft_model:
+            return RenderTier.DRAFT, draft_model, self.settings.veo_draft_resolution
+        return RenderTier.FINAL, self.settings.veo_model, self.settings.veo_default_resolution
 
-    # ── Scene Extension ────────────────────────────────────────────────────
+    def render_spec(self, tier: RenderTier, seed: int | None) -> dict:
+        _tier, model, resolution = self.tier_profile(tier)
+        return {"model": model, "resolution": resolution, "seed": seed}
 
-    def extend_reel(self, original_video_path: str, continuation_prompt: str) -> str:
-        """
-        Extend a previously generated Veo video by 8 more seconds.
-        Note: Scene extension is limited to 720p resolution.
-        """
+    def submit_reel(
+        self,
+        styled_frame_path: str,
+        video_prompt: str,
+        aspect_ratio: str | None = None,
+        resolution: str | None = None,
+        tier: RenderTier = RenderTier.FINAL,
+        seed: int | None = None,
+    ) -> str:
+        """Start an image-to-video render and return its operation name without waiting for it."""
         if self.settings.dry_run:
-            dummy_path = f"/tmp/veo_extended_dryrun_{uuid.uuid4().hex[:8]}.mp4"
-            Path(dummy_path).write_bytes(b"\x00" * 2048)
-            return dummy_path
+            return f"{DRY_RUN_OPERATION_PREFIX}{uuid.uuid4().hex}"
+
+        _tier, model, tier_resolution = self.tier_profile(tier)
+        operation = self._require_client().models.generate_videos(
+            **self._video_request(
+                styled_frame_path,
+                video_prompt,
+                aspect_ratio or self.settings.veo_default_aspect_ratio,
+                resolution or tier_resolution,
+                model,
+                seed,
+            )
+        )
+        logger.info("veo_operation_submitted", operation=operation.name)
+        return operation.name
 
-        if not self._client:
-            raise VeoGenerationError("Veo client not initialised")
+    async def submit_reel_async(
+        self,
+        styled_frame_path: str,
+        video_prompt: str,
+        aspect_ratio: str | None = None,
+        resolution: str | None = None,
+        tier: RenderTier = RenderTier.FINAL,
+        seed: int | None = None,
+    ) -> str:
+        if self.settings.dry_run:
+            return f"{DRY_RUN_OPERATION_PREFIX}{uuid.uuid4().hex}"
+
+        _tier, model, tier_resolution = self.tier_profile(tier)
+        request = await asyncio.to_thread(
+            self._video_request,
+            styled_frame_path,
+            video_prompt,
+            aspect_ratio or self.settings.veo_default_aspect_ratio,
+            resolution or tier_resolution,
+            model,
+            seed,
+        )
+        operation = await self._require_client().aio.models.generate_videos(**request)
+        logger.info("veo_operation_submitted", operation=operation.name)
+        return operation.name
 
-        video_file = self._client.files.upload(file=original_video_path)
+    def submit_extension(self, original_video_path: str, continuation_prompt: str) -> str:
+        """Start an 8-second scene extension (limited to 720p) and return its operation name."""
+        if self.settings.dry_run:
+            return f"{DRY_RUN_OPERATION_PREFIX}{uuid.uuid4().hex}"
 
-        operation = self._client.models.generate_videos(
+        client = self._require_client()
+        video_file = client.files.upload(file=original_video_path)
+        operation = client.models.generate_videos(
             model=self.settings.veo_model,
             prompt=continuation_prompt,
             video=video_file,
         )
+        logger.info("veo_extension_submitted", operation=operation.name)
+        return operation.name
 
-        poll_interval = self.settings.veo_poll_interval_seconds
-        max_duration = self.settings.veo_max_poll_duration_seconds
-        elapsed = 0
+    # ── Completion ─────────────────────────────────────────────────────────
 
-        while not operation.done:
-            if elapsed >= max_duration:
-                raise VeoTimeoutError(f"Veo extension timed out after {elapsed}s")
-            _time.sleep(poll_interval)
-            elapsed += poll_interval
-            operation = self._client.operations.get(operation)
+    def check_operation(self, operation_name: str, output_prefix: str = "veo_output") -> str | None:
+        """Poll an operation once: None while it is still running, else the downloaded MP4 path."""
+        if operation_name.startswith(DRY_RUN_OPERATION_PREFIX):
+            return self._dry_run_output(prefix=output_prefix)
 
+        client = self._require_client()
+        operation = client.operations.get(genai_types.GenerateVideosOperation(name=operation_name))
+        if not operation.done:
+            return None
         if getattr(operation, "error", None):
-            raise VeoGenerationError(f"Veo extension failed: {operation.error}")
+            raise VeoGenerationError(f"Veo generation failed: {operation.error}")
 
         generated_video = self._extract_generated_video(operation)
-        self._client.files.download(file=generated_video)
+        client.files.download(file=generated_video)
 
-        output_path = f"/tmp/veo_extended_{uuid.uuid4().hex[:8]}.mp4"
+        output_path = f"/tmp/{output_prefix}_{uuid.uuid4().hex[:8]}.mp4"
         generated_video.save(output_path)
-
-        logger.info("veo_extension_complete", output=output_path, elapsed_seconds=elapsed)
+        logger.info("veo_operation_complete", operation=operation_name, output=output_path)
         return output_path
 
-    # ── Generate 2 Variations ──────────────────────────────────────────────
+    # ── Variations ─────────────────────────────────────────────────────────
 
-    def generate_reel_variations(
-        self,
-        styled_frame_path: str,
-        style_brief: StyleBrief,
-        video_type: str | None = None,
-        reference_image_path: str | None = None,
-    ) -> list[str]:
-        """Generate Reel video variation(s)."""
+    @staticmethod
+    def variation_count() -> int:
+        return len(VIDEO_VARIATION_MODIFIERS)
 
+    def _variation_prompts(
+        self, style_brief: StyleBrief, video_type: str | None, variation_numbers: list[int] | None = None
+    ) -> list[tuple[int, str, str]]:
         base_prompt = self.build_video_prompt(style_brief, video_type)
-        variations: list[str] = []
-        failures: list[str] = []
-
-        for modifier in VIDEO_VARIATION_MODIFIERS:
-            full_prompt = f"{base_prompt}\n\nMOTION STYLE: {modifier}"
+        return [
+            (number, modifier, f"{base_prompt}\n\nMOTION STYLE: {modifier}")
+            for number, modifier in enumerate(VIDEO_VARIATION_MODIFIERS, start=1)
+            if variation_numbers is None or number in variation_numbers
+        ]
 
-            try:
-                result = self.generate_reel_from_styled_image(
-                    styled_frame_path=styled_frame_path,
-                    video_prompt=full_prompt,
-                    reference_images=[reference_image_path] if reference_image_path else None,
+    def _collect_submissions(
+        self,
+        prompts: list[tuple[int, str, str]],
+        results: list[str | BaseException],
+        tier: RenderTier,
+        seeds: dict[int, int],
+    ) -> list[VeoSubmission]:
+        """Pair prompts with submit results; prompts past ``results`` are returned unsubmitted.
+
+        Any failed submit only skips its variation: raising while others were accepted
+        would drop their operation names, leaving billed renders nothing collects.
+        """
+        submissions: list[VeoSubmission] = []
+        failures: list[str] = []
+        unexpected: Exception | None = None
+        for position, (number, modifier, full_prompt) in enumerate(prompts):
+            result = results[position] if position < len(results) else None
+            if isinstance(result, Exception):
+                failures.append(f"[{modifier}] {result}")
+                logger.warning("veo_variation_failed", error=str(result), modifier=modifier)
+                if not isinstance(result, (VeoGenerationError, VeoTimeoutError)):
+                    unexpected = unexpected or result
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                submissions.append(
+                    VeoSubmission(
+                        number,
+                        result,
+                        full_prompt,
+                        render_tier=self.tier_profile(tier)[0].value,
+                        render_spec=self.render_spec(tier, seeds[number]),
+                    )
                 )
-                if result:
-                    variations.append(result)
-            except (VeoGenerationError, VeoTimeoutError) as exc:
-                failures.append(f"[{modifier}] {exc}")
-                logger.warning("veo_variation_failed", error=str(exc), modifier=modifier)
-                continue
-
-        if not variations and failures:
+
+        if not submissions and unexpected is not None:
+            raise unexpected
+        if not submissions and failures:
             raise VeoGenerationError(
                 "No video variation was successfully generated. "
                 f"Failure details: {' | '.join(failures)}"
             )
+        return submissions
+
+    def submit_reel_variations(
+        self,
+        styled_frame_path: str,
+        style_brief: StyleBrief,
+        video_type: str | None = None,
+        max_operations: int | None = None,
+        variation_numbers: list[int] | None = None,
+        tier: RenderTier = RenderTier.FINAL,
+    ) -> list[VeoSubmission]:
+        """Submit Reel variations together; a variation that fails to submit is skipped.
+
+        Only ``variation_numbers`` (1-based) are considered when given. At most
+        ``max_operations`` are submitted; the rest come back with no operation name so
+        the caller can queue them. Every variation gets its own seed, recorded in its
+        ``render_spec`` together with the ``tier`` model and resolution.
+        """
+        prompts = self._variation_prompts(style_brief, video_type, variation_numbers)
+        limit = len(prompts) if max_operations is None else max(0, max_operations)
+        seeds = {number: secrets.randbelow(2**31) for number, _, _ in prompts}
 
-        return variations
+        def _submit(prompt: tuple[int, str, str]) -> str | BaseException:
+            number, _modifier, full_prompt = prompt
+            try:
+                return self.submit_reel(
+                    styled_frame_path=styled_frame_path, video_prompt=full_prompt, tier=tier, seed=seeds[number]
+                )
+            except Exception as exc:
+                return exc
+
+        if limit == 0:
+            return self._collect_submissions(prompts, [], tier, seeds)
+        with ThreadPoolExecutor(max_workers=limit, thread_name_prefix="veo-submit") as pool:
+            results = list(pool.map(_submit, prompts[:limit]))
+        return self._collect_submissions(prompts, results, tier, seeds)
+
+    async def submit_reel_variations_async(
+        self,
+        styled_frame_path: str,
+        style_brief: StyleBrief,
+        video_type: str | None = None,
+        max_operations: int | None = None,
+        variation_numbers: list[int] | None = None,
+        tier: RenderTier = RenderTier.FINAL,
+    ) -> list[VeoSubmission]:
+        prompts = self._variation_prompts(style_brief, video_type, variation_numbers)
+        limit = len(prompts) if max_operations is None else max(0, max_operations)
+        seeds = {number: secrets.randbelow(2**31) for number, _, _ in prompts}
+        results = await asyncio.gather(
+            *(
+                self.submit_reel_async(
+                    styled_frame_path=styled_frame_path, video_prompt=full_prompt, tier=tier, seed=seeds[number]
+                )
+                for number, _, full_prompt in prompts[:limit]
+            ),
+            return_exceptions=True,
+        )
+        return self._collect_submissions(prompts, list(results), tier, seeds)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Literal, Optional, Union
+from typing import Any, Literal, Optional, Union
 
 from pydantic import AliasChoices, BaseModel, Field, field_validator
 
@@ -116,6 +116,11 @@ class StyledVariant(BaseModel):
     item_urls: list[str] = Field(default_factory=list)
     ssim_score: float
     is_valid: bool
+    render_tier: str = "final"
+    render_spec: Optional[dict[str, Any]] = None
+    # In-memory payloads handed from STYLE to validation, caption and review; never serialized.
+    item_bytes: list[bytes] = Field(default_factory=list, exclude=True, repr=False)
+    source_bytes: Optional[bytes] = Field(default=None, exclude=True, repr=False)
 
 
 class ReviewVariant(BaseModel):
@@ -0,0 +1,174 @@
+"""Byte cache shared by pipeline workers: Redis first, local disk as fallback."""
+
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import os
+import struct
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import structlog
+
+from vak_bot.config import get_settings
+
+logger = structlog.get_logger(__name__)
+
+_REDIS_TIMEOUT_SECONDS = 0.5
+_REDIS_RETRY_AFTER_SECONDS = 30.0
+# Disk entries are prefixed with their absolute expiry (0 = never expires).
+_DISK_HEADER = struct.Struct("<d")
+
+
+class CacheStore:
+    """Namespaced get/set of byte blobs with a TTL.
+
+    Redis is used when reachable; on connection errors the store backs off for a
+    short cooldown and serves from a local directory instead, so a Redis outage
+    degrades to per-host caching rather than failing the pipeline.
+    """
+
+    def __init__(self, namespace: str, redis_url: str | None = None, disk_dir: str | None = None) -> None:
+        settings = get_settings()
+        self.namespace = namespace
+        self._redis_url = settings.redis_url if redis_url is None else redis_url
+        self._disk_dir = Path(disk_dir or settings.cache_dir) / namespace
+        self._redis = None
+        self._redis_down_until = 0.0
+        self._lock = threading.Lock()
+
+    def _key(self, key: str) -> str:
+        return f"vak:{self.namespace}:{key}"
+
+    def _client(self):
+        if not self._redis_url or time.monotonic() < self._redis_down_until:
+            return None
+        with self._lock:
+            if self._redis is None:
+                try:
+                    import redis
+                except ImportError:
+                    self._redis_url = ""
+                    return None
+                self._redis = redis.Redis.from_url(
+                    self._redis_url,
+                    socket_timeout=_REDIS_TIMEOUT_SECONDS,
+                    socket_connect_timeout=_REDIS_TIMEOUT_SECONDS,
+                )
+            return self._redis
+
+    def _mark_redis_down(self, exc: Exception) -> None:
+        self._redis_down_until = time.monotonic() + _REDIS_RETRY_AFTER_SECONDS
+        logger.warning("cache_redis_unavailable", namespace=self.namespace, error=str(exc))
+
+    def _disk_path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self._disk_dir / digest[:2] / digest
+
+    def get(self, key: str) -> bytes | None:
+        client = self._client()
+        if client is not None:
+            try:
+                return client.get(self._key(key))
+            except Exception as exc:
+                self._mark_redis_down(exc)
+
+        return self._read_disk(self._disk_path(key))
+
+    @staticmethod
+    def _read_disk(path: Path) -> bytes | None:
+        try:
+            raw = path.read_bytes()
+        except OSError:
+            return None
+        (expires_at,) = _DISK_HEADER.unpack_from(raw)
+        if expires_at and expires_at < time.time():
+            path.unlink(missing_ok=True)
+            return None
+        return raw[_DISK_HEADER.size :]
+
+    def set(self, key: str, value: bytes, ttl_seconds: int | None = None) -> None:
+        client = self._client()
+        if client is not None:
+            try:
+                client.set(self._key(key), value, ex=ttl_seconds or None)
+                return
+            except Exception as exc:
+                self._mark_redis_down(exc)
+
+        self._write_disk(self._disk_path(key), value, ttl_seconds)
+
+    def _write_disk(self, path: Path, value: bytes, ttl_seconds: int | None) -> None:
+        expires_at = time.time() + ttl_seconds if ttl_seconds else 0.0
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(_DISK_HEADER.pack(expires_at) + value)
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            logger.warning("cache_disk_write_failed", namespace=self.namespace, error=str(exc))
+
+    def update(self, key: str, mutate: Callable[[bytes | None], bytes], ttl_seconds: int | None = None) -> bytes:
+        """Replace ``key`` with ``mutate(current)`` atomically and return the new value.
+
+        Concurrent updates from other workers are never lost: Redis reruns ``mutate``
+        under WATCH until nobody else wrote the key in between, and the disk fallback
+        holds a namespace-wide file lock for the read-modify-write.
+        """
+        client = self._client()
+        if client is not None:
+            redis_key = self._key(key)
+
+            def _apply(pipe) -> bytes:
+                value = mutate(pipe.get(redis_key))
+                pipe.multi()
+                pipe.set(redis_key, value, ex=ttl_seconds or None)
+                return value
+
+            try:
+                return client.transaction(_apply, redis_key, value_from_callable=True)
+            except Exception as exc:
+                self._mark_redis_down(exc)
+
+        path = self._disk_path(key)
+        try:
+            self._disk_dir.mkdir(parents=True, exist_ok=True)
+            lock_file = open(self._disk_dir / ".lock", "a")
+        except OSError as exc:
+            logger.warning("cache_disk_lock_failed", namespace=self.namespace, error=str(exc))
+            return mutate(self._read_disk(path))
+        with lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            value = mutate(self._read_disk(path))
+            self._write_disk(path, value, ttl_seconds)
+        return value
+
+    def delete(self, key: str) -> None:
+        client = self._client()
+        if client is not None:
+            try:
+                client.delete(self._key(key))
+            except Exception as exc:
+                self._mark_redis_down(exc)
+        self._disk_path(key).unlink(missing_ok=True)
+
+    def clear(self) -> int:
+        """Drop every entry in this namespace and return how many were removed."""
+        removed = 0
+        client = self._client()
+        if client is not None:
+            try:
+                keys = list(client.scan_iter(match=f"{self._key('')}*", count=500))
+                for start in range(0, len(keys), 500):
+                    removed += client.delete(*keys[start : start + 500])
+            except Exception as exc:
+                self._mark_redis_down(exc)
+
+        if self._disk_dir.exists():
+            for path in self._disk_dir.glob("*/*"):
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
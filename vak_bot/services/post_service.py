@@ -6,7 +6,8 @@ from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from vak_bot.db.models import Post, Product, TelegramSession
-from vak_bot.enums import MediaType, PostStatus, SessionState
+from vak_bot.enums import JobStage, MediaType, PostStatus, SessionState
+from vak_bot.pipeline.checkpoints import analyze_fingerprint, download_fingerprint, record_checkpoint
 
 
 def get_or_create_session(db: Session, brand_id: int, telegram_user_id: int, chat_id: int) -> TelegramSession:
@@ -78,3 +79,25 @@ def create_draft_post(
     db.commit()
     db.refresh(post)
     return post
+
+
+def apply_reference_prefetch(db: Session, post: Post, prefetch: dict) -> None:
+    """Seed a new post with the scrape and analysis done while the user was choosing photos.
+
+    DOWNLOAD and ANALYZE are recorded as checkpoints, so the pipeline starts at STYLE
+    unless the post ends up routed differently from what the prefetch analyzed.
+    """
+    post.reference_image = prefetch.get("reference_image")
+    post.source_image_urls = prefetch.get("source_image_urls")
+    post.source_caption = prefetch.get("source_caption")
+    post.source_hashtags = prefetch.get("source_hashtags")
+    post.style_brief = prefetch.get("style_brief")
+    # Reel prefetches carry the 9:16 brief and video direction the video ANALYZE step would set.
+    if prefetch.get("video_style_brief") is not None:
+        post.video_style_brief = prefetch["video_style_brief"]
+        post.video_type = prefetch.get("video_type")
+
+    details = {"source": "prefetch"}
+    record_checkpoint(db, post, JobStage.DOWNLOAD, download_fingerprint(post), details)
+    is_video = prefetch.get("pipeline_type") == "reel"
+    record_checkpoint(db, post, JobStage.ANALYZE, analyze_fingerprint(post, is_video=is_video), details)
@@ -0,0 +1,39 @@
+"""``media_assets`` rows for everything written to the media bucket."""
+
+from __future__ import annotations
+
+import structlog
+
+from vak_bot.db.models import MediaAsset
+from vak_bot.db.session import SessionLocal
+from vak_bot.storage.media_probe import MediaProbe
+
+logger = structlog.get_logger(__name__)
+
+
+def record_asset(url: str, storage_key: str, probe: MediaProbe) -> None:
+    """Insert or refresh the asset behind ``url``; never fails the upload that triggered it."""
+    try:
+        with SessionLocal() as session:
+            asset = session.query(MediaAsset).filter(MediaAsset.url == url).one_or_none()
+            if asset is None:
+                asset = MediaAsset(url=url)
+                session.add(asset)
+            asset.storage_key = storage_key
+            asset.content_sha256 = probe.content_sha256
+            asset.byte_size = probe.byte_size
+            asset.mime_type = probe.mime_type
+            asset.width = probe.width
+            asset.height = probe.height
+            asset.duration_seconds = probe.duration_seconds
+            asset.codec = probe.codec
+            asset.bitrate = probe.bitrate
+            session.commit()
+    except Exception as exc:
+        logger.warning("media_asset_record_failed", url=url, error=str(exc))
+
+
+def asset_for_url(session, url: str | None) -> MediaAsset | None:
+    if not url:
+        return None
+    return session.query(MediaAsset).filter(MediaAsset.url == url).one_or_none()
@@ -0,0 +1,180 @@
+"""Retention and orphan cleanup for the media bucket.
+
+Content-addressed objects can be shared by several posts, so nothing is deleted
+while any row still points at it. Rows are streamed with ``yield_per`` and objects
+are removed with batched ``DeleteObjects`` requests.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Iterator
+
+import structlog
+from sqlalchemy import delete, null, or_, select, update
+from sqlalchemy.orm import Session
+
+from vak_bot.db.models import MediaAsset, Post, PostVariant, PostVariantItem, ProductPhoto, TelegramSession, VideoJob
+from vak_bot.storage.r2_client import R2StorageClient
+
+logger = structlog.get_logger(__name__)
+
+_YIELD_PER = 500
+# Keeps IN (...) lists well under every database's bound-parameter limit.
+_IN_CHUNK = 500
+
+_URL_COLUMNS = (
+    Post.reference_image,
+    Post.styled_image,
+    Post.video_url,
+    Post.start_frame_url,
+    PostVariant.preview_url,
+    PostVariantItem.image_url,
+    VideoJob.video_url,
+    ProductPhoto.photo_url,
+)
+_URL_LIST_COLUMNS = (Post.source_image_urls, Post.input_photo_urls)
+
+
+@dataclass
+class LifecycleReport:
+    scanned: int = 0
+    deleted: int = 0
+    reclaimed_bytes: int = 0
+    # Candidates left in place because another row still references them.
+    kept_shared: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return {
+            "scanned": self.scanned,
+            "deleted": self.deleted,
+            "reclaimed_bytes": self.reclaimed_bytes,
+            "kept_shared": self.kept_shared,
+        }
+
+
+def _chunks(values: list[str]) -> Iterator[list[str]]:
+    for start in range(0, len(values), _IN_CHUNK):
+        yield values[start : start + _IN_CHUNK]
+
+
+def _referenced_urls(session: Session) -> Iterator[str]:
+    for column in _URL_COLUMNS:
+        stmt = select(column).where(column.is_not(None)).execution_options(yield_per=_YIELD_PER)
+        for url in session.scalars(stmt):
+            yield url
+    for column in _URL_LIST_COLUMNS:
+        stmt = select(column).where(column.is_not(None)).execution_options(yield_per=_YIELD_PER)
+        for urls in session.scalars(stmt):
+            yield from urls or []
+    # Prefetched references live only in the session context until a post is created.
+    stmt = select(TelegramSession.context_json).where(TelegramSession.context_json.is_not(None))
+    for context in session.scalars(stmt.execution_options(yield_per=_YIELD_PER)):
+        prefetch = (context or {}).get("prefetch") or {}
+        if prefetch.get("reference_image"):
+            yield prefetch["reference_image"]
+        yield from prefetch.get("source_image_urls") or []
+
+
+def live_reference_keys(session: Session, storage: R2StorageClient) -> set[str]:
+    """Bucket keys referenced by any post, variant, video job, product photo or pending prefetch."""
+    keys: set[str] = set()
+    for url in _referenced_urls(session):
+        key = storage.key_for_url(url) if isinstance(url, str) else None
+        if key:
+            keys.add(key)
+    return keys
+
+
+def _asset_sizes(session: Session, keys: Iterable[str]) -> dict[str, int]:
+    sizes: dict[str, int] = {}
+    for chunk in _chunks(sorted(keys)):
+        rows = session.execute(select(MediaAsset.storage_key, MediaAsset.byte_size).where(MediaAsset.storage_key.in_(chunk)))
+        sizes.update({key: size for key, size in rows})
+    return sizes
+
+
+def _forget_assets(session: Session, keys: list[str]) -> None:
+    for chunk in _chunks(sorted(keys)):
+        session.execute(delete(MediaAsset).where(MediaAsset.storage_key.in_(chunk)))
+    session.commit()
+
+
+def purge_reference_images(session: Session, storage: R2StorageClient, days: int) -> LifecycleReport:
+    """Drop the mirrored reference images of posts older than ``days``.
+
+    The post columns are cleared either way; the objects themselves are deleted only
+    when no newer post or pending prefetch shares them.
+    """
+    report = LifecycleReport()
+    if storage.settings.dry_run:
+        return report
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    stmt = (
+        select(Post.id, Post.reference_image, Post.source_image_urls)
+        .where(Post.created_at <= cutoff, or_(Post.reference_image.is_not(None), Post.source_image_urls.is_not(None)))
+        .execution_options(yield_per=_YIELD_PER)
+    )
+    post_ids: list[int] = []
+    candidates: set[str] = set()
+    for post_id, reference_image, source_image_urls in session.execute(stmt):
+        post_ids.append(post_id)
+        for url in [reference_image, *(source_image_urls or [])]:
+            key = storage.key_for_url(url) if url else None
+            if key:
+                candidates.add(key)
+    report.scanned = len(post_ids)
+
+    for start in range(0, len(post_ids), _IN_CHUNK):
+        session.execute(
+            update(Post)
+            .where(Post.id.in_(post_ids[start : start + _IN_CHUNK]))
+            .values(reference_image=None, source_image_urls=null())
+        )
+    session.commit()
+
+    shared = candidates & live_reference_keys(session, storage)
+    report.kept_shared = len(shared)
+    orphaned = candidates - shared
+    sizes = _asset_sizes(session, orphaned)
+    deleted = storage.delete_keys(orphaned)
+    _forget_assets(session, deleted)
+    report.deleted = len(deleted)
+    report.reclaimed_bytes = sum(sizes.get(key, 0) for key in deleted)
+    logger.info("reference_images_purged", days=days, **report.as_dict())
+    return report
+
+
+def sweep_orphans(
+    session: Session, storage: R2StorageClient, prefixes: list[str], grace: timedelta
+) -> LifecycleReport:
+    """Delete objects under ``prefixes`` that no row references, e.g. renders left behind by a redo.
+
+    Objects younger than ``grace`` are kept: an upload lands in the bucket before the
+    row that references it is committed, and a content-addressed upload that finds its
+    object already stored rewrites it in place, so a reused object counts as new too.
+    The bucket is listed before the reference snapshot is taken, so a row committed
+    during the listing still protects its object.
+    """
+    report = LifecycleReport()
+    if storage.settings.dry_run:
+        return report
+
+    cutoff = datetime.now(timezone.utc) - grace
+    candidates: dict[str, int] = {}
+    for prefix in prefixes:
+        for obj in storage.iter_objects(prefix):
+            report.scanned += 1
+            if obj["LastModified"] <= cutoff:
+                candidates[obj["Key"]] = int(obj.get("Size", 0))
+
+    live = live_reference_keys(session, storage)
+    report.kept_shared = sum(1 for key in candidates if key in live)
+    deleted = storage.delete_keys(key for key in candidates if key not in live)
+    _forget_assets(session, deleted)
+    report.deleted = len(deleted)
+    report.reclaimed_bytes = sum(candidates[key] for key in deleted)
+    logger.info("storage_orphans_swept", prefixes=prefixes, **report.as_dict())
+    return report
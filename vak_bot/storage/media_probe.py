@@ -0,0 +1,114 @@
+"""Metadata for uploaded media, probed once so later stages can decide without fetching the bytes."""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import shutil
+import subprocess
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+import structlog
+from PIL import Image
+
+from vak_bot.config import get_settings
+
+logger = structlog.get_logger(__name__)
+
+_HASH_CHUNK_BYTES = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class MediaProbe:
+    byte_size: int
+    mime_type: str
+    content_sha256: str | None = None
+    width: int | None = None
+    height: int | None = None
+    duration_seconds: float | None = None
+    codec: str | None = None
+    bitrate: int | None = None
+
+
+def _ffprobe() -> str | None:
+    configured = get_settings().ffprobe_path
+    if configured and Path(configured).exists():
+        return configured
+    return shutil.which(configured or "ffprobe")
+
+
+def _image_fields(source: bytes | str | Path) -> dict:
+    try:
+        with Image.open(io.BytesIO(source) if isinstance(source, bytes) else source) as image:
+            return {"width": image.width, "height": image.height, "mime_type": Image.MIME.get(image.format or "")}
+    except Exception as exc:
+        logger.warning("media_probe_image_failed", error=str(exc))
+        return {}
+
+
+def _video_fields(path: str | Path) -> dict:
+    binary = _ffprobe()
+    if binary is None:
+        logger.warning("media_probe_ffprobe_missing", configured_path=get_settings().ffprobe_path)
+        return {}
+    cmd = [binary, "-v", "error", "-print_format", "json", "-show_format", "-show_streams", str(path)]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        payload = json.loads(result.stdout or "{}")
+    except Exception as exc:
+        logger.warning("media_probe_video_failed", error=str(exc))
+        return {}
+
+    fmt = payload.get("format") or {}
+    stream = next((s for s in payload.get("streams") or [] if s.get("codec_type") == "video"), {})
+    fields = {
+        "width": stream.get("width"),
+        "height": stream.get("height"),
+        "codec": stream.get("codec_name"),
+        "duration_seconds": float(fmt["duration"]) if fmt.get("duration") else None,
+        "bitrate": int(fmt["bit_rate"]) if fmt.get("bit_rate") else None,
+    }
+    return {key: value for key, value in fields.items() if value is not None}
+
+
+def _fields_for(source: bytes | str | Path, content_type: str) -> dict:
+    if content_type.startswith("image/"):
+        return _image_fields(source)
+    if content_type.startswith("video/"):
+        if isinstance(source, bytes):
+            with tempfile.NamedTemporaryFile(suffix=".mp4") as tf:
+                tf.write(source)
+                tf.flush()
+                return _video_fields(tf.name)
+        return _video_fields(source)
+    return {}
+
+
+def _probe(byte_size: int, digest: str, content_type: str, fields: dict) -> MediaProbe:
+    # The declared content type wins over whatever Pillow guessed, unless none was declared.
+    mime_type = content_type or fields.get("mime_type") or "application/octet-stream"
+    return MediaProbe(
+        byte_size=byte_size,
+        mime_type=mime_type,
+        content_sha256=digest,
+        width=fields.get("width"),
+        height=fields.get("height"),
+        duration_seconds=fields.get("duration_seconds"),
+        codec=fields.get("codec"),
+        bitrate=fields.get("bitrate"),
+    )
+
+
+def probe_bytes(data: bytes, content_type: str) -> MediaProbe:
+    return _probe(len(data), hashlib.sha256(data).hexdigest(), content_type, _fields_for(data, content_type))
+
+
+def probe_file(path: str | Path, content_type: str) -> MediaProbe:
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as fh:
+        for chunk in iter(lambda: fh.read(_HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return _probe(Path(path).stat().st_size, digest.hexdigest(), content_type, _fields_for(path, content_type))
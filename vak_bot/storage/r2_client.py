@@ -1,11 +1,30 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import uuid
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterable, Iterator
 from urllib.parse import urlparse
 
 import boto3
+import httpx
+import structlog
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError
 
 from vak_bot.config import get_settings
+from vak_bot.storage.asset_registry import record_asset
+from vak_bot.storage.media_probe import MediaProbe, probe_bytes, probe_file
+
+logger = structlog.get_logger(__name__)
+
+_MB = 1024 * 1024
+_HASH_CHUNK_BYTES = _MB
+# S3 DeleteObjects accepts at most this many keys per request.
+_DELETE_BATCH = 1000
+# Content-addressed keys never change meaning, so CDNs and clients may cache them for good.
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
 
 
 class R2StorageClient:
@@ -26,22 +45,231 @@ class R2StorageClient:
                 region_name=self.settings.storage_region,
             )
 
+    def _transfer_config(self) -> TransferConfig:
+        # Objects above the threshold move as parallel multipart parts, each held in memory one chunk at a time.
+        return TransferConfig(
+            multipart_threshold=self.settings.storage_multipart_threshold_mb * _MB,
+            multipart_chunksize=self.settings.storage_multipart_chunk_mb * _MB,
+            max_concurrency=self.settings.storage_transfer_concurrency,
+            use_threads=True,
+        )
+
+    def _url_for(self, key: str) -> str:
+        if self._dry_run:
+            return f"{self._public_base_url or 'https://example.com'}/{key}"
+        if self._public_base_url:
+            return f"{self._public_base_url}/{key}"
+        return f"{self._endpoint}/{self._bucket}/{key}"
+
+    def key_for_url(self, url: str) -> str | None:
+        """The bucket key behind ``url``, or None when it is not served from this bucket."""
+        for base in (self._public_base_url, f"{self._endpoint}/{self._bucket}" if self._endpoint else ""):
+            if base and url.startswith(f"{base}/"):
+                return url[len(base) + 1 :].split("?", 1)[0]
+        return None
+
+    def _register(self, key: str, url: str, probe: Callable[[], MediaProbe]) -> None:
+        if not self.settings.media_asset_registry_enabled:
+            return
+        try:
+            record_asset(url, key, probe())
+        except Exception as exc:
+            logger.warning("media_asset_probe_failed", key=key, error=str(exc))
+
     def upload_bytes(self, key: str, data: bytes, content_type: str = "image/jpeg") -> str:
         safe_key = key.strip("/") or f"generated/{uuid.uuid4().hex}.jpg"
-        if self._dry_run:
-            base = self._public_base_url or "https://example.com"
-            return f"{base}/{safe_key}"
+        if not self._dry_run:
+            assert self._client is not None
+            self._client.put_object(
+                Bucket=self._bucket,
+                Key=safe_key,
+                Body=data,
+                ContentType=content_type,
+            )
+        url = self._url_for(safe_key)
+        self._register(safe_key, url, lambda: probe_bytes(data, content_type))
+        return url
 
+    async def upload_bytes_async(self, key: str, data: bytes, content_type: str = "image/jpeg") -> str:
+        # boto3 has no asyncio surface; the put runs on a worker thread so the event loop stays free.
+        return await asyncio.to_thread(self.upload_bytes, key, data, content_type)
+
+    @staticmethod
+    def content_key(prefix: str, digest: str, extension: str) -> str:
+        return f"{prefix.strip('/')}/{digest[:2]}/{digest}{extension}"
+
+    def _exists(self, key: str) -> bool:
         assert self._client is not None
-        self._client.put_object(
+        try:
+            self._client.head_object(Bucket=self._bucket, Key=key)
+        except ClientError as exc:
+            if exc.response.get("Error", {}).get("Code") in {"404", "NoSuchKey", "NotFound"}:
+                return False
+            raise
+        return True
+
+    def _reuse(self, key: str, content_type: str) -> bool:
+        """True when ``key`` is already stored, after restarting its ``LastModified``.
+
+        A dedup hit writes nothing, so the object would keep the age of its first
+        upload while the row that references it is still uncommitted; the orphan
+        sweep's grace period only protects it if it looks freshly written.
+        """
+        if self._dry_run or not self._exists(key):
+            return False
+        assert self._client is not None
+        self._client.copy_object(
             Bucket=self._bucket,
-            Key=safe_key,
-            Body=data,
+            Key=key,
+            CopySource={"Bucket": self._bucket, "Key": key},
+            MetadataDirective="REPLACE",
             ContentType=content_type,
+            CacheControl=IMMUTABLE_CACHE_CONTROL,
         )
-        if self._public_base_url:
-            return f"{self._public_base_url}/{safe_key}"
-        return f"{self._endpoint}/{self._bucket}/{safe_key}"
+        logger.info("storage_upload_deduplicated", key=key)
+        return True
+
+    def upload_content_addressed(
+        self, prefix: str, data: bytes, content_type: str = "image/jpeg", extension: str = ".jpg"
+    ) -> str:
+        """Store ``data`` under ``prefix`` at a key derived from its sha256 and return its URL.
+
+        The same bytes always map to the same key, so a repeat upload costs a HEAD and
+        an in-place copy instead of the transfer. Objects are written with an immutable
+        ``Cache-Control``.
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        key = self.content_key(prefix, digest, extension)
+        url = self._url_for(key)
+        if self._reuse(key, content_type):
+            return url
+        if not self._dry_run:
+            assert self._client is not None
+            self._client.put_object(
+                Bucket=self._bucket,
+                Key=key,
+                Body=data,
+                ContentType=content_type,
+                CacheControl=IMMUTABLE_CACHE_CONTROL,
+            )
+        self._register(key, url, lambda: probe_bytes(data, content_type))
+        return url
+
+    async def upload_content_addressed_async(
+        self, prefix: str, data: bytes, content_type: str = "image/jpeg", extension: str = ".jpg"
+    ) -> str:
+        return await asyncio.to_thread(self.upload_content_addressed, prefix, data, content_type, extension)
+
+    def upload_file_content_addressed(
+        self, prefix: str, path: str | Path, content_type: str = "application/octet-stream"
+    ) -> str:
+        """``upload_content_addressed`` for a local file, hashed and uploaded without reading it into memory."""
+        digest = hashlib.sha256()
+        with Path(path).open("rb") as fh:
+            for chunk in iter(lambda: fh.read(_HASH_CHUNK_BYTES), b""):
+                digest.update(chunk)
+        key = self.content_key(prefix, digest.hexdigest(), Path(path).suffix)
+        url = self._url_for(key)
+        if self._reuse(key, content_type):
+            return url
+        if not self._dry_run:
+            assert self._client is not None
+            self._client.upload_file(
+                str(path),
+                self._bucket,
+                key,
+                ExtraArgs={"ContentType": content_type, "CacheControl": IMMUTABLE_CACHE_CONTROL},
+                Config=self._transfer_config(),
+            )
+        self._register(key, url, lambda: probe_file(path, content_type))
+        return url
+
+    def upload_file(self, key: str, path: str | Path, content_type: str = "application/octet-stream") -> str:
+        """Upload a local file without reading it into memory; large files go up as parallel parts."""
+        safe_key = key.strip("/") or f"generated/{uuid.uuid4().hex}{Path(path).suffix}"
+        if not self._dry_run:
+            assert self._client is not None
+            self._client.upload_file(
+                str(path),
+                self._bucket,
+                safe_key,
+                ExtraArgs={"ContentType": content_type},
+                Config=self._transfer_config(),
+            )
+        url = self._url_for(safe_key)
+        self._register(safe_key, url, lambda: probe_file(path, content_type))
+        return url
+
+    def upload_stream(self, key: str, stream: BinaryIO, content_type: str = "application/octet-stream") -> str:
+        """Upload from a readable binary stream, one multipart chunk in memory at a time.
+
+        The stream cannot be re-read, so its asset records size and hash but no probe fields.
+        """
+        safe_key = key.strip("/") or f"generated/{uuid.uuid4().hex}"
+        reader = _HashingReader(stream)
+        if self._dry_run:
+            for _chunk in iter(lambda: reader.read(_MB), b""):
+                pass
+        else:
+            assert self._client is not None
+            self._client.upload_fileobj(
+                reader,
+                self._bucket,
+                safe_key,
+                ExtraArgs={"ContentType": content_type},
+                Config=self._transfer_config(),
+            )
+        url = self._url_for(safe_key)
+        self._register(
+            safe_key,
+            url,
+            lambda: MediaProbe(byte_size=reader.size, mime_type=content_type, content_sha256=reader.digest.hexdigest()),
+        )
+        return url
+
+    def download_to_path(self, url: str, path: str | Path) -> Path:
+        """Stream ``url`` into ``path`` and return it; memory use does not grow with the object.
+
+        Objects in this bucket are fetched with parallel ranged GETs. Anything else
+        streams through the shared media client, and a connection that drops mid-body
+        is resumed from the bytes already on disk with a ``Range`` request.
+        """
+        key = None if self._dry_run else self.key_for_url(url)
+        if key is not None:
+            assert self._client is not None
+            self._client.download_file(self._bucket, key, str(path), Config=self._transfer_config())
+            return Path(path)
+        _stream_to_path(url, Path(path), attempts=max(1, self.settings.storage_download_attempts))
+        return Path(path)
+
+    def iter_objects(self, prefix: str = "") -> Iterator[dict]:
+        """Yield ``Key``, ``Size`` and ``LastModified`` of every object under ``prefix``, one listing page at a time."""
+        if self._dry_run:
+            return
+        assert self._client is not None
+        paginator = self._client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self._bucket, Prefix=prefix):
+            yield from page.get("Contents", [])
+
+    def delete_keys(self, keys: Iterable[str]) -> list[str]:
+        """Delete ``keys`` with one DeleteObjects request per 1000 keys; returns the keys actually deleted."""
+        pending = sorted(set(keys))
+        if self._dry_run or not pending:
+            return []
+        assert self._client is not None
+        deleted: list[str] = []
+        for start in range(0, len(pending), _DELETE_BATCH):
+            batch = pending[start : start + _DELETE_BATCH]
+            response = self._client.delete_objects(
+                Bucket=self._bucket,
+                Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+            )
+            errors = response.get("Errors", [])
+            for error in errors:
+                logger.warning("storage_delete_failed", key=error.get("Key"), code=error.get("Code"))
+            failed = {error.get("Key") for error in errors}
+            deleted.extend(key for key in batch if key not in failed)
+        return deleted
 
     def delete_by_url(self, url: str) -> None:
         if self._dry_run or not url:
@@ -53,3 +281,49 @@ class R2StorageClient:
         if self._bucket and key.startswith(f"{self._bucket}/"):
             key = key[len(self._bucket) + 1 :]
         self._client.delete_object(Bucket=self._bucket, Key=key)
+
+
+class _HashingReader:
+    """Counts and hashes whatever boto3 reads from the wrapped stream."""
+
+    def __init__(self, stream: BinaryIO) -> None:
+        self._stream = stream
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._stream.read(size)
+        self.digest.update(chunk)
+        self.size += len(chunk)
+        return chunk
+
+
+def _stream_to_path(url: str, path: Path, attempts: int) -> int:
+    # Imported here: vak_bot.pipeline imports this module through the styler.
+    from vak_bot.pipeline.http_clients import get_client
+
+    written = 0
+    with path.open("wb") as fh:
+        for attempt in range(1, attempts + 1):
+            headers = {"Range": f"bytes={written}-"} if written else {}
+            try:
+                with get_client("media").stream("GET", url, headers=headers) as response:
+                    if written and response.status_code == 416:
+                        # The previous attempt already had every byte.
+                        return written
+                    response.raise_for_status()
+                    if written and response.status_code != 206:
+                        # The server ignored the range; start the body over.
+                        fh.seek(0)
+                        fh.truncate()
+                        written = 0
+                    # Unchunked so every byte received is on disk before a drop can interrupt the body.
+                    for chunk in response.iter_bytes():
+                        fh.write(chunk)
+                        written += len(chunk)
+                return written
+            except httpx.TransportError as exc:
+                if attempt == attempts:
+                    raise
+                logger.warning("media_download_resuming", url=url, offset=written, attempt=attempt, error=str(exc))
+    return written
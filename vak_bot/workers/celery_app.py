@@ -17,13 +17,20 @@ celery_app.conf.update(
     task_routes={
         "vak_bot.workers.tasks.process_post_task": {"queue": "pipeline"},
         "vak_bot.workers.tasks.process_video_post_task": {"queue": "pipeline"},
+        "vak_bot.workers.tasks.route_reference_task": {"queue": "pipeline"},
+        "vak_bot.workers.tasks.prefetch_reference_task": {"queue": "pipeline"},
         "vak_bot.workers.tasks.extend_video_task": {"queue": "pipeline"},
         "vak_bot.workers.tasks.reel_this_task": {"queue": "pipeline"},
+        "vak_bot.workers.tasks.render_reel_variation_task": {"queue": "pipeline"},
+        "vak_bot.workers.tasks.render_carousel_slides_task": {"queue": "pipeline"},
+        "vak_bot.workers.tasks.finalize_render_task": {"queue": "pipeline"},
         "vak_bot.workers.tasks.publish_post_task": {"queue": "pipeline"},
         "vak_bot.workers.tasks.rewrite_caption_task": {"queue": "pipeline"},
         "vak_bot.workers.tasks.refresh_meta_token_task": {"queue": "maintenance"},
         "vak_bot.workers.tasks.cleanup_reference_images_task": {"queue": "maintenance"},
+        "vak_bot.workers.tasks.sweep_storage_orphans_task": {"queue": "maintenance"},
         "vak_bot.workers.tasks.dispatch_scheduled_posts_task": {"queue": "maintenance"},
+        "vak_bot.workers.tasks.poll_veo_operations_task": {"queue": "maintenance"},
     },
     beat_schedule={
         "refresh-meta-token-daily": {
@@ -34,10 +41,18 @@ celery_app.conf.update(
             "task": "vak_bot.workers.tasks.cleanup_reference_images_task",
             "schedule": 86400,
         },
+        "sweep-storage-orphans-daily": {
+            "task": "vak_bot.workers.tasks.sweep_storage_orphans_task",
+            "schedule": 86400,
+        },
         "dispatch-scheduled-posts-every-minute": {
             "task": "vak_bot.workers.tasks.dispatch_scheduled_posts_task",
             "schedule": 60,
         },
+        "poll-veo-operations": {
+            "task": "vak_bot.workers.tasks.poll_veo_operations_task",
+            "schedule": settings.veo_poll_interval_seconds,
+        },
     },
 )
 
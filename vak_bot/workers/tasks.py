@@ -4,23 +4,33 @@ from datetime import datetime, timedelta, timezone
 
 from celery.utils.log import get_task_logger
 
+from vak_bot.bot.sender import send_text
+from vak_bot.bot.texts import load_bot_texts
 from vak_bot.config import get_settings
 from vak_bot.db.models import Brand, Post, TelegramSession
 from vak_bot.db.session import SessionLocal
 from vak_bot.enums import PostStatus
 from vak_bot.pipeline.orchestrator import (
+    VEO_RESUME_FINAL,
+    VEO_RESUME_REEL_THIS,
     notify_token_expiry,
-    purge_old_reference_images,
+    resolve_reference_pipeline_type,
+    run_reference_prefetch,
     run_caption_rewrite,
+    run_carousel_completion,
+    run_final_render,
     run_generation_pipeline,
     run_publish,
     run_reel_this_conversion,
+    run_reel_variation,
+    run_veo_sweep,
     run_video_extension,
     run_video_generation_pipeline,
 )
 from vak_bot.pipeline.poster import MetaGraphPoster
 from vak_bot.services.credentials_service import update_brand_meta_token
 from vak_bot.storage import R2StorageClient
+from vak_bot.storage.lifecycle import purge_reference_images, sweep_orphans
 from vak_bot.workers.celery_app import celery_app
 
 logger = get_task_logger(__name__)
@@ -28,9 +38,9 @@ settings = get_settings()
 
 
 @celery_app.task(bind=True, autoretry_for=(Exception,), retry_backoff=True, retry_kwargs={"max_retries": 2})
-def process_post_task(self, post_id: int, chat_id: int, brand_id: int | None = None) -> None:
-    logger.info("process_post_task_start post_id=%s brand_id=%s", post_id, brand_id)
-    run_generation_pipeline(post_id=post_id, chat_id=chat_id, brand_id=brand_id)
+def process_post_task(self, post_id: int, chat_id: int, brand_id: int | None = None, from_stage: str | None = None) -> None:
+    logger.info("process_post_task_start post_id=%s brand_id=%s from_stage=%s", post_id, brand_id, from_stage)
+    run_generation_pipeline(post_id=post_id, chat_id=chat_id, brand_id=brand_id, from_stage=from_stage)
 
 
 @celery_app.task(bind=True, autoretry_for=(Exception,), retry_backoff=True, retry_kwargs={"max_retries": 2})
@@ -39,6 +49,18 @@ def rewrite_caption_task(self, post_id: int, chat_id: int, instruction: str, bra
     run_caption_rewrite(post_id=post_id, chat_id=chat_id, rewrite_instruction=instruction, brand_id=brand_id)
 
 
+@celery_app.task
+def render_carousel_slides_task(post_id: int, variant_index: int, brand_id: int | None = None) -> None:
+    logger.info("render_carousel_slides_task_start post_id=%s variant=%s brand_id=%s", post_id, variant_index, brand_id)
+    run_carousel_completion(post_id=post_id, variant_index=variant_index, brand_id=brand_id)
+
+
+@celery_app.task
+def finalize_render_task(post_id: int, chat_id: int, brand_id: int | None = None) -> None:
+    logger.info("finalize_render_task_start post_id=%s brand_id=%s", post_id, brand_id)
+    run_final_render(post_id=post_id, chat_id=chat_id, brand_id=brand_id)
+
+
 @celery_app.task(bind=True, autoretry_for=(Exception,), retry_backoff=True, retry_kwargs={"max_retries": 2})
 def publish_post_task(self, post_id: int, chat_id: int, posted_by: str, brand_id: int | None = None) -> None:
     resolved_brand_id = brand_id
@@ -103,9 +125,34 @@ def refresh_meta_token_task() -> None:
 @celery_app.task
 def cleanup_reference_images_task() -> int:
     storage = R2StorageClient()
-    deleted = purge_old_reference_images(days=30, storage_client=storage)
-    logger.info("cleanup_reference_images deleted=%s", deleted)
-    return deleted
+    with SessionLocal() as db:
+        report = purge_reference_images(db, storage, days=settings.reference_image_retention_days)
+    logger.info(
+        "cleanup_reference_images deleted=%s reclaimed_bytes=%s kept_shared=%s",
+        report.deleted,
+        report.reclaimed_bytes,
+        report.kept_shared,
+    )
+    return report.deleted
+
+
+@celery_app.task
+def sweep_storage_orphans_task() -> dict:
+    storage = R2StorageClient()
+    with SessionLocal() as db:
+        report = sweep_orphans(
+            db,
+            storage,
+            prefixes=settings.storage_sweep_prefix_list,
+            grace=timedelta(hours=settings.storage_orphan_grace_hours),
+        )
+    logger.info(
+        "sweep_storage_orphans scanned=%s deleted=%s reclaimed_bytes=%s",
+        report.scanned,
+        report.deleted,
+        report.reclaimed_bytes,
+    )
+    return report.as_dict()
 
 
 @celery_app.task
@@ -143,9 +190,42 @@ def dispatch_scheduled_posts_task() -> int:
 
 
 @celery_app.task(bind=True, autoretry_for=(Exception,), retry_backoff=True, retry_kwargs={"max_retries": 2})
-def process_video_post_task(self, post_id: int, chat_id: int, brand_id: int | None = None) -> None:
-    logger.info("process_video_post_task_start post_id=%s brand_id=%s", post_id, brand_id)
-    run_video_generation_pipeline(post_id=post_id, chat_id=chat_id, brand_id=brand_id)
+def process_video_post_task(
+    self, post_id: int, chat_id: int, brand_id: int | None = None, from_stage: str | None = None
+) -> None:
+    logger.info("process_video_post_task_start post_id=%s brand_id=%s from_stage=%s", post_id, brand_id, from_stage)
+    run_video_generation_pipeline(post_id=post_id, chat_id=chat_id, brand_id=brand_id, from_stage=from_stage)
+
+
+@celery_app.task
+def prefetch_reference_task(
+    brand_id: int,
+    telegram_user_id: int,
+    chat_id: int,
+    source_url: str,
+    prefetch_id: str,
+    pipeline_type: str | None = None,
+) -> None:
+    logger.info("prefetch_reference_task_start brand_id=%s source_url=%s", brand_id, source_url)
+    run_reference_prefetch(
+        brand_id=brand_id,
+        telegram_user_id=telegram_user_id,
+        chat_id=chat_id,
+        source_url=source_url,
+        prefetch_id=prefetch_id,
+        pipeline_type=pipeline_type,
+    )
+
+
+@celery_app.task
+def route_reference_task(post_id: int, chat_id: int, brand_id: int | None = None) -> None:
+    logger.info("route_reference_task_start post_id=%s brand_id=%s", post_id, brand_id)
+    pipeline_type = resolve_reference_pipeline_type(post_id=post_id, brand_id=brand_id)
+    if pipeline_type == "reel":
+        send_text(brand_id, chat_id, load_bot_texts(brand_id).reel_detected_message)
+        process_video_post_task.delay(post_id, chat_id, brand_id)
+    else:
+        process_post_task.delay(post_id, chat_id, brand_id)
 
 
 @celery_app.task(bind=True, autoretry_for=(Exception,), retry_backoff=True, retry_kwargs={"max_retries": 2})
@@ -155,6 +235,25 @@ def extend_video_task(self, post_id: int, chat_id: int, video_variation: int = 1
 
 
 @celery_app.task(bind=True, autoretry_for=(Exception,), retry_backoff=True, retry_kwargs={"max_retries": 2})
-def reel_this_task(self, post_id: int, chat_id: int, brand_id: int | None = None) -> None:
-    logger.info("reel_this_task_start post_id=%s brand_id=%s", post_id, brand_id)
-    run_reel_this_conversion(post_id=post_id, chat_id=chat_id, brand_id=brand_id)
+def reel_this_task(self, post_id: int, chat_id: int, brand_id: int | None = None, resume: bool = False) -> None:
+    logger.info("reel_this_task_start post_id=%s brand_id=%s resume=%s", post_id, brand_id, resume)
+    run_reel_this_conversion(post_id=post_id, chat_id=chat_id, brand_id=brand_id, resume=resume)
+
+
+@celery_app.task(bind=True, autoretry_for=(Exception,), retry_backoff=True, retry_kwargs={"max_retries": 2})
+def render_reel_variation_task(self, post_id: int, chat_id: int, brand_id: int | None = None) -> None:
+    logger.info("render_reel_variation_task_start post_id=%s brand_id=%s", post_id, brand_id)
+    run_reel_variation(post_id=post_id, chat_id=chat_id, brand_id=brand_id)
+
+
+@celery_app.task
+def poll_veo_operations_task() -> None:
+    """Collect finished Veo renders and re-enqueue their pipelines; checkpoints skip the done stages."""
+    for resume in run_veo_sweep():
+        logger.info("veo_resume post_id=%s kind=%s", resume.post_id, resume.kind)
+        if resume.kind == VEO_RESUME_FINAL:
+            publish_post_task.delay(resume.post_id, resume.chat_id, resume.publish_as, resume.brand_id)
+        elif resume.kind == VEO_RESUME_REEL_THIS:
+            reel_this_task.delay(post_id=resume.post_id, chat_id=resume.chat_id, brand_id=resume.brand_id, resume=True)
+        else:
+            process_video_post_task.delay(post_id=resume.post_id, chat_id=resume.chat_id, brand_id=resume.brand_id)